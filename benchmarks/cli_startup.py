@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Startup benchmark for auto_extract command
+
+Measures wall clock time of importing `tableaupy.cli` and of running
+`auto_extract --help` in a fresh interpreter, and reports which heavy
+modules got imported along the way.
+
+Usage::
+
+    python benchmarks/cli_startup.py [--repeat N]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import json
+import subprocess
+import sys
+import timeit
+
+HEAVY_MODULES = ['tableausdk', 'lxml', 'xmltodict', 'future']
+
+_IMPORT_SNIPPET = '''
+import json, sys
+import tableaupy.cli
+print(json.dumps(sorted(
+    name for name in {heavy!r}
+    if any(module == name or module.startswith(name + '.')
+           for module in sys.modules)
+)))
+'''.format(heavy=HEAVY_MODULES)
+
+_HELP_SNIPPET = '''
+import sys
+from tableaupy.cli import main
+sys.argv = ['auto_extract', '--help']
+main()
+'''
+
+
+def _run(snippet):
+    """Runs `snippet` in a fresh interpreter and returns its output"""
+
+    return subprocess.check_output([sys.executable, '-c', snippet])
+
+
+def _best_of(snippet, repeat):
+    """Best wall clock time in seconds of running `snippet`"""
+
+    return min(timeit.repeat(lambda: _run(snippet), number=1, repeat=repeat))
+
+
+def main():
+    """Runs benchmark and prints the report"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = _best_of('pass', args.repeat)
+    import_time = _best_of(_IMPORT_SNIPPET, args.repeat)
+    help_time = _best_of(_HELP_SNIPPET, args.repeat)
+    loaded = json.loads(_run(_IMPORT_SNIPPET).decode('utf-8'))
+
+    print('interpreter startup     : {:8.1f} ms'.format(baseline * 1000))
+    print('import tableaupy.cli    : {:8.1f} ms'.format(
+        (import_time - baseline) * 1000
+    ))
+    print('auto_extract --help     : {:8.1f} ms'.format(
+        (help_time - baseline) * 1000
+    ))
+    print('heavy modules imported  : {}'.format(', '.join(loaded) or 'none'))
+
+
+if __name__ == '__main__':
+    main()
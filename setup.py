@@ -63,7 +63,11 @@ setup(
     },
     entry_points={
         'console_scripts': [
-            'auto_extract = tableaupy.cli:main'
+            'auto_extract = tableaupy.cli:main',
+            'extract_server = tableaupy.server:main',
+            'extract_report = tableaupy.report:main',
+            'infer_tds = tableaupy.infer:main',
+            'rewrite_tds = tableaupy.rewrite:main',
         ]
     },
     install_requires=[
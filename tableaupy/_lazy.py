@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""This module defines lazily imported module proxies
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import importlib
+import sys
+
+
+class LazyModule(object):
+    """Proxy for a module which is imported on first attribute access
+
+    Heavy dependencies like the tableau sdk are only needed when an extract
+    is actually written, proxying them keeps command startup, help and
+    argument validation free from their import cost.
+
+    Parameters
+    ----------
+    name : str
+        absolute name of the module to be imported
+
+    Examples
+    --------
+    >>> json = LazyModule('json')
+    >>> json.loads('[1, 2]')
+    [1, 2]
+    >>> json.loaded
+    True
+
+    Probing special attributes, e.g. by doctest or inspect, does not
+    import the module
+
+    >>> missing = LazyModule('tableaupy_missing_module')
+    >>> hasattr(missing, '__wrapped__'), missing.loaded
+    (False, False)
+    >>> try:
+    ...     missing.ExtractAPI
+    ... except ImportError:
+    ...     print('not installed')
+    not installed
+    """
+
+    def __init__(self, name):
+        super(LazyModule, self).__init__()
+        self.__name = name
+        self.__module = None
+
+    @property
+    def loaded(self):
+        """True if the proxied module is imported"""
+
+        return self.__module is not None or self.__name in sys.modules
+
+    def __getattr__(self, attribute):
+        if self.__module is None:
+            # special attributes are probed, not used, e.g. __wrapped__
+            if attribute.startswith('__') and attribute.endswith('__'):
+                raise AttributeError(attribute)
+
+            self.__module = importlib.import_module(self.__name)
+
+        return getattr(self.__module, attribute)
+
+    def __repr__(self):
+        return '<LazyModule {!r}>'.format(self.__name)
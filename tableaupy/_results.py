@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""This module defines printing of per file results of tableaupy commands
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import click
+
+from tableaupy import _status
+
+RES_STATUS = 'status'  #: result key of the _status.Status of a file
+RES_LOCAL_PATH = 'local-path'  #: result key of the file path as input
+RES_MSG = 'msg'  #: result key of the error message of a file
+
+
+def print_result(tde_result, cols=80):
+    """Prints result of processing a file, as one line of a table
+
+    Parameters
+    ----------
+    tde_result : dict
+        Represented in form::
+
+            {
+                'local-path': File path (not absolute),
+                'status': Passed | Failed
+                'msg': error_message || ''
+            }
+    cols : int
+        Length of a line in the print result. The value is,
+        calculated by taking into account the names of all files,
+        and maximum length of status to accommodate everything in a neat
+        tabular form. Defaults to 80.
+    """
+
+    file_name = tde_result[RES_LOCAL_PATH]
+    file_status = tde_result[RES_STATUS]
+    message = tde_result[RES_MSG]
+
+    dots = '.' * (cols - len(file_name) - len(file_status.text) - 1)
+    click.echo(file_name + dots, nl=False)
+    click.secho(file_status.text, bg=file_status.color)
+
+    if message:
+        click.echo(message)
+
+
+def compute_cols(files):
+    """Computes max required length for output
+
+    From all the file names and maximum length of _status constant text,
+    determines the maximum length a line can have in the result.
+
+    Parameters
+    ----------
+    files : list
+        list of all the files input by the user.
+
+    Returns
+    -------
+    int
+        maximum line length of output result, min: 80
+
+    Examples
+    --------
+    >>> files = ['abcd', 'abcde', 'abcdf']
+    >>> compute_cols(files)
+    80
+
+    >>> import os
+    >>> files = ['abcd', 'abcd'*18]
+    >>> s = 'abcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcd'
+    >>> s += 'abcdabcdabcd...Success' + os.linesep
+    >>> compute_cols(files) == len(s)
+    True
+    """
+
+    if files:
+        name_len = max(len(current_file) for current_file in files)
+    else:
+        name_len = 0
+
+    cols = name_len + 3 + len(_status.SUCCESS.text) + 1
+    return max(cols, 80)
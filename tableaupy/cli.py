@@ -6,17 +6,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
+import time
+
 import click
-from pathlib2 import Path
 
 from tableaupy import _status
+from tableaupy._results import RES_LOCAL_PATH
+from tableaupy._results import RES_MSG
+from tableaupy._results import RES_STATUS
+from tableaupy._results import compute_cols
+from tableaupy._results import print_result
 from tableaupy.exceptions import AutoExtractException
-from tableaupy.writers import TDEWriter
-from tableaupy.writers import WriterException
-
-_RES_STATUS = 'status'
-_RES_LOCAL_PATH = 'local-path'
-_RES_MSG = 'msg'
+from tableaupy.journal import Journal
+from tableaupy.progress import Throughput
 
 _PROGRESS_TEXT = 'Processing datasource files'
 
@@ -30,8 +33,102 @@ _PROGRESS_TEXT = 'Processing datasource files'
               help='Adds prefix to generated file names')
 @click.option('--overwrite', is_flag=True,
               help='To overwrite already existing .tde files')
-@click.argument('files', nargs=-1, type=click.Path(exists=True), required=True)
-def main(files, overwrite, prefix, suffix, output_dir):
+@click.option('-w', '--watch', metavar='DIR',
+              type=click.Path(exists=True, file_okay=False),
+              help='Keep running and regenerate extracts of .tds files '
+                   'added or modified in DIR')
+@click.option('--interval', default=2.0, show_default=True,
+              help='Seconds between two polls of the watched directory')
+@click.option('--journal', type=click.Path(dir_okay=False),
+              help='Append result of every processed file to this '
+                   'checkpoint journal')
+@click.option('--resume', is_flag=True,
+              help='Skip files journaled as successful in --journal')
+@click.option('-j', '--jobs', default=1, show_default=True,
+              type=click.IntRange(min=1),
+              help='Number of worker processes generating extracts')
+@click.option('--fetch-rows', is_flag=True,
+              help='Fill extracts with rows read from datasource connections')
+@click.option('--batch-size', default=1000, show_default=True,
+              type=click.IntRange(min=1),
+              help='Rows fetched at once with --fetch-rows')
+@click.option('--queue-size', default=4, show_default=True,
+              type=click.IntRange(min=1),
+              help='Batches fetched and converted ahead of insertion with '
+                   '--fetch-rows')
+@click.option('--parse-processes', type=click.IntRange(min=1), metavar='N',
+              help='Processes parsing csv files of textscan datasources '
+                   'with --fetch-rows  [default: cpu count]')
+@click.option('--buffer-memory', type=click.IntRange(min=1), metavar='MB',
+              help='Fetch rows with --fetch-rows ahead of insertion, '
+                   'spilling to disk beyond MB of buffered rows')
+@click.option('--fetch-process', is_flag=True,
+              help='Fetch and convert rows in a forked process with '
+                   '--fetch-rows, sending them through shared memory')
+@click.option('--include-column', 'include_columns', multiple=True,
+              metavar='NAME',
+              help='Only define this column in extracts, can be repeated')
+@click.option('--exclude-column', 'exclude_columns', multiple=True,
+              metavar='NAME',
+              help='Leave this column out of extracts, can be repeated')
+@click.option('--where', multiple=True, metavar='PREDICATE',
+              help='Fetch only rows meeting this predicate, e.g. '
+                   '"[Order Date]>=2017-01-01", can be repeated')
+@click.option('--aggregate', is_flag=True,
+              help='Group rows fetched with --fetch-rows on dimensions and '
+                   'aggregate measures')
+@click.option('--aggregate-memory', default=256, show_default=True,
+              type=click.IntRange(min=1), metavar='MB',
+              help='Memory of groups held by --aggregate before spilling '
+                   'to disk')
+@click.option('--sort-by', multiple=True, metavar='NAME[:desc]',
+              help='Sort rows fetched with --fetch-rows on this column, '
+                   'can be repeated')
+@click.option('--sort-memory', default=256, show_default=True,
+              type=click.IntRange(min=1), metavar='MB',
+              help='Memory of rows held by --sort-by before spilling to '
+                   'disk')
+@click.option('--sample-rows', type=click.IntRange(min=0), metavar='K',
+              help='Keep a uniform sample of K rows fetched with '
+                   '--fetch-rows')
+@click.option('--sample-percent', type=click.FloatRange(min=0, max=100),
+              metavar='P',
+              help='Keep the same P percent of rows fetched on every run')
+@click.option('--sample-seed', type=int,
+              help='Seed of the --sample-rows sample')
+@click.option('--top', 'top_rows', type=click.IntRange(min=0), metavar='N',
+              help='Keep the first N rows fetched in order of --top-by')
+@click.option('--top-by', multiple=True, metavar='NAME[:desc]',
+              help='Order of rows kept by --top, can be repeated')
+@click.option('--denormalize', is_flag=True,
+              help='Join the tables of datasources joining tables into a '
+                   'single extract table')
+@click.option('--timeout', type=click.FloatRange(min=0), metavar='SECONDS',
+              help='Kill generation of a file running longer than this')
+@click.option('--memory-limit', type=click.IntRange(min=1), metavar='MB',
+              help='Kill generation of a file using more memory than this')
+@click.option('--shard', metavar='I/N',
+              help='Process only the files of shard I out of N')
+@click.option('--history', type=click.Path(dir_okay=False),
+              help='Schedule from and record durations to this file')
+@click.option('--schedule-report', is_flag=True,
+              help='Print busy and idle time of every worker')
+@click.option('--memory-profile', is_flag=True,
+              help='Print memory used per file and phase, and top '
+                   'allocators')
+@click.option('--pipeline-report', is_flag=True,
+              help='Print utilization of fetch, convert and insert stages '
+                   'with --fetch-rows')
+@click.argument('files', nargs=-1, type=click.Path(exists=True))
+@click.pass_context
+def main(ctx, files, overwrite, prefix, suffix, output_dir, watch, interval,
+         journal, resume, jobs, fetch_rows, batch_size, queue_size,
+         parse_processes, buffer_memory, fetch_process, include_columns,
+         exclude_columns, where, aggregate, aggregate_memory, sort_by,
+         sort_memory, sample_rows, sample_percent, sample_seed, top_rows,
+         top_by, denormalize,
+         timeout, memory_limit, shard, history,
+         schedule_report, memory_profile, pipeline_report):
     """auto_extract command
 
     The script creates tableau datasource extracts corresponding
@@ -45,119 +142,631 @@ def main(files, overwrite, prefix, suffix, output_dir):
     like '*', anything that will result in a valid file path.
 
     Error will be thrown if any file / directory does not exists.
+
+    Output paths of all `FILES` are planned before processing starts. If
+    an input is not a .tds file, if several inputs would write to the same
+    .tde file, or if a .tde file already exists without --overwrite, the
+    command fails without processing any file.
+
+    With --watch, `FILES` are not accepted, the command keeps running and
+    regenerates the extract of every .tds file in DIR which is added or
+    modified, overwriting the previous extract, with the extract options
+    given, like --fetch-rows or --where.
+
+    With --jobs, files are dispatched to worker processes largest first,
+    estimated from file sizes or from durations recorded in --history.
+
+    With --fetch-rows, extracts are filled with the rows of the relation of
+    each datasource, read through its connection. Datasources of the same
+    database share pooled connections. Rows are fetched and converted in
+    background threads while previous rows are inserted, at most
+    --queue-size batches of --batch-size rows ahead. With --fetch-process,
+    rows are fetched and converted in a forked process instead and reach
+    the process inserting them through shared memory, unless files are
+    generated by worker processes. With --buffer-memory, rows are fetched
+    as fast as the database sends them and the connection is released as
+    soon as they are read, rows not inserted yet beyond MB being spilled
+    to a temporary file.
+
+    Rows of textscan datasources are read from their csv file, split into
+    chunks parsed and converted by --parse-processes processes.
+
+    With --fetch-rows and --overwrite, the extract of a datasource refreshed
+    incrementally, with an increment-key and incremental-updates="true",
+    is appended only the rows whose increment key is greater than the
+    high-water mark saved next to the extract by the previous run.
+
+    With --include-column or --exclude-column, only the selected columns
+    are defined and fetched, named by local-name or remote-name. With
+    --where, only rows meeting every predicate are fetched, predicates are
+    evaluated by the database.
+
+    With --aggregate, extracts hold one row per distinct value of their
+    dimensions, numeric columns aggregated by Sum, Avg, Min, Max or Count
+    in the datasource being measures aggregated that way. Groups beyond
+    --aggregate-memory are spilled to temporary files.
+
+    With --sort-by, rows are inserted sorted on the given columns, in
+    descending order for NAME:desc, which compresses extracts better.
+    Rows beyond --sort-memory are sorted in runs spilled to temporary files
+    and merged.
+
+    With --sample-percent, --sample-rows or --top, only a sample of the
+    rows fetched is inserted, for development extracts: the same P percent
+    of rows on every run, a uniform sample of K rows, or the first N rows
+    in order of --top-by columns.
+
+    Datasources whose relation joins tables get an extract per table, next
+    to the extract of the datasource, holding the columns of the table,
+    e.g. sales.orders.tde, written at once by a thread each. With
+    --denormalize, tables are joined locally instead, by hash joins
+    holding joined tables in memory, into a single extract table.
+
+    With --timeout or --memory-limit, every file is generated in an
+    isolated worker process which is killed and replaced when it exceeds
+    the limit, failing only that file.
+
+    With --memory-profile, files are processed in this process and the
+    memory used by each file and each of its phases is printed, with the
+    code locations allocating most.
+
+    With --pipeline-report, files are processed in this process and the
+    time spent fetching, converting and inserting rows is printed.
+
+    With --journal, the result of every file is appended to the journal as
+    soon as it is processed. A run which got interrupted can be rerun with
+    the same --journal and --resume to process only the files which failed
+    or were not processed yet.
+
+    With --shard, hosts sharing a directory can split one batch: every
+    host runs the same command with its own shard I out of N shards and
+    its own --journal, and processes only the files hashed to its shard.
+    The journals of all shards are merged by the extract_report command.
     """
 
+    if watch is not None and files:
+        raise click.BadArgumentUsage('FILES cannot be used with --watch')
+
+    if watch is None and not files:
+        raise click.MissingParameter(
+            ctx=ctx,
+            param_hint='"files"',
+            param_type='argument'
+        )
+
+    if resume and journal is None:
+        raise click.UsageError('--resume requires --journal')
+
+    if memory_profile and (jobs > 1 or timeout or memory_limit):
+        raise click.UsageError(
+            '--memory-profile cannot be used with --jobs, --timeout or '
+            '--memory-limit'
+        )
+
+    if pipeline_report and (jobs > 1 or timeout or memory_limit):
+        raise click.UsageError(
+            '--pipeline-report cannot be used with --jobs, --timeout or '
+            '--memory-limit'
+        )
+
+    if top_rows is not None and not top_by:
+        raise click.UsageError('--top requires --top-by')
+
+    shard = _parse_shard(shard)
+    where = _parse_where(where)
+    sort_by = [_parse_sort_key(value) for value in sort_by]
+    top_by = [_parse_sort_key(value) for value in top_by]
+
+    # writers are imported here so that --help and argument validation
+    # never pay for importing lxml, xmltodict and tableau sdk
+    from tableaupy.writers import TDEWriter
+    from tableaupy.memprofile import MemoryProfiler
+    from tableaupy.writers.scheduler import CostHistory
+    from tableaupy.writers.scheduler import schedule
+
     tde_success_map = dict()
 
-    cols = _compute_cols(files)
+    cols = compute_cols(files)
 
-    tde_writer = TDEWriter(options={
+    options = {
         'prefix': prefix,
         'suffix': suffix,
-        'overwrite': overwrite,
+        'overwrite': overwrite or watch is not None,
         'output_dir': output_dir
-    })
-
-    with click.progressbar(files, label=_PROGRESS_TEXT) as file_names:
-        for file_name in file_names:
-            absolute_path = str(Path(file_name).resolve())
-
-            if absolute_path in tde_success_map:
-                continue
-
-            try:
-                tde_writer.generate_from_tds(file_name)
-                tde_success_map[absolute_path] = {
-                    _RES_STATUS: _status.SUCCESS,
-                    _RES_LOCAL_PATH: file_name,
-                    _RES_MSG: ''
-                }
-            except WriterException as err:
-                tde_success_map[absolute_path] = {
-                    _RES_STATUS: _status.FAILED,
-                    _RES_LOCAL_PATH: file_name,
-                    _RES_MSG: str(err)
-                }
+    }
+    tde_writer = TDEWriter(options=options)
+    generate_options = {
+        'fetch_rows': fetch_rows,
+        'batch_size': batch_size,
+        'queue_size': queue_size,
+        'fetch_process': fetch_process,
+        'parse_processes': parse_processes,
+        'buffer_memory': buffer_memory << 20 if buffer_memory else None,
+        'include_columns': list(include_columns),
+        'exclude_columns': list(exclude_columns),
+        'where': where,
+        'aggregate': aggregate,
+        'aggregate_memory': aggregate_memory << 20,
+        'sort_by': sort_by,
+        'sort_memory': sort_memory << 20,
+        'sample_rows': sample_rows,
+        'sample_percent': sample_percent,
+        'sample_seed': sample_seed,
+        'top_rows': top_rows,
+        'top_by': top_by,
+        'denormalize': denormalize,
+    }
+
+    if watch is not None:
+        _watch(tde_writer, watch, interval, generate_options)
+        return
+
+    checkpoint = None if journal is None else Journal(journal)
+    journaled = checkpoint.successes() if resume else set()
+
+    if journaled:
+        click.echo('Resuming, skipping files journaled as successful')
+
+    # outputs of files whose records were lost by an interrupted run are
+    # regenerated rather than failing as already existing
+    plan = tde_writer.plan(
+        files,
+        skip=journaled,
+        journaled=set(checkpoint.records()) if resume else None,
+        include_columns=list(include_columns),
+        exclude_columns=list(exclude_columns),
+        denormalize=denormalize
+    )
+
+    # colliding files fail in every shard they are hashed to, outputs of
+    # other shards existing already do not stop this shard
+    if shard is not None:
+        plan = plan.shard(*shard)
+
+    for absolute_path, (file_name, err) in plan.failures.items():
+        tde_success_map[absolute_path] = {
+            RES_STATUS: _status.FAILED,
+            RES_LOCAL_PATH: file_name,
+            RES_MSG: str(err)
+        }
+
+    cost_history = CostHistory(history)
+    profiler = MemoryProfiler() if memory_profile else None
+    timings = list()
+
+    if jobs > 1:
+        plan.entries = schedule(plan.entries, cost_history)
+
+    # a batch with planning failures is not started at all
+    if plan.ok:
+        sizes = dict(
+            (entry.absolute_path, os.path.getsize(entry.absolute_path))
+            for entry in plan.entries
+        )
+        throughput = Throughput(len(sizes), sum(sizes.values()))
+
+        try:
+            # progress is measured in bytes so that a few big files do not
+            # throw the estimate off, rates are shown next to the bar
+            with click.progressbar(length=throughput.total_bytes,
+                                   label=_PROGRESS_TEXT,
+                                   show_eta=False,
+                                   item_show_func=lambda _: (
+                                       throughput.format()
+                                   )) as progress:
+                if profiler is not None:
+                    profiler.start()
+
+                results = _generate(
+                    tde_writer,
+                    plan,
+                    jobs,
+                    timeout=timeout,
+                    memory_limit=memory_limit,
+                    generate_options=generate_options
+                )
+
+                for entry, error, timing, columns in results:
+                    size = sizes[entry.absolute_path]
+                    timings.append(timing)
+                    throughput.update(size, columns)
+                    cost_history.record(
+                        entry.absolute_path,
+                        size,
+                        timing.finished_at - timing.started_at
+                    )
+
+                    status = _status.SUCCESS if error is None else \
+                        _status.FAILED
+                    tde_success_map[entry.absolute_path] = {
+                        RES_STATUS: status,
+                        RES_LOCAL_PATH: entry.file_name,
+                        RES_MSG: error or ''
+                    }
+
+                    if checkpoint is not None:
+                        checkpoint.record(
+                            entry.absolute_path,
+                            error is None,
+                            error or ''
+                        )
+
+                    progress.update(size)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+
+            if checkpoint is not None:
+                checkpoint.close()
+
+            cost_history.save()
 
     failed = False
     for key in tde_success_map:
-        if tde_success_map[key][_RES_STATUS] == _status.FAILED:
+        if tde_success_map[key][RES_STATUS] == _status.FAILED:
             failed = True
-        _print_result(tde_success_map[key], cols=cols)
+        print_result(tde_success_map[key], cols=cols)
+
+    if schedule_report:
+        _print_schedule_report(timings)
+
+    if profiler is not None:
+        _print_memory_report(profiler.report())
+
+    if pipeline_report:
+        _print_pipeline_report(tde_writer.pipeline_metrics)
 
     if failed:
         raise AutoExtractException(tde_success_map)
 
 
-def _print_result(tde_result, cols=80):
-    """Prints result of auto_extract command
+def _generate(tde_writer,
+              plan,
+              jobs,
+              timeout=None,
+              memory_limit=None,
+              generate_options=None):
+    """Generates extracts of planned files
+
+    Parameters
+    ----------
+    tde_writer : TDEWriter
+        writer used when processing sequentially, its options are used by
+        every worker when processing in parallel
+    plan : Plan
+        planned files, see TDEWriter.plan
+    jobs : int
+        number of worker processes, files are processed sequentially in
+        this process when 1 without limits
+    timeout : float
+        seconds generation of a single file may take
+    memory_limit : int
+        megabytes of memory generation of a single file may use
+    generate_options : dict
+        keyword arguments of TDEWriter.generate_from_tds
+
+    Yields
+    ------
+    tuple
+        (PlanEntry, error message or None, Timing, number of columns
+        defined) in order of completion
+    """
+
+    from future.moves.queue import Queue
+
+    from tableaupy.memprofile import track_file
+    from tableaupy.writers import WriterException
+    from tableaupy.writers import WriterPool
+    from tableaupy.writers.scheduler import Timing
+
+    generate_options = generate_options or {}
+
+    if jobs == 1 and timeout is None and memory_limit is None:
+        for entry in plan.entries:
+            error = None
+            columns = 0
+            started_at = time.time()
+
+            overwrite = tde_writer.overwrite
+            tde_writer.overwrite = overwrite or entry.overwrite
+
+            try:
+                with track_file(entry.file_name):
+                    columns = tde_writer.generate_from_tds(
+                        entry.file_name,
+                        output_path=entry.output_path,
+                        **generate_options
+                    )
+            except WriterException as err:
+                error = str(err)
+            finally:
+                tde_writer.overwrite = overwrite
+
+            timing = Timing(os.getpid(), started_at, time.time())
+            yield entry, error, timing, columns or 0
+
+        return
+
+    completed = Queue()
+    options = {
+        'prefix': tde_writer.prefix,
+        'suffix': tde_writer.suffix,
+        'overwrite': tde_writer.overwrite,
+        'output_dir': tde_writer.output_dir,
+    }
+
+    pool = WriterPool(
+        processes=jobs,
+        options=options,
+        timeout=timeout,
+        memory_limit=None if memory_limit is None else memory_limit << 20
+    )
+
+    with pool:
+        entries = dict()
+
+        for entry in plan.entries:
+            job = pool.submit(
+                entry.file_name,
+                options={'overwrite': True} if entry.overwrite else None,
+                output_path=entry.output_path,
+                callback=completed.put,
+                generate_options=generate_options
+            )
+            entries[job.job_id] = entry
+
+        for _ in plan.entries:
+            job = completed.get()
+            timing = Timing(
+                job.worker,
+                job.started_at,
+                job.started_at + job.duration
+            )
+            yield entries[job.job_id], job.error, timing, job.columns
+
+
+def _print_schedule_report(timings):
+    """Prints makespan and busy / idle time of every worker
+
+    Parameters
+    ----------
+    timings : list[Timing]
+        timings of every processed file
+    """
+
+    from tableaupy.writers.scheduler import makespan_report
+
+    report = makespan_report(timings)
+    click.echo('Makespan: {:.2f}s'.format(report['makespan']))
+
+    for worker, usage in report['workers'].items():
+        click.echo(
+            'Worker {}: {} files, busy {:.2f}s, idle {:.2f}s'.format(
+                worker, usage['jobs'], usage['busy'], usage['idle']
+            )
+        )
+
+
+def _print_memory_report(report):
+    """Prints files with highest memory peak and top allocators
+
+    Parameters
+    ----------
+    report : dict
+        see MemoryProfiler.report
+    """
+
+    def _mb(size):
+        """Formats `size` bytes"""
+
+        if size is None:
+            return 'n/a'
+
+        if abs(size) < 1048576:
+            return '{:.1f} KB'.format(size / 1024)
+
+        return '{:.1f} MB'.format(size / 1048576)
+
+    if not report['tracemalloc']:
+        click.echo('tracemalloc is not available, heap peaks are not known')
+
+    click.echo('Files with highest memory peak:')
+
+    for entry in report['files']:
+        click.echo('{}: peak {}, rss {}'.format(
+            entry['path'], _mb(entry['peak']), _mb(entry['rss'])
+        ))
+
+        for name, usage in entry['phases'].items():
+            click.echo('    {}: peak {}, rss {}'.format(
+                name, _mb(usage['peak']), _mb(usage['rss'])
+            ))
+
+    if report['allocators']:
+        click.echo('Top allocators:')
+
+    for location, size in report['allocators']:
+        click.echo('{}: {}'.format(location, _mb(size)))
+
+
+def _print_pipeline_report(metrics):
+    """Prints busy and waiting time of every insert pipeline stage
+
+    Parameters
+    ----------
+    metrics : dict
+        see TDEWriter.pipeline_metrics
+    """
+
+    if not metrics:
+        click.echo('No rows were fetched')
+        return
+
+    click.echo('Pipeline: {:.2f}s'.format(metrics['elapsed']))
+
+    for stage in ('fetch', 'convert', 'insert'):
+        usage = metrics[stage]
+        click.echo(
+            '{}: {} rows, busy {:.2f}s ({:.0%}), waiting {:.2f}s'.format(
+                stage.capitalize(),
+                usage['rows'],
+                usage['busy'],
+                usage['utilization'],
+                usage['waiting']
+            )
+        )
+
+
+def _watch(tde_writer, directory, interval, generate_options=None):
+    """Regenerates extracts of files changing in `directory` until interrupted
 
     Parameters
     ----------
-    tde_result : dict
-        Represented in form::
-
-            {
-                'local-path': File path (not absolute),
-                'status': Passed | Failed
-                'msg': error_message || ''
-            }
-    cols : int
-        Length of a line in the print result. The value is,
-        calculated by taking into account the names of all files,
-        and maximum length of status to accommodate everything in a neat
-        tabular form. Defaults to 80.
+    tde_writer : TDEWriter
+        writer kept warm for the whole session
+    directory : str
+        directory to be watched
+    interval : float
+        seconds between two polls
+    generate_options : dict
+        keyword arguments of TDEWriter.generate_from_tds
     """
 
-    file_name = tde_result[_RES_LOCAL_PATH]
-    file_status = tde_result[_RES_STATUS]
-    message = tde_result[_RES_MSG]
+    from tableaupy.watcher import Watcher
+
+    def _on_result(file_name, error):
+        """Prints result of regenerating a file"""
 
-    dots = '.' * (cols - len(file_name) - len(file_status.text) - 1)
-    click.echo(file_name + dots, nl=False)
-    click.secho(file_status.text, bg=file_status.color)
+        print_result({
+            RES_STATUS: _status.SUCCESS if error is None else _status.FAILED,
+            RES_LOCAL_PATH: file_name,
+            RES_MSG: '' if error is None else str(error),
+        }, cols=compute_cols([file_name]))
 
-    if message:
-        click.echo(message)
+    click.echo('Watching {} for datasource changes'.format(directory))
 
+    try:
+        Watcher(
+            directory,
+            tde_writer,
+            interval=interval,
+            generate_options=generate_options
+        ).run(_on_result)
+    except KeyboardInterrupt:
+        pass
 
-def _compute_cols(files):
-    """Computes max required length for output
 
-    From all the file names and maximum length of _status constant text,
-    determines the maximum length a line can have in the result.
+def _parse_where(values):
+    """Parses --where values
 
     Parameters
     ----------
-    files : list
-        list of all the files input by the user.
+    values : tuple
+        predicates as "COLUMN OPERATOR VALUE"
 
     Returns
     -------
-    int
-        maximum line length of output result, min: 80
+    list[Predicate]
+        parsed predicates
+
+    Raises
+    ------
+    click.BadParameter
+        when a value is not a predicate
 
     Examples
     --------
-    >>> files = ['abcd', 'abcde', 'abcdf']
-    >>> _compute_cols(files)
-    80
-
-    >>> import os
-    >>> files = ['abcd', 'abcd'*18]
-    >>> s = 'abcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcdabcd'
-    >>> s += 'abcdabcdabcd...Success' + os.linesep
-    >>> _compute_cols(files) == len(s)
-    True
+    >>> _parse_where(('Day >= 2017-01-01',))[0].operator
+    '>='
     """
 
-    if files:
-        name_len = max(len(current_file) for current_file in files)
-    else:
-        name_len = 0
+    from tableaupy.rowsources import predicates
+
+    parsed = list()
+
+    for value in values:
+        try:
+            parsed.append(predicates.parse(value))
+        except ValueError:
+            raise click.BadParameter(
+                'expected COLUMN OPERATOR VALUE, got {!r}'.format(value),
+                param_hint='"--where"'
+            )
+
+    return parsed
+
+
+def _parse_sort_key(value):
+    """Parses --sort-by value
+
+    Parameters
+    ----------
+    value : str
+        column name, followed by ":desc" for descending order or ":asc"
+
+    Returns
+    -------
+    tuple
+        (column name, True if descending)
+
+    Examples
+    --------
+    >>> _parse_sort_key('Order Date:desc')
+    ('Order Date', True)
+    >>> _parse_sort_key('Region')
+    ('Region', False)
+    """
+
+    name, _, order = value.rpartition(':')
+
+    if name and order.lower() in ('asc', 'desc'):
+        return name, order.lower() == 'desc'
+
+    return value, False
+
+
+def _parse_shard(value):
+    """Parses --shard value
+
+    Parameters
+    ----------
+    value : str
+        shard as "I/N", I from 0 to N - 1, or None
+
+    Returns
+    -------
+    tuple
+        (I, N), None when value is None
+
+    Raises
+    ------
+    click.BadParameter
+        when value is not a valid shard
+
+    Examples
+    --------
+    >>> _parse_shard('1/4')
+    (1, 4)
+    """
+
+    if value is None:
+        return None
+
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise click.BadParameter(
+            'expected I/N, got {!r}'.format(value),
+            param_hint='"--shard"'
+        )
+
+    if not 0 <= index < count:
+        raise click.BadParameter(
+            'shard {} is not between 0 and {}'.format(index, count - 1),
+            param_hint='"--shard"'
+        )
 
-    cols = name_len + 3 + len(_status.SUCCESS.text) + 1
-    return max(cols, 80)
+    return index, count
 
 
 if __name__ == '__main__':  # pragma: no cover
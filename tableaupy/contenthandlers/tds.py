@@ -7,9 +7,13 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from collections import Counter
+from collections import OrderedDict
+
 import lxml.etree as etree
 import xmltodict
 
+from tableaupy import memprofile
 from tableaupy.contenthandlers import exceptions
 
 
@@ -19,16 +23,26 @@ class TDSContentHandler(object):
     K_COL_DEF_PARENT_NAME = 'parent-name'
     K_COL_DEF_LOCAL_NAME = 'local-name'
     K_COL_DEF_LOCAL_TYPE = 'local-type'
+    K_COL_DEF_REMOTE_NAME = 'remote-name'
+    K_COL_DEF_AGGREGATION = 'aggregation'
 
     K_METADATA_DATASOURCE = 'datasource'
     K_METADATA_CONNECTION = 'connection'
 
+    K_REFRESH_INCREMENT_KEY = 'increment-key'
+    K_REFRESH_INCREMENTAL = 'incremental-updates'
+
     _col_def_keys = [
         K_COL_DEF_PARENT_NAME,
         K_COL_DEF_LOCAL_NAME,
         K_COL_DEF_LOCAL_TYPE,
     ]
 
+    _col_detail_keys = _col_def_keys + [
+        K_COL_DEF_REMOTE_NAME,
+        K_COL_DEF_AGGREGATION,
+    ]
+
     def __init__(self):
         super(TDSContentHandler, self).__init__()
 
@@ -38,6 +52,18 @@ class TDSContentHandler(object):
         #: list[dict] : tableau datasource column information
         self._tds_columns = list()
 
+        #: dict : connection attributes by named-connection name
+        self._tds_connections = OrderedDict()
+
+        #: dict : attributes of relation the datasource reads from
+        self._tds_relation = dict()
+
+        #: dict : relation the datasource reads from, with its joins
+        self._tds_relation_tree = dict()
+
+        #: dict : attributes of extract refresh settings
+        self._tds_refresh = dict()
+
     @property
     def column_definitions(self):
         """Column Definitions property
@@ -60,6 +86,111 @@ class TDSContentHandler(object):
             for column in self._tds_columns
         ]
 
+    @property
+    def column_details(self):
+        """Column Details property
+
+        Returns
+        -------
+        list
+            list of dictionary items containing column information needed
+            to read column data, represented as::
+
+                {
+                    'local-name': local name of column,
+                    'parent-name': name of the table containing column
+                    'local-type': local data type of column,
+                    'remote-name': name of column in the relation,
+                    'aggregation': default aggregation, e.g. Sum or Year,
+                }
+
+            with None for information missing in datasource
+        """
+
+        return [
+            {key: column.get(key) for key in self._col_detail_keys}
+            for column in self._tds_columns
+        ]
+
+    @property
+    def column_records(self):
+        """Column Records property
+
+        Returns
+        -------
+        list
+            every field of the metadata-record of every column, as parsed
+            by xmltodict: attributes are keys prefixed with '@', e.g.
+            '@class', child elements are keys holding their text, None
+            when empty, or a dict for elements with attributes
+        """
+
+        return self._tds_columns
+
+    @property
+    def relation(self):
+        """Relation property
+
+        Returns
+        -------
+        dict
+            attributes of relation element, e.g. its `type` and `table`,
+            empty when datasource has no relation
+        """
+
+        return self._tds_relation
+
+    @property
+    def relation_tree(self):
+        """Relation Tree property
+
+        Returns
+        -------
+        dict
+            relation the datasource reads from, represented as::
+
+                {
+                    'attributes': attributes of relation element,
+                    'relations': joined relations, as relation trees,
+                    'clauses': (left, right) column references of every
+                               equality of the join clause, e.g.
+                               ('[orders].[customer]', '[customers].[id]'),
+                }
+
+            where relations and clauses are empty but for joins, empty
+            when datasource has no relation
+        """
+
+        return self._tds_relation_tree
+
+    @property
+    def connections(self):
+        """Connections property
+
+        Returns
+        -------
+        OrderedDict
+            attributes of every connection by name of its
+            named-connection, relations name the connection they read
+            from, in order of datasource. metadata connection is the
+            first one
+        """
+
+        return self._tds_connections
+
+    @property
+    def refresh(self):
+        """Refresh property
+
+        Returns
+        -------
+        dict
+            attributes of refresh element, e.g. its `increment-key` and
+            `incremental-updates`, empty when datasource has no refresh
+        """
+
+        return self._tds_refresh
+
     @property
     def metadata(self):
         """Metadata property
@@ -78,6 +209,29 @@ class TDSContentHandler(object):
 
         return self._tds_metadata
 
+    @classmethod
+    def _relation_tree(cls, relation):
+        """Relation tree of `relation` element, see relation_tree"""
+
+        clauses = list()
+
+        for expression in relation.iterfind('clause//expression'):
+            operands = expression.findall('expression')
+
+            if expression.get('op') == '=' and len(operands) == 2:
+                clauses.append(
+                    tuple(operand.get('op') for operand in operands)
+                )
+
+        return {
+            'attributes': dict(relation.attrib),
+            'relations': [
+                cls._relation_tree(child)
+                for child in relation.iterfind('relation')
+            ],
+            'clauses': clauses,
+        }
+
     def parse(self, tds_xml):
         """Parses tableau datasource xml tree
 
@@ -89,7 +243,9 @@ class TDSContentHandler(object):
         Raises
         ------
         UnexpectedCount
-            when more than 1 connection information is available
+            * when no connection information is available
+            * when a named-connection has more than 1 connection
+            * when named-connections share a name
         UnexpectedEmptyInformation
             when datasource information is empty,
             when connection information is empty,
@@ -102,47 +258,79 @@ class TDSContentHandler(object):
                 self.K_METADATA_DATASOURCE
             )
 
-        connection_path = '/'.join([
-            'connection',
-            'named-connections',
-            'named-connection',
-            'connection'
-        ])
         connections = list()
 
-        for connection in tds_xml.iterfind(connection_path):
-            connections.append(connection.attrib)
+        # a single federated connection names the connections it reads
+        federated = tds_xml.findall(self.K_METADATA_CONNECTION)
 
-        if len(connections) != 1:
+        if len(federated) > 1:
             raise exceptions.UnexpectedCount(
                 identifier=self.K_METADATA_CONNECTION,
                 expected=1,
-                value=len(connections)
+                value=len(federated)
             )
 
-        # dict because the lxml.etree.Element.attrib represents a dictionary
-        # like class instance but not dictionary
-        connection = dict(connections[0])
+        for named_connection in tds_xml.iterfind(
+                'connection/named-connections/named-connection'):
+            inside = named_connection.findall(self.K_METADATA_CONNECTION)
+
+            if len(inside) != 1:
+                raise exceptions.UnexpectedCount(
+                    identifier=self.K_METADATA_CONNECTION,
+                    expected=1,
+                    value=len(inside)
+                )
+
+            # dict because the lxml.etree.Element.attrib represents a
+            # dictionary like class instance but not dictionary
+            connections.append(
+                (named_connection.get('name'), dict(inside[0].attrib))
+            )
 
-        if len(connection) == 0:
-            raise exceptions.UnexpectedEmptyInformation(
-                self.K_METADATA_CONNECTION
+        if len(connections) == 0:
+            raise exceptions.UnexpectedCount(
+                identifier=self.K_METADATA_CONNECTION,
+                expected=1,
+                value=0
             )
 
+        names = Counter(name for name, _ in connections)
+
+        for name, connection in connections:
+            if names[name] > 1:
+                raise exceptions.UnexpectedCount(
+                    identifier='named-connection {!r}'.format(name),
+                    expected=1,
+                    value=names[name]
+                )
+
+            if len(connection) == 0:
+                raise exceptions.UnexpectedEmptyInformation(
+                    self.K_METADATA_CONNECTION
+                )
+
         metadata_record_path = '/'.join([
             'connection',
             'metadata-records',
             'metadata-record'
         ])
+        relation = tds_xml.find('connection/relation')
+        refresh = tds_xml.find('connection/refresh')
         columns = list()
 
-        for metadata_record in tds_xml.iterfind(metadata_record_path):
-            xml_dict = xmltodict.parse(etree.tostring(metadata_record))
-            columns.append(xml_dict.get('metadata-record'))
+        with memprofile.phase('xmltodict records'):
+            for metadata_record in tds_xml.iterfind(metadata_record_path):
+                xml_dict = xmltodict.parse(etree.tostring(metadata_record))
+                columns.append(xml_dict.get('metadata-record'))
 
         self._tds_metadata = {
             self.K_METADATA_DATASOURCE: datasource,
-            self.K_METADATA_CONNECTION: connection,
+            self.K_METADATA_CONNECTION: connections[0][1],
         }
+        self._tds_connections = OrderedDict(connections)
 
         self._tds_columns = columns
+        self._tds_relation = {} if relation is None else dict(relation.attrib)
+        self._tds_relation_tree = {} if relation is None else \
+            self._relation_tree(relation)
+        self._tds_refresh = {} if refresh is None else dict(refresh.attrib)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""This module defines infer_tds command
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+
+import click
+
+from tableaupy import _status
+from tableaupy._results import RES_LOCAL_PATH
+from tableaupy._results import RES_MSG
+from tableaupy._results import RES_STATUS
+from tableaupy._results import compute_cols
+from tableaupy._results import print_result
+from tableaupy.exceptions import AutoExtractException
+from tableaupy.exceptions import TableauPyException
+
+
+def _datasource(csv_path, separator, header, encoding):
+    """(metadata, relation) of the textscan datasource of `csv_path`"""
+
+    directory, file_name = os.path.split(os.path.abspath(csv_path))
+    stem, extension = os.path.splitext(file_name)
+    metadata = {
+        'datasource': {
+            'formatted-name': stem,
+            'inline': 'true',
+        },
+        'connection': {
+            'class': 'textscan',
+            'directory': directory,
+            'filename': file_name,
+            'separator': separator,
+            'header': 'yes' if header else 'no',
+            'character-set': encoding,
+        },
+    }
+    relation = {
+        'connection': 'textscan.{}'.format(stem),
+        'name': file_name,
+        'table': '[{}#{}]'.format(stem, extension[1:]),
+        'type': 'table',
+    }
+
+    return metadata, relation
+
+
+@click.command(name='infer_tds')
+@click.option('-o', '--output-dir', type=click.Path(exists=True),
+              help='Output directory for generated files')
+@click.option('--overwrite', is_flag=True,
+              help='Overwrites the files if they exist')
+@click.option('--separator', default=',', show_default=True,
+              help='Field separator of the csv files')
+@click.option('--no-header', is_flag=True,
+              help='The first record of the csv files holds values, not '
+                   'column names')
+@click.option('--encoding', default='utf-8', show_default=True,
+              help='Encoding of the csv files')
+@click.option('--sample-size', default=1, show_default=True,
+              type=click.IntRange(min=1), metavar='MB',
+              help='Bytes of every csv file sampled to infer column types')
+@click.option('--extract/--no-extract', default=True, show_default=True,
+              help='Generates the extract of every datasource too')
+@click.option('--fetch-rows', is_flag=True,
+              help='Fills extracts with the rows of the csv files')
+@click.argument('files', nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False))
+def main(files, output_dir, overwrite, separator, no_header, encoding,
+         sample_size, extract, fetch_rows):
+    """infer_tds command
+
+    Writes the tableau datasource of every csv file of `FILES`, a
+    textscan datasource whose columns are inferred from a sample of the
+    file, and generates its extract, of the inferred columns, filled with
+    the rows of the file with --fetch-rows.
+
+    Column types are inferred from --sample-size MB read from chunks
+    spread evenly over the file, so inferring takes as long for a file of
+    any size.
+
+    Fails if any file failed.
+    """
+
+    # writers are imported here so that --help and argument validation
+    # never pay for importing lxml, xmltodict and tableau sdk
+    from tableaupy.rowsources.inference import infer_columns
+    from tableaupy.writers import TDEWriter
+    from tableaupy.writers import TDSWriter
+
+    cols = compute_cols(files)
+    options = {
+        'overwrite': overwrite,
+        'output_dir': output_dir,
+    }
+    tds_writer = TDSWriter(options=options)
+    tde_writer = TDEWriter(options=options)
+    results = dict()
+
+    for csv_path in files:
+        result = {
+            RES_STATUS: _status.SUCCESS,
+            RES_LOCAL_PATH: csv_path,
+            RES_MSG: '',
+        }
+
+        try:
+            tds_path = tds_writer.get_output_path(csv_path)
+            tds_writer.check_file_writable(tds_path)
+            columns = infer_columns(
+                csv_path,
+                os.path.basename(csv_path),
+                separator=separator,
+                encoding=encoding,
+                header=not no_header,
+                sample_size=sample_size << 20
+            )
+            metadata, relation = _datasource(
+                csv_path,
+                separator,
+                not no_header,
+                encoding
+            )
+            tds_writer.write(
+                csv_path,
+                metadata,
+                columns,
+                relation=relation,
+                output_path=tds_path
+            )
+
+            if extract:
+                tde_writer.generate_from_tds(tds_path, fetch_rows=fetch_rows)
+        except (TableauPyException, IOError) as err:
+            result[RES_STATUS] = _status.FAILED
+            result[RES_MSG] = str(err)
+
+        results[csv_path] = result
+        print_result(result, cols=cols)
+
+    if any(result[RES_STATUS] is _status.FAILED
+           for result in results.values()):
+        raise AutoExtractException(results)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()  # pylint: disable=locally-disabled,no-value-for-parameter
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""This module defines checkpoint journal of processed datasource files
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import OrderedDict
+import io
+import json
+import os
+import threading
+import time
+
+SUCCESS = 'success'  #: journal status of a file processed successfully
+FAILED = 'failed'  #: journal status of a file which failed processing
+
+
+class Journal(object):
+    """Append-only checkpoint journal
+
+    Every processed file is appended as a JSON line::
+
+        {"path": absolute file path, "status": "success" | "failed",
+         "msg": error message}
+
+    Syncing to disk is batched, the journal is fsync-ed after `sync_every`
+    records or `sync_interval` seconds after the first unsynced record,
+    whichever comes first, and on close. A crash can only lose the records
+    of the last unsynced batch, whose files are then processed again on
+    resume, replacing the outputs they may have committed.
+    A torn last line left by a crash is ended before records are appended,
+    so that it never swallows the next record.
+
+    Parameters
+    ----------
+    path : str
+        path to journal file, created if it does not exist
+    sync_every : int
+        records to be written before syncing (default: 100)
+    sync_interval : float
+        seconds after which pending records are synced (default: 1.0)
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'run.journal')
+    >>> with Journal(path) as journal:
+    ...     journal.record('/data/a.tds', True)
+    ...     journal.record('/data/b.tds', False, 'file already exists')
+    >>> sorted(Journal(path).load().items())
+    [('/data/a.tds', 'success'), ('/data/b.tds', 'failed')]
+    """
+
+    def __init__(self, path, sync_every=100, sync_interval=1.0):
+        super(Journal, self).__init__()
+        self._path = path
+        self._sync_every = sync_every
+        self._sync_interval = sync_interval
+        self._stream = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+        self._lock = threading.Lock()
+
+        #: threading.Timer : syncs pending records after sync_interval
+        self._timer = None
+
+    @property
+    def path(self):
+        """path getter"""
+
+        return self._path
+
+    def records(self):
+        """Reads journal records
+
+        Later records of a file override earlier ones, a torn last line
+        left by a crash is ignored.
+
+        Returns
+        -------
+        dict
+            absolute file path to its last journaled record, represented
+            as ``{'status': status, 'msg': error message}``, empty when the
+            journal does not exist
+        """
+
+        records = dict()
+
+        if not os.path.exists(self._path):
+            return records
+
+        with io.open(self._path, encoding='utf-8') as stream:
+            for line in stream:
+                try:
+                    entry = json.loads(line)
+                    records[str(entry['path'])] = {
+                        'status': str(entry['status']),
+                        'msg': entry.get('msg', ''),
+                    }
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+
+        return records
+
+    def load(self):
+        """Reads journaled statuses
+
+        Returns
+        -------
+        dict
+            absolute file path to its last journaled status, see records
+        """
+
+        return dict(
+            (path, record['status'])
+            for path, record in self.records().items()
+        )
+
+    def successes(self):
+        """Set of absolute file paths last journaled as success"""
+
+        return set(
+            path for path, status in self.load().items() if status == SUCCESS
+        )
+
+    def record(self, path, succeeded, msg=''):
+        """Appends result of processing a file
+
+        Parameters
+        ----------
+        path : str
+            absolute file path
+        succeeded : bool
+            True if the file was processed successfully
+        msg : str
+            error message of a failure
+        """
+
+        entry = json.dumps({
+            'path': path,
+            'status': SUCCESS if succeeded else FAILED,
+            'msg': msg,
+        })
+
+        with self._lock:
+            if self._stream is None:
+                self._stream = self._open()
+
+            self._stream.write(entry.encode('utf-8') + b'\n')
+            self._unsynced += 1
+
+            if (self._unsynced >= self._sync_every or
+                    time.time() - self._last_sync >= self._sync_interval):
+                self._sync()
+            elif self._timer is None:
+                # records are synced even if no later record is written
+                self._timer = threading.Timer(self._sync_interval, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _open(self):
+        """Opens journal file for appending, ending a torn last line"""
+
+        stream = io.open(self._path, 'ab')
+
+        if stream.tell() > 0:
+            with io.open(self._path, 'rb') as journal:
+                journal.seek(-1, os.SEEK_END)
+                torn = journal.read(1) != b'\n'
+
+            if torn:
+                stream.write(b'\n')
+
+        return stream
+
+    def _sync(self):
+        """Flushes and fsyncs pending records, called holding the lock"""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._stream is None or self._unsynced == 0:
+            return
+
+        self._stream.flush()
+        os.fsync(self._stream.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    def sync(self):
+        """Flushes and fsyncs pending records"""
+
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """Syncs pending records and closes journal file"""
+
+        with self._lock:
+            self._sync()
+
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def merge(paths):
+    """Merges records of several journals, e.g. one per shard of a batch
+
+    Parameters
+    ----------
+    paths : list
+        journal file paths, a record of a later journal overrides the
+        record of the same file in earlier ones
+
+    Returns
+    -------
+    OrderedDict
+        absolute file path to its record, see Journal.records, sorted by
+        path
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> paths = [os.path.join(directory, name) for name in ['0', '1']]
+    >>> with Journal(paths[0]) as journal:
+    ...     journal.record('/data/b.tds', False, 'file already exists')
+    >>> with Journal(paths[1]) as journal:
+    ...     journal.record('/data/a.tds', True)
+    >>> [(path, record['status']) for path, record in merge(paths).items()]
+    [('/data/a.tds', 'success'), ('/data/b.tds', 'failed')]
+    """
+
+    records = dict()
+
+    for path in paths:
+        records.update(Journal(path).records())
+
+    return OrderedDict(sorted(records.items()))
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""This module defines memory profiling of datasource processing
+
+Reading and writing code marks its phases with `phase` and the file being
+processed with `track_file`, both doing nothing unless a MemoryProfiler
+is started in the process.
+
+Python heap is measured with tracemalloc, which is not available on
+python 2, where only resident set size is recorded. Memory allocated
+outside python heap, like lxml element trees, only shows in resident set
+size.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import os
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+#: profiler started in this process, see MemoryProfiler.start
+_active = None
+
+
+def _rss():
+    """Resident set size of this process in bytes, None if unknown"""
+
+    try:
+        with open('/proc/self/statm') as stream:
+            pages = int(stream.read().split()[1])
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+@contextmanager
+def phase(name):
+    """Measures memory of a processing phase of the current file
+
+    Parameters
+    ----------
+    name : str
+        phase name, e.g. "parse tree"
+    """
+
+    if _active is None:
+        yield
+    else:
+        with _active.measure(name):
+            yield
+
+
+@contextmanager
+def track_file(path):
+    """Measures memory of processing a file, phases included
+
+    Parameters
+    ----------
+    path : str
+        file being processed
+    """
+
+    if _active is None:
+        yield
+    else:
+        with _active.profile_file(path):
+            yield
+
+
+class _Measure(object):
+    """Memory measured over a file or a phase"""
+
+    def __init__(self, traced, rss):
+        super(_Measure, self).__init__()
+        self.start_traced = traced
+        self.peak_traced = traced
+        self.start_rss = rss
+        self.peak = None
+        self.rss = None
+
+
+class MemoryProfiler(object):
+    """Records memory used per file and per phase
+
+    For every file and every phase within it, records the peak of python
+    heap above its level when the phase started, and the change in
+    resident set size. Phases may nest, a phase includes the phases run
+    within it.
+
+    At the end of every phase the heap is snapshot, the code locations
+    holding most memory at the end of any phase are reported as top
+    allocators.
+
+    Parameters
+    ----------
+    frames : int
+        traceback frames stored per allocation (default: 1)
+
+    Examples
+    --------
+    >>> with MemoryProfiler() as profiler:
+    ...     with track_file('a.tds'):
+    ...         with phase('build'):
+    ...             data = [str(number) for number in range(10000)]
+    >>> report = profiler.report()
+    >>> list(report['files'][0]['phases'])
+    ['build']
+    >>> report['files'][0]['peak'] > 0 or not report['tracemalloc']
+    True
+    """
+
+    def __init__(self, frames=1):
+        super(MemoryProfiler, self).__init__()
+        self._frames = frames
+        self._started_tracing = False
+        self._stack = list()
+        self._file = None
+        self._files = OrderedDict()
+        self._allocators = dict()
+
+    @property
+    def tracing(self):
+        """True if python heap is measured"""
+
+        return tracemalloc is not None
+
+    def start(self):
+        """Starts profiling code run in this process"""
+
+        global _active  # pylint: disable=global-statement
+
+        if self.tracing and not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+            self._started_tracing = True
+
+        _active = self
+
+    def stop(self):
+        """Stops profiling"""
+
+        global _active  # pylint: disable=global-statement
+
+        if _active is self:
+            _active = None
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _traced(self):
+        """(current, peak) python heap, reset peak if supported"""
+
+        if not self.tracing:
+            return 0, 0
+
+        current, peak = tracemalloc.get_traced_memory()
+
+        # before python 3.9 peak can not be reset, it is then the peak of
+        # the whole run and phase peaks are upper bounds
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+        return current, peak
+
+    def _push(self):
+        """Starts measuring a nested file or phase"""
+
+        current, peak = self._traced()
+
+        for outer in self._stack:
+            outer.peak_traced = max(outer.peak_traced, peak)
+
+        measure = _Measure(current, _rss())
+        self._stack.append(measure)
+        return measure
+
+    def _pop(self):
+        """Stops measuring innermost file or phase"""
+
+        current, peak = self._traced()
+        measure = self._stack.pop()
+
+        for outer in self._stack + [measure]:
+            outer.peak_traced = max(outer.peak_traced, peak)
+
+        measure.peak = measure.peak_traced - measure.start_traced
+        rss = _rss()
+
+        if rss is not None and measure.start_rss is not None:
+            measure.rss = rss - measure.start_rss
+
+        return measure
+
+    def _snapshot(self):
+        """Records code locations holding memory"""
+
+        if not self.tracing:
+            return
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+        for stat in snapshot.statistics('lineno'):
+            frame = stat.traceback[0]
+            location = '{}:{}'.format(frame.filename, frame.lineno)
+            self._allocators[location] = max(
+                self._allocators.get(location, 0), stat.size
+            )
+
+        # memory of the snapshot itself is not part of any phase
+        del snapshot
+        self._traced()
+
+    @contextmanager
+    def profile_file(self, path):
+        """Measures processing of file `path`, see track_file"""
+
+        self._file = path
+        self._files[path] = {
+            'peak': None,
+            'rss': None,
+            'phases': OrderedDict(),
+        }
+        self._push()
+
+        try:
+            yield
+        finally:
+            measure = self._pop()
+            self._files[path]['peak'] = measure.peak
+            self._files[path]['rss'] = measure.rss
+            self._file = None
+
+    @contextmanager
+    def measure(self, name):
+        """Measures phase `name` of current file, see phase"""
+
+        self._push()
+
+        try:
+            yield
+        finally:
+            measure = self._pop()
+            self._snapshot()
+
+            if self._file is not None:
+                phases = self._files[self._file]['phases']
+                previous = phases.get(name, {'peak': 0, 'rss': None})
+                phases[name] = {
+                    'peak': max(previous['peak'], measure.peak),
+                    'rss': measure.rss,
+                }
+
+    def report(self, limit=10):
+        """Profiling report
+
+        Parameters
+        ----------
+        limit : int
+            number of files and allocators reported (default: 10)
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'tracemalloc': True if python heap was measured,
+                    'files': files with highest peak first, as [{
+                        'path': file path,
+                        'peak': peak python heap bytes,
+                        'rss': resident set size change in bytes,
+                        'phases': OrderedDict of phase name to {
+                            'peak': ..., 'rss': ...
+                        }, in order of first run
+                    }],
+                    'allocators': [(code location, bytes)], largest first
+                }
+        """
+
+        files = sorted(
+            (
+                {
+                    'path': path,
+                    'peak': entry['peak'],
+                    'rss': entry['rss'],
+                    'phases': entry['phases'],
+                }
+                for path, entry in self._files.items()
+            ),
+            key=lambda entry: (entry['peak'] or 0, entry['rss'] or 0),
+            reverse=True
+        )
+        allocators = sorted(
+            self._allocators.items(),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+        return {
+            'tracemalloc': self.tracing,
+            'files': files[:limit],
+            'allocators': allocators[:limit],
+        }
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""This module defines throughput tracking of a batch of processed files
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import deque
+import time
+
+_MB = 1024 * 1024
+
+
+class Throughput(object):
+    """Progress and moving average rates of a batch
+
+    Every processed file is reported with its size and the number of
+    columns defined for it. Rates are averaged over the files completed in
+    the last `window` seconds, so that the ETA follows the current pace of
+    the batch instead of its overall average, and the ETA is computed from
+    remaining bytes rather than remaining files, so big files left to the
+    end are accounted for.
+
+    Files processed by parallel workers are reported from the thread
+    collecting their results, the tracker itself is not thread safe.
+
+    Parameters
+    ----------
+    total_files : int
+        number of files in the batch
+    total_bytes : int
+        sum of sizes of files in the batch
+    window : float
+        seconds over which rates are averaged (default: 30.0)
+    started_at : float
+        time the batch started, now when None
+
+    Examples
+    --------
+    >>> throughput = Throughput(4, 4 * 1024 * 1024, started_at=0.0)
+    >>> throughput.update(1024 * 1024, columns=10, now=1.0)
+    >>> throughput.update(1024 * 1024, columns=5, now=2.0)
+    >>> throughput.files_per_second(now=2.0), throughput.eta(now=2.0)
+    (1.0, 2.0)
+    >>> throughput.format(now=2.0)
+    '2/4 files, 15 columns, 1.0 files/s, 1.0 MB/s, eta 0:00:02'
+    """
+
+    def __init__(self, total_files, total_bytes, window=30.0,
+                 started_at=None):
+        super(Throughput, self).__init__()
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.files = 0
+        self.bytes = 0
+        self.columns = 0
+        self._window = window
+        self._started_at = time.time() if started_at is None else started_at
+        self._recent = deque()
+
+    def update(self, size, columns=0, now=None):
+        """Reports a processed file
+
+        Parameters
+        ----------
+        size : int
+            size of the file in bytes
+        columns : int
+            number of columns defined for the file
+        now : float
+            time the file completed, now when None
+        """
+
+        now = time.time() if now is None else now
+        self.files += 1
+        self.bytes += size
+        self.columns += columns
+        self._recent.append((now, size))
+        self._expire(now)
+
+    def _expire(self, now):
+        """Drops completions older than the window"""
+
+        while self._recent and now - self._recent[0][0] > self._window:
+            self._recent.popleft()
+
+    def _elapsed(self, now):
+        """Seconds covered by the moving window"""
+
+        return min(now - self._started_at, self._window)
+
+    def files_per_second(self, now=None):
+        """Moving average of files processed per second"""
+
+        now = time.time() if now is None else now
+        self._expire(now)
+        elapsed = self._elapsed(now)
+        return len(self._recent) / elapsed if elapsed > 0 else 0.0
+
+    def bytes_per_second(self, now=None):
+        """Moving average of bytes processed per second"""
+
+        now = time.time() if now is None else now
+        self._expire(now)
+        elapsed = self._elapsed(now)
+        processed = sum(size for _, size in self._recent)
+        return processed / elapsed if elapsed > 0 else 0.0
+
+    def eta(self, now=None):
+        """Estimated seconds until the batch completes
+
+        Returns
+        -------
+        float
+            seconds, None while no rate is known
+        """
+
+        if self.files >= self.total_files:
+            return 0.0
+
+        rate = self.bytes_per_second(now)
+
+        if rate > 0:
+            return (self.total_bytes - self.bytes) / rate
+
+        # batch of empty files, fall back to files
+        rate = self.files_per_second(now)
+
+        if rate > 0:
+            return (self.total_files - self.files) / rate
+
+        return None
+
+    def format(self, now=None):
+        """Single line summary of progress and rates"""
+
+        eta = self.eta(now)
+
+        if eta is None:
+            eta_text = '--:--:--'
+        else:
+            minutes, seconds = divmod(int(round(eta)), 60)
+            hours, minutes = divmod(minutes, 60)
+            eta_text = '{}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+
+        return '{}/{} files, {} columns, {:.1f} files/s, {:.1f} MB/s, ' \
+            'eta {}'.format(
+                self.files,
+                self.total_files,
+                self.columns,
+                self.files_per_second(now),
+                self.bytes_per_second(now) / _MB,
+                eta_text
+            )
@@ -11,6 +11,7 @@ from future.utils import raise_with_traceback
 import lxml.etree as etree
 from pathlib2 import Path
 
+from tableaupy import memprofile
 from tableaupy.contenthandlers import ContentHandlerException
 from tableaupy.readers import exceptions
 
@@ -74,8 +75,9 @@ class Reader(object):
                     extension=self.__extension
                 )
 
-            tree = etree.parse(absolute_path, parser=self._parser)
-            root = tree.getroot()
+            with memprofile.phase('parse tree'):
+                tree = etree.parse(absolute_path, parser=self._parser)
+                root = tree.getroot()
 
             self._xml_content_handler.parse(root)
         except (etree.XMLSchemaParseError, ContentHandlerException) as err:
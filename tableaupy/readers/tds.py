@@ -5,6 +5,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from tableaupy import memprofile
 from tableaupy.contenthandlers.tds import TDSContentHandler
 from tableaupy.readers.base import Reader
 
@@ -61,7 +62,74 @@ class TDSReader(Reader):
             column information of datasource file read
         """
 
-        return self._xml_content_handler.column_definitions
+        with memprofile.phase('column definitions'):
+            return self._xml_content_handler.column_definitions
+
+    def get_datasource_column_details(self):
+        """Gets tableau datasource column information needed to read data
+
+        Returns
+        -------
+        TDSContentHandler.column_details
+            column information of datasource file read
+        """
+
+        return self._xml_content_handler.column_details
+
+    def get_datasource_column_records(self):
+        """Gets every field of tableau datasource column metadata records
+
+        Returns
+        -------
+        TDSContentHandler.column_records
+            metadata records of datasource file read
+        """
+
+        return self._xml_content_handler.column_records
+
+    def get_datasource_relation(self):
+        """Gets tableau datasource relation information
+
+        Returns
+        -------
+        TDSContentHandler.relation
+            relation attributes of datasource file read
+        """
+
+        return self._xml_content_handler.relation
+
+    def get_datasource_relation_tree(self):
+        """Gets tableau datasource relation with its joined relations
+
+        Returns
+        -------
+        TDSContentHandler.relation_tree
+            relation tree of datasource file read
+        """
+
+        return self._xml_content_handler.relation_tree
+
+    def get_datasource_connections(self):
+        """Gets tableau datasource connections by name
+
+        Returns
+        -------
+        TDSContentHandler.connections
+            connections of datasource file read
+        """
+
+        return self._xml_content_handler.connections
+
+    def get_datasource_refresh(self):
+        """Gets tableau datasource extract refresh settings
+
+        Returns
+        -------
+        TDSContentHandler.refresh
+            refresh attributes of datasource file read
+        """
+
+        return self._xml_content_handler.refresh
 
     def get_datasource_metadata(self):
         """Gets tableau datasource metadata information
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""This module defines extract_report command
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import click
+
+from tableaupy import _status
+from tableaupy._results import RES_LOCAL_PATH
+from tableaupy._results import RES_MSG
+from tableaupy._results import RES_STATUS
+from tableaupy._results import compute_cols
+from tableaupy._results import print_result
+from tableaupy.exceptions import AutoExtractException
+from tableaupy.journal import SUCCESS
+from tableaupy.journal import merge
+
+
+@click.command(name='extract_report')
+@click.option('--failed-only', is_flag=True,
+              help='Print only files which failed')
+@click.argument('journals', nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False))
+def main(journals, failed_only):
+    """extract_report command
+
+    Merges the checkpoint `JOURNALS` written by auto_extract --journal,
+    typically one per --shard of a batch, and prints the result of every
+    file of the batch followed by a summary.
+
+    Fails if any file failed.
+    """
+
+    records = merge(journals)
+    cols = compute_cols(list(records))
+    failures = 0
+
+    for path, record in records.items():
+        succeeded = record['status'] == SUCCESS
+        failures += 0 if succeeded else 1
+
+        if succeeded and failed_only:
+            continue
+
+        print_result({
+            RES_STATUS: _status.SUCCESS if succeeded else _status.FAILED,
+            RES_LOCAL_PATH: path,
+            RES_MSG: record['msg'],
+        }, cols=cols)
+
+    click.echo('{} files, {} succeeded, {} failed'.format(
+        len(records), len(records) - failures, failures
+    ))
+
+    if failures:
+        raise AutoExtractException(records)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()  # pylint: disable=locally-disabled,no-value-for-parameter
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""This module defines rewrite_tds command
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import Counter
+import multiprocessing
+import os
+
+import click
+
+from tableaupy import _status
+from tableaupy._results import RES_LOCAL_PATH
+from tableaupy._results import RES_MSG
+from tableaupy._results import RES_STATUS
+from tableaupy._results import compute_cols
+from tableaupy._results import print_result
+from tableaupy.exceptions import AutoExtractException
+from tableaupy.exceptions import TableauPyException
+
+#: files rewritten by a pool process at once
+_CHUNK_SIZE = 16
+
+
+def _parse_assignments(values, option):
+    """Parses NAME=VALUE values of `option`
+
+    Raises
+    ------
+    click.BadParameter
+        when a value is not NAME=VALUE
+
+    Examples
+    --------
+    >>> _parse_assignments(('server=db2.example.com',), '--set')
+    {'server': 'db2.example.com'}
+    """
+
+    parsed = dict()
+
+    for value in values:
+        name, equals, assigned = value.partition('=')
+
+        if not name.strip() or not equals:
+            raise click.BadParameter(
+                'expected NAME=VALUE, got {!r}'.format(value),
+                param_hint='"{}"'.format(option)
+            )
+
+        parsed[name.strip()] = assigned
+
+    return parsed
+
+
+def _datasource_files(paths):
+    """.tds files of `paths`, directories are searched recursively"""
+
+    files = list()
+
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+
+        for directory, _, file_names in os.walk(path):
+            files.extend(
+                os.path.join(directory, file_name)
+                for file_name in sorted(file_names)
+                if file_name.endswith('.tds')
+            )
+
+    return files
+
+
+def _rewrite(task):
+    """(path, values changed, error message) of rewrite `task`
+
+    Called by pool processes, `task` is (path, changes, conditions,
+    dry_run).
+    """
+
+    from tableaupy.writers.connections import ConnectionRewriter
+
+    path, changes, conditions, dry_run = task
+
+    try:
+        return path, ConnectionRewriter(
+            changes,
+            conditions,
+            dry_run
+        ).rewrite(path), None
+    except (TableauPyException, IOError, OSError) as err:
+        return path, list(), str(err)
+
+
+def _describe(change):
+    """Text of (attribute, old value, new value) `change`"""
+
+    name, old, new = change
+
+    if old is None:
+        return '{}: added {!r}'.format(name, new)
+
+    return '{}: {!r} -> {!r}'.format(name, old, new)
+
+
+@click.command(name='rewrite_tds')
+@click.option('--set', 'assignments', multiple=True, required=True,
+              metavar='NAME=VALUE',
+              help='Set this connection attribute, e.g. server=db2, can be '
+                   'repeated')
+@click.option('--match', 'matches', multiple=True, metavar='NAME=VALUE',
+              help='Rewrite only connections having this attribute value, '
+                   'can be repeated')
+@click.option('--dry-run', is_flag=True,
+              help='Print values which would change without writing files')
+@click.option('-j', '--jobs', type=click.IntRange(min=1), metavar='N',
+              help='Number of processes rewriting files  '
+                   '[default: cpu count]')
+@click.argument('paths', nargs=-1, required=True,
+                type=click.Path(exists=True))
+def main(assignments, matches, dry_run, jobs, paths):
+    """rewrite_tds command
+
+    Sets attributes of the connection of every tableau datasource of
+    `PATHS`, files or directories searched for .tds files, e.g. its
+    server, dbname or username when a database moves.
+
+    Files are streamed and only the values set are changed, every other
+    byte of a file is kept, and a file is replaced atomically, only when
+    a value changes. With --match, only connections having every value
+    matched are rewritten. With --dry-run, files are not written.
+
+    Files changed or failed are printed with their changes, followed by a
+    summary of every change.
+
+    Fails if any file failed.
+    """
+
+    changes = _parse_assignments(assignments, '--set')
+    conditions = _parse_assignments(matches, '--match')
+    files = _datasource_files(paths)
+    tasks = [(path, changes, conditions, dry_run) for path in files]
+    cols = compute_cols(files)
+    results = dict()
+    summary = Counter()
+    changed = 0
+    jobs = jobs or multiprocessing.cpu_count()
+    pool = None if jobs == 1 or len(tasks) < 2 else \
+        multiprocessing.Pool(jobs)
+
+    try:
+        rewritten = map(_rewrite, tasks) if pool is None else \
+            pool.imap_unordered(_rewrite, tasks, _CHUNK_SIZE)
+
+        for path, diff, error in rewritten:
+            summary.update(diff)
+            changed += 1 if diff else 0
+
+            if not diff and error is None:
+                continue
+
+            result = {
+                RES_STATUS: _status.SUCCESS if error is None
+                else _status.FAILED,
+                RES_LOCAL_PATH: path,
+                RES_MSG: error or '\n'.join(
+                    _describe(change) for change in diff
+                ),
+            }
+            results[path] = result
+            print_result(result, cols=cols)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    for change, count in sorted(summary.items(),
+                                key=lambda item: (-item[1], str(item[0]))):
+        click.echo('{} in {} connections'.format(_describe(change), count))
+
+    failures = {
+        path: result for path, result in results.items()
+        if result[RES_STATUS] is _status.FAILED
+    }
+    click.echo('{} files, {} {}, {} unchanged, {} failed'.format(
+        len(files),
+        changed,
+        'would change' if dry_run else 'changed',
+        len(files) - changed - len(failures),
+        len(failures)
+    ))
+
+    if failures:
+        raise AutoExtractException(failures)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()  # pylint: disable=locally-disabled,no-value-for-parameter
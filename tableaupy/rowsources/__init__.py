@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""This module defines row sources streaming rows into extracts
+
+Row Sources:
+* RowSource
+* IterableSource
+* DBRowSource
+* CSVSource
+* AggregateSource
+* SortSource
+* ReservoirSource
+* HashSampleSource
+* TopSource
+* SpillSource
+* HashJoinSource
+Connection Pools:
+* ConnectionPool
+Exceptions:
+* RowSourceException
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tableaupy.rowsources.exceptions import RowSourceException
+from tableaupy.rowsources.aggregate import AggregateSource
+from tableaupy.rowsources.base import IterableSource
+from tableaupy.rowsources.base import RowSource
+from tableaupy.rowsources.csvfile import CSVSource
+from tableaupy.rowsources.db import ConnectionPool
+from tableaupy.rowsources.db import DBRowSource
+from tableaupy.rowsources.join import HashJoinSource
+from tableaupy.rowsources.sample import HashSampleSource
+from tableaupy.rowsources.sample import ReservoirSource
+from tableaupy.rowsources.sample import TopSource
+from tableaupy.rowsources.sort import SortSource
+from tableaupy.rowsources.spill import SpillSource
+
+__all__ = [
+    'AggregateSource',
+    'ConnectionPool',
+    'CSVSource',
+    'DBRowSource',
+    'HashJoinSource',
+    'HashSampleSource',
+    'IterableSource',
+    'ReservoirSource',
+    'RowSource',
+    'RowSourceException',
+    'SortSource',
+    'SpillSource',
+    'TopSource',
+]
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""This module defines streaming aggregation of rows
+
+Rows are grouped on their dimensions in a hash table, measures of every
+group are accumulated as rows stream in. When the table grows beyond its
+memory budget it is sorted and spilled to a run file, runs are merged
+back in group order once every row is read, so that memory does not grow
+with the number of groups.
+
+Whether a column is a measure is decided by the `aggregation` hint of its
+metadata-record and its local-type, like tableau does: numeric columns
+aggregated by Sum, Avg, Min, Max or Count are measures, every other
+column is a dimension.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tableaupy.rowsources import predicates
+from tableaupy.rowsources import runs
+from tableaupy.rowsources.base import RowSource
+from tableaupy.rowsources.exceptions import UnknownSourceColumn
+
+_numeric_types = frozenset(['integer', 'double', 'real'])
+
+
+def _sum(state, value):
+    """Adds `value` to sum `state`"""
+
+    return value if state is None else state + value
+
+
+def _min(state, value):
+    """Smallest of min `state` and `value`"""
+
+    return value if state is None or value < state else state
+
+
+def _max(state, value):
+    """Greatest of max `state` and `value`"""
+
+    return value if state is None or value > state else state
+
+
+def _count(state, value):  # pylint: disable=unused-argument
+    """Counts `value` in count `state`"""
+
+    return (state or 0) + 1
+
+
+def _avg(state, value):
+    """Adds `value` to (sum, count) `state`"""
+
+    return (value, 1) if state is None else (state[0] + value, state[1] + 1)
+
+
+def _merge_avg(state, other):
+    """Merges two (sum, count) states"""
+
+    return (state[0] + other[0], state[1] + other[1])
+
+
+def _result_avg(state):
+    """Average of (sum, count) `state`"""
+
+    return None if state is None else state[0] / state[1]
+
+
+def _result_count(state):
+    """Count of `state`, 0 for groups without values"""
+
+    return state or 0
+
+
+#: dict : function name to (add value, merge states, result of state)
+_functions = {
+    'sum': (_sum, _sum, None),
+    'min': (_min, _min, None),
+    'max': (_max, _max, None),
+    'count': (_count, lambda state, other: state + other, _result_count),
+    'avg': (_avg, _merge_avg, _result_avg),
+}
+
+
+def measure_functions(aggregations, local_types):
+    """Aggregation function of every column, None for dimensions
+
+    Parameters
+    ----------
+    aggregations : list
+        `aggregation` hint of every column, e.g. "Sum", "Year" or None
+    local_types : list
+        local-type of every column
+
+    Returns
+    -------
+    list
+        function name, one of sum, min, max, count and avg, or None
+
+    Examples
+    --------
+    >>> measure_functions(['Sum', 'Count', 'Year', 'Avg'],
+    ...                   ['double', 'string', 'date', 'integer'])
+    ['sum', None, None, 'avg']
+    """
+
+    functions = list()
+
+    for aggregation, local_type in zip(aggregations, local_types):
+        function = (aggregation or '').lower()
+
+        if local_type not in _numeric_types or function not in _functions:
+            function = None
+
+        functions.append(function)
+
+    return functions
+
+
+def output_types(functions, local_types):
+    """local-type of every column of aggregated rows
+
+    Counts are integers, averages are doubles, other columns keep their
+    local-type.
+
+    Examples
+    --------
+    >>> output_types([None, 'count', 'avg'], ['date', 'double', 'integer'])
+    ['date', 'integer', 'double']
+    """
+
+    types = {'count': 'integer', 'avg': 'double'}
+
+    return [
+        types.get(function, local_type)
+        for function, local_type in zip(functions, local_types)
+    ]
+
+
+def _group_order(group):
+    """Sort key of (key, states) `group`"""
+
+    return runs.sort_key(group[0])
+
+
+class AggregateSource(RowSource):
+    """Groups the converted rows of a row source
+
+    Aggregated rows have the columns of the source, dimensions hold the
+    values of the group, measures their aggregate. Groups are emitted
+    sorted when runs were spilled, in no particular order otherwise.
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be aggregated
+    convert : callable
+        called with a source row, returns the converted row
+    functions : list
+        aggregation function of every column, None for dimensions, see
+        measure_functions
+    memory_budget : int
+        bytes the hash table may use before it is spilled
+        (default: 256 MB)
+    batch_size : int
+        rows per batch of aggregated rows (default: 1000)
+    spill_dir : str
+        directory of run files, the system temporary directory when None
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> source = IterableSource(['day', 'sales'], [
+    ...     ('mon', 2), ('tue', 1), ('mon', 3), ('mon', None),
+    ... ])
+    >>> aggregated = AggregateSource(source, tuple, [None, 'sum'])
+    >>> sorted(aggregated.rows())
+    [('mon', 5), ('tue', 1)]
+    """
+
+    def __init__(self,
+                 row_source,
+                 convert,
+                 functions,
+                 memory_budget=256 << 20,
+                 batch_size=1000,
+                 spill_dir=None):
+        super(AggregateSource, self).__init__(row_source.columns)
+        self._row_source = row_source
+        self._convert = convert
+        self._functions = list(functions)
+        self._memory_budget = memory_budget
+        self._batch_size = batch_size
+        self._spill_dir = spill_dir
+        self._conditions = list()
+        self._runs = list()
+
+        self._dimensions = [
+            position for position, function in enumerate(self._functions)
+            if function is None
+        ]
+        self._measures = [
+            (position, _functions[function])
+            for position, function in enumerate(self._functions)
+            if function is not None
+        ]
+
+        #: dict : spill metrics, see metrics
+        self._counts = {'rows': 0, 'groups': 0, 'runs': 0}
+
+    @property
+    def metrics(self):
+        """Aggregation metrics
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'rows': rows aggregated,
+                    'groups': groups emitted,
+                    'runs': runs spilled to disk,
+                }
+        """
+
+        return dict(self._counts)
+
+    def push_filters(self, filters):
+        """Pushes conditions to the source, applies the others itself
+
+        Conditions are applied to rows before they are aggregated.
+
+        Raises
+        ------
+        UnknownSourceColumn
+            when a condition column is not a column of the source
+        """
+
+        remaining = self._row_source.push_filters(filters)
+
+        for column, comparison, value in remaining:
+            if column not in self.columns:
+                raise UnknownSourceColumn(column)
+
+            self._conditions.append(
+                (self.columns.index(column), comparison, value)
+            )
+
+        return list()
+
+    def _accumulate(self, table, row):
+        """Adds converted `row` to its group of `table`"""
+
+        key = tuple(row[position] for position in self._dimensions)
+        states = table.get(key)
+
+        if states is None:
+            states = [None] * len(self._measures)
+            table[key] = states
+
+        for index, (position, (add, _, _)) in enumerate(self._measures):
+            value = row[position]
+
+            if value is not None:
+                states[index] = add(states[index], value)
+
+    def _spill(self, table):
+        """Writes groups of `table` sorted by key to a new run file"""
+
+        self._runs.append(runs.write_run(
+            sorted(table.items(), key=_group_order),
+            self._spill_dir
+        ))
+        self._counts['runs'] += 1
+
+    def _merge(self, states, other):
+        """Merges measure states of a group read from two runs"""
+
+        merged = list()
+
+        for (_, (_, merge, _)), state, other_state in zip(
+                self._measures, states, other):
+            if state is None or other_state is None:
+                merged.append(other_state if state is None else state)
+            else:
+                merged.append(merge(state, other_state))
+
+        return merged
+
+    def _groups(self):
+        """Yields (key, states) of every group, spilling beyond budget"""
+
+        table = dict()
+        group_size = None
+        matches = predicates.matcher(self._conditions)
+
+        for batch in self._row_source.batches():
+            for source_row in batch:
+                row = self._convert(source_row)
+
+                if self._conditions and not matches(row):
+                    continue
+
+                self._accumulate(table, row)
+                self._counts['rows'] += 1
+
+            if group_size is None and len(table) >= runs.SAMPLED_RECORDS:
+                group_size = runs.record_size(table.items())
+
+            if group_size is not None and \
+                    len(table) * group_size > self._memory_budget:
+                self._spill(table)
+                table = dict()
+
+        if not self._runs:
+            for group in table.items():
+                yield group
+
+            return
+
+        if table:
+            self._spill(table)
+
+        current_key = None
+        current_states = None
+
+        # groups of a key spilled to several runs follow each other
+        for key, states in runs.merge_runs(self._runs, _group_order):
+            if current_states is not None and key == current_key:
+                current_states = self._merge(current_states, states)
+                continue
+
+            if current_states is not None:
+                yield current_key, current_states
+
+            current_key = key
+            current_states = states
+
+        if current_states is not None:
+            yield current_key, current_states
+
+    def _result(self, key, states):
+        """Aggregated row of group `key`"""
+
+        row = [None] * len(self._functions)
+
+        for position, value in zip(self._dimensions, key):
+            row[position] = value
+
+        for (position, (_, _, result)), state in zip(self._measures, states):
+            if result is not None:
+                state = result(state)
+
+            row[position] = state
+
+        return tuple(row)
+
+    def batches(self):
+        batch = list()
+
+        try:
+            for key, states in self._groups():
+                batch.append(self._result(key, states))
+                self._counts['groups'] += 1
+
+                if len(batch) >= self._batch_size:
+                    yield batch
+                    batch = list()
+
+            if batch:
+                yield batch
+        finally:
+            self._close_runs()
+
+    def _close_runs(self):
+        """Closes and so removes run files"""
+
+        for run in self._runs:
+            run.close()
+
+        self._runs = list()
+
+    def close(self):
+        self._close_runs()
+        self._row_source.close()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""This module defines row source base class"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+
+class RowSource(object):
+    """Base class for all row sources
+
+    A row source streams the rows of a table as batches, lists of tuples
+    with one value per column, so that rows are never all held in memory.
+
+    Parameters
+    ----------
+    columns : list
+        names of the columns of every row, in row order
+    """
+
+    def __init__(self, columns):
+        super(RowSource, self).__init__()
+        self.columns = list(columns)
+
+    def batches(self):
+        """Yields batches of rows
+
+        Yields
+        ------
+        list[tuple]
+            next batch of rows, never empty
+        """
+
+        raise NotImplementedError
+
+    def push_filters(self, filters):
+        """Hands conditions over to the source, to filter rows itself
+
+        Parameters
+        ----------
+        filters : list
+            (column, operator, value) conditions, see predicates
+
+        Returns
+        -------
+        list
+            conditions the source does not apply, all of them by default,
+            to be matched against rows read
+        """
+
+        return list(filters)
+
+    def rows(self):
+        """Yields rows one by one"""
+
+        for batch in self.batches():
+            for row in batch:
+                yield row
+
+    def close(self):
+        """Releases resources held by the source"""
+
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class IterableSource(RowSource):
+    """Row source over rows of an iterable
+
+    Parameters
+    ----------
+    columns : list
+        names of the columns of every row
+    rows : iterable
+        rows as tuples
+    batch_size : int
+        rows per batch (default: 1000)
+
+    Examples
+    --------
+    >>> source = IterableSource(['a'], [(1,), (2,), (3,)], batch_size=2)
+    >>> list(source.batches())
+    [[(1,), (2,)], [(3,)]]
+    """
+
+    def __init__(self, columns, rows, batch_size=1000):
+        super(IterableSource, self).__init__(columns)
+        self._rows = rows
+        self._batch_size = batch_size
+
+    def batches(self):
+        batch = list()
+
+        for row in self._rows:
+            batch.append(tuple(row))
+
+            if len(batch) >= self._batch_size:
+                yield batch
+                batch = list()
+
+        if batch:
+            yield batch
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+"""This module defines the row source of csv files
+
+The file is memory mapped and split into chunks of about `chunk_size`
+bytes ending at record ends, newlines outside quoted fields. Chunks are
+parsed and converted to column local-types by a pool of processes, a few
+chunks ahead of the consumer, and their rows are yielded in file order,
+so that reading a file scales with the number of cores.
+
+Csv files are the `textscan` connections of tableau datasource files::
+
+    <connection class='textscan' directory='/data' filename='orders.csv'
+                separator=',' header='yes' character-set='UTF-8' />
+
+`separator`, `header` and `character-set` are optional, defaulting to the
+values above. Columns are found by their `remote-name` in the header
+row, or by their position among column definitions for files without
+header.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import deque
+import codecs
+import csv
+import io
+import itertools
+import mmap
+import multiprocessing
+import os
+
+from future.utils import PY2
+
+from tableaupy.exceptions import UnexpectedNoneValue
+from tableaupy.rowsources import predicates
+from tableaupy.rowsources import values
+from tableaupy.rowsources.base import RowSource
+from tableaupy.rowsources.exceptions import UnknownSourceColumn
+
+_QUOTE = b'"'
+_NEWLINE = b'\n'
+
+
+def _records(text, separator):
+    """Yields fields of every record of csv `text`"""
+
+    if not PY2:
+        for record in csv.reader(io.StringIO(text, newline=''),
+                                 delimiter=separator):
+            yield record
+
+        return
+
+    lines = text.encode('utf-8').splitlines(True)
+
+    for record in csv.reader(lines, delimiter=separator.encode('utf-8')):
+        yield [field.decode('utf-8') for field in record]
+
+
+def split_chunks(mapped, start, chunk_size):
+    """(start, end) offsets of chunks of `mapped` ending at record ends
+
+    A newline ends a record when it follows an even number of quotes of
+    the chunk, quotes escaped by doubling them count twice.
+
+    Parameters
+    ----------
+    mapped : mmap
+        memory mapped file, or bytes
+    start : int
+        offset of the first record
+    chunk_size : int
+        bytes of a chunk, chunks end at the first record end after it
+
+    Examples
+    --------
+    >>> split_chunks(b'a,1\\n"b\\nc",2\\nd,3\\n', 0, 4)
+    [(0, 4), (4, 12), (12, 16)]
+    """
+
+    chunks = list()
+    size = len(mapped)
+
+    while start < size:
+        end = min(start + chunk_size, size)
+        quotes = mapped[start:end].count(_QUOTE)
+
+        while end < size and (
+                quotes % 2 or mapped[end - 1:end] != _NEWLINE):
+            newline = mapped.find(_NEWLINE, end)
+
+            if newline < 0:
+                end = size
+                break
+
+            quotes += mapped[end:newline + 1].count(_QUOTE)
+            end = newline + 1
+
+        chunks.append((start, end))
+        start = end
+
+    return chunks
+
+
+def _parse_chunk(task):
+    """Converted rows of chunk `task` of a csv file meeting its conditions
+
+    Called by pool processes, `task` is (path, start, end, encoding,
+    separator, positions, local_types, conditions).
+    """
+
+    (path, start, end, encoding, separator,
+     positions, local_types, conditions) = task
+
+    with open(path, 'rb') as csv_file:
+        csv_file.seek(start)
+        text = csv_file.read(end - start).decode(encoding)
+
+    convert = values.converter(local_types)
+    matches = predicates.matcher(conditions)
+    rows = list()
+
+    for record in _records(text, separator):
+        if not record:
+            continue
+
+        row = convert([
+            record[position] if position < len(record) else None
+            for position in positions
+        ])
+
+        if not conditions or matches(row):
+            rows.append(row)
+
+    return rows
+
+
+class CSVSource(RowSource):
+    """Streams converted rows of a csv file
+
+    Parameters
+    ----------
+    path : str
+        csv file path
+    columns : list
+        names of the columns to be read
+    local_types : list
+        local-type of every column read, rows are converted to them
+    positions : list
+        field positions of columns, found by name in the header when None
+    header : bool
+        True if the first record holds column names (default: True)
+    separator : str
+        field separator (default: ",")
+    encoding : str
+        encoding of the file (default: "utf-8")
+    batch_size : int
+        rows per batch (default: 1000)
+    processes : int
+        processes parsing chunks, cpu count when None, chunks are parsed
+        in this process when 1 or when this process is a daemon
+    chunk_size : int
+        bytes of a chunk (default: 4 MB)
+
+    Raises
+    ------
+    UnknownSourceColumn
+        when a column or condition column is not in the header
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'sample.csv')
+    >>> with open(path, 'w') as csv_file:
+    ...     _ = csv_file.write('id,name\\n1,a\\n2,"b, c"\\n3,\\n')
+    >>> source = CSVSource(path, ['name', 'id'], ['string', 'integer'],
+    ...                    processes=1)
+    >>> [tuple(str(value) for value in row) for row in source.rows()]
+    [('a', '1'), ('b, c', '2'), ('', '3')]
+    """
+
+    def __init__(self,
+                 path,
+                 columns,
+                 local_types,
+                 positions=None,
+                 header=True,
+                 separator=',',
+                 encoding='utf-8',
+                 batch_size=1000,
+                 processes=None,
+                 chunk_size=4 << 20):
+        super(CSVSource, self).__init__(columns)
+        self._path = path
+        self._local_types = list(local_types)
+        self._positions = positions
+        self._header = header
+        self._separator = separator
+        self._encoding = encoding
+        self._batch_size = batch_size
+        self._processes = processes or multiprocessing.cpu_count()
+        self._chunk_size = chunk_size
+        self._conditions = list()
+
+        #: dict : read metrics, see metrics
+        self._counts = {'chunks': 0, 'rows': 0, 'bytes': 0}
+
+    @classmethod
+    def from_reader(cls,
+                    tds_reader,
+                    batch_size=1000,
+                    selected=None,
+                    processes=None,
+                    chunk_size=4 << 20):
+        """Row source of the csv file of a read textscan datasource
+
+        Parameters
+        ----------
+        tds_reader : TDSReader
+            reader which has read a datasource
+        batch_size : int
+            rows per batch (default: 1000)
+        selected : list
+            indexes of the columns to be read, every column when None
+        processes : int
+            processes parsing chunks, cpu count when None
+        chunk_size : int
+            bytes of a chunk (default: 4 MB)
+
+        Returns
+        -------
+        CSVSource
+            row source
+
+        Raises
+        ------
+        UnexpectedNoneValue
+            * when connection has no filename
+            * when a column has no remote-name
+        """
+
+        connection = tds_reader.get_datasource_metadata()['connection']
+
+        if connection.get('filename') is None:
+            raise UnexpectedNoneValue('connection filename')
+
+        path = os.path.join(
+            connection.get('directory', ''),
+            connection['filename']
+        )
+        header = connection.get('header', 'yes').lower() in ('yes', 'true')
+
+        details = tds_reader.get_datasource_column_details()
+        indexes = list(range(len(details))) if selected is None else selected
+        columns = list()
+
+        for index in indexes:
+            if details[index]['remote-name'] is None:
+                raise UnexpectedNoneValue('remote-name')
+
+            columns.append(details[index]['remote-name'])
+
+        return cls(
+            path,
+            columns,
+            [details[index]['local-type'] for index in indexes],
+            positions=None if header else indexes,
+            header=header,
+            separator=connection.get('separator', ','),
+            encoding=connection.get('character-set', 'utf-8'),
+            batch_size=batch_size,
+            processes=processes,
+            chunk_size=chunk_size
+        )
+
+    @property
+    def metrics(self):
+        """Read metrics
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'chunks': chunks parsed,
+                    'rows': rows yielded,
+                    'bytes': bytes of chunks parsed,
+                }
+        """
+
+        return dict(self._counts)
+
+    def push_filters(self, filters):
+        """Applies conditions to rows as chunks are parsed
+
+        Raises
+        ------
+        UnknownSourceColumn
+            when a condition column is not a column of the source
+        """
+
+        for column, comparison, value in filters:
+            if column not in self.columns:
+                raise UnknownSourceColumn(column)
+
+            self._conditions.append(
+                (self.columns.index(column), comparison, value)
+            )
+
+        return list()
+
+    def _read_header(self, mapped):
+        """(field positions of columns, offset of the first record)"""
+
+        start = len(codecs.BOM_UTF8) \
+            if mapped[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+
+        if not self._header:
+            return self._positions, start
+
+        end = mapped.find(_NEWLINE, start)
+        end = len(mapped) if end < 0 else end + 1
+        text = mapped[start:end].decode(self._encoding)
+        names = next(_records(text, self._separator), [])
+        names = [name.strip() for name in names]
+        positions = list()
+
+        for column in self.columns:
+            if column not in names:
+                raise UnknownSourceColumn(column)
+
+            positions.append(names.index(column))
+
+        return positions, end
+
+    def _tasks(self):
+        """Parse task of every chunk of the file, in file order"""
+
+        if os.path.getsize(self._path) == 0:
+            return list()
+
+        with open(self._path, 'rb') as csv_file:
+            mapped = mmap.mmap(
+                csv_file.fileno(),
+                0,
+                access=mmap.ACCESS_READ
+            )
+
+            try:
+                positions, start = self._read_header(mapped)
+                chunks = split_chunks(mapped, start, self._chunk_size)
+            finally:
+                mapped.close()
+
+        return [
+            (
+                self._path, start, end, self._encoding, self._separator,
+                positions, self._local_types, self._conditions,
+            )
+            for start, end in chunks
+        ]
+
+    def _parsed_chunks(self, tasks):
+        """Yields (task, rows) of every chunk of `tasks`, in file order"""
+
+        if self._processes == 1 or multiprocessing.current_process().daemon:
+            for task in tasks:
+                yield task, _parse_chunk(task)
+
+            return
+
+        pool = multiprocessing.Pool(self._processes)
+        tasks = iter(tasks)
+
+        try:
+            # chunks parsed ahead of the consumer are bounded
+            pending = deque(
+                (task, pool.apply_async(_parse_chunk, (task,)))
+                for task in itertools.islice(tasks, 2 * self._processes)
+            )
+
+            while pending:
+                task, result = pending.popleft()
+                rows = result.get()
+
+                for next_task in itertools.islice(tasks, 1):
+                    pending.append((
+                        next_task,
+                        pool.apply_async(_parse_chunk, (next_task,))
+                    ))
+
+                yield task, rows
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def batches(self):
+        for task, rows in self._parsed_chunks(self._tasks()):
+            self._counts['chunks'] += 1
+            self._counts['bytes'] += task[2] - task[1]
+            self._counts['rows'] += len(rows)
+
+            for start in range(0, len(rows), self._batch_size):
+                yield rows[start:start + self._batch_size]
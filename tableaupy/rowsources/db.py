@@ -0,0 +1,526 @@
+# -*- coding: utf-8 -*-
+"""This module defines database row source and connection pool
+
+Connections are opened by drivers registered per connection `class` of
+tableau datasource files. A driver is a function called with the
+connection attributes of a datasource, returning a DB-API 2.0 connection.
+The `sqlite` driver is built in, opening the `dbname` file, other drivers
+can be registered with `register_driver`, with the DB-API `paramstyle` of
+the driver module::
+
+    def connect_sqlserver(connection):
+        return pyodbc.connect(
+            server=connection['server'],
+            database=connection['dbname'],
+            user=connection['username'],
+            password=os.environ['SQLSERVER_PASSWORD'],
+        )
+
+    register_driver('sqlserver', connect_sqlserver, pyodbc.paramstyle)
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from contextlib import contextmanager
+import threading
+import weakref
+
+from future.moves.urllib.request import pathname2url
+from future.utils import raise_with_traceback
+
+from tableaupy.exceptions import UnexpectedNoneValue
+from tableaupy.rowsources.base import RowSource
+from tableaupy.rowsources.exceptions import RowSourceException
+from tableaupy.rowsources.exceptions import UnsupportedConnection
+
+#: dict : connection class to (driver connect function, paramstyle)
+_drivers = dict()
+
+#: connection attributes not identifying the database connected to
+_cosmetic_attributes = frozenset([
+    'caption',
+    'expected-driver-version',
+    'minimum-driver-version',
+])
+
+#: WeakSet : every ConnectionPool of the process, see after_fork
+_pools = weakref.WeakSet()
+
+#: comparison operators of row filters
+_operators = frozenset(['=', '<>', '<', '<=', '>', '>='])
+
+#: dict : DB-API paramstyle to placeholder of parameter at position
+_placeholders = {
+    'qmark': lambda position: '?',
+    'numeric': lambda position: ':{}'.format(position + 1),
+    'named': lambda position: ':p{}'.format(position + 1),
+    'format': lambda position: '%s',
+    'pyformat': lambda position: '%(p{})s'.format(position + 1),
+}
+
+
+def register_driver(connection_class, connect, paramstyle='qmark'):
+    """Registers driver of `connection_class` datasource connections
+
+    Parameters
+    ----------
+    connection_class : str
+        `class` attribute of datasource connection, e.g. "sqlserver"
+    connect : callable
+        called with datasource connection attributes, returns a DB-API
+        connection
+    paramstyle : str
+        DB-API paramstyle of the driver (default: "qmark")
+
+    Raises
+    ------
+    ValueError
+        when paramstyle is not a DB-API paramstyle
+    """
+
+    if paramstyle not in _placeholders:
+        raise ValueError(paramstyle)
+
+    _drivers[connection_class] = (connect, paramstyle)
+
+
+def _driver(connection_class):
+    """(connect, paramstyle) of `connection_class` driver
+
+    Raises
+    ------
+    UnsupportedConnection
+        when no driver is registered for the connection class
+    """
+
+    driver = _drivers.get(connection_class)
+
+    if driver is None:
+        raise UnsupportedConnection(connection_class)
+
+    return driver
+
+
+def _connect_sqlite(connection):
+    """Opens sqlite database file named by `dbname`, read-only
+
+    A missing database file fails rather than being created empty.
+    """
+
+    import sqlite3
+
+    # connections are shared by threads of a pool, never concurrently
+    return sqlite3.connect(
+        'file:{}?mode=ro'.format(pathname2url(connection['dbname'])),
+        uri=True,
+        check_same_thread=False
+    )
+
+
+register_driver('sqlite', _connect_sqlite)
+
+
+def quote_identifier(name):
+    """Quotes column or table name unless already quoted
+
+    Examples
+    --------
+    >>> quote_identifier('name')
+    '"name"'
+    >>> quote_identifier('[dbo].[TABLE_NAME]')
+    '[dbo].[TABLE_NAME]'
+    """
+
+    if name[:1] in ('[', '"', '`'):
+        return name
+
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def _pool_key(connection):
+    """Key of the idle connections of the database of `connection`
+
+    Examples
+    --------
+    >>> _pool_key({'class': 'sqlite', 'dbname': 'a.db', 'caption': 'A'})
+    (('class', 'sqlite'), ('dbname', 'a.db'))
+    """
+
+    return tuple(sorted(
+        (name, value) for name, value in connection.items()
+        if name not in _cosmetic_attributes
+    ))
+
+
+class ConnectionPool(object):
+    """Pool of database connections shared by datasources
+
+    Datasources with the same connection attributes, but for cosmetic ones
+    like captions, share connections, a batch of datasources of one
+    database opens as many connections as are used at the same time.
+
+    Parameters
+    ----------
+    max_idle : int
+        idle connections kept open per database (default: 4)
+    """
+
+    def __init__(self, max_idle=4):
+        super(ConnectionPool, self).__init__()
+        self._max_idle = max_idle
+        self._idle = dict()
+        self._lock = threading.Lock()
+        self._counts = {'opened': 0, 'reused': 0, 'closed': 0}
+        _pools.add(self)
+
+    @property
+    def metrics(self):
+        """Pool metrics
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'opened': connections opened,
+                    'reused': connections taken from idle ones,
+                    'closed': connections closed,
+                    'idle': connections idle,
+                }
+        """
+
+        with self._lock:
+            metrics = dict(self._counts)
+            metrics['idle'] = sum(len(idle) for idle in self._idle.values())
+
+        return metrics
+
+    def acquire(self, connection):
+        """Takes an idle connection to the database or opens a new one
+
+        Parameters
+        ----------
+        connection : dict
+            datasource connection attributes
+
+        Returns
+        -------
+        object
+            DB-API connection
+
+        Raises
+        ------
+        UnsupportedConnection
+            when no driver is registered for the connection class
+        RowSourceException
+            when the database can not be connected to
+        """
+
+        key = _pool_key(connection)
+
+        with self._lock:
+            idle = self._idle.get(key)
+
+            if idle:
+                self._counts['reused'] += 1
+                return idle.pop()
+
+        connect, _ = _driver(connection.get('class'))
+
+        try:
+            db_connection = connect(connection)
+        except Exception as err:  # pylint: disable=broad-except
+            # DB-API drivers share no common base exception
+            raise_with_traceback(RowSourceException(err))
+
+        with self._lock:
+            self._counts['opened'] += 1
+
+        return db_connection
+
+    def release(self, connection, db_connection, broken=False):
+        """Returns a connection taken with acquire to the pool
+
+        Parameters
+        ----------
+        connection : dict
+            datasource connection attributes
+        db_connection : object
+            DB-API connection
+        broken : bool
+            closes the connection instead of keeping it idle if True
+        """
+
+        key = _pool_key(connection)
+
+        with self._lock:
+            idle = self._idle.setdefault(key, list())
+
+            if not broken and len(idle) < self._max_idle:
+                idle.append(db_connection)
+                return
+
+            self._counts['closed'] += 1
+
+        db_connection.close()
+
+    @contextmanager
+    def connection(self, connection):
+        """Connection to the database for the duration of a with block
+
+        A connection is closed instead of reused when the block raises.
+        """
+
+        db_connection = self.acquire(connection)
+        broken = False
+
+        try:
+            yield db_connection
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(connection, db_connection, broken)
+
+    def forget(self):
+        """Drops idle connections without closing them
+
+        Called in a forked process, whose idle connections are those of
+        its parent: using or closing them would break them for the parent.
+        """
+
+        self._lock = threading.Lock()
+        self._idle = dict()
+
+    def close(self):
+        """Closes idle connections"""
+
+        with self._lock:
+            idle = [
+                db_connection
+                for connections in self._idle.values()
+                for db_connection in connections
+            ]
+            self._idle = dict()
+            self._counts['closed'] += len(idle)
+
+        for db_connection in idle:
+            db_connection.close()
+
+
+def after_fork():
+    """Forgets idle connections of every pool, in a forked process"""
+
+    for pool in list(_pools):
+        pool.forget()
+
+
+class DBRowSource(RowSource):
+    """Streams rows of a database table
+
+    Rows are fetched with `fetchmany`, one batch at a time, on a connection
+    taken from `pool` for as long as rows are being read.
+
+    Parameters
+    ----------
+    connection : dict
+        datasource connection attributes
+    table : str
+        table name, quoted or not
+    columns : list
+        names of the columns to be read
+    pool : ConnectionPool
+        pool to take connection from, a private pool when None
+    batch_size : int
+        rows per fetchmany batch (default: 1000)
+    filters : list
+        (column, operator, value) conditions rows must all meet, operator
+        one of =, <>, <, <=, >, >=, see push_filters
+
+    Raises
+    ------
+    ValueError
+        when a filter operator is not supported
+
+    Examples
+    --------
+    >>> import os, sqlite3, tempfile
+    >>> dbname = os.path.join(tempfile.mkdtemp(), 'sample.db')
+    >>> db = sqlite3.connect(dbname)
+    >>> _ = db.execute('CREATE TABLE t (id INTEGER, name TEXT)')
+    >>> _ = db.executemany('INSERT INTO t VALUES (?, ?)', [(1, 'a'), (2, 'b')])
+    >>> db.commit()
+    >>> connection = {'class': 'sqlite', 'dbname': dbname}
+    >>> source = DBRowSource(connection, 't', ['id', 'name'], batch_size=1)
+    >>> [len(batch) for batch in source.batches()]
+    [1, 1]
+    >>> source = DBRowSource(connection, 't', ['name'], filters=[
+    ...     ('id', '>', 1),
+    ... ])
+    >>> list(source.rows())
+    [('b',)]
+    """
+
+    def __init__(self,
+                 connection,
+                 table,
+                 columns,
+                 pool=None,
+                 batch_size=1000,
+                 filters=None):
+        super(DBRowSource, self).__init__(columns)
+        self._connection = connection
+        self._table = table
+        self._pool = ConnectionPool() if pool is None else pool
+        self._batch_size = batch_size
+        self._filters = list()
+        self.push_filters(filters or [])
+
+    @classmethod
+    def from_reader(cls,
+                    tds_reader,
+                    pool=None,
+                    batch_size=1000,
+                    selected=None):
+        """Row source of the relation of a read tableau datasource
+
+        Columns are read by their `remote-name`, in order of column
+        definitions, from the connection named by the relation, or the
+        first connection of the datasource.
+
+        Parameters
+        ----------
+        tds_reader : TDSReader
+            reader which has read a datasource
+        pool : ConnectionPool
+            pool to take connection from
+        batch_size : int
+            rows per fetchmany batch (default: 1000)
+        selected : list
+            indexes of the columns to be read, every column when None
+
+        Returns
+        -------
+        DBRowSource
+            row source
+
+        Raises
+        ------
+        UnexpectedNoneValue
+            * when relation has no table
+            * when a column has no remote-name
+        """
+
+        relation = tds_reader.get_datasource_relation()
+        connection = tds_reader.get_datasource_connections().get(
+            relation.get('connection'),
+            tds_reader.get_datasource_metadata()['connection']
+        )
+        table = relation.get('table')
+
+        if table is None:
+            raise UnexpectedNoneValue('relation table')
+
+        columns = list()
+        details = tds_reader.get_datasource_column_details()
+
+        if selected is not None:
+            details = [details[index] for index in selected]
+
+        for column in details:
+            if column['remote-name'] is None:
+                raise UnexpectedNoneValue('remote-name')
+
+            columns.append(column['remote-name'])
+
+        return cls(connection, table, columns, pool, batch_size)
+
+    def push_filters(self, filters):
+        """Adds conditions to the WHERE clause of the query
+
+        Columns of conditions are column names of the table, read or not.
+
+        Raises
+        ------
+        ValueError
+            when an operator is not supported
+        """
+
+        for _, operator, _ in filters:
+            if operator not in _operators:
+                raise ValueError(operator)
+
+        self._filters.extend(filters)
+        return list()
+
+    @property
+    def query(self):
+        """SELECT statement reading the rows, placeholders in qmark style"""
+
+        return self._statement('qmark')[0]
+
+    def _statement(self, paramstyle):
+        """(SELECT statement, parameters) in `paramstyle`"""
+
+        statement = 'SELECT {} FROM {}'.format(
+            ', '.join(quote_identifier(column) for column in self.columns),
+            quote_identifier(self._table)
+        )
+
+        if not self._filters:
+            return statement, ()
+
+        placeholder = _placeholders[paramstyle]
+        conditions = [
+            '{} {} {}'.format(
+                quote_identifier(column),
+                operator,
+                placeholder(position)
+            )
+            for position, (column, operator, _) in enumerate(self._filters)
+        ]
+        parameters = [value for _, _, value in self._filters]
+
+        if paramstyle in ('named', 'pyformat'):
+            parameters = dict(
+                ('p{}'.format(position + 1), value)
+                for position, value in enumerate(parameters)
+            )
+
+        return (
+            '{} WHERE {}'.format(statement, ' AND '.join(conditions)),
+            parameters
+        )
+
+    def _fetch(self, cursor):
+        """Fetches next batch, driver errors as RowSourceException"""
+
+        try:
+            return cursor.fetchmany(self._batch_size)
+        except Exception as err:  # pylint: disable=broad-except
+            # DB-API drivers share no common base exception
+            raise_with_traceback(RowSourceException(err))
+
+    def batches(self):
+        _, paramstyle = _driver(self._connection.get('class'))
+        statement, parameters = self._statement(paramstyle)
+
+        with self._pool.connection(self._connection) as db_connection:
+            cursor = db_connection.cursor()
+
+            try:
+                try:
+                    cursor.execute(statement, parameters)
+                except Exception as err:  # pylint: disable=broad-except
+                    raise_with_traceback(RowSourceException(err))
+
+                rows = self._fetch(cursor)
+
+                while rows:
+                    yield [tuple(row) for row in rows]
+                    rows = self._fetch(cursor)
+            finally:
+                cursor.close()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=too-many-ancestors
+
+"""Exceptions for Row Sources"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tableaupy import exceptions
+
+
+class RowSourceException(exceptions.TableauPyException):
+    """raised when an exception is thrown by a RowSource"""
+
+    _message_template = 'An error occurred with RowSource'
+
+
+class UnsupportedConnection(RowSourceException):
+    """raised when no driver is registered for a connection class"""
+
+    _message_template = '{!r}: no driver registered for connection class'
+
+    def __init__(self, connection_class):
+        RowSourceException.__init__(self)
+        self.connection_class = connection_class
+        self.args += (connection_class,)
+
+
+class UnknownSourceColumn(RowSourceException):
+    """raised when a column is not a column of a row source"""
+
+    _message_template = '{!r}: is not a column of row source'
+
+    def __init__(self, column):
+        RowSourceException.__init__(self)
+        self.column = column
+        self.args += (column,)
+
+
+class ValueConversionError(RowSourceException, ValueError):
+    """raised when a value can not be converted to a column local-type"""
+
+    _message_template = '{!r}: can not be converted to {}'
+
+    def __init__(self, value, local_type):
+        ValueError.__init__(self)
+        RowSourceException.__init__(self)
+        self.value = value
+        self.local_type = local_type
+        self.args += (value, local_type)
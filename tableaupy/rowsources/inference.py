@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""This module defines inference of the columns of csv files
+
+A few chunks spread evenly over the file are sampled, so that inference
+takes as long for a file of any size. Every column is given the first
+local-type all its sampled values convert to, in order:
+
+* boolean - true or false, in any case
+* integer
+* double
+* date - YYYY-MM-DD
+* datetime - YYYY-MM-DD HH:MM[:SS[.ffffff]], or with a T separator
+* string, or unicode_string when a value is not ascii
+
+and is nullable when a sampled value is empty. Values are checked column
+by column with vectorized numpy operations when numpy is installed, one
+by one otherwise.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import codecs
+import mmap
+import os
+
+from tableaupy.rowsources import values
+from tableaupy.rowsources.csvfile import _records
+from tableaupy.rowsources.exceptions import ValueConversionError
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    # values are checked one by one
+    numpy = None
+
+_NEWLINE = b'\n'
+
+#: local-types inferred, in order of preference
+_candidate_types = ('boolean', 'integer', 'double', 'date', 'datetime')
+
+#: dict : local-type to aggregation of its columns, like tableau does
+_aggregations = {
+    'integer': 'Sum',
+    'double': 'Sum',
+    'date': 'Year',
+    'datetime': 'Year',
+}
+
+#: dict : local-type to remote-type of text files
+_remote_types = {
+    'boolean': '11',
+    'integer': '20',
+    'double': '5',
+    'date': '133',
+    'datetime': '135',
+    'string': '129',
+    'unicode_string': '130',
+}
+
+#: most digits of integers inferred, larger ones do not fit 64 bits
+_INTEGER_DIGITS = 18
+
+#: digits of integers, isdigit also accepts other digits like u'\xb2'
+_DIGITS = u'0123456789'
+
+
+def _record_end(mapped, offset):
+    """Offset following the newline at or after `offset`"""
+
+    newline = mapped.find(_NEWLINE, offset)
+    return len(mapped) if newline < 0 else newline + 1
+
+
+def sample_records(path,
+                   separator=',',
+                   encoding='utf-8',
+                   header=True,
+                   sample_size=1 << 20,
+                   chunks=8):
+    """Header and sampled records of a csv file
+
+    Records are read from `chunks` chunks of ``sample_size / chunks``
+    bytes spread evenly over the file, the whole file when it is smaller
+    than `sample_size`. A chunk not at the start of the file starts at a
+    newline, records of a chunk which do not have as many fields as the
+    first record, like those cut in a quoted field, are left out.
+
+    Parameters
+    ----------
+    path : str
+        csv file path
+    separator : str
+        field separator (default: ",")
+    encoding : str
+        encoding of the file (default: "utf-8")
+    header : bool
+        True if the first record holds column names (default: True)
+    sample_size : int
+        bytes sampled (default: 1 MB)
+    chunks : int
+        chunks sampled (default: 8)
+
+    Returns
+    -------
+    tuple
+        (column names, sampled records), names are F1, F2, ... for files
+        without header and for empty names
+    """
+
+    if os.path.getsize(path) == 0:
+        return list(), list()
+
+    with open(path, 'rb') as csv_file:
+        mapped = mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            start = len(codecs.BOM_UTF8) \
+                if mapped[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+            names = None
+
+            if header:
+                end = _record_end(mapped, start)
+                text = mapped[start:end].decode(encoding)
+                names = next(_records(text, separator), [])
+                start = end
+
+            size = len(mapped) - start
+            spans = [(start, len(mapped))]
+
+            if size > sample_size:
+                step = (size - sample_size // chunks) // max(chunks - 1, 1)
+                spans = [
+                    (start + index * step,
+                     start + index * step + sample_size // chunks)
+                    for index in range(chunks)
+                ]
+
+            records = list()
+
+            for index, (chunk_start, chunk_end) in enumerate(spans):
+                if index:
+                    chunk_start = _record_end(mapped, chunk_start - 1)
+
+                chunk_end = _record_end(mapped, max(chunk_end - 1, 0))
+                text = mapped[chunk_start:chunk_end].decode(
+                    encoding,
+                    'replace'
+                )
+                records.extend(
+                    record for record in _records(text, separator) if record
+                )
+        finally:
+            mapped.close()
+
+    if names is None:
+        names = [u''] * (len(records[0]) if records else 0)
+
+    names = [
+        name.strip() or u'F{}'.format(position + 1)
+        for position, name in enumerate(names)
+    ]
+
+    return names, [record for record in records if len(record) == len(names)]
+
+
+def _is_ascii(texts):
+    """True if every text of `texts` is ascii"""
+
+    try:
+        u''.join(texts).encode('ascii')
+    except UnicodeError:
+        return False
+
+    return True
+
+
+def _numpy_matches(local_type, texts):
+    """True if every text of array `texts` converts to `local_type`"""
+
+    lengths = numpy.char.str_len(texts)
+
+    if local_type == 'boolean':
+        return bool(numpy.isin(
+            numpy.char.lower(texts),
+            ['true', 'false']
+        ).all())
+
+    if local_type == 'integer':
+        digits = numpy.char.lstrip(texts, '+-')
+        signs = lengths - numpy.char.str_len(digits)
+        others = numpy.char.str_len(numpy.char.strip(digits, _DIGITS))
+        return bool(
+            (others == 0).all() and
+            (lengths > signs).all() and
+            (signs <= 1).all() and
+            (lengths - signs <= _INTEGER_DIGITS).all()
+        )
+
+    if local_type == 'date' and not (lengths == 10).all():
+        return False
+
+    # no time zone offsets, which datetime columns do not hold
+    if local_type == 'datetime' and not (
+            ((lengths >= 16) & (lengths <= 26)).all() and
+            (numpy.char.rfind(texts, '-') < 10).all() and
+            (numpy.char.find(texts, '+') < 0).all() and
+            (numpy.char.find(texts, 'Z') < 0).all()):
+        return False
+
+    parsed_types = {
+        'double': numpy.float64,
+        'date': 'datetime64[D]',
+        'datetime': 'datetime64[us]',
+    }
+
+    try:
+        texts.astype(parsed_types[local_type])
+    except (ValueError, OverflowError):
+        return False
+
+    return True
+
+
+def _python_matches(local_type, texts):
+    """True if every text of `texts` converts to `local_type`"""
+
+    for text in texts:
+        if local_type == 'boolean' and text.lower() not in ('true', 'false'):
+            return False
+
+        if local_type == 'integer' and (
+                len(text.lstrip('+-')) > _INTEGER_DIGITS or
+                not text.lstrip('+-') or
+                text.lstrip('+-').strip(_DIGITS)):
+            return False
+
+        if local_type == 'date' and len(text) != 10:
+            return False
+
+        if local_type == 'datetime' and len(text) < 16:
+            return False
+
+        try:
+            values.coerce(local_type, text)
+        except ValueConversionError:
+            return False
+
+    return True
+
+
+def infer_column(texts):
+    """(local-type, nullable) of a column of sampled `texts`
+
+    Examples
+    --------
+    >>> infer_column([u'1', u'-2', u''])
+    ('integer', True)
+    >>> infer_column([u'1.5', u'2'])
+    ('double', False)
+    >>> infer_column([u'2017-01-02 10:00', u'2017-01-02T10:00:00.5'])
+    ('datetime', False)
+    >>> infer_column([u'TRUE', u'false'])
+    ('boolean', False)
+    >>> infer_column([u'Zürich', u'42'])
+    ('unicode_string', False)
+    >>> infer_column([u'42', u'4\xb2'])
+    ('unicode_string', False)
+    >>> infer_column([u''])
+    ('string', True)
+    """
+
+    stripped = [text.strip() for text in texts]
+    present = [text for text in stripped if text]
+    nullable = len(present) < len(stripped)
+
+    if present:
+        if numpy is not None:
+            array = numpy.array(present, dtype=numpy.str_)
+            matches = _numpy_matches
+        else:
+            array = present
+            matches = _python_matches
+
+        for local_type in _candidate_types:
+            if matches(local_type, array):
+                return local_type, nullable
+
+    return 'string' if _is_ascii(present) else 'unicode_string', nullable
+
+
+def infer_columns(path,
+                  table,
+                  separator=',',
+                  encoding='utf-8',
+                  header=True,
+                  sample_size=1 << 20):
+    """Column details of a csv file, inferred from a sample
+
+    Parameters
+    ----------
+    path : str
+        csv file path
+    table : str
+        table name, parent of the columns
+    separator : str
+        field separator (default: ",")
+    encoding : str
+        encoding of the file (default: "utf-8")
+    header : bool
+        True if the first record holds column names (default: True)
+    sample_size : int
+        bytes sampled (default: 1 MB), see sample_records
+
+    Returns
+    -------
+    list
+        metadata-record fields of every column, in file order::
+
+            {
+                'remote-name': name in the file,
+                'remote-type': type code of text files,
+                'local-name': '[name]',
+                'parent-name': '[table]',
+                'remote-alias': name in the file,
+                'ordinal': position, from 1,
+                'local-type': inferred local-type,
+                'aggregation': default aggregation,
+                'contains-null': 'true' or 'false',
+            }
+    """
+
+    names, records = sample_records(
+        path,
+        separator=separator,
+        encoding=encoding,
+        header=header,
+        sample_size=sample_size
+    )
+    columns = list()
+
+    for position, name in enumerate(names):
+        local_type, nullable = infer_column(
+            [record[position] for record in records]
+        )
+        columns.append({
+            'remote-name': name,
+            'remote-type': _remote_types[local_type],
+            'local-name': u'[{}]'.format(name),
+            'parent-name': u'[{}]'.format(table),
+            'remote-alias': name,
+            'ordinal': str(position + 1),
+            'local-type': local_type,
+            'aggregation': _aggregations.get(local_type, 'Count'),
+            'contains-null': 'true' if nullable else 'false',
+        })
+
+    return columns
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""This module defines joining of row sources on equal keys
+
+Rows of the right source, the build side, are read into a hash table by
+a thread while the first rows of the left source, the probe side, are
+read, then left rows are streamed and matched against the table. The
+right source of a join may be a join itself, so that the hash tables of
+every joined table are built at once, each by its own thread.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+import threading
+
+from future.utils import raise_
+
+from tableaupy.rowsources import predicates
+from tableaupy.rowsources.base import RowSource
+
+#: seconds waited for the hash table before checking for interrupts
+_POLL_INTERVAL = 0.1
+
+#: join types keeping left rows without match
+_KEEP_LEFT = ('left', 'full')
+
+#: join types keeping right rows without match
+_KEEP_RIGHT = ('right', 'full')
+
+
+def _projection(positions):
+    """Function returning values at `positions` of a row, as a tuple"""
+
+    if positions is None:
+        return None
+
+    positions = list(positions)
+    return lambda row: tuple([row[position] for position in positions])
+
+
+class HashJoinSource(RowSource):
+    """Joins rows of two row sources having equal key values
+
+    Rows of `right` are held in memory, rows of `left` are streamed. Rows
+    with a null key value match no row, as in SQL.
+
+    Parameters
+    ----------
+    left : RowSource
+        rows streamed
+    right : RowSource
+        rows held in a hash table of their key values
+    keys : list
+        (left position, right position) of every pair of columns having
+        equal values in joined rows
+    how : str
+        join type, one of inner, left, right, full (default: inner),
+        columns of a row without match are null
+    columns : list
+        names of joined columns, left columns then right columns, names
+        of columns of `left` and `right` when None
+    output : list
+        positions of joined columns kept in joined rows, in order, every
+        column when None
+    batch_size : int
+        rows per batch (default: 1000)
+
+    Raises
+    ------
+    ValueError
+        when `how` is not a join type
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> orders = IterableSource(['id', 'customer'], [(1, 7), (2, 8), (3, 7)])
+    >>> customers = IterableSource(['id', 'name'], [(7, 'a'), (9, 'c')])
+    >>> joined = HashJoinSource(orders, customers, [(1, 0)], how='left',
+    ...                         output=[0, 3])
+    >>> list(joined.rows())
+    [(1, 'a'), (2, None), (3, 'a')]
+    >>> joined.columns
+    ['id', 'name']
+    """
+
+    def __init__(self,
+                 left,
+                 right,
+                 keys,
+                 how='inner',
+                 columns=None,
+                 output=None,
+                 batch_size=1000):
+        if how not in ('inner', ) + _KEEP_LEFT + _KEEP_RIGHT:
+            raise ValueError(how)
+
+        if columns is None:
+            columns = left.columns + right.columns
+
+        super(HashJoinSource, self).__init__(
+            columns if output is None
+            else [columns[position] for position in output]
+        )
+        self._left = left
+        self._right = right
+        self._left_keys = [position for position, _ in keys]
+        self._right_keys = [position for _, position in keys]
+        self._how = how
+        self._joined_columns = list(columns)
+        self._output = output
+        self._batch_size = batch_size
+        self._conditions = list()
+        self._stop = threading.Event()
+
+        #: tuple : (hash table, right rows, exc_info) of the build thread
+        self._build = None
+
+        #: dict : join metrics, see metrics
+        self._counts = {'build_rows': 0, 'probe_rows': 0, 'rows': 0}
+
+    @property
+    def metrics(self):
+        """Join metrics
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'build_rows': rows of right source held in memory,
+                    'probe_rows': rows of left source matched,
+                    'rows': joined rows,
+                }
+        """
+
+        return dict(self._counts)
+
+    def push_filters(self, filters):
+        """Hands conditions over to the joined sources, or applies them
+
+        A condition on columns of a side every row of which is joined at
+        most once, the left side of inner and left joins, the right side
+        of inner and right joins, is handed over to that side, any other
+        condition is matched against joined rows.
+
+        Returns
+        -------
+        list
+            conditions on columns which are not joined columns
+        """
+
+        positions = dict(
+            (column, position)
+            for position, column in enumerate(self._joined_columns)
+        )
+        width = len(self._left.columns)
+        remaining = list()
+
+        for condition in filters:
+            column, operator, value = condition
+            position = positions.get(column)
+
+            if position is None:
+                remaining.append(condition)
+                continue
+
+            if position < width and self._how not in _KEEP_RIGHT:
+                side = self._left
+                name = self._left.columns[position]
+            elif position >= width and self._how not in _KEEP_LEFT:
+                side = self._right
+                name = self._right.columns[position - width]
+            else:
+                side = None
+
+            if side is None or side.push_filters([(name, operator, value)]):
+                self._conditions.append((position, operator, value))
+
+        return remaining
+
+    def _fill(self):
+        """Build thread, reads rows of the right source into a hash table"""
+
+        table = dict()
+        rows = list()
+        keys = self._right_keys
+        batches = iter(self._right.batches())
+
+        try:
+            for batch in batches:
+                if self._stop.is_set():
+                    break
+
+                for row in batch:
+                    key = tuple([row[position] for position in keys])
+
+                    if None not in key:
+                        table.setdefault(key, list()).append(len(rows))
+
+                    rows.append(row)
+
+            self._counts['build_rows'] = len(rows)
+            self._build = (table, rows, None)
+        except Exception:  # pylint: disable=broad-except
+            self._build = (None, None, sys.exc_info())
+        finally:
+            close = getattr(batches, 'close', None)
+
+            if close is not None:
+                close()
+
+    def _matched(self, batches, table, rows, matched):
+        """Yields joined rows of every left row of `batches`"""
+
+        keys = self._left_keys
+        keep_left = self._how in _KEEP_LEFT
+        track = matched is not None
+        nulls = (None, ) * len(self._right.columns)
+
+        for batch in batches:
+            self._counts['probe_rows'] += len(batch)
+
+            for row in batch:
+                key = tuple([row[position] for position in keys])
+                indexes = None if None in key else table.get(key)
+
+                if indexes:
+                    for index in indexes:
+                        if track:
+                            matched[index] = 1
+
+                        yield row + rows[index]
+                elif keep_left:
+                    yield row + nulls
+
+    def _unmatched(self, rows, matched):
+        """Yields joined rows of every right row without match"""
+
+        nulls = (None, ) * len(self._left.columns)
+
+        for index, row in enumerate(rows):
+            if not matched[index]:
+                yield nulls + row
+
+    def batches(self):
+        self._stop.clear()
+        self._build = None
+        thread = threading.Thread(target=self._fill, name='hash-join')
+        thread.daemon = True
+        thread.start()
+        left_batches = iter(self._left.batches())
+
+        try:
+            # the first left rows are read while the table is built
+            first = next(left_batches, None)
+
+            while thread.is_alive():
+                thread.join(_POLL_INTERVAL)
+
+            table, rows, error = self._build
+
+            if error is not None:
+                raise_(*error)
+
+            matched = bytearray(len(rows)) \
+                if self._how in _KEEP_RIGHT else None
+            joined = self._matched(
+                self._chain(first, left_batches),
+                table,
+                rows,
+                matched
+            )
+
+            for batch in self._batched(joined):
+                yield batch
+
+            if matched is not None:
+                for batch in self._batched(self._unmatched(rows, matched)):
+                    yield batch
+        finally:
+            self._stop.set()
+            thread.join()
+
+            # the hash table is released once rows are joined
+            self._build = None
+            close = getattr(left_batches, 'close', None)
+
+            if close is not None:
+                close()
+
+    @staticmethod
+    def _chain(first, batches):
+        """Yields batch `first` unless None, then every batch of `batches`"""
+
+        if first is not None:
+            yield first
+
+        for batch in batches:
+            yield batch
+
+    def _batched(self, joined):
+        """Yields batches of joined rows matching conditions, projected"""
+
+        matches = predicates.matcher(self._conditions) \
+            if self._conditions else None
+        project = _projection(self._output)
+        batch = list()
+
+        for row in joined:
+            if matches is not None and not matches(row):
+                continue
+
+            batch.append(row if project is None else project(row))
+
+            if len(batch) >= self._batch_size:
+                self._counts['rows'] += len(batch)
+                yield batch
+                batch = list()
+
+        if batch:
+            self._counts['rows'] += len(batch)
+            yield batch
+
+    def close(self):
+        self._left.close()
+        self._right.close()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""This module defines row predicates
+
+A predicate compares a column to a value, it is written as
+``COLUMN OPERATOR VALUE`` with one of the operators ``=``, ``<>`` (or
+``!=``), ``<``, ``<=``, ``>`` and ``>=``, e.g. ``[Order Date]>=2017-01-01``.
+
+Predicates are pushed to row sources able to filter rows themselves, like
+databases, see RowSource.push_filters, others are matched against
+converted rows.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import namedtuple
+import operator
+import re
+
+#: dict : predicate operator to python comparison
+_comparisons = {
+    '=': operator.eq,
+    '<>': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+_predicate_pattern = re.compile(r'^\s*(.+?)\s*(<>|!=|<=|>=|=|<|>)\s*(.*?)\s*$')
+
+
+class Predicate(namedtuple('Predicate', ['column', 'operator', 'value'])):
+    """Comparison of a column to a value
+
+    Attributes
+    ----------
+    column : str
+        column name
+    operator : str
+        one of =, <>, <, <=, >, >=
+    value : object
+        value compared to, as text when parsed
+    """
+
+    __slots__ = ()
+
+
+def parse(text):
+    """Parses predicate `text`
+
+    Parameters
+    ----------
+    text : str
+        predicate, as ``COLUMN OPERATOR VALUE``
+
+    Returns
+    -------
+    Predicate
+        parsed predicate, value is text
+
+    Raises
+    ------
+    ValueError
+        when text is not a predicate
+
+    Examples
+    --------
+    >>> parse('[Order Date] >= 2017-01-01')
+    Predicate(column='[Order Date]', operator='>=', value='2017-01-01')
+    >>> parse('Region!=West').operator
+    '<>'
+    """
+
+    match = _predicate_pattern.match(text)
+
+    if match is None:
+        raise ValueError(text)
+
+    column, comparison, value = match.groups()
+    return Predicate(column, '<>' if comparison == '!=' else comparison, value)
+
+
+def compare(comparison, left, right):
+    """True if `left` compares to `right`, False when any is null
+
+    Examples
+    --------
+    >>> compare('<', 1, 2)
+    True
+    >>> compare('=', None, None)
+    False
+    """
+
+    if left is None or right is None:
+        return False
+
+    return _comparisons[comparison](left, right)
+
+
+def matcher(conditions):
+    """Row matcher of (position, operator, value) `conditions`
+
+    Parameters
+    ----------
+    conditions : list
+        (position in row, operator, value) conditions rows must all meet
+
+    Returns
+    -------
+    callable
+        called with a row, True if it meets every condition
+
+    Examples
+    --------
+    >>> matches = matcher([(0, '>', 1), (1, '=', 'a')])
+    >>> matches((2, 'a')), matches((1, 'a'))
+    (True, False)
+    """
+
+    conditions = list(conditions)
+
+    def _matches(row):
+        """True if `row` meets every condition"""
+
+        return all(
+            compare(comparison, row[position], value)
+            for position, comparison, value in conditions
+        )
+
+    return _matches
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""This module defines sorted runs spilled to temporary files
+
+Row sources holding more rows than fit in their memory budget sort them
+into runs, temporary files of pickled records, and merge the runs back in
+order, see AggregateSource and SortSource.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import heapq
+import sys
+import tempfile
+
+from future.moves import pickle
+
+#: records sampled to estimate memory used by a record
+SAMPLED_RECORDS = 64
+
+#: records pickled at once to a run file
+_RUN_CHUNK = 1000
+
+
+class _Descending(object):
+    """Value ordered in reverse"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __gt__(self, other):
+        return other.value > self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __ne__(self, other):
+        return self.value != other.value
+
+    def __le__(self, other):
+        return not other.value > self.value
+
+    def __ge__(self, other):
+        return not other.value < self.value
+
+    __hash__ = None
+
+
+def sort_key(values, descending=None):
+    """Sort key of `values`, nulls last
+
+    Parameters
+    ----------
+    values : tuple
+        values compared in order
+    descending : list
+        True for every value sorted in descending order, every value is
+        sorted in ascending order when None
+
+    Examples
+    --------
+    >>> sorted([(2, 'a'), (None, 'b'), (1, 'c')], key=sort_key)
+    [(1, 'c'), (2, 'a'), (None, 'b')]
+    >>> sorted([(2,), (None,), (1,)], key=lambda row: sort_key(row, [True]))
+    [(2,), (1,), (None,)]
+    """
+
+    key = list()
+
+    for index, value in enumerate(values):
+        if value is None:
+            key.append((True, 0))
+        elif descending is not None and descending[index]:
+            key.append((False, _Descending(value)))
+        else:
+            key.append((False, value))
+
+    return tuple(key)
+
+
+def approximate_size(value):
+    """Approximate bytes used by `value` and the values it holds
+
+    Examples
+    --------
+    >>> approximate_size((1, 'a')) > approximate_size(())
+    True
+    """
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (tuple, list)):
+        size += sum(approximate_size(item) for item in value)
+
+    return size
+
+
+def record_size(records):
+    """Average approximate bytes used by sampled `records`"""
+
+    sampled = list(records)[:SAMPLED_RECORDS]
+
+    if not sampled:
+        return 0
+
+    return sum(approximate_size(record) for record in sampled) // len(sampled)
+
+
+def write_run(records, spill_dir=None):
+    """Writes `records` to a new run file
+
+    Parameters
+    ----------
+    records : list
+        picklable records, in run order
+    spill_dir : str
+        directory of the run file, the system temporary directory when None
+
+    Returns
+    -------
+    file
+        run file positioned at its start, removed when closed
+    """
+
+    run = tempfile.TemporaryFile(dir=spill_dir)
+
+    for start in range(0, len(records), _RUN_CHUNK):
+        pickle.dump(
+            records[start:start + _RUN_CHUNK],
+            run,
+            pickle.HIGHEST_PROTOCOL
+        )
+
+    run.seek(0)
+    return run
+
+
+def read_run(run):
+    """Yields records of run file `run`, in run order"""
+
+    while True:
+        try:
+            records = pickle.load(run)
+        except EOFError:
+            return
+
+        for record in records:
+            yield record
+
+
+def merge_runs(runs, key):
+    """Yields records of `runs`, each sorted by `key`, in `key` order
+
+    Records of equal keys are yielded in order of their runs, then in run
+    order, so that merging runs written in turn is a stable sort.
+
+    Parameters
+    ----------
+    runs : list
+        run files, see write_run
+    key : callable
+        called with a record, returns its sort key
+
+    Examples
+    --------
+    >>> runs = [write_run([1, 4, 5]), write_run([2, 3, 6])]
+    >>> list(merge_runs(runs, key=lambda record: record))
+    [1, 2, 3, 4, 5, 6]
+    """
+
+    def _decorated(run, index):
+        """Yields (key, run index, position, record) of run records"""
+
+        for position, record in enumerate(read_run(run)):
+            yield key(record), index, position, record
+
+    merged = heapq.merge(*[
+        _decorated(run, index) for index, run in enumerate(runs)
+    ])
+
+    for _, _, _, record in merged:
+        yield record
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""This module defines row sources sampling the rows of a row source
+
+* ReservoirSource - uniform sample of a fixed number of rows
+* HashSampleSource - deterministic sample of a percentage of rows
+* TopSource - first rows in order of key columns
+
+Every sample is taken in one streaming pass holding only sampled rows in
+memory, and only sampled rows are converted and inserted into extracts.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+import heapq
+import math
+import random
+
+from tableaupy.rowsources import predicates
+from tableaupy.rowsources import runs
+from tableaupy.rowsources.base import RowSource
+from tableaupy.rowsources.exceptions import UnknownSourceColumn
+
+#: hash of a row is mapped to [0, 1) on this many buckets
+_HASH_BUCKETS = 1 << 32
+
+
+class _SampleSource(RowSource):
+    """Base class of sources sampling the rows of a row source
+
+    Conditions are pushed to the sampled source, those it does not apply
+    are applied to its rows before sampling, so that rows are sampled
+    among rows meeting every condition.
+    """
+
+    def __init__(self, row_source, batch_size=1000):
+        super(_SampleSource, self).__init__(row_source.columns)
+        self._row_source = row_source
+        self._batch_size = batch_size
+        self._conditions = list()
+
+    def push_filters(self, filters):
+        """Pushes conditions to the source, applies the others itself
+
+        Raises
+        ------
+        UnknownSourceColumn
+            when a condition column is not a column of the source
+        """
+
+        remaining = self._row_source.push_filters(filters)
+
+        for column, comparison, value in remaining:
+            if column not in self.columns:
+                raise UnknownSourceColumn(column)
+
+            self._conditions.append(
+                (self.columns.index(column), comparison, value)
+            )
+
+        return list()
+
+    def _source_rows(self):
+        """Yields rows of the source meeting conditions"""
+
+        rows = self._row_source.rows()
+
+        if self._conditions:
+            matches = predicates.matcher(self._conditions)
+            rows = (row for row in rows if matches(row))
+
+        return rows
+
+    def _sampled_rows(self):
+        """Yields sampled rows"""
+
+        raise NotImplementedError
+
+    def batches(self):
+        batch = list()
+
+        for row in self._sampled_rows():
+            batch.append(row)
+
+            if len(batch) >= self._batch_size:
+                yield batch
+                batch = list()
+
+        if batch:
+            yield batch
+
+    def close(self):
+        self._row_source.close()
+
+
+class ReservoirSource(_SampleSource):
+    """Uniform sample of `size` rows of a row source
+
+    Every row has the same probability to be sampled, sampled rows keep
+    their source order. Random numbers are drawn only for sampled rows,
+    see Li, "Reservoir-Sampling Algorithms of Time Complexity
+    O(n(1 + log(N/n)))".
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be sampled
+    size : int
+        number of rows sampled, every row when there are fewer
+    seed : int
+        seed of the random sample, a different sample every run when None
+    batch_size : int
+        rows per batch of sampled rows (default: 1000)
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> source = IterableSource(['n'], [(n,) for n in range(100)])
+    >>> rows = list(ReservoirSource(source, 5, seed=1).rows())
+    >>> len(rows), rows == sorted(rows)
+    (5, True)
+    """
+
+    def __init__(self, row_source, size, seed=None, batch_size=1000):
+        super(ReservoirSource, self).__init__(row_source, batch_size)
+        self._size = size
+        self._random = random.Random(seed)
+
+    def _draw(self):
+        """Random number in (0, 1]"""
+
+        return 1.0 - self._random.random()
+
+    def _skip(self, weight):
+        """Number of rows skipped before the next sampled row"""
+
+        if weight >= 1.0:
+            return 0
+
+        return int(math.floor(math.log(self._draw()) / math.log(1 - weight)))
+
+    def _sampled_rows(self):
+        size = self._size
+        reservoir = list()
+
+        if size <= 0:
+            return
+
+        weight = math.exp(math.log(self._draw()) / size)
+        next_index = size + self._skip(weight)
+
+        for index, row in enumerate(self._source_rows()):
+            if index < size:
+                reservoir.append((index, row))
+            elif index == next_index:
+                reservoir[self._random.randrange(size)] = (index, row)
+                weight *= math.exp(math.log(self._draw()) / size)
+                next_index += self._skip(weight) + 1
+
+        reservoir.sort(key=lambda item: item[0])
+
+        for _, row in reservoir:
+            yield row
+
+
+def _row_hash(values):
+    """Hash of `values` in [0, 1), the same on every host and run"""
+
+    text = u'\x1f'.join(
+        u'\x00' if value is None else
+        value.decode('utf-8') if isinstance(value, bytes) else
+        u'{}'.format(value)
+        for value in values
+    )
+    digest = hashlib.md5(text.encode('utf-8')).hexdigest()
+    return (int(digest, 16) % _HASH_BUCKETS) / _HASH_BUCKETS
+
+
+class HashSampleSource(_SampleSource):
+    """Deterministic sample of `percent` percent of the rows of a source
+
+    A row is sampled when the hash of its key values falls below the
+    percentage, so that the same rows are sampled on every run, and rows
+    sharing key values are sampled together.
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be sampled
+    percent : float
+        percentage of rows sampled, from 0 to 100
+    positions : list
+        positions of the key columns, every column when None
+    batch_size : int
+        rows per batch of sampled rows (default: 1000)
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> rows = [(n,) for n in range(1000)]
+    >>> sample = list(HashSampleSource(IterableSource(['n'], rows), 10).rows())
+    >>> 50 < len(sample) < 150
+    True
+    >>> sample == list(
+    ...     HashSampleSource(IterableSource(['n'], rows), 10).rows()
+    ... )
+    True
+    """
+
+    def __init__(self, row_source, percent, positions=None, batch_size=1000):
+        super(HashSampleSource, self).__init__(row_source, batch_size)
+        self._fraction = percent / 100
+        self._positions = positions
+
+    def _sampled_rows(self):
+        fraction = self._fraction
+        positions = self._positions
+
+        for row in self._source_rows():
+            key = row if positions is None else [row[i] for i in positions]
+
+            if _row_hash(key) < fraction:
+                yield row
+
+
+class TopSource(_SampleSource):
+    """First `count` converted rows of a source in order of key columns
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be sampled
+    convert : callable
+        called with a source row, returns the converted row
+    keys : list
+        (position, descending) of every key column, in key order, see
+        SortSource
+    count : int
+        number of rows sampled
+    batch_size : int
+        rows per batch of sampled rows (default: 1000)
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> source = IterableSource(['n'], [(3,), (None,), (9,), (5,)])
+    >>> list(TopSource(source, tuple, [(0, True)], 2).rows())
+    [(9,), (5,)]
+    """
+
+    def __init__(self, row_source, convert, keys, count, batch_size=1000):
+        super(TopSource, self).__init__(row_source, batch_size)
+        self._convert = convert
+        self._positions = [position for position, _ in keys]
+        self._descending = [descending for _, descending in keys]
+        self._count = count
+
+    def _order(self, row):
+        """Sort key of converted `row`"""
+
+        return runs.sort_key(
+            tuple(row[position] for position in self._positions),
+            self._descending
+        )
+
+    def _sampled_rows(self):
+        convert = self._convert
+        rows = (convert(row) for row in self._row_source.rows())
+
+        # conditions are matched against converted rows
+        if self._conditions:
+            matches = predicates.matcher(self._conditions)
+            rows = (row for row in rows if matches(row))
+
+        # holds `count` rows at most, ties keep their source order
+        for row in heapq.nsmallest(self._count, rows, key=self._order):
+            yield row
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""This module defines external merge sort of rows
+
+Converted rows are buffered until they use the memory budget, the buffer
+is then sorted and spilled to a run file on local disk. Once every row is
+read, runs are merged back in order, so that rows of any number are
+sorted holding at most a budget of them in memory.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tableaupy.rowsources import predicates
+from tableaupy.rowsources import runs
+from tableaupy.rowsources.base import RowSource
+from tableaupy.rowsources.exceptions import UnknownSourceColumn
+
+
+class SortSource(RowSource):
+    """Sorts the converted rows of a row source
+
+    Rows are sorted on the values of the key columns, nulls last, rows of
+    equal keys keep their source order.
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be sorted
+    convert : callable
+        called with a source row, returns the converted row
+    keys : list
+        (position, descending) of every key column, in key order
+    memory_budget : int
+        bytes of rows held in memory before they are spilled
+        (default: 256 MB)
+    batch_size : int
+        rows per batch of sorted rows (default: 1000)
+    spill_dir : str
+        directory of run files, the system temporary directory when None
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> source = IterableSource(['day', 'sales'], [
+    ...     ('tue', 1), ('mon', 3), (None, 2), ('mon', 5),
+    ... ])
+    >>> list(SortSource(source, tuple, [(0, False), (1, True)]).rows())
+    [('mon', 5), ('mon', 3), ('tue', 1), (None, 2)]
+    """
+
+    def __init__(self,
+                 row_source,
+                 convert,
+                 keys,
+                 memory_budget=256 << 20,
+                 batch_size=1000,
+                 spill_dir=None):
+        super(SortSource, self).__init__(row_source.columns)
+        self._row_source = row_source
+        self._convert = convert
+        self._positions = [position for position, _ in keys]
+        self._descending = [descending for _, descending in keys]
+        self._memory_budget = memory_budget
+        self._batch_size = batch_size
+        self._spill_dir = spill_dir
+        self._conditions = list()
+        self._runs = list()
+
+        #: dict : sort metrics, see metrics
+        self._counts = {'rows': 0, 'runs': 0}
+
+    @property
+    def metrics(self):
+        """Sort metrics
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'rows': rows sorted,
+                    'runs': runs spilled to disk,
+                }
+        """
+
+        return dict(self._counts)
+
+    def push_filters(self, filters):
+        """Pushes conditions to the source, applies the others itself
+
+        Raises
+        ------
+        UnknownSourceColumn
+            when a condition column is not a column of the source
+        """
+
+        remaining = self._row_source.push_filters(filters)
+
+        for column, comparison, value in remaining:
+            if column not in self.columns:
+                raise UnknownSourceColumn(column)
+
+            self._conditions.append(
+                (self.columns.index(column), comparison, value)
+            )
+
+        return list()
+
+    def _order(self, row):
+        """Sort key of converted `row`"""
+
+        return runs.sort_key(
+            tuple(row[position] for position in self._positions),
+            self._descending
+        )
+
+    def _sorted_rows(self):
+        """Yields converted rows in order, spilling beyond budget"""
+
+        buffered = list()
+        row_size = None
+        matches = predicates.matcher(self._conditions)
+
+        for batch in self._row_source.batches():
+            for source_row in batch:
+                row = self._convert(source_row)
+
+                if self._conditions and not matches(row):
+                    continue
+
+                buffered.append(row)
+                self._counts['rows'] += 1
+
+            if row_size is None and len(buffered) >= runs.SAMPLED_RECORDS:
+                row_size = runs.record_size(buffered)
+
+            if row_size is not None and \
+                    len(buffered) * row_size > self._memory_budget:
+                buffered.sort(key=self._order)
+                self._runs.append(runs.write_run(buffered, self._spill_dir))
+                self._counts['runs'] += 1
+                buffered = list()
+
+        buffered.sort(key=self._order)
+
+        if not self._runs:
+            for row in buffered:
+                yield row
+
+            return
+
+        if buffered:
+            self._runs.append(runs.write_run(buffered, self._spill_dir))
+            self._counts['runs'] += 1
+
+        for row in runs.merge_runs(self._runs, self._order):
+            yield row
+
+    def batches(self):
+        batch = list()
+
+        try:
+            for row in self._sorted_rows():
+                batch.append(row)
+
+                if len(batch) >= self._batch_size:
+                    yield batch
+                    batch = list()
+
+            if batch:
+                yield batch
+        finally:
+            self._close_runs()
+
+    def _close_runs(self):
+        """Closes and so removes run files"""
+
+        for run in self._runs:
+            run.close()
+
+        self._runs = list()
+
+    def close(self):
+        self._close_runs()
+        self._row_source.close()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""This module defines buffering of a row source ahead of its consumer
+
+A thread reads the batches of a row source as fast as the source yields
+them, whatever the pace of their consumer. Batches are held in memory up
+to a budget, beyond which they are pickled to a temporary spill file, and
+batches are replayed in source order either way. The source, and so its
+database connection, is released once every row is read, while rows
+held by the buffer never use more than the budget of memory.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import deque
+import sys
+import tempfile
+import threading
+
+from future.moves import pickle
+from future.utils import raise_
+
+from tableaupy.rowsources import runs
+from tableaupy.rowsources.base import RowSource
+
+#: seconds a consumer waits for a batch before checking for interrupts
+_POLL_INTERVAL = 0.1
+
+#: marks a batch of the buffer written to the spill file
+_SPILLED = object()
+
+
+class SpillSource(RowSource):
+    """Reads a row source ahead of its consumer, spilling beyond budget
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be buffered
+    memory_budget : int
+        bytes of batches held in memory before they are spilled
+        (default: 64 MB)
+    spill_dir : str
+        directory of the spill file, the system temporary directory when
+        None
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> source = IterableSource(['n'], [(n,) for n in range(5)], batch_size=2)
+    >>> buffered = SpillSource(source, memory_budget=1)
+    >>> list(buffered.batches())
+    [[(0,), (1,)], [(2,), (3,)], [(4,)]]
+    >>> buffered.metrics['spilled']
+    3
+    """
+
+    def __init__(self, row_source, memory_budget=64 << 20, spill_dir=None):
+        super(SpillSource, self).__init__(row_source.columns)
+        self._row_source = row_source
+        self._memory_budget = memory_budget
+        self._spill_dir = spill_dir
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._entries = deque()
+        self._memory = 0
+        self._row_size = None
+        self._spill_file = None
+        self._read_position = 0
+        self._write_position = 0
+        self._finished = False
+        self._error = None
+
+        #: dict : buffer metrics, see metrics
+        self._counts = {
+            'rows': 0,
+            'batches': 0,
+            'spilled': 0,
+            'spilled_bytes': 0,
+            'peak_memory': 0,
+        }
+
+    @property
+    def metrics(self):
+        """Buffer metrics
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'rows': rows read from the source,
+                    'batches': batches read from the source,
+                    'spilled': batches spilled to disk,
+                    'spilled_bytes': bytes written to the spill file,
+                    'peak_memory': most bytes of batches held in memory,
+                }
+        """
+
+        with self._condition:
+            return dict(self._counts)
+
+    def push_filters(self, filters):
+        return self._row_source.push_filters(filters)
+
+    def _batch_size(self, batch):
+        """Approximate bytes of `batch` held in memory"""
+
+        if self._row_size is None:
+            self._row_size = runs.record_size(batch)
+
+        return len(batch) * self._row_size
+
+    def _put(self, batch):
+        """Adds `batch` to the buffer, spilling it beyond budget"""
+
+        size = self._batch_size(batch)
+
+        with self._condition:
+            spill = self._memory + size > self._memory_budget
+
+        # pickled outside the lock, so that the consumer is not held up
+        data = pickle.dumps(batch, pickle.HIGHEST_PROTOCOL) if spill else None
+
+        with self._condition:
+            self._counts['rows'] += len(batch)
+            self._counts['batches'] += 1
+
+            if data is None:
+                self._entries.append((batch, size))
+                self._memory += size
+                self._counts['peak_memory'] = max(
+                    self._counts['peak_memory'],
+                    self._memory
+                )
+            else:
+                if self._spill_file is None:
+                    self._spill_file = tempfile.TemporaryFile(
+                        dir=self._spill_dir
+                    )
+
+                self._spill_file.seek(self._write_position)
+                self._spill_file.write(data)
+                self._write_position += len(data)
+                self._entries.append(_SPILLED)
+                self._counts['spilled'] += 1
+                self._counts['spilled_bytes'] += len(data)
+
+            self._condition.notify_all()
+
+    def _drain(self):
+        """Reading thread, buffers every batch of the source"""
+
+        batches = iter(self._row_source.batches())
+
+        try:
+            for batch in batches:
+                if self._stop.is_set():
+                    break
+
+                self._put(batch)
+        except Exception:  # pylint: disable=broad-except
+            self._error = sys.exc_info()
+        finally:
+            # releases the database connection as soon as rows are read
+            close = getattr(batches, 'close', None)
+
+            if close is not None:
+                close()
+
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def _take(self):
+        """Next batch of the buffer, None once every batch was taken
+
+        Raises
+        ------
+        Exception
+            exception raised reading the source, with its traceback
+        """
+
+        with self._condition:
+            while not self._entries and not self._finished:
+                self._condition.wait(_POLL_INTERVAL)
+
+            if self._error is not None:
+                raise_(*self._error)
+
+            if not self._entries:
+                return None
+
+            entry = self._entries.popleft()
+
+            if entry is not _SPILLED:
+                batch, size = entry
+                self._memory -= size
+                return batch
+
+            self._spill_file.seek(self._read_position)
+            batch = pickle.load(self._spill_file)
+            self._read_position = self._spill_file.tell()
+
+            # every spilled batch was replayed, the file is reused
+            if self._read_position == self._write_position:
+                self._spill_file.seek(0)
+                self._spill_file.truncate()
+                self._read_position = self._write_position = 0
+
+            return batch
+
+    def batches(self):
+        self._stop.clear()
+        self._finished = False
+        self._error = None
+        thread = threading.Thread(target=self._drain, name='spill-source')
+        thread.daemon = True
+        thread.start()
+
+        try:
+            while True:
+                batch = self._take()
+
+                if batch is None:
+                    return
+
+                yield batch
+        finally:
+            self._stop.set()
+            thread.join()
+            self._close_spill_file()
+
+    def _close_spill_file(self):
+        """Closes and so removes the spill file"""
+
+        with self._condition:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+
+            self._entries.clear()
+            self._memory = 0
+            self._read_position = self._write_position = 0
+
+    def close(self):
+        self._close_spill_file()
+        self._row_source.close()
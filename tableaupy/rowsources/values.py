@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""This module defines conversion of values to column local-types
+
+Values are converted to the python type of the `local-type` of their
+column, as found in tableau datasource files:
+
+==============  =======================
+local-type      python type
+==============  =======================
+boolean         bool
+integer         int
+double, real    float
+date            datetime.date
+datetime        datetime.datetime
+duration        datetime.timedelta
+others          text
+==============  =======================
+
+Values read from text, like csv fields or dates stored as text by sqlite,
+are parsed, an empty text of a non text column is null.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import datetime
+
+from tableaupy.rowsources.exceptions import ValueConversionError
+
+_text_type = type(u'')
+
+_true_texts = frozenset(['true', 't', 'yes', 'y', '1'])
+_false_texts = frozenset(['false', 'f', 'no', 'n', '0'])
+
+_date_format = '%Y-%m-%d'
+_datetime_formats = (
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+)
+
+
+def _to_text(value):
+    """Converts value to text"""
+
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+
+    return _text_type(value)
+
+
+def _to_boolean(value):
+    """Converts value to bool"""
+
+    if isinstance(value, (bytes, _text_type)):
+        text = _to_text(value).strip().lower()
+
+        if text in _true_texts:
+            return True
+
+        if text in _false_texts:
+            return False
+
+        raise ValueError(value)
+
+    return bool(value)
+
+
+def _to_integer(value):
+    """Converts value to int"""
+
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(value)
+
+    return int(value)
+
+
+def _to_date(value):
+    """Converts value to datetime.date"""
+
+    if isinstance(value, datetime.datetime):
+        return value.date()
+
+    if isinstance(value, datetime.date):
+        return value
+
+    text = _to_text(value).strip()[:10]
+    return datetime.datetime.strptime(text, _date_format).date()
+
+
+def _to_datetime(value):
+    """Converts value to datetime.datetime"""
+
+    if isinstance(value, datetime.datetime):
+        return value
+
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+
+    text = _to_text(value).strip()
+
+    for datetime_format in _datetime_formats:
+        try:
+            return datetime.datetime.strptime(text, datetime_format)
+        except ValueError:
+            continue
+
+    raise ValueError(value)
+
+
+def _to_duration(value):
+    """Converts value, timedelta or seconds, to datetime.timedelta"""
+
+    if isinstance(value, datetime.timedelta):
+        return value
+
+    return datetime.timedelta(seconds=float(value))
+
+
+_converters = {
+    'boolean': _to_boolean,
+    'integer': _to_integer,
+    'double': float,
+    'real': float,
+    'date': _to_date,
+    'datetime': _to_datetime,
+    'duration': _to_duration,
+}
+
+
+def coerce(local_type, value):
+    """Converts `value` to the python type of `local_type`
+
+    Parameters
+    ----------
+    local_type : str
+        local-type of the column
+    value : object
+        value to be converted, None for null
+
+    Returns
+    -------
+    object
+        converted value, None for null
+
+    Raises
+    ------
+    ValueConversionError
+        when value can not be converted
+
+    Examples
+    --------
+    >>> coerce('integer', '42')
+    42
+    >>> coerce('date', '2017-03-01 10:00:00')
+    datetime.date(2017, 3, 1)
+    >>> coerce('boolean', 'False')
+    False
+    >>> coerce('double', '') is None
+    True
+    """
+
+    if value is None:
+        return None
+
+    convert = _converters.get(local_type)
+
+    if convert is None:
+        return _to_text(value)
+
+    if isinstance(value, (bytes, _text_type)) and not value.strip():
+        return None
+
+    try:
+        return convert(value)
+    except (ValueError, TypeError, OverflowError):
+        raise ValueConversionError(value, local_type)
+
+
+def converter(local_types):
+    """Row converter for columns of `local_types`
+
+    Parameters
+    ----------
+    local_types : list
+        local-type of every column, in row order
+
+    Returns
+    -------
+    callable
+        converting a row tuple to a tuple of converted values
+
+    Examples
+    --------
+    >>> convert = converter(['integer', 'double'])
+    >>> convert(('1', 2))
+    (1, 2.0)
+    """
+
+    local_types = list(local_types)
+
+    def _convert(row):
+        """Converts `row`"""
+
+        return tuple(
+            coerce(local_type, value)
+            for local_type, value in zip(local_types, row)
+        )
+
+    return _convert
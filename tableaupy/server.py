@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""This module defines extract_server command
+
+The server accepts extract generation jobs over localhost HTTP or a Unix
+socket and runs them on a pool of warm writer processes, so that tools
+generating extracts one file at a time do not pay for interpreter startup
+and tableau sdk initialization on every call.
+
+Endpoints:
+
+* ``POST /jobs`` with a JSON object::
+
+      {
+          "path": tableau datasource file path (required),
+          "prefix": prefix of output file name,
+          "suffix": suffix of output file name,
+          "output_dir": output directory,
+          "overwrite": true | false,
+          "collation": default column collation
+      }
+
+  waits for the job to finish and responds with::
+
+      {
+          "path": tableau datasource file path,
+          "status": "Success" | "Failed",
+          "msg": error message or "",
+          "duration": seconds spent generating the extract
+      }
+
+  ``503`` is returned when the job queue is full.
+* ``GET /metrics`` responds with pool metrics, see WriterPool.metrics
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import stat
+
+import click
+from future.moves.http.server import BaseHTTPRequestHandler
+from future.moves.http.server import HTTPServer
+from future.moves.queue import Full
+from future.moves.socketserver import ThreadingMixIn
+from future.moves.socketserver import UnixStreamServer
+
+from tableaupy import _status
+
+_JOB_OPTION_KEYS = ('prefix', 'suffix', 'output_dir', 'overwrite')
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """Handles job and metrics requests for the pool of `server`"""
+
+    def address_string(self):
+        # unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _respond(self, code, body):
+        """Sends `body` as JSON response"""
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # noqa: N802 pylint: disable=invalid-name
+        """Serves pool metrics"""
+
+        if self.path != '/metrics':
+            self._respond(404, {'msg': 'not found'})
+            return
+
+        self._respond(200, self.server.pool.metrics)
+
+    def do_POST(self):  # noqa: N802 pylint: disable=invalid-name
+        """Runs an extract generation job"""
+
+        if self.path != '/jobs':
+            self._respond(404, {'msg': 'not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            path = request['path']
+        except (ValueError, KeyError, TypeError) as err:
+            self._respond(400, {'msg': 'invalid job: {}'.format(err)})
+            return
+
+        options = {
+            key: request[key] for key in _JOB_OPTION_KEYS if key in request
+        }
+
+        try:
+            job = self.server.pool.submit(
+                path,
+                options=options,
+                collation=request.get('collation', 'en_us_ci'),
+                block=False
+            )
+        except Full:
+            self._respond(503, {'msg': 'job queue is full'})
+            return
+
+        job.wait()
+        status = _status.SUCCESS if job.succeeded else _status.FAILED
+
+        self._respond(200, {
+            'path': path,
+            'status': status.text,
+            'msg': job.error or '',
+            'duration': job.duration,
+        })
+
+
+class _TCPJobServer(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP job server on a TCP address"""
+
+    daemon_threads = True
+
+    def __init__(self, address, pool):
+        HTTPServer.__init__(self, address, _JobRequestHandler)
+        self.pool = pool
+
+
+class _UnixJobServer(ThreadingMixIn, UnixStreamServer):
+    """Threaded HTTP job server on a Unix socket"""
+
+    daemon_threads = True
+
+    def __init__(self, address, pool):
+        UnixStreamServer.__init__(self, address, _JobRequestHandler)
+        self.pool = pool
+
+
+def _is_socket(path):
+    """True if `path` is a Unix socket, not following symbolic links"""
+
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+
+@click.command(name='extract_server')
+@click.option('--host', default='127.0.0.1', show_default=True,
+              help='Address to listen on')
+@click.option('--port', default=8765, show_default=True,
+              help='Port to listen on')
+@click.option('--socket', 'socket_path', type=click.Path(),
+              help='Listen on this Unix socket instead of host and port')
+@click.option('-j', '--processes', type=click.IntRange(min=1),
+              help='Number of warm writer processes  [default: cpu count]')
+@click.option('--max-pending', default=64, show_default=True,
+              type=click.IntRange(min=0),
+              help='Maximum jobs queued or running, 0 for unbounded')
+@click.option('--timeout', type=click.FloatRange(min=0), metavar='SECONDS',
+              help='Kill generation of a file running longer than this')
+@click.option('--memory-limit', type=click.IntRange(min=1), metavar='MB',
+              help='Kill generation of a file using more memory than this')
+def main(host, port, socket_path, processes, max_pending, timeout,
+         memory_limit):
+    """extract_server command
+
+    Serves extract generation jobs from a pool of worker processes, each
+    keeping a TDEWriter with initialized tableau sdk.
+    """
+
+    from tableaupy.writers import WriterPool
+
+    # a stale socket of a previous run is replaced, any other file is kept
+    if socket_path is not None and os.path.lexists(socket_path) and \
+            not _is_socket(socket_path):
+        raise click.BadParameter(
+            '{!r} exists and is not a socket'.format(socket_path),
+            param_hint='"--socket"'
+        )
+
+    pool = WriterPool(
+        processes=processes,
+        max_pending=max_pending,
+        timeout=timeout,
+        memory_limit=None if memory_limit is None else memory_limit << 20
+    )
+
+    if socket_path is not None:
+        if os.path.lexists(socket_path):
+            os.unlink(socket_path)
+
+        server = _UnixJobServer(socket_path, pool)
+        click.echo('Serving extract jobs on {}'.format(socket_path))
+    else:
+        server = _TCPJobServer((host, port), pool)
+        click.echo('Serving extract jobs on http://{}:{}'.format(host, port))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+        if socket_path is not None and _is_socket(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()  # pylint: disable=locally-disabled,no-value-for-parameter
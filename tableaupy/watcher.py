@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""This module defines directory watcher regenerating extracts on change
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import time
+
+from tableaupy.writers import WriterException
+
+
+class StatIndex(object):
+    """Index of stat signatures of files under a directory
+
+    Signature of a file is its (modification time, size) pair, comparing
+    signatures between scans is enough to find added and modified files
+    without reading them or depending on platform notification apis.
+
+    Parameters
+    ----------
+    directory : str
+        directory to be indexed recursively
+    extension : str
+        only files having this extension are indexed (default: '.tds')
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> index = StatIndex(directory)
+    >>> index.scan()
+    ([], [])
+    >>> open(os.path.join(directory, 'a.tds'), 'w').close()
+    >>> changed, removed = index.scan()
+    >>> [os.path.basename(path) for path in changed], removed
+    (['a.tds'], [])
+    >>> index.scan()
+    ([], [])
+    """
+
+    def __init__(self, directory, extension='.tds'):
+        super(StatIndex, self).__init__()
+        self._directory = directory
+        self._extension = extension
+
+        #: dict : file path to (mtime, size)
+        self._signatures = dict()
+
+    @property
+    def signatures(self):
+        """signatures getter"""
+
+        return self._signatures
+
+    def _walk(self):
+        """Yields (path, signature) for every indexed file"""
+
+        for root, _, file_names in os.walk(self._directory):
+            for file_name in file_names:
+                if not file_name.endswith(self._extension):
+                    continue
+
+                path = os.path.join(root, file_name)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed between listing and stat
+                    continue
+
+                yield path, (stat.st_mtime, stat.st_size)
+
+    def scan(self):
+        """Rescans directory and updates index
+
+        Returns
+        -------
+        tuple
+            (changed, removed) lists of sorted file paths, changed includes
+            files added and modified since last scan
+        """
+
+        signatures = dict(self._walk())
+
+        changed = sorted(
+            path for path, signature in signatures.items()
+            if self._signatures.get(path) != signature
+        )
+        removed = sorted(set(self._signatures) - set(signatures))
+
+        self._signatures = signatures
+        return changed, removed
+
+
+class Watcher(object):
+    """Regenerates extracts of datasource files added or modified in directory
+
+    A single writer is used for the life of the watcher, so tableau sdk is
+    initialized once instead of once per run. Changes are debounced, a
+    file is regenerated only after its signature has stayed the same for
+    `debounce` seconds, which coalesces bursts of writes to the same file.
+
+    Parameters
+    ----------
+    directory : str
+        directory to be watched for tableau datasource files
+    writer : TDEWriter
+        writer used to generate extracts, should allow overwrite
+    interval : float
+        seconds to sleep between two polls (default: 2.0)
+    debounce : float
+        seconds a file should remain unchanged before it is regenerated
+        (default: 1.0)
+    generate_options : dict
+        keyword arguments of writer.generate_from_tds (default: None)
+    """
+
+    def __init__(self,
+                 directory,
+                 writer,
+                 interval=2.0,
+                 debounce=1.0,
+                 generate_options=None):
+        super(Watcher, self).__init__()
+        self._index = StatIndex(directory, extension='.tds')
+        self._writer = writer
+        self._generate_options = generate_options or {}
+        self._interval = interval
+        self._debounce = debounce
+
+        #: dict : file path to time when its last change was seen
+        self._pending = dict()
+        self._started = False
+
+    @property
+    def pending(self):
+        """file paths waiting for their changes to settle"""
+
+        return sorted(self._pending)
+
+    def _is_stale(self, path, signature):
+        """True if extract of `path` is missing or older than `path`"""
+
+        try:
+            output_path = self._writer.get_output_path(path)
+            return os.path.getmtime(output_path) < signature[0]
+        except (OSError, IOError):
+            return True
+
+    def poll(self, now=None):
+        """Scans directory once and regenerates settled changes
+
+        On the first poll only the files whose extract is missing or older
+        than the datasource file are considered changed.
+
+        Parameters
+        ----------
+        now : float
+            current time, defaults to time.time()
+
+        Returns
+        -------
+        list
+            list of (file path, error) tuples for every file regenerated,
+            error is None when generation succeeded
+        """
+
+        now = time.time() if now is None else now
+        changed, removed = self._index.scan()
+        signatures = self._index.signatures
+
+        if not self._started:
+            changed = [
+                path for path in changed
+                if self._is_stale(path, signatures[path])
+            ]
+            self._started = True
+
+        for path in removed:
+            self._pending.pop(path, None)
+
+        for path in changed:
+            self._pending[path] = now
+
+        results = list()
+
+        for path in sorted(self._pending):
+            if now - self._pending[path] < self._debounce:
+                continue
+
+            del self._pending[path]
+            results.append((path, self._generate(path)))
+
+        return results
+
+    def _generate(self, path):
+        """Generates extract of `path`, returns error or None"""
+
+        try:
+            self._writer.generate_from_tds(path, **self._generate_options)
+        except WriterException as err:
+            return err
+
+        return None
+
+    def run(self, callback=None, polls=None):
+        """Polls directory until interrupted
+
+        Parameters
+        ----------
+        callback : callable
+            called with (file path, error) for every file regenerated
+        polls : int
+            stops after these many polls, runs forever when None
+        """
+
+        count = 0
+
+        while polls is None or count < polls:
+            for path, error in self.poll():
+                if callback is not None:
+                    callback(path, error)
+
+            count += 1
+            time.sleep(self._interval)
@@ -3,6 +3,8 @@
 
 Writers:
 * TDEWriter
+* TDSWriter
+* WriterPool
 Exceptions:
 * WriterException
 """
@@ -13,10 +15,14 @@ from __future__ import print_function
 
 from tableaupy.writers.exceptions import WriterException
 from tableaupy.writers.tde import TDEWriter
+from tableaupy.writers.tds import TDSWriter
 from tableaupy.writers.base import Writer
+from tableaupy.writers.pool import WriterPool
 
 __all__ = [
     'WriterException',
     'TDEWriter',
+    'TDSWriter',
     'Writer',
+    'WriterPool',
 ]
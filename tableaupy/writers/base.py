@@ -5,11 +5,41 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import errno
+import hashlib
+import os
+import socket
+import time
+import uuid
+
 from future.utils import raise_with_traceback
 from pathlib2 import Path
 
 from tableaupy.writers import exceptions
 
+_TEMP_MARKER = '.tmp'
+
+#: errnos of file systems which do not support hard links
+_NO_LINK = frozenset(
+    getattr(errno, name)
+    for name in ('EPERM', 'ENOTSUP', 'EOPNOTSUPP', 'ENOSYS')
+    if hasattr(errno, name)
+)
+
+#: str : identifies temporary files created by this host
+_HOST_TOKEN = hashlib.md5(socket.gethostname().encode('utf-8')).hexdigest()[:8]
+
+
+def _pid_alive(pid):
+    """True if a process with `pid` is running on this host"""
+
+    try:
+        os.kill(pid, 0)
+    except OSError as err:
+        return err.errno == errno.EPERM
+
+    return True
+
 
 class Writer(object):
     """Writer class
@@ -111,6 +141,47 @@ class Writer(object):
 
         self._output_dir = output_dir
 
+    def get_output_name(self, file_path):
+        """Returns output file name with prefix, suffix and extension
+
+        Parameters
+        ----------
+        file_path: str
+            path to input file
+
+        Returns
+        -------
+        str
+            name of output file
+
+        Examples
+        --------
+        >>> Writer('.tde', {'prefix': 'p_'}).get_output_name('a/b.tds')
+        'p_b.tde'
+        """
+
+        file_path = Path(file_path)
+        output_file_name = self._prefix + file_path.stem + self._suffix
+        output_path = file_path.with_name(output_file_name)
+        return output_path.with_suffix(self.__extension).name
+
+    def get_output_dir(self):
+        """Returns resolved output directory, None if not set
+
+        Raises
+        ------
+        WriterException
+            when not able to resolve output directory
+        """
+
+        if self._output_dir is None:
+            return None
+
+        try:
+            return str(Path(self._output_dir).resolve())
+        except OSError as err:
+            raise_with_traceback(exceptions.WriterException(err))
+
     def get_output_path(self, file_path):
         """Returns the absolute path to output file
 
@@ -133,26 +204,22 @@ class Writer(object):
         """
 
         try:
-            file_path = Path(file_path)
-            output_file_name = self._prefix + file_path.stem + self._suffix
-            output_path = file_path.with_name(output_file_name)
-            output_path = output_path.with_suffix(self.__extension)
+            output_dir = self.get_output_dir()
 
-            if self._output_dir is not None:
-                output_dir = Path(self._output_dir).resolve()
-            else:
+            if output_dir is None:
                 # because the file_path may have been passed with folder name
-                output_dir = output_path.parent.resolve()
+                output_dir = str(Path(file_path).parent.resolve())
 
-            return str(output_dir / output_path.name)
+            return os.path.join(output_dir, self.get_output_name(file_path))
         except OSError as err:
             raise_with_traceback(exceptions.WriterException(err))
 
     def check_file_writable(self, output_path):
         """Checks if the file is writable
 
-        If overwrite is true, overwrites the file
-        else if the file exists throws exception
+        If the file exists and overwrite is false throws exception. An
+        existing file is never removed here, it is replaced by
+        `commit_file` once the new file is completely written.
 
         Parameters
         ----------
@@ -170,5 +237,164 @@ class Writer(object):
         if not self._overwrite and output_path.exists():
             raise exceptions.FileAlreadyExists(str(output_path))
 
-        if self._overwrite and output_path.exists():
-            Path(output_path).unlink()
+    def get_temp_path(self, output_path):
+        """Returns a unique temporary path to write `output_path` to
+
+        The temporary file is a hidden file in the same directory as
+        `output_path`, so that it can be renamed into place atomically, and
+        it keeps the writer extension. Its name records the host and
+        process writing it for `cleanup_temp_files`.
+
+        Parameters
+        ----------
+        output_path : str
+            path to output file
+
+        Returns
+        -------
+        str
+            path to temporary file
+
+        Examples
+        --------
+        >>> writer = Writer('.tde')
+        >>> temp_path = writer.get_temp_path('/data/sample.tde')
+        >>> temp_path.startswith('/data/.sample.')
+        True
+        >>> temp_path.endswith('.tmp.tde')
+        True
+        """
+
+        output_path = Path(output_path)
+        temp_name = '.{}.{}-{}-{}{}{}'.format(
+            output_path.stem,
+            _HOST_TOKEN,
+            os.getpid(),
+            uuid.uuid4().hex[:8],
+            _TEMP_MARKER,
+            self.__extension
+        )
+        return str(output_path.with_name(temp_name))
+
+    def commit_file(self, temp_path, output_path):
+        """Moves completely written temporary file to `output_path`
+
+        With overwrite, the temporary file atomically replaces any existing
+        file, readers see either the old or the new file and never a
+        missing or partial one. Without overwrite, the file is linked into
+        place which fails if another writer created `output_path` in the
+        meantime. Where hard links are not supported, `output_path` is
+        created exclusively, which fails likewise, then replaced by the
+        temporary file.
+
+        Parameters
+        ----------
+        temp_path : str
+            path to completely written temporary file
+        output_path : str
+            path to output file
+
+        Raises
+        ------
+        FileAlreadyExists
+            when overwrite is false and `output_path` exists
+        WriterException
+            when the file could not be moved
+        """
+
+        try:
+            if self._overwrite:
+                if os.name == 'nt' and os.path.exists(output_path):
+                    # rename does not replace existing files on windows
+                    os.remove(output_path)
+                os.rename(temp_path, output_path)
+            elif hasattr(os, 'link'):
+                try:
+                    os.link(temp_path, output_path)
+                except OSError as err:
+                    if err.errno not in _NO_LINK:
+                        raise
+                    self._claim_file(temp_path, output_path)
+                else:
+                    os.remove(temp_path)
+            else:
+                self._claim_file(temp_path, output_path)
+        except OSError as err:
+            if err.errno == errno.EEXIST:
+                raise exceptions.FileAlreadyExists(output_path)
+            raise_with_traceback(exceptions.WriterException(err))
+
+    @staticmethod
+    def _claim_file(temp_path, output_path):
+        """Creates `output_path` exclusively then moves `temp_path` over it
+
+        Raises
+        ------
+        OSError
+            with errno EEXIST when `output_path` exists
+        """
+
+        os.close(os.open(output_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+
+        if os.name == 'nt':
+            # rename does not replace existing files on windows
+            os.remove(output_path)
+
+        os.rename(temp_path, output_path)
+
+    @staticmethod
+    def discard_file(temp_path):
+        """Removes temporary file if it still exists"""
+
+        try:
+            os.remove(temp_path)
+        except OSError as err:
+            if err.errno != errno.ENOENT:
+                raise
+
+    def cleanup_temp_files(self, directory, stale_after=86400):
+        """Removes temporary files left behind by interrupted writers
+
+        A temporary file is stale when the process of this host which
+        created it is not running anymore, or when it has not been modified
+        for `stale_after` seconds.
+
+        Parameters
+        ----------
+        directory : str
+            directory to be cleaned
+        stale_after : float
+            seconds after which temporary file of any host is considered
+            stale (default: 86400)
+
+        Returns
+        -------
+        list
+            paths of removed files
+        """
+
+        removed = list()
+        suffix = _TEMP_MARKER + self.__extension
+        now = time.time()
+
+        for file_name in os.listdir(directory):
+            if not (file_name.startswith('.') and file_name.endswith(suffix)):
+                continue
+
+            owner = file_name[:-len(suffix)].rsplit('.', 1)[-1].split('-')
+            path = os.path.join(directory, file_name)
+
+            try:
+                local_dead = (
+                    len(owner) == 3 and owner[0] == _HOST_TOKEN and
+                    owner[1].isdigit() and not _pid_alive(int(owner[1]))
+                )
+
+                if local_dead or now - os.path.getmtime(path) > stale_after:
+                    os.remove(path)
+                    removed.append(path)
+            except OSError:
+                # removed or committed concurrently
+                continue
+
+        return removed
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""This module defines rewriting of datasource connection attributes
+
+Datasource files are streamed markup by markup, every byte is copied as
+is except the attribute values of the connection elements read by
+TDSContentHandler::
+
+    <datasource>
+      <connection>
+        <named-connections>
+          <named-connection>
+            <connection server='...' dbname='...' username='...' />
+
+so that a rewritten file differs from the original only by the values
+changed: quoting, attribute order, whitespace, comments and encoding
+declaration are preserved. The rewritten file is written to a temporary
+file, then atomically replaces the original.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import io
+import re
+import shutil
+from xml.sax.saxutils import unescape
+
+from future.builtins import chr as unichr
+
+from tableaupy.writers.base import Writer
+from tableaupy.writers.exceptions import MalformedDatasource
+
+#: path of connection elements rewritten, from the root element
+_CONNECTION_PATH = (
+    b'datasource',
+    b'connection',
+    b'named-connections',
+    b'named-connection',
+    b'connection',
+)
+
+#: bytes read at once
+_CHUNK_SIZE = 64 << 10
+
+#: piece of xml: text followed by a `tag` named `name`, `end` for end
+#: tags, with '>' in quoted attribute values, a comment, CDATA section,
+#: processing instruction or declaration, or text ending the buffer. A
+#: markup only matches once it ends in the buffer matched
+_PIECE = re.compile(
+    br'[^<]*(?:'
+    br'(?P<tag><(?P<end>/?)(?P<name>[^\s/>!?]+)'
+    br'[^\'">]*(?:(?:"[^"]*"|\'[^\']*\')[^\'">]*)*>)'
+    br'|<!--.*?-->'
+    br'|<!\[CDATA\[.*?\]\]>'
+    br'|<\?.*?\?>'
+    br'|<!(?!--|\[CDATA\[)[^>]*>'
+    br'|\Z)',
+    re.DOTALL
+)
+
+_ATTRIBUTE = re.compile(
+    br'(\s+)([^\s=/>]+)(\s*=\s*)(?:"([^"]*)"|\'([^\']*)\')'
+)
+_TAG_NAME = re.compile(br'<([^\s/>]+)')
+
+_CHARACTER_REFERENCE = re.compile(u'&#(x?)([0-9a-fA-F]+);')
+
+_ENTITIES = {'&quot;': '"', '&apos;': "'"}
+
+
+def _pieces(stream, chunk_size=_CHUNK_SIZE):
+    """Yields matches of _PIECE of every piece of xml byte `stream`
+
+    Raises
+    ------
+    ValueError
+        when the stream ends in a markup
+    """
+
+    buf = b''
+    eof = False
+
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+        start = 0
+
+        for match in _PIECE.finditer(buf):
+            # text may go on in the next chunk
+            if match.start() != start or match.end() == start or (
+                    not eof and match.group(0)[-1:] != b'>'):
+                break
+
+            yield match
+            start = match.end()
+
+        buf = buf[start:]
+
+    if buf:
+        raise ValueError('stream ends in markup')
+
+
+def markup(stream, chunk_size=_CHUNK_SIZE):
+    """Yields text and markup pieces of xml byte `stream`, in order
+
+    Pieces joined are the bytes of the stream, every piece is text
+    followed by a tag, comment, CDATA section, processing instruction or
+    declaration, but the last which may be text only.
+
+    Raises
+    ------
+    ValueError
+        when the stream ends in a markup
+
+    Examples
+    --------
+    >>> import io
+    >>> pieces = list(markup(io.BytesIO(b'<a x=">">t<!-- <b> --></a>'), 4))
+    >>> pieces == [b'<a x=">">', b't<!-- <b> -->', b'</a>']
+    True
+    """
+
+    for match in _pieces(stream, chunk_size):
+        yield match.group(0)
+
+
+def _escape(value, quote):
+    """utf-8 bytes of attribute `value` escaped for `quote` quotes"""
+
+    value = value.replace(u'&', u'&amp;').replace(u'<', u'&lt;')
+    value = value.replace(
+        u'"' if quote == b'"' else u"'",
+        u'&quot;' if quote == b'"' else u'&apos;'
+    )
+    return value.encode('utf-8')
+
+
+def _unescape(value):
+    """Text of escaped attribute `value`"""
+
+    def _character(match):
+        """Character of a character reference"""
+
+        return unichr(int(match.group(2), 16 if match.group(1) else 10))
+
+    return unescape(_CHARACTER_REFERENCE.sub(_character, value), _ENTITIES)
+
+
+def _attributes(tag):
+    """{name: (value, match)} of attributes of `tag`"""
+
+    attributes = dict()
+
+    for match in _ATTRIBUTE.finditer(tag):
+        value = match.group(4)
+
+        if value is None:
+            value = match.group(5)
+
+        attributes[match.group(2).decode('utf-8')] = (
+            _unescape(value.decode('utf-8')),
+            match
+        )
+
+    return attributes
+
+
+def patch_tag(tag, changes, conditions=None):
+    """`tag` with attribute values of `changes`
+
+    Parameters
+    ----------
+    tag : bytes
+        start tag
+    changes : dict
+        new value of attributes, attributes missing are added
+    conditions : dict
+        values attributes must have for the tag to be patched
+
+    Returns
+    -------
+    tuple
+        (patched tag, list of (attribute, old value, new value)), old
+        value is None for attributes added, the tag as is with no change
+        when conditions are not met
+
+    Examples
+    --------
+    >>> tag, diff = patch_tag(b"<connection server='a' dbname='d'/>",
+    ...                       {'server': 'b', 'username': 'u'})
+    >>> tag == b"<connection server='b' dbname='d' username=\\"u\\"/>"
+    True
+    >>> diff == [('server', 'a', 'b'), ('username', None, 'u')]
+    True
+    """
+
+    attributes = _attributes(tag)
+
+    for name, value in (conditions or {}).items():
+        if attributes.get(name, (None,))[0] != value:
+            return tag, list()
+
+    patched = list()
+    diff = list()
+    position = _TAG_NAME.match(tag).end()
+
+    for name, (old, match) in sorted(attributes.items(),
+                                     key=lambda item: item[1][1].start()):
+        position = match.end()
+
+        if name not in changes or changes[name] == old:
+            continue
+
+        quote = tag[match.end() - 1:match.end()]
+        value_start = match.start(4 if match.group(4) is not None else 5)
+        patched.append((
+            value_start,
+            match.end() - 1,
+            _escape(changes[name], quote)
+        ))
+        diff.append((name, old, changes[name]))
+
+    added = [name for name in sorted(changes) if name not in attributes]
+
+    if added:
+        patched.append((position, position, b''.join(
+            b' ' + name.encode('utf-8') + b'="' +
+            _escape(changes[name], b'"') + b'"'
+            for name in added
+        )))
+        diff.extend((name, None, changes[name]) for name in added)
+
+    for start, end, replacement in reversed(patched):
+        tag = tag[:start] + replacement + tag[end:]
+
+    return tag, diff
+
+
+def rewrite_stream(source, target, changes, conditions=None):
+    """Copies datasource `source` to `target`, patching its connections
+
+    Parameters
+    ----------
+    source : file
+        datasource bytes read
+    target : file
+        bytes written, nothing is written when None
+    changes : dict
+        new value of connection attributes, see patch_tag
+    conditions : dict
+        values connection attributes must have to be patched
+
+    Returns
+    -------
+    list
+        (attribute, old value, new value) of every value changed
+
+    Raises
+    ------
+    ValueError
+        when the datasource is not well formed
+    """
+
+    path = list()
+    diff = list()
+    write = None if target is None else target.write
+
+    for match in _pieces(source):
+        piece = match.group(0)
+        name = match.group('name')
+
+        if match.group('end'):
+            if not path or path[-1] != name:
+                raise ValueError(
+                    'unexpected end tag {!r}'.format(match.group('tag'))
+                )
+
+            path.pop()
+        elif name is not None:
+            if len(path) == 4 and name == _CONNECTION_PATH[4] and \
+                    tuple(path) == _CONNECTION_PATH[:4]:
+                tag, tag_diff = patch_tag(
+                    match.group('tag'),
+                    changes,
+                    conditions
+                )
+                piece = piece[:match.start('tag') - match.start()] + tag
+                diff.extend(tag_diff)
+
+            if piece[-2:] != b'/>':
+                path.append(name)
+
+        if write is not None:
+            write(piece)
+
+    if path:
+        raise ValueError('unclosed element {!r}'.format(path[-1]))
+
+    return diff
+
+
+class ConnectionRewriter(Writer):
+    """Rewrites connection attributes of tableau datasource files in place
+
+    Parameters
+    ----------
+    changes : dict
+        new value of connection attributes, e.g. ``{'server': 'db2'}``,
+        attributes missing are added
+    conditions : dict
+        values connection attributes must have to be rewritten, e.g.
+        ``{'server': 'db1'}``, every connection when None
+    dry_run : bool
+        only reports values which would change, files are not written
+        (default: False)
+    """
+
+    def __init__(self, changes, conditions=None, dry_run=False):
+        super(ConnectionRewriter, self).__init__('.tds', {'overwrite': True})
+        self._changes = dict(changes)
+        self._conditions = dict(conditions or {})
+        self._dry_run = dry_run
+
+    def rewrite(self, tds_file_name):
+        """Rewrites connection attributes of datasource `tds_file_name`
+
+        The file is left untouched when no value changes.
+
+        Returns
+        -------
+        list
+            (attribute, old value, new value) of every value changed
+
+        Raises
+        ------
+        MalformedDatasource
+            when the datasource is not well formed
+        WriterException
+            when the file could not be replaced
+        """
+
+        temp_path = None if self._dry_run else \
+            self.get_temp_path(tds_file_name)
+
+        try:
+            with io.open(tds_file_name, 'rb') as source:
+                target = None if temp_path is None else \
+                    io.open(temp_path, 'wb')
+
+                try:
+                    diff = rewrite_stream(
+                        source,
+                        target,
+                        self._changes,
+                        self._conditions
+                    )
+                except ValueError as err:
+                    raise MalformedDatasource(tds_file_name, str(err))
+                finally:
+                    if target is not None:
+                        target.close()
+
+            if diff and temp_path is not None:
+                shutil.copymode(tds_file_name, temp_path)
+                self.commit_file(temp_path, tds_file_name)
+        finally:
+            if temp_path is not None:
+                self.discard_file(temp_path)
+
+        return diff
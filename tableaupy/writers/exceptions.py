@@ -30,3 +30,129 @@ class FileAlreadyExists(FileOutputException):
     """
 
     _message_template = '{!r}: file already exists'
+
+
+class OutputPathCollision(FileOutputException):
+    """raised when output paths of several input files are the same"""
+
+    _message_template = '{!r}: is output path of multiple files: {}'
+
+    def __init__(self, filename, sources):
+        FileOutputException.__init__(self, filename=filename)
+        self.sources = sources
+        self.args += (', '.join(sources),)
+
+
+class GenerationTimeout(WriterException):
+    """raised when generating a file takes longer than allowed"""
+
+    _message_template = '{!r}: generation exceeded {} seconds, worker killed'
+
+    def __init__(self, filename, timeout):
+        WriterException.__init__(self)
+        self.file = filename
+        self.timeout = timeout
+        self.args += (filename, timeout)
+
+
+class MemoryBudgetExceeded(WriterException):
+    """raised when generating a file needs more memory than allowed"""
+
+    _message_template = '{!r}: generation exceeded memory budget of {} MB'
+
+    def __init__(self, filename, memory_limit):
+        WriterException.__init__(self)
+        self.file = filename
+        self.memory_limit = memory_limit
+        self.args += (filename, memory_limit // (1024 * 1024))
+
+
+class WorkerDied(WriterException):
+    """raised when a worker process dies while generating a file"""
+
+    _message_template = '{!r}: worker process died with exit code {}'
+
+    def __init__(self, filename, exitcode):
+        WriterException.__init__(self)
+        self.file = filename
+        self.exitcode = exitcode
+        self.args += (filename, exitcode)
+
+
+class UnknownColumn(WriterException):
+    """raised when a column name matches no column of a datasource"""
+
+    _message_template = '{!r}: is not a column of datasource'
+
+    def __init__(self, name):
+        WriterException.__init__(self)
+        self.name = name
+        self.args += (name,)
+
+
+class UnknownIncrementKey(WriterException):
+    """raised when the increment key of a datasource is not a column"""
+
+    _message_template = '{!r}: increment key is not a column of extract'
+
+    def __init__(self, increment_key):
+        WriterException.__init__(self)
+        self.increment_key = increment_key
+        self.args += (increment_key,)
+
+
+class FetchProcessDied(WriterException):
+    """raised when the process fetching rows dies before every row is sent"""
+
+    _message_template = 'fetch process died with exit code {}'
+
+    def __init__(self, exitcode):
+        WriterException.__init__(self)
+        self.exitcode = exitcode
+        self.args += (exitcode,)
+
+
+class MalformedDatasource(WriterException):
+    """raised when a datasource file rewritten is not well formed"""
+
+    _message_template = '{!r}: malformed datasource, {}'
+
+    def __init__(self, filename, reason):
+        WriterException.__init__(self)
+        self.file = filename
+        self.reason = reason
+        self.args += (filename, reason)
+
+
+class UnknownTable(WriterException):
+    """raised when a column is not a column of a table of the relation"""
+
+    _message_template = '{!r}: is not a table of datasource relation'
+
+    def __init__(self, parent_name):
+        WriterException.__init__(self)
+        self.parent_name = parent_name
+        self.args += (parent_name,)
+
+
+class UnsupportedRelation(WriterException):
+    """raised when rows of a relation can not be read locally"""
+
+    _message_template = '{!r}: relation not supported, {}'
+
+    def __init__(self, relation, reason):
+        WriterException.__init__(self)
+        self.relation = relation
+        self.reason = reason
+        self.args += (relation, reason)
+
+
+class MultiTableOption(WriterException):
+    """raised when an option requires rows of a single table"""
+
+    _message_template = '{!r}: requires a single table, see denormalize'
+
+    def __init__(self, option):
+        WriterException.__init__(self)
+        self.option = option
+        self.args += (option,)
@@ -0,0 +1,510 @@
+# -*- coding: utf-8 -*-
+"""This module defines the pipeline inserting fetched rows into extracts
+
+Rows go through three stages, each running in its own thread:
+
+* fetch - reads batches of a row source, waiting on the database
+* convert - converts values of every row to column local-types
+* insert - inserts converted rows, in the thread running the pipeline so
+  that tableau sdk is only ever called from one thread per pipeline, the
+  inserts of pipelines run in several threads are serialized by their
+  insert callables, see TDEWriter._insert_rows
+
+Stages are connected by bounded queues, fetching and converting run
+ahead of insertion by at most `queue_size` batches per queue, which caps
+the rows held in memory at about ``(2 * queue_size + 3) * batch_size``.
+
+ProcessInsertPipeline fetches and converts rows in a forked process
+instead, so that converting rows does not compete with inserting them for
+the interpreter lock. Converted batches reach the inserting process
+through shared memory, see BatchChannel.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import multiprocessing
+import sys
+import threading
+import time
+
+from future.moves import pickle
+from future.moves.queue import Empty
+from future.moves.queue import Full
+from future.moves.queue import Queue
+from future.utils import raise_
+
+from tableaupy.rowsources import db
+from tableaupy.rowsources import RowSourceException
+from tableaupy.writers.transport import BatchChannel
+
+#: seconds a blocked stage waits before checking whether to stop
+_POLL_INTERVAL = 0.1
+
+_STAGES = ('fetch', 'convert', 'insert')
+
+#: marks the end of the batches of a queue
+_DONE = object()
+
+#: seconds an exiting fetch process is waited for before it is terminated
+_JOIN_TIMEOUT = 5.0
+
+
+def _stage_metrics():
+    """New metrics of a stage"""
+
+    return {'busy': 0.0, 'waiting': 0.0, 'batches': 0, 'rows': 0}
+
+
+class InsertPipeline(object):
+    """Fetches, converts and inserts rows concurrently
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be inserted
+    convert : callable
+        called with a source row, returns the converted row
+    insert : callable
+        called with every converted row, in source order
+    queue_size : int
+        batches buffered between two stages (default: 4)
+    keep : callable
+        called with every converted row by the convert stage, False for
+        rows not to be inserted, every row is inserted when None
+
+    Examples
+    --------
+    >>> from tableaupy.rowsources import IterableSource
+    >>> inserted = list()
+    >>> pipeline = InsertPipeline(
+    ...     IterableSource(['a'], [(1,), (2,), (3,)], batch_size=2),
+    ...     lambda row: (row[0] * 10,),
+    ...     inserted.append
+    ... )
+    >>> pipeline.run()
+    3
+    >>> inserted
+    [(10,), (20,), (30,)]
+    >>> pipeline.metrics['fetch']['batches']
+    2
+    """
+
+    def __init__(self,
+                 row_source,
+                 convert,
+                 insert,
+                 queue_size=4,
+                 keep=None):
+        super(InsertPipeline, self).__init__()
+        self._row_source = row_source
+        self._convert = convert
+        self._keep = keep
+        self._insert = insert
+        self._fetched = Queue(maxsize=queue_size)
+        self._converted = Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+        self._metrics = dict((stage, _stage_metrics()) for stage in _STAGES)
+        self._elapsed = 0.0
+
+    @property
+    def metrics(self):
+        """Per stage metrics of the last run
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'elapsed': seconds the run took,
+                    'fetch' / 'convert' / 'insert': {
+                        'busy': seconds spent working,
+                        'waiting': seconds blocked on a queue,
+                        'batches': batches processed,
+                        'rows': rows processed,
+                        'utilization': busy / elapsed,
+                    },
+                }
+        """
+
+        metrics = {'elapsed': self._elapsed}
+
+        for stage in _STAGES:
+            metrics[stage] = dict(self._metrics[stage])
+            metrics[stage]['utilization'] = (
+                self._metrics[stage]['busy'] / self._elapsed
+                if self._elapsed else 0.0
+            )
+
+        return metrics
+
+    def _fail(self):
+        """Records exception being handled and stops every stage"""
+
+        with self._error_lock:
+            if self._error is None:
+                self._error = sys.exc_info()
+
+        self._stop.set()
+
+    def _put(self, queue, item, metrics):
+        """Puts `item` on `queue`, False if the pipeline stopped first"""
+
+        started = time.time()
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    queue.put(item, timeout=_POLL_INTERVAL)
+                    return True
+                except Full:
+                    continue
+
+            return False
+        finally:
+            metrics['waiting'] += time.time() - started
+
+    def _get(self, queue, metrics):
+        """Gets next batch of `queue`, _DONE if the pipeline stopped"""
+
+        started = time.time()
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    return queue.get(timeout=_POLL_INTERVAL)
+                except Empty:
+                    continue
+
+            return _DONE
+        finally:
+            metrics['waiting'] += time.time() - started
+
+    def _fetch(self):
+        """Fetch stage, reads batches of the row source"""
+
+        metrics = self._metrics['fetch']
+        batches = iter(self._row_source.batches())
+
+        try:
+            while True:
+                started = time.time()
+                batch = next(batches, _DONE)
+                metrics['busy'] += time.time() - started
+
+                if batch is _DONE:
+                    break
+
+                metrics['batches'] += 1
+                metrics['rows'] += len(batch)
+
+                if not self._put(self._fetched, batch, metrics):
+                    return
+
+            self._put(self._fetched, _DONE, metrics)
+        except Exception:  # pylint: disable=broad-except
+            self._fail()
+        finally:
+            # releases the database connection of an unfinished source
+            close = getattr(batches, 'close', None)
+
+            if close is not None:
+                close()
+
+    def _convert_batches(self):
+        """Convert stage, converts rows of fetched batches"""
+
+        metrics = self._metrics['convert']
+        convert = self._convert
+        keep = self._keep
+
+        try:
+            while True:
+                batch = self._get(self._fetched, metrics)
+
+                if batch is _DONE:
+                    break
+
+                started = time.time()
+                converted = [convert(row) for row in batch]
+
+                if keep is not None:
+                    converted = [row for row in converted if keep(row)]
+
+                metrics['busy'] += time.time() - started
+                metrics['batches'] += 1
+                metrics['rows'] += len(converted)
+
+                if not self._put(self._converted, converted, metrics):
+                    return
+
+            self._put(self._converted, _DONE, metrics)
+        except Exception:  # pylint: disable=broad-except
+            self._fail()
+
+    def run(self):
+        """Runs the pipeline until every row is inserted
+
+        Returns
+        -------
+        int
+            number of rows inserted
+
+        Raises
+        ------
+        Exception
+            first exception raised by any stage, with its traceback
+        """
+
+        metrics = self._metrics['insert']
+        insert = self._insert
+        started_at = time.time()
+        threads = [
+            threading.Thread(target=self._fetch, name='pipeline-fetch'),
+            threading.Thread(
+                target=self._convert_batches,
+                name='pipeline-convert'
+            ),
+        ]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            while True:
+                batch = self._get(self._converted, metrics)
+
+                if batch is _DONE:
+                    break
+
+                started = time.time()
+
+                for row in batch:
+                    insert(row)
+
+                metrics['busy'] += time.time() - started
+                metrics['batches'] += 1
+                metrics['rows'] += len(batch)
+        except Exception:  # pylint: disable=broad-except
+            self._fail()
+        finally:
+            self._stop.set()
+
+            for thread in threads:
+                thread.join()
+
+            self._row_source.close()
+            self._elapsed = time.time() - started_at
+
+        if self._error is not None:
+            raise_(*self._error)
+
+        return metrics['rows']
+
+
+def _fork_context():
+    """multiprocessing context forking processes, None where unavailable"""
+
+    get_context = getattr(multiprocessing, 'get_context', None)
+
+    if get_context is None:
+        # python 2 forks on every platform but windows
+        return multiprocessing if sys.platform != 'win32' else None
+
+    try:
+        return get_context('fork')
+    except ValueError:
+        return None
+
+
+class _Stopped(Exception):
+    """raised in the fetch process when the inserting process stopped"""
+
+
+class ProcessInsertPipeline(InsertPipeline):
+    """Fetches and converts rows in a forked process, inserts them here
+
+    The forked process runs the fetch and convert stages of an
+    InsertPipeline and sends converted rows in batches of `batch_size`
+    through shared memory, at most `queue_size` batches ahead of
+    insertion. The row source, converter and `keep` are inherited by the
+    forked process, they need not be picklable, and idle connections of
+    connection pools are not shared with it, see ConnectionPool.forget.
+
+    Parameters
+    ----------
+    row_source : RowSource
+        rows to be inserted
+    convert : callable
+        called with a source row, returns the converted row
+    insert : callable
+        called with every converted row, in source order
+    layout : BatchLayout
+        layout of converted rows in shared memory
+    queue_size : int
+        batches in flight between processes (default: 4)
+    keep : callable
+        called with every converted row, False for rows not to be
+        inserted, every row is inserted when None
+    batch_size : int
+        rows per batch sent (default: 1000)
+    slot_size : int
+        bytes of shared memory per batch in flight (default: 4 MB)
+    """
+
+    def __init__(self,
+                 row_source,
+                 convert,
+                 insert,
+                 layout,
+                 queue_size=4,
+                 keep=None,
+                 batch_size=1000,
+                 slot_size=4 << 20):
+        super(ProcessInsertPipeline, self).__init__(
+            row_source,
+            convert,
+            insert,
+            queue_size=queue_size,
+            keep=keep
+        )
+        self._layout = layout
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+        self._slot_size = slot_size
+
+    @staticmethod
+    def supported():
+        """True if the current process can fork a fetch process
+
+        Processes can not be forked on windows, nor by daemonic worker
+        processes, see WriterPool.
+        """
+
+        return _fork_context() is not None and \
+            not multiprocessing.current_process().daemon
+
+    def _produce(self, channel):
+        """Fetch process, sends converted batches to the channel"""
+
+        db.after_fork()
+        batch = list()
+
+        def _send(row):
+            """Sends rows in batches of batch_size"""
+
+            batch.append(row)
+
+            if len(batch) >= self._batch_size:
+                if not channel.send(batch):
+                    raise _Stopped()
+
+                del batch[:]
+
+        pipeline = InsertPipeline(
+            self._row_source,
+            self._convert,
+            _send,
+            queue_size=self._queue_size,
+            keep=self._keep
+        )
+
+        try:
+            pipeline.run()
+
+            if batch and not channel.send(batch):
+                return
+
+            metrics = pipeline.metrics
+            channel.finish(dict(
+                (stage, dict(
+                    (name, value)
+                    for name, value in metrics[stage].items()
+                    if name != 'utilization'
+                ))
+                for stage in ('fetch', 'convert')
+            ))
+        except _Stopped:
+            return
+        except Exception as err:  # pylint: disable=broad-except
+            try:
+                pickle.dumps(err)
+            except Exception:  # pylint: disable=broad-except
+                err = RowSourceException(str(err))
+
+            channel.fail(err)
+
+    def run(self):
+        """Runs the pipeline until every row is inserted
+
+        Returns
+        -------
+        int
+            number of rows inserted
+
+        Raises
+        ------
+        Exception
+            first exception raised by any stage
+        FetchProcessDied
+            when the fetch process dies before every row is sent
+        """
+
+        metrics = self._metrics['insert']
+        insert = self._insert
+        context = _fork_context()
+        started_at = time.time()
+        channel = BatchChannel(
+            self._layout,
+            context,
+            slots=self._queue_size,
+            slot_size=self._slot_size
+        )
+        producer = context.Process(
+            target=self._produce,
+            args=(channel,),
+            name='pipeline-fetch'
+        )
+        producer.daemon = True
+        producer.start()
+
+        try:
+            batches = channel.receive(producer)
+
+            while True:
+                started = time.time()
+                batch = next(batches, _DONE)
+                metrics['waiting'] += time.time() - started
+
+                if batch is _DONE:
+                    break
+
+                started = time.time()
+
+                for row in batch:
+                    insert(row)
+
+                metrics['busy'] += time.time() - started
+                metrics['batches'] += 1
+                metrics['rows'] += len(batch)
+
+            for stage, stage_metrics in channel.producer_metrics.items():
+                self._metrics[stage].update(stage_metrics)
+        finally:
+            channel.stop()
+            producer.join(_JOIN_TIMEOUT)
+
+            if producer.is_alive():
+                producer.terminate()
+                producer.join()
+
+            channel.close()
+            self._row_source.close()
+            self._elapsed = time.time() - started_at
+
+        return metrics['rows']
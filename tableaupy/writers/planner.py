@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""This module defines output path planner for batches of input files"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import namedtuple
+from collections import OrderedDict
+import hashlib
+import os
+
+from tableaupy.readers.exceptions import FileExtensionMismatch
+from tableaupy.writers import exceptions
+
+#: planned work for a single input file, `overwrite` is True when its
+#: existing output is replaced even though the writer does not overwrite
+PlanEntry = namedtuple('PlanEntry', [
+    'file_name',
+    'absolute_path',
+    'output_path',
+    'overwrite',
+])
+PlanEntry.__new__.__defaults__ = (False, )
+
+
+class Plan(object):
+    """Output paths of a batch computed before any file is processed
+
+    Attributes
+    ----------
+    entries : list[PlanEntry]
+        files to be processed, in input order without duplicates
+    failures : OrderedDict
+        absolute input path to (file name, WriterException) of files which
+        can not be processed
+    """
+
+    def __init__(self, entries, failures):
+        super(Plan, self).__init__()
+        self.entries = entries
+        self.failures = failures
+
+    @property
+    def ok(self):
+        """True if every file of the batch can be processed"""
+
+        return len(self.failures) == 0
+
+    def shard(self, index, count):
+        """Part of the plan belonging to shard `index` of `count`
+
+        Parameters
+        ----------
+        index : int
+            shard index, from 0 to count - 1
+        count : int
+            number of shards
+
+        Returns
+        -------
+        Plan
+            entries and failures of files in the shard, see shard_of
+        """
+
+        return Plan(
+            [
+                entry for entry in self.entries
+                if shard_of(entry.absolute_path, count) == index
+            ],
+            OrderedDict(
+                (absolute_path, failure)
+                for absolute_path, failure in self.failures.items()
+                if shard_of(absolute_path, count) == index
+            )
+        )
+
+
+def shard_of(absolute_path, count):
+    """Shard of a file among `count` shards
+
+    The shard is derived from a hash of the absolute path only, so every
+    host seeing the files under the same path assigns them to the same
+    shards, whatever the order or the subset of files it was given.
+
+    Parameters
+    ----------
+    absolute_path : str
+        absolute path to input file
+    count : int
+        number of shards
+
+    Returns
+    -------
+    int
+        shard index, from 0 to count - 1
+
+    Examples
+    --------
+    >>> shard_of('/data/sample.tds', 4) == shard_of('/data/sample.tds', 4)
+    True
+    >>> shard_of('/data/sample.tds', 1)
+    0
+    """
+
+    digest = hashlib.md5(absolute_path.encode('utf-8')).hexdigest()
+    return int(digest, 16) % count
+
+
+def plan_batch(writer,
+               file_names,
+               input_extension=None,
+               skip=None,
+               journaled=None,
+               output_paths=None):
+    """Plans output paths of `file_names` for `writer`
+
+    Output directory is resolved once for the batch, or once per input
+    directory when writer has no output directory. Problems which would
+    only surface while writing are detected up front:
+
+    * input file without `input_extension`
+    * several input files having the same output path, including the
+      other outputs of files written to several outputs
+    * output file already existing when writer does not overwrite, unless
+      the file has no record in the journal of the run being resumed: its
+      output was committed by the interrupted run before its record was
+      journaled, and is replaced
+
+    Parameters
+    ----------
+    writer : Writer
+        writer whose prefix, suffix, output_dir and overwrite are used
+    file_names : list
+        input file names / paths, duplicates are planned once
+    input_extension : str
+        extension every input file should have, not checked when None
+    skip : set
+        absolute input paths to be left out of the plan
+    journaled : set
+        absolute input paths having a journal record when resuming a run,
+        None when not resuming
+    output_paths : callable
+        called with an input file name and its output path, every path
+        the file is written to, its output path only when None
+
+    Returns
+    -------
+    Plan
+        planned batch
+
+    Raises
+    ------
+    WriterException
+        when output directory can not be resolved
+
+    Examples
+    --------
+    >>> from tableaupy.writers import Writer
+    >>> plan = plan_batch(Writer('.tde'), ['sample/sample.tds'] * 2)
+    >>> [entry.output_path.endswith('sample.tde') for entry in plan.entries]
+    [True]
+    """
+
+    output_dir = writer.get_output_dir()
+    resolved_dirs = dict()
+
+    entries = list()
+    failures = OrderedDict()
+    seen = set() if skip is None else set(skip)
+
+    for file_name in file_names:
+        input_dir, base_name = os.path.split(file_name)
+        absolute_path = os.path.realpath(file_name)
+
+        if input_dir not in resolved_dirs:
+            resolved_dirs[input_dir] = os.path.realpath(input_dir or '.')
+
+        if absolute_path in seen:
+            continue
+
+        seen.add(absolute_path)
+
+        if (input_extension is not None and
+                os.path.splitext(base_name)[1] != input_extension):
+            failures[absolute_path] = (
+                file_name,
+                exceptions.WriterException(
+                    FileExtensionMismatch(file_name, input_extension)
+                )
+            )
+            continue
+
+        output_path = os.path.join(
+            resolved_dirs[input_dir] if output_dir is None else output_dir,
+            writer.get_output_name(file_name)
+        )
+        entries.append(PlanEntry(file_name, absolute_path, output_path))
+
+    by_output = OrderedDict()
+    existing = dict()
+
+    for entry in entries:
+        paths = [entry.output_path] if output_paths is None else \
+            output_paths(entry.file_name, entry.output_path)
+
+        for path in paths:
+            planned = by_output.setdefault(path, [])
+
+            if entry not in planned:
+                planned.append(entry)
+
+            if not writer.overwrite and os.path.exists(path):
+                existing.setdefault(entry.absolute_path, path)
+
+    for output_path, planned in by_output.items():
+        if len(planned) > 1:
+            collision = exceptions.OutputPathCollision(
+                output_path, [entry.file_name for entry in planned]
+            )
+
+            for entry in planned:
+                failures[entry.absolute_path] = (entry.file_name, collision)
+
+    for entry in entries:
+        if entry.absolute_path not in existing or \
+                entry.absolute_path in failures or \
+                journaled is not None and \
+                entry.absolute_path not in journaled:
+            continue
+
+        failures[entry.absolute_path] = (
+            entry.file_name,
+            exceptions.FileAlreadyExists(existing[entry.absolute_path])
+        )
+
+    entries = [
+        entry._replace(overwrite=entry.absolute_path in existing)
+        for entry in entries if entry.absolute_path not in failures
+    ]
+
+    return Plan(entries, failures)
@@ -0,0 +1,587 @@
+# -*- coding: utf-8 -*-
+"""This module defines a pool of worker processes generating extracts"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import deque
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from future.moves.queue import Full
+
+from tableaupy.writers import exceptions
+from tableaupy.writers.tde import TDEWriter
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on windows, memory budget is not enforced there
+    resource = None
+
+_STARTED = 'started'
+_FINISHED = 'finished'
+
+#: exit code of a worker which ran out of its memory budget
+_EXIT_MEMORY = 3
+
+#: seconds between two checks of worker health and job timeouts
+_SUPERVISE_INTERVAL = 0.1
+
+_option_keys = ('prefix', 'suffix', 'overwrite', 'output_dir')
+
+
+class Job(object):
+    """Extract generation job submitted to a WriterPool
+
+    Attributes
+    ----------
+    job_id : int
+        identifier of the job, unique for a pool
+    tds_file_name : str
+        tableau datasource file name / path
+    options : dict
+        writer options used for the job
+    collation : str
+        default column collation
+    output_path : str
+        planned output path, computed by the worker when None
+    generate_options : dict
+        keyword arguments of TDEWriter.generate_from_tds, e.g. fetch_rows
+    error : str
+        error message, None if the job succeeded or is not finished
+    duration : float
+        seconds spent generating the extract
+    columns : int
+        number of columns defined in the extract
+    worker : int
+        process id of the worker which ran the job
+    started_at : float
+        time when the worker started the job
+    requeued : bool
+        True if the job was queued again after its worker died before
+        starting it
+    """
+
+    def __init__(self,
+                 job_id,
+                 tds_file_name,
+                 options,
+                 collation,
+                 output_path=None,
+                 generate_options=None):
+        super(Job, self).__init__()
+        self.job_id = job_id
+        self.tds_file_name = tds_file_name
+        self.options = options
+        self.collation = collation
+        self.output_path = output_path
+        self.generate_options = (
+            {} if generate_options is None else generate_options
+        )
+        self.error = None
+        self.duration = None
+        self.columns = 0
+        self.worker = None
+        self.started_at = None
+        self.requeued = False
+        self.callback = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        """True when the job is finished"""
+
+        return self._done.is_set()
+
+    @property
+    def succeeded(self):
+        """True when the job is finished without error"""
+
+        return self.done and self.error is None
+
+    @property
+    def task(self):
+        """Picklable description of the job sent to a worker"""
+
+        return (
+            self.job_id,
+            self.tds_file_name,
+            self.options,
+            self.collation,
+            self.output_path,
+            self.generate_options,
+        )
+
+    def wait(self, timeout=None):
+        """Waits for the job to finish, returns True if finished"""
+
+        self._done.wait(timeout)
+        return self.done
+
+    def start(self, worker, started_at):
+        """Marks job as started by `worker`"""
+
+        self.worker = worker
+        self.started_at = started_at
+
+    def finish(self, error, duration, columns=0):
+        """Marks job as finished"""
+
+        self.error = error
+        self.duration = duration
+        self.columns = columns
+        self._done.set()
+
+
+def _limit_memory(memory_limit):
+    """Limits address space of current process to `memory_limit` bytes"""
+
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _work(index, tasks, results, options, memory_limit):
+    """Worker process loop
+
+    Keeps a single warm TDEWriter and generates an extract for every task
+    until a None task is received, sending messages through `results`, the
+    writing end of a pipe of its own. A worker running out of its memory
+    budget reports the failure as exhausted and exits with _EXIT_MEMORY,
+    as its state can not be trusted anymore.
+    """
+
+    _limit_memory(memory_limit)
+    tde_writer = TDEWriter(options=options)
+    tde_writer.warm_up()
+
+    for task in iter(tasks.get, None):
+        (job_id, tds_file_name, job_options, collation, output_path,
+         generate_options) = task
+        start = time.time()
+        results.send((_STARTED, index, job_id, (os.getpid(), start)))
+
+        for key in _option_keys:
+            setattr(tde_writer, key, job_options[key])
+
+        error = None
+        columns = 0
+        exhausted = False
+
+        try:
+            columns = tde_writer.generate_from_tds(
+                tds_file_name,
+                collation=collation,
+                output_path=output_path,
+                **generate_options
+            )
+        except MemoryError:
+            exhausted = True
+            error = str(exceptions.MemoryBudgetExceeded(
+                tds_file_name, memory_limit
+            ))
+        except Exception as err:  # pylint: disable=broad-except
+            # a worker reports every failure and stays alive for next job
+            error = str(err) or repr(err)
+
+        results.send((
+            _FINISHED,
+            index,
+            job_id,
+            (error, time.time() - start, columns or 0, exhausted)
+        ))
+
+        if exhausted:
+            results.close()
+            sys.exit(_EXIT_MEMORY)
+
+
+class _Worker(object):
+    """Worker process with its own task queue, result pipe and current job
+
+    A worker killed while sending a message can only garble its own result
+    pipe, which is discarded with it, never the messages of other workers.
+    """
+
+    def __init__(self, index, options, memory_limit):
+        super(_Worker, self).__init__()
+        self.tasks = multiprocessing.Queue()
+        self.results, results = multiprocessing.Pipe(duplex=False)
+        self.job = None
+        self.dispatched_at = None
+
+        #: bool : True once the worker exits after its current job
+        self.retiring = False
+
+        #: threading.Thread : collects messages of the worker, see
+        #: WriterPool._collect
+        self.collector = None
+
+        self.process = multiprocessing.Process(
+            target=_work,
+            args=(index, self.tasks, results, options, memory_limit)
+        )
+        self.process.daemon = True
+        self.process.start()
+
+        # the worker holds the only writing end, its exit ends the pipe
+        results.close()
+
+
+class WriterPool(object):
+    """Pool of persistent worker processes with warm TDEWriters
+
+    Each worker initializes tableau sdk once and keeps it initialized for
+    every job it runs. Jobs are queued in submission order and dispatched
+    to whichever worker is idle; the number of jobs queued or running is
+    bounded by `max_pending`.
+
+    Every job runs isolated in a worker process. A worker running a job
+    for longer than `timeout` is killed, a worker exceeding `memory_limit`
+    or dying otherwise is discarded; either way the job fails with a
+    WriterException message and a new worker takes its place, so a single
+    pathological file can not stall the pool. A job whose worker died
+    before starting it is queued again, once.
+
+    Parameters
+    ----------
+    processes : int
+        number of worker processes (default: cpu count)
+    options : dict
+        default writer options for jobs, see Writer
+    max_pending : int
+        maximum number of jobs queued or running, unbounded when 0
+        (default: 0)
+    timeout : float
+        seconds a job may run, unlimited when None (default: None)
+    memory_limit : int
+        bytes of address space a worker may use, unlimited when None
+        (default: None)
+    """
+
+    def __init__(self,
+                 processes=None,
+                 options=None,
+                 max_pending=0,
+                 timeout=None,
+                 memory_limit=None):
+        super(WriterPool, self).__init__()
+
+        self._processes = processes or multiprocessing.cpu_count()
+        self._options = {
+            'prefix': '',
+            'suffix': '',
+            'overwrite': False,
+            'output_dir': None,
+        }
+        self._options.update({} if options is None else options)
+        self._max_pending = max_pending
+        self._capacity = (
+            threading.BoundedSemaphore(max_pending) if max_pending else None
+        )
+        self._timeout = timeout
+        self._memory_limit = memory_limit
+
+        self._ids = itertools.count(1)
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._closing = False
+        self._wakeup = threading.Event()
+        self._counts = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'replaced': 0,
+        }
+
+        self._workers = [
+            self._start_worker(index) for index in range(self._processes)
+        ]
+
+        self._supervisor = threading.Thread(target=self._supervise)
+        self._supervisor.daemon = True
+        self._supervisor.start()
+
+    def _start_worker(self, index):
+        """Starts worker process at `index` and collector of its messages"""
+
+        worker = _Worker(index, self._options, self._memory_limit)
+        worker.collector = threading.Thread(
+            target=self._collect,
+            args=(worker, )
+        )
+        worker.collector.daemon = True
+        worker.collector.start()
+        return worker
+
+    @property
+    def processes(self):
+        """number of worker processes"""
+
+        return self._processes
+
+    @property
+    def metrics(self):
+        """Pool metrics
+
+        Returns
+        -------
+        dict
+            represented as::
+
+                {
+                    'processes': number of worker processes,
+                    'max-pending': bound on queued and running jobs,
+                    'queued': jobs waiting for a worker,
+                    'running': jobs being generated,
+                    'submitted': jobs accepted,
+                    'completed': jobs finished successfully,
+                    'failed': jobs finished with error,
+                    'rejected': jobs refused because pool was full,
+                    'timeouts': jobs killed for exceeding timeout,
+                    'replaced': workers replaced after being killed or
+                                dying,
+                }
+        """
+
+        with self._lock:
+            metrics = dict(self._counts)
+            metrics['queued'] = len(self._pending)
+            metrics['running'] = sum(
+                1 for worker in self._workers if worker.job is not None
+            )
+
+        metrics['processes'] = self._processes
+        metrics['max-pending'] = self._max_pending
+        return metrics
+
+    def submit(self,
+               tds_file_name,
+               options=None,
+               collation='en_us_ci',
+               block=True,
+               callback=None,
+               output_path=None,
+               generate_options=None):
+        """Queues generation of extract from tableau datasource file
+
+        Parameters
+        ----------
+        tds_file_name : str
+            tableau datasource file name / path
+        options : dict
+            writer options overriding pool defaults for this job
+        collation : str
+            default column collation (default: "en_us_ci")
+        block : bool
+            when pool is full, wait for a slot if True or else raise Full
+        callback : callable
+            called with the job, from a pool thread, when it finishes
+        output_path : str
+            planned output path, see TDEWriter.plan
+        generate_options : dict
+            keyword arguments of TDEWriter.generate_from_tds
+
+        Returns
+        -------
+        Job
+            submitted job
+
+        Raises
+        ------
+        Full
+            when pool is full and block is False
+        """
+
+        if self._capacity is not None and not self._capacity.acquire(block):
+            with self._lock:
+                self._counts['rejected'] += 1
+            raise Full('{} jobs pending'.format(self._max_pending))
+
+        job_options = dict(self._options)
+        job_options.update({} if options is None else options)
+        job = Job(
+            next(self._ids),
+            tds_file_name,
+            job_options,
+            collation,
+            output_path,
+            generate_options
+        )
+
+        job.callback = callback
+
+        with self._lock:
+            self._pending.append(job)
+            self._counts['submitted'] += 1
+
+        self._wakeup.set()
+        return job
+
+    def _finish(self, job, error, duration, columns=0):
+        """Finishes job and frees its capacity, call without lock held"""
+
+        with self._lock:
+            self._counts['failed' if error else 'completed'] += 1
+
+        job.finish(error, duration, columns)
+
+        if self._capacity is not None:
+            self._capacity.release()
+
+        if job.callback is not None:
+            job.callback(job)
+
+        self._wakeup.set()
+
+    def _collect(self, worker):
+        """Collects messages of `worker` and finishes jobs
+
+        Stops once the worker exits, or dies while sending a message.
+        """
+
+        while True:
+            try:
+                event, index, job_id, payload = worker.results.recv()
+            except Exception:  # pylint: disable=broad-except
+                # EOFError once closed, any error when a message is cut
+                break
+
+            with self._lock:
+                job = self._workers[index].job
+
+                # message of a job whose worker was killed meanwhile
+                if job is None or job.job_id != job_id:
+                    continue
+
+                if event == _STARTED:
+                    job.start(*payload)
+                    continue
+
+                error, duration, columns, exhausted = payload
+                self._workers[index].job = None
+
+                # an exhausted worker is exiting, it gets no further job
+                self._workers[index].retiring = exhausted
+
+            self._finish(job, error, duration, columns)
+
+        worker.results.close()
+
+    def _check_worker(self, index, now):
+        """Replaces worker at `index` if it is dead or timed out
+
+        Returns
+        -------
+        tuple
+            (job, error message) of the job lost with the worker, None
+            otherwise
+        """
+
+        worker = self._workers[index]
+        job = worker.job
+
+        if worker.process.is_alive():
+            if (job is None or self._timeout is None or
+                    now - worker.dispatched_at <= self._timeout):
+                return None
+
+            worker.process.terminate()
+            worker.process.join()
+            self._counts['timeouts'] += 1
+            error = exceptions.GenerationTimeout(
+                job.tds_file_name, self._timeout
+            )
+        elif job is None:
+            error = None
+        elif (job.started_at is None and not job.requeued and
+              worker.process.exitcode != _EXIT_MEMORY):
+            # the worker died before the job, e.g. while starting up
+            job.requeued = True
+            self._pending.appendleft(job)
+            job = None
+            error = None
+        elif worker.process.exitcode == _EXIT_MEMORY:
+            error = exceptions.MemoryBudgetExceeded(
+                job.tds_file_name, self._memory_limit
+            )
+        else:
+            error = exceptions.WorkerDied(
+                job.tds_file_name, worker.process.exitcode
+            )
+
+        self._counts['replaced'] += 1
+        self._workers[index] = self._start_worker(index)
+
+        if job is None:
+            return None
+
+        if job.started_at is None:
+            job.start(worker.process.pid, worker.dispatched_at)
+
+        return job, str(error)
+
+    def _supervise(self):
+        """Replaces failed workers and dispatches queued jobs"""
+
+        while True:
+            self._wakeup.wait(_SUPERVISE_INTERVAL)
+            self._wakeup.clear()
+            now = time.time()
+            lost = list()
+
+            with self._lock:
+                for index in range(len(self._workers)):
+                    result = self._check_worker(index, now)
+
+                    if result is not None:
+                        lost.append(result)
+
+                for worker in self._workers:
+                    if not self._pending:
+                        break
+
+                    if worker.job is None and not worker.retiring:
+                        worker.job = self._pending.popleft()
+                        worker.dispatched_at = now
+                        worker.tasks.put(worker.job.task)
+
+                done = (
+                    self._closing and not lost and not self._pending and
+                    all(worker.job is None for worker in self._workers)
+                )
+
+            for job, error in lost:
+                self._finish(job, error, now - job.started_at)
+
+            if done:
+                return
+
+    def close(self):
+        """Lets workers finish queued jobs and stops them"""
+
+        with self._lock:
+            self._closing = True
+
+        self._wakeup.set()
+        self._supervisor.join()
+
+        for worker in self._workers:
+            worker.tasks.put(None)
+
+        for worker in self._workers:
+            worker.process.join()
+            worker.collector.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""This module defines high-water marks of incremental extract refreshes
+
+A datasource refreshed incrementally declares the column whose values only
+grow, like an order date or an identity, as increment key::
+
+    <refresh increment-key="[Order Date]" incremental-updates="true"/>
+
+After its rows are fetched, the greatest increment key value inserted is
+saved next to the extract, in ``<extract>.hwm``, as::
+
+    {"increment-key": "[Order Date]", "local-type": "date",
+     "mark": "2017-03-01", "scope": {"columns": [...], "where": [...]}}
+
+The next refresh appends only the rows with a greater increment key, if
+the extract holds the same columns and rows meeting the same predicates,
+as recorded by the scope of the mark, and is rebuilt otherwise.
+The new mark is written to a temporary file and any previous mark removed
+before the extract is committed, the temporary file is renamed right
+after, so that an interrupted refresh leaves an extract without mark,
+which is rebuilt, rather than an extract with the mark of other rows.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import datetime
+import errno
+import json
+import os
+
+from future.utils import raise_with_traceback
+
+from tableaupy.contenthandlers import TDSContentHandler
+from tableaupy.rowsources import values
+from tableaupy.writers import selection
+from tableaupy.writers.exceptions import UnknownColumn
+from tableaupy.writers.exceptions import UnknownIncrementKey
+from tableaupy.writers.exceptions import WriterException
+
+_MARK_EXTENSION = '.hwm'
+
+
+def increment_column(tds_reader, selected=None):
+    """Column of the increment key of a datasource refreshed incrementally
+
+    Parameters
+    ----------
+    tds_reader : TDSReader
+        reader which has read a datasource
+    selected : list
+        indexes of the columns of the extract, every column when None
+
+    Returns
+    -------
+    tuple
+        (position in extract columns, column details) of the increment key
+        column, None when datasource is not refreshed incrementally or the
+        increment key column is left out of the extract, which is then
+        rebuilt
+
+    Raises
+    ------
+    UnknownIncrementKey
+        when increment key is not a column of the datasource, see selection
+    """
+
+    refresh = tds_reader.get_datasource_refresh()
+    increment_key = refresh.get(TDSContentHandler.K_REFRESH_INCREMENT_KEY)
+
+    incremental = refresh.get(TDSContentHandler.K_REFRESH_INCREMENTAL)
+
+    if not increment_key or incremental != 'true':
+        return None
+
+    column_details = tds_reader.get_datasource_column_details()
+
+    try:
+        index = selection.find_column(column_details, increment_key)
+    except UnknownColumn:
+        raise UnknownIncrementKey(increment_key)
+
+    if selected is None:
+        return index, column_details[index]
+
+    selected = list(selected)
+
+    if index not in selected:
+        return None
+
+    return selected.index(index), column_details[index]
+
+
+def mark_path(output_path):
+    """Path of the high-water mark file of extract `output_path`
+
+    Examples
+    --------
+    >>> mark_path('/data/sample.tde')
+    '/data/sample.tde.hwm'
+    """
+
+    return output_path + _MARK_EXTENSION
+
+
+def _serialize(value):
+    """JSON value of a converted `value`"""
+
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(' ')
+
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+
+    return value
+
+
+def mark_scope(columns, filters):
+    """Scope of a high-water mark, the columns and rows of its extract
+
+    Parameters
+    ----------
+    columns : list
+        names of the columns of the extract
+    filters : list
+        (column, operator, value) conditions rows of the extract meet
+
+    Returns
+    -------
+    dict
+        JSON value of the scope, the order of conditions is irrelevant
+
+    Examples
+    --------
+    >>> day = datetime.date(2017, 3, 1)
+    >>> scope = mark_scope(['Id', 'Day'], [('Day', '>', day)])
+    >>> scope == mark_scope(['Id', 'Day'], [('Day', '>', '2017-03-01')])
+    True
+    >>> scope == mark_scope(['Id', 'Day'], [])
+    False
+    """
+
+    scope = {
+        'columns': list(columns),
+        'where': sorted(
+            [column, comparison, _serialize(value)]
+            for column, comparison, value in filters
+        ),
+    }
+
+    # compares equal to the scope of a mark loaded back
+    return json.loads(json.dumps(scope))
+
+
+def load_mark(output_path, increment_key, local_type, scope=None):
+    """Loads high-water mark of extract `output_path`
+
+    Parameters
+    ----------
+    output_path : str
+        path to extract
+    increment_key : str
+        increment key of the datasource
+    local_type : str
+        local-type of the increment key column
+    scope : dict
+        scope of the extract, see mark_scope
+
+    Returns
+    -------
+    object
+        greatest increment key value in the extract, None when there is no
+        mark, it can not be read, or it is the mark of another key, type or
+        scope
+    """
+
+    try:
+        with open(mark_path(output_path)) as stream:
+            mark = json.load(stream)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if not isinstance(mark, dict) or \
+            mark.get('increment-key') != increment_key or \
+            mark.get('local-type') != local_type or \
+            mark.get('scope') != scope:
+        return None
+
+    try:
+        return values.coerce(local_type, mark.get('mark'))
+    except ValueError:
+        return None
+
+
+def write_mark(output_path, increment_key, local_type, mark, scope=None):
+    """Writes high-water mark of extract `output_path` to a temporary file
+
+    Parameters
+    ----------
+    output_path : str
+        path to extract
+    increment_key : str
+        increment key of the datasource
+    local_type : str
+        local-type of the increment key column
+    mark : object
+        greatest increment key value in the extract
+    scope : dict
+        scope of the extract, see mark_scope
+
+    Returns
+    -------
+    str
+        path to temporary mark file, see commit_mark
+
+    Raises
+    ------
+    WriterException
+        when the mark file could not be written
+    """
+
+    temp_path = '{}.{}.tmp'.format(mark_path(output_path), os.getpid())
+
+    try:
+        with open(temp_path, 'w') as stream:
+            json.dump({
+                'increment-key': increment_key,
+                'local-type': local_type,
+                'mark': _serialize(mark),
+                'scope': scope,
+            }, stream)
+    except (IOError, OSError) as err:
+        raise_with_traceback(WriterException(err))
+
+    return temp_path
+
+
+def commit_mark(temp_path, output_path):
+    """Moves mark file written by write_mark in place, replacing any
+
+    Raises
+    ------
+    WriterException
+        when the mark file could not be moved
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> output_path = os.path.join(tempfile.mkdtemp(), 'sample.tde')
+    >>> day = datetime.date(2017, 3, 1)
+    >>> temp_path = write_mark(output_path, '[Day]', 'date', day)
+    >>> commit_mark(temp_path, output_path)
+    >>> load_mark(output_path, '[Day]', 'date')
+    datetime.date(2017, 3, 1)
+    >>> load_mark(output_path, '[Id]', 'integer') is None
+    True
+    """
+
+    path = mark_path(output_path)
+
+    try:
+        if os.name == 'nt' and os.path.exists(path):
+            # rename does not replace existing files on windows
+            os.remove(path)
+
+        os.rename(temp_path, path)
+    except OSError as err:
+        raise_with_traceback(WriterException(err))
+
+
+def remove_mark(output_path):
+    """Removes high-water mark of extract `output_path` if any
+
+    Raises
+    ------
+    WriterException
+        when the mark file could not be removed
+    """
+
+    try:
+        os.remove(mark_path(output_path))
+    except OSError as err:
+        if err.errno != errno.ENOENT:
+            raise_with_traceback(WriterException(err))
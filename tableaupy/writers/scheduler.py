@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""This module defines largest-first scheduling of planned files"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import namedtuple
+from collections import OrderedDict
+import io
+import json
+import numbers
+import os
+
+#: time spent by a worker on a single file
+Timing = namedtuple('Timing', ['worker', 'started_at', 'finished_at'])
+
+
+def _valid(entry):
+    """True if `entry` is a history entry with numeric size and duration"""
+
+    return isinstance(entry, dict) and all(
+        isinstance(entry.get(key), numbers.Real) and
+        not isinstance(entry.get(key), bool)
+        for key in ('size', 'duration')
+    )
+
+
+class CostHistory(object):
+    """Observed generation durations of files across runs
+
+    Stored as a JSON object mapping absolute file path to its size in
+    bytes and the seconds its last generation took.
+
+    Parameters
+    ----------
+    path : str
+        path to history file, None keeps history in memory only
+    """
+
+    def __init__(self, path=None):
+        super(CostHistory, self).__init__()
+        self._path = path
+        self._entries = dict()
+
+        if path is not None and os.path.exists(path):
+            with io.open(path, encoding='utf-8') as stream:
+                try:
+                    entries = json.load(stream)
+                except ValueError:
+                    entries = dict()
+
+            # a corrupt history only costs estimates, never the batch
+            if isinstance(entries, dict):
+                self._entries = dict(
+                    (absolute_path, entry)
+                    for absolute_path, entry in entries.items()
+                    if _valid(entry)
+                )
+
+    def seconds_per_byte(self):
+        """Median observed generation rate, None without history"""
+
+        rates = sorted(
+            entry['duration'] / entry['size']
+            for entry in self._entries.values() if entry['size'] > 0
+        )
+
+        if not rates:
+            return None
+
+        return rates[len(rates) // 2]
+
+    def estimate(self, absolute_path, size, rate=None):
+        """Estimated cost of generating a file
+
+        The last observed duration is used when the file size did not
+        change since, otherwise size is scaled by observed `rate`. Without
+        any history the size itself is the cost.
+
+        Parameters
+        ----------
+        absolute_path : str
+            absolute path to input file
+        size : int
+            current size of input file in bytes
+        rate : float
+            seconds per byte, see seconds_per_byte
+
+        Returns
+        -------
+        float
+            estimated cost
+        """
+
+        entry = self._entries.get(absolute_path)
+
+        if entry is not None and entry['size'] == size:
+            return entry['duration']
+
+        if rate is None:
+            return float(size)
+
+        return size * rate
+
+    def record(self, absolute_path, size, duration):
+        """Records observed generation duration of a file"""
+
+        self._entries[absolute_path] = {'size': size, 'duration': duration}
+
+    def save(self):
+        """Writes history file atomically"""
+
+        if self._path is None:
+            return
+
+        temp_path = '{}.{}.tmp'.format(self._path, os.getpid())
+
+        with io.open(temp_path, 'wb') as stream:
+            stream.write(json.dumps(self._entries).encode('utf-8'))
+
+        os.rename(temp_path, self._path)
+
+
+def _size(path):
+    """Size of file in bytes, 0 if it can not be read"""
+
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def schedule(entries, history):
+    """Orders planned entries longest estimated job first
+
+    Dispatching the longest jobs first from a queue shared by all workers,
+    where an idle worker takes the next job, keeps big files from being
+    left to the end of a batch while other workers sit idle.
+
+    Parameters
+    ----------
+    entries : list[PlanEntry]
+        planned entries
+    history : CostHistory
+        observed durations used for estimates
+
+    Returns
+    -------
+    list[PlanEntry]
+        entries in dispatch order
+
+    Examples
+    --------
+    >>> from tableaupy.writers.planner import PlanEntry
+    >>> entries = [
+    ...     PlanEntry('a', '/a', '/a.tde'),
+    ...     PlanEntry('b', '/b', '/b.tde'),
+    ... ]
+    >>> history = CostHistory()
+    >>> history.record('/a', 0, 1.0)
+    >>> history.record('/b', 0, 5.0)
+    >>> [entry.file_name for entry in schedule(entries, history)]
+    ['b', 'a']
+    """
+
+    rate = history.seconds_per_byte()
+
+    return sorted(
+        entries,
+        key=lambda entry: history.estimate(
+            entry.absolute_path, _size(entry.absolute_path), rate
+        ),
+        reverse=True
+    )
+
+
+def makespan_report(timings):
+    """Summarizes how busy each worker was during a batch
+
+    Parameters
+    ----------
+    timings : list[Timing]
+        timings of every processed file
+
+    Returns
+    -------
+    dict
+        represented as::
+
+            {
+                'makespan': seconds from first start to last finish,
+                'workers': OrderedDict of worker to {
+                    'jobs': number of files processed,
+                    'busy': seconds spent processing,
+                    'idle': seconds of makespan not spent processing,
+                }
+            }
+
+    Examples
+    --------
+    >>> report = makespan_report([
+    ...     Timing(1, 0.0, 4.0), Timing(2, 0.0, 1.0), Timing(2, 1.0, 2.0)
+    ... ])
+    >>> report['makespan'], report['workers'][2]['idle']
+    (4.0, 2.0)
+    """
+
+    if not timings:
+        return {'makespan': 0.0, 'workers': OrderedDict()}
+
+    start = min(timing.started_at for timing in timings)
+    makespan = max(timing.finished_at for timing in timings) - start
+    workers = OrderedDict()
+
+    for timing in sorted(timings, key=lambda timing: timing.worker):
+        worker = workers.setdefault(timing.worker, {'jobs': 0, 'busy': 0.0})
+        worker['jobs'] += 1
+        worker['busy'] += timing.finished_at - timing.started_at
+
+    for worker in workers.values():
+        worker['idle'] = makespan - worker['busy']
+
+    return {'makespan': makespan, 'workers': workers}
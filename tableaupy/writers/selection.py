@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""This module defines selection of the columns of a datasource
+
+A column is named by its local-name, with or without its enclosing square
+brackets, or by its remote-name, e.g. ``[Order Date]``, ``Order Date`` or
+``ORDER_DATE``.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tableaupy.contenthandlers import TDSContentHandler
+from tableaupy.writers.exceptions import UnknownColumn
+
+
+def _strip_brackets(name):
+    """Name without enclosing square brackets"""
+
+    if name.startswith('[') and name.endswith(']'):
+        return name[1:-1]
+
+    return name
+
+
+def find_column(column_details, name):
+    """Index of column `name`
+
+    Parameters
+    ----------
+    column_details : list
+        see TDSReader.get_datasource_column_details
+    name : str
+        local-name or remote-name of the column
+
+    Returns
+    -------
+    int
+        index of the column
+
+    Raises
+    ------
+    UnknownColumn
+        when no column has this name
+
+    Examples
+    --------
+    >>> details = [
+    ...     {'local-name': '[Day]', 'remote-name': 'DAY'},
+    ...     {'local-name': '[Sales]', 'remote-name': 'SALES'},
+    ... ]
+    >>> find_column(details, 'Sales'), find_column(details, 'DAY')
+    (1, 0)
+    """
+
+    stripped = _strip_brackets(name)
+
+    for index, column in enumerate(column_details):
+        local_name = column.get(TDSContentHandler.K_COL_DEF_LOCAL_NAME)
+        remote_name = column.get(TDSContentHandler.K_COL_DEF_REMOTE_NAME)
+
+        if stripped == remote_name or (
+                local_name is not None and
+                stripped == _strip_brackets(local_name)):
+            return index
+
+    raise UnknownColumn(name)
+
+
+def select_columns(column_details, include=None, exclude=None):
+    """Indexes of the columns selected, in datasource order
+
+    Parameters
+    ----------
+    column_details : list
+        see TDSReader.get_datasource_column_details
+    include : list
+        names of the columns to be selected, every column when None or
+        empty
+    exclude : list
+        names of the columns not to be selected
+
+    Returns
+    -------
+    list
+        indexes of selected columns
+
+    Raises
+    ------
+    UnknownColumn
+        when a name matches no column
+
+    Examples
+    --------
+    >>> details = [{'local-name': '[{}]'.format(name), 'remote-name': name}
+    ...            for name in ['A', 'B', 'C']]
+    >>> select_columns(details, include=['C', 'A'])
+    [0, 2]
+    >>> select_columns(details, exclude=['B'])
+    [0, 2]
+    """
+
+    if include:
+        selected = set(find_column(column_details, name) for name in include)
+    else:
+        selected = set(range(len(column_details)))
+
+    for name in exclude or []:
+        selected.discard(find_column(column_details, name))
+
+    return sorted(selected)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""This module defines tables of a datasource relation joining tables
+
+A relation of type join joins two relations, tables or joins, on the
+equalities of its clause, e.g.::
+
+    <relation join='left' type='join'>
+      <clause type='join'>
+        <expression op='='>
+          <expression op='[orders].[customer]' />
+          <expression op='[customers].[id]' />
+        </expression>
+      </clause>
+      <relation connection='sqlite.a' name='orders' table='[orders]'
+                type='table' />
+      <relation connection='sqlite.b' name='customers'
+                table='[customers]' type='table' />
+    </relation>
+
+and the `parent-name` of every column, ``[orders]`` or ``[customers]``,
+is the name of its table. Columns are referenced as in clauses, by the
+name of their table and their remote-name.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import OrderedDict
+import os
+import re
+
+from tableaupy.contenthandlers import TDSContentHandler
+from tableaupy.writers.exceptions import UnknownTable
+
+#: characters of table names replaced in file names
+_UNSAFE = re.compile(r'[^\w.-]+', re.UNICODE)
+
+
+def relation_tables(relation_tree):
+    """Attributes of every table of `relation_tree`, in datasource order
+
+    Parameters
+    ----------
+    relation_tree : dict
+        see TDSReader.get_datasource_relation_tree
+
+    Examples
+    --------
+    >>> tree = {'attributes': {'type': 'join'}, 'clauses': [], 'relations': [
+    ...     {'attributes': {'name': 'a'}, 'clauses': [], 'relations': []},
+    ...     {'attributes': {'name': 'b'}, 'clauses': [], 'relations': []},
+    ... ]}
+    >>> [table['name'] for table in relation_tables(tree)]
+    ['a', 'b']
+    """
+
+    if not relation_tree:
+        return list()
+
+    if not relation_tree['relations']:
+        return [relation_tree['attributes']]
+
+    return [
+        table
+        for relation in relation_tree['relations']
+        for table in relation_tables(relation)
+    ]
+
+
+def table_name(table):
+    """parent-name of the columns of `table`, its name in square brackets
+
+    Examples
+    --------
+    >>> table_name({'name': 'orders'}), table_name({'name': 'a]b'})
+    ('[orders]', '[a]]b]')
+    """
+
+    return '[{}]'.format(table.get('name', '').replace(']', ']]'))
+
+
+def column_reference(column):
+    """Reference of `column` in join clauses, e.g. ``[orders].[id]``
+
+    Parameters
+    ----------
+    column : dict
+        see TDSReader.get_datasource_column_details
+    """
+
+    return '{}.[{}]'.format(
+        column[TDSContentHandler.K_COL_DEF_PARENT_NAME],
+        (column[TDSContentHandler.K_COL_DEF_REMOTE_NAME] or '').replace(
+            ']', ']]'
+        )
+    )
+
+
+def group_columns(column_details, tables, selected=None):
+    """Indexes of the selected columns of every table, by parent-name
+
+    Parameters
+    ----------
+    column_details : list
+        see TDSReader.get_datasource_column_details
+    tables : list
+        attributes of every table, see relation_tables
+    selected : list
+        indexes of the columns to be grouped, every column when None
+
+    Returns
+    -------
+    OrderedDict
+        list of column indexes by parent-name, in order of `tables`, for
+        tables having a selected column
+
+    Raises
+    ------
+    UnknownTable
+        when a column is not a column of a table of `tables`
+
+    Examples
+    --------
+    >>> details = [{'parent-name': '[b]'}, {'parent-name': '[a]'},
+    ...            {'parent-name': '[b]'}]
+    >>> groups = group_columns(details, [{'name': 'a'}, {'name': 'b'}])
+    >>> list(groups.items())
+    [('[a]', [1]), ('[b]', [0, 2])]
+    """
+
+    groups = OrderedDict((table_name(table), list()) for table in tables)
+
+    if selected is None:
+        selected = range(len(column_details))
+
+    for index in selected:
+        parent_name = column_details[index][
+            TDSContentHandler.K_COL_DEF_PARENT_NAME
+        ]
+
+        if parent_name not in groups:
+            raise UnknownTable(parent_name)
+
+        groups[parent_name].append(index)
+
+    return OrderedDict(
+        (name, indexes) for name, indexes in groups.items() if indexes
+    )
+
+
+def table_path(output_path, table):
+    """Path of the extract of `table`, next to extract `output_path`
+
+    Examples
+    --------
+    >>> table_path('out/sales.tde', {'name': 'Order Items'})
+    'out/sales.Order_Items.tde'
+    """
+
+    root, extension = os.path.splitext(output_path)
+    return '{}.{}{}'.format(
+        root,
+        _UNSAFE.sub('_', table.get('name', '')).strip('.'),
+        extension
+    )
@@ -5,91 +5,333 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from collections import OrderedDict
+import os
+import shutil
+import sys
+import threading
+
+from future.utils import raise_
 from future.utils import raise_with_traceback
-from tableausdk.Exceptions import GetLastErrorMessage
-from tableausdk.Exceptions import TableauException
-from tableausdk.Extract import Extract
-from tableausdk.Extract import ExtractAPI
-from tableausdk.Extract import TableDefinition
-from tableausdk.Types import Collation
-from tableausdk.Types import Type
 
+from tableaupy import memprofile
+from tableaupy._lazy import LazyModule
 from tableaupy.contenthandlers import TDSContentHandler
 from tableaupy.exceptions import UnexpectedNoneValue
 from tableaupy.readers import ReaderException
 from tableaupy.readers import TDSReader
+from tableaupy.rowsources import AggregateSource
+from tableaupy.rowsources import ConnectionPool
+from tableaupy.rowsources import CSVSource
+from tableaupy.rowsources import DBRowSource
+from tableaupy.rowsources import HashSampleSource
+from tableaupy.rowsources import ReservoirSource
+from tableaupy.rowsources import RowSourceException
+from tableaupy.rowsources import SortSource
+from tableaupy.rowsources import SpillSource
+from tableaupy.rowsources import TopSource
+from tableaupy.rowsources import predicates
+from tableaupy.rowsources import values
+from tableaupy.rowsources.aggregate import measure_functions
+from tableaupy.rowsources.aggregate import output_types
+from tableaupy.rowsources.join import HashJoinSource
 from tableaupy.writers.base import Writer
+from tableaupy.writers import refresh
+from tableaupy.writers import selection
+from tableaupy.writers import tables
+from tableaupy.writers.exceptions import MultiTableOption
+from tableaupy.writers.exceptions import OutputPathCollision
+from tableaupy.writers.exceptions import UnknownColumn
+from tableaupy.writers.exceptions import UnsupportedRelation
 from tableaupy.writers.exceptions import WriterException
+from tableaupy.writers.pipeline import InsertPipeline
+from tableaupy.writers.pipeline import ProcessInsertPipeline
+from tableaupy.writers.transport import BatchLayout
+from tableaupy.writers.planner import plan_batch
+
+# tableau sdk is loaded on first use, see TDEWriter._acquire_extract_api
+sdk_exceptions = LazyModule('tableausdk.Exceptions')
+sdk_extract = LazyModule('tableausdk.Extract')
+sdk_types = LazyModule('tableausdk.Types')
+
+
+def _set_date(row, index, value):
+    """Sets datetime.date value"""
+
+    row.setDate(index, value.year, value.month, value.day)
+
+
+def _set_datetime(row, index, value):
+    """Sets datetime.datetime value, fraction is in 1/10000 seconds"""
+
+    row.setDateTime(
+        index,
+        value.year,
+        value.month,
+        value.day,
+        value.hour,
+        value.minute,
+        value.second,
+        value.microsecond // 100
+    )
+
+
+def _set_duration(row, index, value):
+    """Sets datetime.timedelta value, fraction is in 1/10000 seconds"""
+
+    hours, seconds = divmod(value.seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    row.setDuration(
+        index,
+        value.days,
+        hours,
+        minutes,
+        seconds,
+        value.microseconds // 100
+    )
+
+
+#: dict : local-type to function setting a converted value in sdk Row
+_value_setters = {
+    'boolean': lambda row, index, value: row.setBoolean(index, value),
+    'string': lambda row, index, value: row.setCharString(index, value),
+    'date': _set_date,
+    'datetime': _set_datetime,
+    'integer': lambda row, index, value: row.setLongInteger(index, value),
+    'double': lambda row, index, value: row.setDouble(index, value),
+    'duration': _set_duration,
+    'unicode_string': lambda row, index, value: row.setString(index, value),
+}
 
 
 class TDEWriter(Writer):
-    """Writer class for Tableau extract files (\\*.tde)"""
-
-    _collation_map = {
-        'ar': Collation.AR,
-        'binary': Collation.BINARY,
-        'cs': Collation.CS,
-        'cs_ci': Collation.CS_CI,
-        'cs_ci_ai': Collation.CS_CI_AI,
-        'da': Collation.DA,
-        'de': Collation.DE,
-        'el': Collation.EL,
-        'en_gb': Collation.EN_GB,
-        'en_us': Collation.EN_US,
-        'en_us_ci': Collation.EN_US_CI,
-        'es': Collation.ES,
-        'es_ci_ai': Collation.ES_CI_AI,
-        'et': Collation.ET,
-        'fi': Collation.FI,
-        'fr_ca': Collation.FR_CA,
-        'fr_fr': Collation.FR_FR,
-        'fr_fr_ci_ai': Collation.FR_FR_CI_AI,
-        'he': Collation.HE,
-        'hu': Collation.HU,
-        'is': Collation.IS,
-        'it': Collation.IT,
-        'ja': Collation.JA,
-        'ja_jis': Collation.JA_JIS,
-        'ko': Collation.KO,
-        'lt': Collation.LT,
-        'lv': Collation.LV,
-        'nl_nl': Collation.NL_NL,
-        'nn': Collation.NN,
-        'pl': Collation.PL,
-        'pt_br': Collation.PT_BR,
-        'pt_br_ci_ai': Collation.PT_BR_CI_AI,
-        'pt_pt': Collation.PT_PT,
-        'root': Collation.ROOT,
-        'ru': Collation.RU,
-        'sl': Collation.SL,
-        'sv_fi': Collation.SV_FI,
-        'sv_se': Collation.SV_SE,
-        'tr': Collation.TR,
-        'uk': Collation.UK,
-        'vi': Collation.VI,
-        'zh_hans_cn': Collation.ZH_HANS_CN,
-        'zh_hant_tw': Collation.ZH_HANT_TW,
-    }
+    """Writer class for Tableau extract files (\\*.tde)
+
+    Tableau SDK is imported and `ExtractAPI` is initialized only when the
+    first extract is generated, not when the writer is created.
+    """
+
+    _collation_names = (
+        'ar',
+        'binary',
+        'cs',
+        'cs_ci',
+        'cs_ci_ai',
+        'da',
+        'de',
+        'el',
+        'en_gb',
+        'en_us',
+        'en_us_ci',
+        'es',
+        'es_ci_ai',
+        'et',
+        'fi',
+        'fr_ca',
+        'fr_fr',
+        'fr_fr_ci_ai',
+        'he',
+        'hu',
+        'is',
+        'it',
+        'ja',
+        'ja_jis',
+        'ko',
+        'lt',
+        'lv',
+        'nl_nl',
+        'nn',
+        'pl',
+        'pt_br',
+        'pt_br_ci_ai',
+        'pt_pt',
+        'root',
+        'ru',
+        'sl',
+        'sv_fi',
+        'sv_se',
+        'tr',
+        'uk',
+        'vi',
+        'zh_hans_cn',
+        'zh_hant_tw',
+    )
 
-    _type_map = {
-        'boolean': Type.BOOLEAN,
-        'string': Type.CHAR_STRING,
-        'date': Type.DATE,
-        'datetime': Type.DATETIME,
-        'integer': Type.INTEGER,
-        'double': Type.DOUBLE,
-        'duration': Type.DURATION,
-        'unicode_string': Type.UNICODE_STRING,
+    _type_names = {
+        'boolean': 'BOOLEAN',
+        'string': 'CHAR_STRING',
+        'date': 'DATE',
+        'datetime': 'DATETIME',
+        'integer': 'INTEGER',
+        'double': 'DOUBLE',
+        'duration': 'DURATION',
+        'unicode_string': 'UNICODE_STRING',
     }
 
+    #: dict : collation name to sdk Collation, built on first use
+    _collation_map = None
+
+    #: dict : local-type to sdk Type, built on first use
+    _type_map = None
+
+    #: int : count of writers holding an initialized ExtractAPI
+    _extract_api_users = 0
+    _extract_api_lock = threading.Lock()
+
     def __init__(self, options=None):
         super(TDEWriter, self).__init__('.tde', options)
-        ExtractAPI.initialize()
+        self._extract_api_acquired = False
+
+        #: set : output directories cleaned of stale temporary files
+        self._cleaned_dirs = set()
+
+        #: ConnectionPool : connections shared by datasources of a database
+        self._connection_pool = ConnectionPool()
+
+        #: dict : stage metrics of insert pipelines, summed over extracts
+        self._pipeline_metrics = dict()
+        self._pipeline_metrics_lock = threading.Lock()
 
     def __del__(self):
-        ExtractAPI.cleanup()
+        self._release_extract_api()
+
+    @property
+    def connection_pool(self):
+        """connection pool used to fetch rows of datasources"""
+
+        return self._connection_pool
+
+    @property
+    def pipeline_metrics(self):
+        """Metrics of fetching rows, summed over generated extracts
+
+        Returns
+        -------
+        dict
+            see InsertPipeline.metrics, empty if no rows were fetched
+        """
+
+        metrics = dict(
+            (stage, dict(stage_metrics))
+            for stage, stage_metrics in self._pipeline_metrics.items()
+            if stage != 'elapsed'
+        )
+        elapsed = self._pipeline_metrics.get('elapsed', 0.0)
+
+        for stage_metrics in metrics.values():
+            stage_metrics['utilization'] = (
+                stage_metrics['busy'] / elapsed if elapsed else 0.0
+            )
+
+        if metrics:
+            metrics['elapsed'] = elapsed
+
+        return metrics
+
+    def _record_pipeline_metrics(self, metrics):
+        """Adds metrics of an insert pipeline run to pipeline_metrics"""
+
+        # tables of a datasource are inserted by a thread each
+        with self._pipeline_metrics_lock:
+            self._pipeline_metrics['elapsed'] = (
+                self._pipeline_metrics.get('elapsed', 0.0) +
+                metrics['elapsed']
+            )
+
+            for stage, stage_metrics in metrics.items():
+                if stage == 'elapsed':
+                    continue
+
+                totals = self._pipeline_metrics.setdefault(stage, dict())
+
+                for name, value in stage_metrics.items():
+                    if name != 'utilization':
+                        totals[name] = totals.get(name, 0) + value
+
+    def warm_up(self):
+        """Initializes ExtractAPI ahead of the first extract
+
+        Long running processes call this once at start so that the first
+        extract does not pay for loading tableau sdk.
+        """
 
-    def _define_table(self, tds_reader, collation):
+        self._acquire_extract_api()
+
+    def _acquire_extract_api(self):
+        """Initializes ExtractAPI for the process on first use
+
+        ExtractAPI is shared by every writer of the process, it is
+        initialized by the first writer generating an extract and cleaned up
+        when the last such writer is deleted.
+        """
+
+        if self._extract_api_acquired:
+            return
+
+        with TDEWriter._extract_api_lock:
+            if TDEWriter._extract_api_users == 0:
+                sdk_extract.ExtractAPI.initialize()
+
+            TDEWriter._extract_api_users += 1
+            self._extract_api_acquired = True
+
+    def _release_extract_api(self):
+        """Cleans up ExtractAPI if this is the last writer using it"""
+
+        if not getattr(self, '_extract_api_acquired', False):
+            return
+
+        with TDEWriter._extract_api_lock:
+            TDEWriter._extract_api_users -= 1
+            self._extract_api_acquired = False
+
+            if TDEWriter._extract_api_users == 0:
+                sdk_extract.ExtractAPI.cleanup()
+
+    def _cleanup_output_dir(self, output_dir):
+        """Removes stale temporary extracts once per output directory"""
+
+        if output_dir in self._cleaned_dirs:
+            return
+
+        self.cleanup_temp_files(output_dir)
+        self._cleaned_dirs.add(output_dir)
+
+    @classmethod
+    def _get_collation(cls, collation):
+        """Returns sdk Collation for collation name
+
+        Raises
+        ------
+        KeyError
+            when collation is not a valid collation name
+        """
+
+        if cls._collation_map is None:
+            cls._collation_map = {
+                name: getattr(sdk_types.Collation, name.upper())
+                for name in cls._collation_names
+            }
+
+        return cls._collation_map[collation]
+
+    @classmethod
+    def _get_type(cls, local_type):
+        """Returns sdk Type for local-type, Type.UNICODE_STRING by default"""
+
+        if cls._type_map is None:
+            cls._type_map = {
+                name: getattr(sdk_types.Type, type_name)
+                for name, type_name in cls._type_names.items()
+            }
+
+        return cls._type_map.get(local_type, cls._type_map['unicode_string'])
+
+    def _define_table(self,
+                      tds_reader,
+                      collation,
+                      selected=None,
+                      local_types=None):
         """Returns TableDefinition object from parsed metadata-records
 
         The method uses Tableau Extract module to create Table Definition
@@ -101,6 +343,11 @@ class TDEWriter(Writer):
             containing parsed information from a tableau datasource file
         collation: Collation
             collation to be used for all columns of the table
+        selected: list
+            indexes of the columns to be defined, every column when None
+        local_types: list
+            local-type of every defined column, instead of the local-type
+            of its column definition
 
         Returns
         -------
@@ -122,62 +369,1031 @@ class TDEWriter(Writer):
             * when a KeyError is occurred while fetching data
         """
 
-        table_definition = TableDefinition()
         column_definitions = tds_reader.get_datasource_column_defs()
+        position = 0
 
-        table_definition.setDefaultCollation(collation)
+        with memprofile.phase('table definition'):
+            table_definition = sdk_extract.TableDefinition()
+            table_definition.setDefaultCollation(collation)
 
-        for i, col_def in enumerate(column_definitions, start=1):
-            try:
-                [parent_name, local_name, local_type] = [
-                    col_def.get(TDSContentHandler.K_COL_DEF_PARENT_NAME),
-                    col_def.get(TDSContentHandler.K_COL_DEF_LOCAL_NAME),
-                    col_def.get(TDSContentHandler.K_COL_DEF_LOCAL_TYPE),
-                ]
+            for i, col_def in enumerate(column_definitions, start=1):
+                if selected is not None and i - 1 not in selected:
+                    continue
 
-                if parent_name is None:
-                    raise UnexpectedNoneValue(
-                        TDSContentHandler.K_COL_DEF_PARENT_NAME
-                    )
+                try:
+                    [parent_name, local_name, local_type] = [
+                        col_def.get(TDSContentHandler.K_COL_DEF_PARENT_NAME),
+                        col_def.get(TDSContentHandler.K_COL_DEF_LOCAL_NAME),
+                        col_def.get(TDSContentHandler.K_COL_DEF_LOCAL_TYPE),
+                    ]
+
+                    if parent_name is None:
+                        raise UnexpectedNoneValue(
+                            TDSContentHandler.K_COL_DEF_PARENT_NAME
+                        )
+
+                    if local_name is None:
+                        raise UnexpectedNoneValue(
+                            TDSContentHandler.K_COL_DEF_LOCAL_NAME
+                        )
+
+                    if local_types is not None:
+                        local_type = local_types[position]
+
+                    column_name = '{}.{}'.format(parent_name, local_name)
+                    column_type = self._get_type(local_type)
+                    position += 1
+
+                    table_definition.addColumn(column_name, column_type)
+                except (UnexpectedNoneValue, KeyError) as err:
+                    err.args += (i, col_def)
+                    raise_with_traceback(WriterException(err))
+
+        return table_definition
+
+    @classmethod
+    def _local_types(cls, tds_reader, selected=None):
+        """local-type of selected columns, unknown types as unicode_string"""
+
+        local_types = [
+            column[TDSContentHandler.K_COL_DEF_LOCAL_TYPE]
+            for column in tds_reader.get_datasource_column_details()
+        ]
+
+        if selected is not None:
+            local_types = [local_types[index] for index in selected]
+
+        return [
+            local_type if local_type in cls._type_names else 'unicode_string'
+            for local_type in local_types
+        ]
+
+    def _insert_rows(self,
+                     table,
+                     table_definition,
+                     local_types,
+                     row_source,
+                     queue_size=4,
+                     increment_index=None,
+                     keep=None,
+                     fetch_process=False,
+                     batch_size=1000,
+                     sdk_lock=None):
+        """Inserts rows of `row_source` into extract `table`
+
+        Rows are fetched and converted while previous ones are inserted,
+        see InsertPipeline, in a forked process if `fetch_process` is True
+        and processes can be forked, see ProcessInsertPipeline.
+
+        Parameters
+        ----------
+        table : Table
+            extract table
+        table_definition : TableDefinition
+            definition of `table`
+        local_types : list
+            local-type of every column, in row order
+        row_source : RowSource
+            rows with a value per column of `table`
+        queue_size : int
+            batches buffered between pipeline stages (default: 4)
+        increment_index : int
+            index of the increment key column, if any
+        keep : callable
+            called with every converted row, False for rows not to be
+            inserted, every row is inserted when None
+        fetch_process : bool
+            fetches and converts rows in a forked process if True
+        batch_size : int
+            rows per batch sent by the fetch process (default: 1000)
+        sdk_lock : threading.Lock
+            held while calling tableau sdk, when rows are inserted into
+            several extracts by several threads
+
+        Returns
+        -------
+        tuple
+            (number of rows inserted, greatest increment key value
+            inserted or None)
+
+        Raises
+        ------
+        RowSourceException
+            when rows can not be read or converted
+        """
+
+        setters = [_value_setters[local_type] for local_type in local_types]
+        columns = list(enumerate(setters))
+        row = sdk_extract.Row(table_definition)
+        high_water = [None]
+
+        def _insert(converted):
+            """Inserts a converted row"""
+
+            if increment_index is not None:
+                key = converted[increment_index]
+
+                if key is not None and (
+                        high_water[0] is None or key > high_water[0]):
+                    high_water[0] = key
+
+            for index, set_value in columns:
+                value = converted[index]
+
+                if value is None:
+                    row.setNull(index)
+                else:
+                    set_value(row, index, value)
+
+            table.insert(row)
+
+        insert = _insert
+
+        if sdk_lock is not None:
+            def insert(converted):
+                """Inserts a converted row holding sdk_lock"""
+
+                with sdk_lock:
+                    _insert(converted)
+
+        if fetch_process and ProcessInsertPipeline.supported():
+            pipeline = ProcessInsertPipeline(
+                row_source,
+                values.converter(local_types),
+                insert,
+                BatchLayout([
+                    self._type_names.get(local_type, 'UNICODE_STRING')
+                    for local_type in local_types
+                ]),
+                queue_size=queue_size,
+                keep=keep,
+                batch_size=batch_size
+            )
+        else:
+            pipeline = InsertPipeline(
+                row_source,
+                values.converter(local_types),
+                insert,
+                queue_size=queue_size,
+                keep=keep
+            )
+
+        try:
+            return pipeline.run(), high_water[0]
+        finally:
+            row.close()
+            self._record_pipeline_metrics(pipeline.metrics)
+
+    @staticmethod
+    def _same_columns(table_definition, other):
+        """True if both table definitions have the same columns"""
+
+        count = table_definition.getColumnCount()
+
+        if count != other.getColumnCount():
+            return False
+
+        return all(
+            table_definition.getColumnName(index) ==
+            other.getColumnName(index) and
+            table_definition.getColumnType(index) ==
+            other.getColumnType(index)
+            for index in range(count)
+        )
+
+    def _open_table(self, output_path, temp_path, table_definition, append):
+        """Opens the extract table rows are written to
+
+        When appending, existing extract is copied to `temp_path` and its
+        table is opened, unless its columns are not the ones of
+        `table_definition`, then a new extract is created instead.
+
+        Returns
+        -------
+        tuple
+            (Extract, Table, True if appending to existing rows)
+        """
+
+        if append:
+            shutil.copyfile(output_path, temp_path)
+            extract = sdk_extract.Extract(temp_path)
+
+            if extract.hasTable('Extract'):
+                table = extract.openTable('Extract')
+
+                if self._same_columns(
+                        table.getTableDefinition(), table_definition):
+                    return extract, table, True
+
+            extract.close()
+            self.discard_file(temp_path)
+
+        extract = sdk_extract.Extract(temp_path)
+        table = extract.addTable('Extract', tableDefinition=table_definition)
+        return extract, table, False
+
+    def _filters(self, tds_reader, where, indexes=None, qualified=False):
+        """(column, operator, value) conditions of predicates `where`
+
+        Columns are named by their remote-name, or by their reference in
+        join clauses if `qualified`, see tables.column_reference. Values
+        are converted to the local-type of their column. Only predicates
+        on columns of `indexes` are kept, when given.
+
+        Raises
+        ------
+        UnknownColumn
+            when a predicate column is not a column of the datasource
+        UnexpectedNoneValue
+            when a predicate column has no remote-name
+        ValueConversionError
+            when a value can not be converted to its column local-type
+        """
+
+        column_details = tds_reader.get_datasource_column_details()
+        local_types = self._local_types(tds_reader)
+        filters = list()
+
+        for predicate in where:
+            index = selection.find_column(column_details, predicate.column)
+
+            if indexes is not None and index not in indexes:
+                continue
+
+            remote_name = column_details[index][
+                TDSContentHandler.K_COL_DEF_REMOTE_NAME
+            ]
+
+            if remote_name is None:
+                raise UnexpectedNoneValue(
+                    TDSContentHandler.K_COL_DEF_REMOTE_NAME
+                )
+
+            filters.append((
+                tables.column_reference(column_details[index])
+                if qualified else remote_name,
+                predicate.operator,
+                values.coerce(local_types[index], predicate.value)
+            ))
+
+        return filters
+
+    @staticmethod
+    def _sort_keys(tds_reader, selected, sort_by):
+        """(position, descending) of sort columns among selected columns
+
+        Raises
+        ------
+        UnknownColumn
+            when a sort column is not a selected column
+        """
+
+        column_details = tds_reader.get_datasource_column_details()
+        column_details = [column_details[index] for index in selected]
+        keys = list()
+
+        for key in sort_by:
+            name, descending = key if isinstance(key, tuple) else (key, False)
+            keys.append(
+                (selection.find_column(column_details, name), descending)
+            )
+
+        return keys
+
+    def _row_source(self, tds_reader, batch_size, selected, parse_processes):
+        """Row source of the datasource, by its connection class
+
+        Tables of a relation joining tables are joined, see _join_source.
+        """
+
+        if len(tables.relation_tables(
+                tds_reader.get_datasource_relation_tree())) > 1:
+            return self._join_source(
+                tds_reader,
+                batch_size,
+                selected,
+                parse_processes
+            )
+
+        connection = tds_reader.get_datasource_metadata()['connection']
+
+        if connection.get('class') == 'textscan':
+            return CSVSource.from_reader(
+                tds_reader,
+                batch_size=batch_size,
+                selected=selected,
+                processes=parse_processes
+            )
+
+        return DBRowSource.from_reader(
+            tds_reader,
+            pool=self._connection_pool,
+            batch_size=batch_size,
+            selected=selected
+        )
+
+    def _table_source(self,
+                      tds_reader,
+                      table,
+                      indexes,
+                      batch_size,
+                      parse_processes):
+        """Row source of columns `indexes` of a table of the relation
+
+        Rows are read from the connection named by the table, the csv
+        file named by the table for textscan connections.
+
+        Parameters
+        ----------
+        tds_reader : TDSReader
+            reader which has read a datasource
+        table : dict
+            attributes of the table, see tables.relation_tables
+        indexes : list
+            indexes of the columns read, columns of the table
+        batch_size : int
+            rows per batch
+        parse_processes : int
+            processes parsing a csv file, cpu count when None
+
+        Raises
+        ------
+        UnexpectedNoneValue
+            * when table has no table name
+            * when a column has no remote-name
+        """
+
+        connection = tds_reader.get_datasource_connections().get(
+            table.get('connection'),
+            tds_reader.get_datasource_metadata()['connection']
+        )
+        details = tds_reader.get_datasource_column_details()
+        columns = list()
+
+        for index in indexes:
+            remote_name = details[index][
+                TDSContentHandler.K_COL_DEF_REMOTE_NAME
+            ]
+
+            if remote_name is None:
+                raise UnexpectedNoneValue(
+                    TDSContentHandler.K_COL_DEF_REMOTE_NAME
+                )
+
+            columns.append(remote_name)
 
-                if local_name is None:
-                    raise UnexpectedNoneValue(
-                        TDSContentHandler.K_COL_DEF_LOCAL_NAME
+        if connection.get('class') == 'textscan':
+            header = connection.get('header', 'yes').lower() in (
+                'yes', 'true'
+            )
+            # without header, columns are in order of the table columns
+            parent_name = tables.table_name(table)
+            positions = [
+                index for index, column in enumerate(details)
+                if column[TDSContentHandler.K_COL_DEF_PARENT_NAME] ==
+                parent_name
+            ]
+
+            return CSVSource(
+                os.path.join(
+                    connection.get('directory', ''),
+                    table.get('name', '')
+                ),
+                columns,
+                [
+                    details[index][TDSContentHandler.K_COL_DEF_LOCAL_TYPE]
+                    for index in indexes
+                ],
+                positions=None if header else [
+                    positions.index(index) for index in indexes
+                ],
+                header=header,
+                separator=connection.get('separator', ','),
+                encoding=connection.get('character-set', 'utf-8'),
+                batch_size=batch_size,
+                processes=parse_processes
+            )
+
+        if table.get('table') is None:
+            raise UnexpectedNoneValue('relation table')
+
+        return DBRowSource(
+            connection,
+            table['table'],
+            columns,
+            pool=self._connection_pool,
+            batch_size=batch_size
+        )
+
+    @staticmethod
+    def _clause_references(relation_tree):
+        """Column references of every join clause of `relation_tree`"""
+
+        references = set()
+
+        for left, right in relation_tree.get('clauses', []):
+            references.update((left, right))
+
+        for relation in relation_tree.get('relations', []):
+            references.update(TDEWriter._clause_references(relation))
+
+        return references
+
+    def _join_source(self, tds_reader, batch_size, selected, parse_processes):
+        """Row source of the tables of the relation, joined in memory
+
+        Every table reads its selected columns and the columns of join
+        clauses, then joins are performed locally by hash joins, see
+        HashJoinSource. Hash tables of every join are built at once, by a
+        thread each, while the first rows of the first table are read.
+        Row source columns are named by their reference in join clauses,
+        see tables.column_reference.
+
+        Raises
+        ------
+        UnknownTable
+            when a column is not a column of a table of the relation
+        UnknownColumn
+            when a column of a join clause is not a column of the tables
+            it joins
+        UnsupportedRelation
+            when a relation is neither a table nor a join of 2 relations
+            on equal columns
+        """
+
+        relation_tree = tds_reader.get_datasource_relation_tree()
+        details = tds_reader.get_datasource_column_details()
+        references = [tables.column_reference(column) for column in details]
+        keys = self._clause_references(relation_tree)
+
+        if selected is None:
+            selected = list(range(len(details)))
+
+        read = set(selected).union(
+            index for index, reference in enumerate(references)
+            if reference in keys
+        )
+        reads = tables.group_columns(
+            details,
+            tables.relation_tables(relation_tree),
+            sorted(read)
+        )
+
+        def _source(relation_tree, output=None):
+            """(row source, column references) of `relation_tree`"""
+
+            attributes = relation_tree['attributes']
+            relations = relation_tree['relations']
+
+            if not relations:
+                indexes = reads.get(tables.table_name(attributes), [])
+                return self._table_source(
+                    tds_reader,
+                    attributes,
+                    indexes,
+                    batch_size,
+                    parse_processes
+                ), [references[index] for index in indexes]
+
+            how = attributes.get('join', 'inner')
+
+            if attributes.get('type') != 'join' or len(relations) != 2:
+                raise UnsupportedRelation(
+                    attributes.get('type'),
+                    'expected a join of 2 relations'
+                )
+
+            if how not in ('inner', 'left', 'right', 'full'):
+                raise UnsupportedRelation(how, 'unknown join type')
+
+            left, left_names = _source(relations[0])
+            right, right_names = _source(relations[1])
+            positions = list()
+
+            for first, second in relation_tree['clauses']:
+                if first in right_names and second in left_names:
+                    first, second = second, first
+
+                for reference, names in ((first, left_names),
+                                         (second, right_names)):
+                    if reference not in names:
+                        raise UnknownColumn(reference)
+
+                positions.append(
+                    (left_names.index(first), right_names.index(second))
+                )
+
+            if not positions:
+                raise UnsupportedRelation(
+                    how,
+                    'join clause has no equality of columns'
+                )
+
+            names = left_names + right_names
+
+            return HashJoinSource(
+                left,
+                right,
+                positions,
+                how=how,
+                columns=names,
+                output=None if output is None else [
+                    names.index(reference) for reference in output
+                ],
+                batch_size=batch_size
+            ), names
+
+        return _source(
+            relation_tree,
+            [references[index] for index in selected]
+        )[0]
+
+    @staticmethod
+    def _row_matcher(row_source, filters):
+        """Matcher of `filters` the row source does not apply, or None
+
+        Raises
+        ------
+        UnknownColumn
+            when a filter column is not read by the source
+        """
+
+        remaining = row_source.push_filters(filters)
+
+        if not remaining:
+            return None
+
+        positions = dict(
+            (column, position)
+            for position, column in enumerate(row_source.columns)
+        )
+        conditions = list()
+
+        for column, comparison, value in remaining:
+            if column not in positions:
+                raise UnknownColumn(column)
+
+            conditions.append((positions[column], comparison, value))
+
+        return predicates.matcher(conditions)
+
+    def _write_table(self,
+                     tds_reader,
+                     job,
+                     fetch_rows,
+                     batch_size,
+                     queue_size,
+                     buffer_memory,
+                     parse_processes):
+        """Writes the extract of a table of `job`, see _generate_tables"""
+
+        table, indexes, filters, table_definition, temp_path, sdk_lock = job
+        local_types = self._local_types(tds_reader, indexes)
+
+        with sdk_lock:
+            new_extract, extract_table, _ = self._open_table(
+                None,
+                temp_path,
+                table_definition,
+                append=False
+            )
+
+        try:
+            if fetch_rows:
+                row_source = self._table_source(
+                    tds_reader,
+                    table,
+                    indexes,
+                    batch_size,
+                    parse_processes
+                )
+
+                if buffer_memory is not None:
+                    row_source = SpillSource(
+                        row_source,
+                        memory_budget=buffer_memory
                     )
 
-                column_name = '{}.{}'.format(parent_name, local_name)
-                column_type = self._type_map.get(
-                    local_type,
-                    self._type_map['unicode_string']
+                self._insert_rows(
+                    extract_table,
+                    table_definition,
+                    local_types,
+                    row_source,
+                    queue_size=queue_size,
+                    keep=self._row_matcher(row_source, filters),
+                    batch_size=batch_size,
+                    sdk_lock=sdk_lock
                 )
+        finally:
+            with sdk_lock:
+                new_extract.close()
 
-                table_definition.addColumn(column_name, column_type)
-            except (UnexpectedNoneValue, KeyError) as err:
-                err.args += (i, col_def)
-                raise_with_traceback(WriterException(err))
+    def _generate_tables(self,
+                         tds_reader,
+                         relation_tables,
+                         output_path,
+                         collation,
+                         selected,
+                         where,
+                         fetch_rows,
+                         batch_size,
+                         queue_size,
+                         buffer_memory,
+                         parse_processes):
+        """Generates an extract per table of a relation joining tables
 
-        return table_definition
+        Tableau SDK extracts hold a single table, named 'Extract', the
+        selected columns of every table, grouped by parent-name, are so
+        written to an extract of their own, next to `output_path`, see
+        tables.table_path. Extracts are written at once, by a thread
+        each, fetching rows in threads, and replace existing extracts
+        only once every extract is written. Tableau sdk is called by one
+        thread at a time. Predicates of `where` filter rows of the table
+        of their column.
+
+        Returns
+        -------
+        int
+            number of columns defined in every extract
+
+        Raises
+        ------
+        OutputPathCollision
+            when the extracts of several tables have the same path, e.g.
+            tables 'a b' and 'a_b'
+        MultiTableOption
+            when a predicate is on a column of a table having no selected
+            column, whose rows are not written
+        """
+
+        details = tds_reader.get_datasource_column_details()
+        groups = tables.group_columns(details, relation_tables, selected)
+        collation = self._get_collation(collation)
+        sdk_lock = threading.Lock()
+        jobs = list()
+        paths = list()
+        names_by_path = OrderedDict()
+
+        for table, path in self._table_paths(
+                relation_tables, groups, output_path):
+            name = tables.table_name(table)
+            names_by_path.setdefault(os.path.normcase(path), list()).append(
+                table.get('name', '')
+            )
+            paths.append(path)
+            jobs.append((
+                table,
+                groups[name],
+                self._filters(tds_reader, where, indexes=[
+                    index for index, column in enumerate(details)
+                    if column[TDSContentHandler.K_COL_DEF_PARENT_NAME] ==
+                    name
+                ]),
+            ))
+
+        # table names differing in unsafe characters only share a path
+        for path, names in names_by_path.items():
+            if len(names) > 1:
+                raise OutputPathCollision(path, names)
+
+        for predicate in where:
+            index = selection.find_column(details, predicate.column)
+
+            if details[index][TDSContentHandler.K_COL_DEF_PARENT_NAME] \
+                    not in groups:
+                raise MultiTableOption('where')
+
+        for path in paths:
+            self.check_file_writable(path)
+
+        self._cleanup_output_dir(os.path.dirname(output_path))
+        self._acquire_extract_api()
+        temp_paths = [self.get_temp_path(path) for path in paths]
+        table_definitions = list()
+        errors = list()
+
+        def _write(job):
+            """Writes the extract of a table, keeping errors raised"""
+
+            try:
+                self._write_table(
+                    tds_reader,
+                    job,
+                    fetch_rows,
+                    batch_size,
+                    queue_size,
+                    buffer_memory,
+                    parse_processes
+                )
+            except Exception:  # pylint: disable=broad-except
+                errors.append(sys.exc_info())
+
+        try:
+            for table, indexes, _ in jobs:
+                table_definitions.append(self._define_table(
+                    tds_reader,
+                    collation,
+                    indexes,
+                    self._local_types(tds_reader, indexes)
+                ))
+
+            threads = [
+                threading.Thread(
+                    target=_write,
+                    args=(job + (table_definition, temp_path, sdk_lock),),
+                    name='extract-table'
+                )
+                for job, table_definition, temp_path in zip(
+                    jobs,
+                    table_definitions,
+                    temp_paths
+                )
+            ]
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            if errors:
+                raise_(*errors[0])
+
+            for temp_path, path in zip(temp_paths, paths):
+                self.commit_file(temp_path, path)
+
+            return sum(
+                table_definition.getColumnCount()
+                for table_definition in table_definitions
+            )
+        finally:
+            for table_definition in table_definitions:
+                table_definition.close()
+
+            for temp_path in temp_paths:
+                self.discard_file(temp_path)
+
+    @staticmethod
+    def _table_paths(relation_tables, groups, output_path):
+        """(table, extract path) of tables having columns in `groups`"""
+
+        return [
+            (table, tables.table_path(output_path, table))
+            for table in relation_tables
+            if tables.table_name(table) in groups
+        ]
+
+    def get_output_paths(self,
+                         tds_file_name,
+                         output_path=None,
+                         include_columns=None,
+                         exclude_columns=None,
+                         denormalize=False):
+        """Paths of the extracts generated from a tableau datasource file
+
+        Parameters
+        ----------
+        tds_file_name : str
+            tableau datasource file name / path
+        output_path : str
+            absolute path to output file, computed from tds_file_name when
+            None (default: None)
+        include_columns : list
+            see generate_from_tds
+        exclude_columns : list
+            see generate_from_tds
+        denormalize : bool
+            see generate_from_tds
+
+        Returns
+        -------
+        list
+            path of the extract of every table of a datasource joining
+            tables, unless denormalized, see _generate_tables, else
+            output_path alone, as when the datasource can not be read and
+            generate_from_tds fails
+        """
+
+        if output_path is None:
+            output_path = self.get_output_path(tds_file_name)
+
+        if denormalize:
+            return [output_path]
+
+        try:
+            tds_reader = TDSReader()
+            tds_reader.read(tds_file_name)
+            relation_tables = tables.relation_tables(
+                tds_reader.get_datasource_relation_tree()
+            )
+
+            if len(relation_tables) < 2:
+                return [output_path]
+
+            details = tds_reader.get_datasource_column_details()
+            groups = tables.group_columns(
+                details,
+                relation_tables,
+                selection.select_columns(
+                    details,
+                    include_columns,
+                    exclude_columns
+                )
+            )
+        except (ReaderException, UnexpectedNoneValue, WriterException):
+            return [output_path]
+
+        return [
+            path for _, path in self._table_paths(
+                relation_tables, groups, output_path
+            )
+        ]
+
+    def plan(self,
+             tds_file_names,
+             skip=None,
+             journaled=None,
+             include_columns=None,
+             exclude_columns=None,
+             denormalize=False):
+        """Plans output paths of a batch of tableau datasource files
+
+        Every extract of a datasource joining tables is planned, see
+        get_output_paths.
+
+        Parameters
+        ----------
+        tds_file_names : list
+            tableau datasource file names / paths
+        skip : set
+            absolute paths of files to be left out of the plan
+        journaled : set
+            absolute paths of files having a journal record when resuming,
+            see planner.plan_batch
+        include_columns : list
+            see generate_from_tds
+        exclude_columns : list
+            see generate_from_tds
+        denormalize : bool
+            see generate_from_tds
+
+        Returns
+        -------
+        Plan
+            see planner.plan_batch
+        """
+
+        def _output_paths(tds_file_name, output_path):
+            return self.get_output_paths(
+                tds_file_name,
+                output_path,
+                include_columns,
+                exclude_columns,
+                denormalize
+            )
+
+        return plan_batch(
+            self,
+            tds_file_names,
+            '.tds',
+            skip=skip,
+            journaled=journaled,
+            output_paths=_output_paths
+        )
 
     def generate_from_tds(self,
                           tds_file_name,
-                          collation='en_us_ci'):
+                          collation='en_us_ci',
+                          output_path=None,
+                          fetch_rows=False,
+                          batch_size=1000,
+                          queue_size=4,
+                          include_columns=None,
+                          exclude_columns=None,
+                          where=None,
+                          aggregate=False,
+                          aggregate_memory=256 << 20,
+                          sort_by=None,
+                          sort_memory=256 << 20,
+                          sample_rows=None,
+                          sample_percent=None,
+                          sample_seed=None,
+                          top_rows=None,
+                          top_by=None,
+                          fetch_process=False,
+                          buffer_memory=None,
+                          parse_processes=None,
+                          denormalize=False):
         """Generates a tableau extract file from tableau datasource file
 
         Default behaviour is to place the files in the same folder as the tds
         files unless output_dir is specified
 
+        The extract is written to a temporary file in the output directory
+        and renamed into place when complete, an existing extract stays
+        readable until it is replaced.
+
         Parameters
         ----------
         tds_file_name: str
             tableau datasource file name / path
         collation: str
             default column collation (default: "en_us_ci")
+        output_path: str
+            absolute path to output file, computed from tds_file_name when
+            None (default: None), see plan
+        fetch_rows: bool
+            fills the extract with rows of the datasource relation, read
+            from its connection, if True (default: False), see DBRowSource.
+            An existing extract of a datasource refreshed incrementally is
+            appended the rows above its high-water mark, see refresh
+        batch_size: int
+            rows fetched at once when fetching rows (default: 1000)
+        queue_size: int
+            batches fetched and converted ahead of insertion when fetching
+            rows (default: 4)
+        include_columns: list
+            names of the only columns of the extract, every column when
+            None (default: None), see selection
+        exclude_columns: list
+            names of the columns left out of the extract (default: None)
+        where: list
+            predicates rows fetched must all meet (default: None), pushed
+            to the row source, see predicates.Predicate
+        aggregate: bool
+            groups rows fetched on their dimensions and aggregates their
+            measures, as hinted by column aggregations, if True
+            (default: False), see AggregateSource. Extracts of aggregated
+            rows are always rebuilt, never refreshed incrementally
+        aggregate_memory: int
+            bytes of groups held in memory when aggregating, beyond which
+            groups are spilled to disk (default: 256 MB)
+        sort_by: list
+            names of the columns rows fetched are sorted on, or
+            (name, descending) pairs (default: None), see SortSource
+        sort_memory: int
+            bytes of rows held in memory when sorting, beyond which rows
+            are spilled to disk (default: 256 MB)
+        sample_rows: int
+            number of rows fetched sampled uniformly (default: None), see
+            ReservoirSource
+        sample_percent: float
+            percentage of rows fetched sampled deterministically
+            (default: None), see HashSampleSource
+        sample_seed: int
+            seed of sample_rows sample (default: None)
+        top_rows: int
+            number of first rows fetched in order of top_by columns
+            (default: None), see TopSource
+        top_by: list
+            names of the columns ordering top_rows, or (name, descending)
+            pairs
+        fetch_process: bool
+            fetches and converts rows in a forked process, sending them
+            through shared memory, if True (default: False), see
+            ProcessInsertPipeline. Rows are fetched in threads where
+            processes can not be forked, e.g. by WriterPool workers
+        buffer_memory: int
+            bytes of fetched rows buffered ahead of insertion before they
+            are spilled to disk, so that rows are fetched and connections
+            released whatever the pace of insertion (default: None), see
+            SpillSource. Rows are fetched only as fast as they are inserted
+            when None
+        parse_processes: int
+            processes parsing the csv file of a textscan datasource, cpu
+            count when None (default: None), see CSVSource
+        denormalize: bool
+            joins the tables of a relation joining tables into the single
+            table of the extract, by hash joins held in memory (default:
+            False), see HashJoinSource. Otherwise the columns of every
+            table are written to an extract of their own, where rows are
+            neither sampled, aggregated nor sorted, see _generate_tables
+
+        Samples are taken in turn, by percentage, by number, then top rows,
+        before rows are aggregated or sorted.
+
+        Returns
+        -------
+        int
+            number of columns defined in the extract
 
         Raises
         ------
         WriterException
             when not able to read/write datasource/extract file
             when not able to process tableau data table
+            when not able to fetch rows
+        UnknownIncrementKey
+            when increment key of datasource is not one of its columns
+        UnknownColumn
+            when a column or predicate name is not a column of datasource
+        UnexpectedNoneValue
+            when top_rows is given without top_by
+        MultiTableOption
+            when rows of an extract per table are to be sampled,
+            aggregated or sorted
+        UnknownTable
+            when a column is not a column of a table of the relation
 
         Note
         ----
@@ -232,18 +1448,259 @@ class TDEWriter(Writer):
             tds_reader = TDSReader()
             tds_reader.read(tds_file_name)
 
-            output_path = self.get_output_path(tds_file_name)
+            if output_path is None:
+                output_path = self.get_output_path(tds_file_name)
+
+            relation_tables = tables.relation_tables(
+                tds_reader.get_datasource_relation_tree()
+            )
+            joined = len(relation_tables) > 1
+
+            # pruned columns are never defined, fetched nor converted
+            selected = selection.select_columns(
+                tds_reader.get_datasource_column_details(),
+                include_columns,
+                exclude_columns
+            )
+
+            if joined and not denormalize:
+                for option, value in (('aggregate', aggregate or None),
+                                      ('sort_by', sort_by or None),
+                                      ('sample_rows', sample_rows),
+                                      ('sample_percent', sample_percent),
+                                      ('top_rows', top_rows)):
+                    if value is not None:
+                        raise MultiTableOption(option)
+
+                return self._generate_tables(
+                    tds_reader,
+                    relation_tables,
+                    output_path,
+                    collation,
+                    selected,
+                    where or [],
+                    fetch_rows,
+                    batch_size,
+                    queue_size,
+                    buffer_memory,
+                    parse_processes
+                )
+
             self.check_file_writable(output_path)
-            new_extract = Extract(output_path)
+            self._cleanup_output_dir(os.path.dirname(output_path))
+
+            increment = None
+            increment_index = None
+            mark = None
+            local_types = self._local_types(tds_reader, selected)
+            filters = self._filters(
+                tds_reader,
+                where or [],
+                qualified=joined
+            )
+
+            sampled = sample_rows is not None or \
+                sample_percent is not None or top_rows is not None
+
+            # aggregated or sampled rows are no increment of the extract
+            if fetch_rows and not aggregate and not sampled:
+                increment = refresh.increment_column(tds_reader, selected)
+
+            functions = None
+            extract_types = local_types
+
+            if fetch_rows and aggregate:
+                functions = measure_functions(
+                    [
+                        tds_reader.get_datasource_column_details()[index][
+                            TDSContentHandler.K_COL_DEF_AGGREGATION
+                        ]
+                        for index in selected
+                    ],
+                    local_types
+                )
+                extract_types = output_types(functions, local_types)
+
+            if increment is not None:
+                increment_index, increment_column = increment
+                increment_key = tds_reader.get_datasource_refresh()[
+                    TDSContentHandler.K_REFRESH_INCREMENT_KEY
+                ]
+                increment_type = local_types[increment_index]
+                column_details = tds_reader.get_datasource_column_details()
+
+                # rows appended must belong to the same columns and meet
+                # the same predicates as the rows of the extract
+                scope = refresh.mark_scope(
+                    [
+                        column_details[index][
+                            TDSContentHandler.K_COL_DEF_LOCAL_NAME
+                        ]
+                        for index in selected
+                    ],
+                    filters
+                )
+
+                if os.path.exists(output_path):
+                    mark = refresh.load_mark(
+                        output_path,
+                        increment_key,
+                        increment_type,
+                        scope
+                    )
+
+            self._acquire_extract_api()
+            temp_path = self.get_temp_path(output_path)
+
+            new_extract = table_definition = None
+            mark_temp_path = None
+
+            try:
+                try:
+                    collation = self._get_collation(collation)
+                    table_definition = self._define_table(
+                        tds_reader,
+                        collation,
+                        selected,
+                        extract_types
+                    )
+
+                    new_extract, table, appending = self._open_table(
+                        output_path,
+                        temp_path,
+                        table_definition,
+                        append=mark is not None
+                    )
+                    columns = table_definition.getColumnCount()
+                    high_water = None
+
+                    if not appending:
+                        mark = None
+
+                    if fetch_rows:
+                        if mark is not None:
+                            filters.append((
+                                tables.column_reference(increment_column)
+                                if joined else increment_column[
+                                    TDSContentHandler.K_COL_DEF_REMOTE_NAME
+                                ],
+                                '>',
+                                mark
+                            ))
+
+                        row_source = self._row_source(
+                            tds_reader,
+                            batch_size,
+                            selected,
+                            parse_processes
+                        )
+
+                        if sample_percent is not None:
+                            row_source = HashSampleSource(
+                                row_source,
+                                sample_percent,
+                                batch_size=batch_size
+                            )
+
+                        if sample_rows is not None:
+                            row_source = ReservoirSource(
+                                row_source,
+                                sample_rows,
+                                seed=sample_seed,
+                                batch_size=batch_size
+                            )
+
+                        if top_rows is not None:
+                            if not top_by:
+                                raise UnexpectedNoneValue('top_by')
+
+                            row_source = TopSource(
+                                row_source,
+                                values.converter(local_types),
+                                self._sort_keys(tds_reader, selected, top_by),
+                                top_rows,
+                                batch_size=batch_size
+                            )
+
+                        if functions is not None:
+                            row_source = AggregateSource(
+                                row_source,
+                                values.converter(local_types),
+                                functions,
+                                memory_budget=aggregate_memory,
+                                batch_size=batch_size
+                            )
+
+                        if sort_by:
+                            row_source = SortSource(
+                                row_source,
+                                values.converter(
+                                    local_types if functions is None
+                                    else extract_types
+                                ),
+                                self._sort_keys(tds_reader, selected, sort_by),
+                                memory_budget=sort_memory,
+                                batch_size=batch_size
+                            )
+
+                        if buffer_memory is not None:
+                            row_source = SpillSource(
+                                row_source,
+                                memory_budget=buffer_memory
+                            )
+
+                        with memprofile.phase('rows'):
+                            _, high_water = self._insert_rows(
+                                table,
+                                table_definition,
+                                extract_types,
+                                row_source,
+                                queue_size=queue_size,
+                                increment_index=increment_index,
+                                keep=self._row_matcher(row_source, filters),
+                                fetch_process=fetch_process,
+                                batch_size=batch_size
+                            )
+                finally:
+                    # the extract is written when closed, before it is
+                    # committed, and released when writing failed
+                    if new_extract is not None:
+                        new_extract.close()
+
+                    if table_definition is not None:
+                        table_definition.close()
+
+                # a rebuilt extract holds no rows of the previous mark
+                if high_water is None:
+                    high_water = mark
+
+                if high_water is not None:
+                    mark_temp_path = refresh.write_mark(
+                        output_path,
+                        increment_key,
+                        increment_type,
+                        high_water,
+                        scope
+                    )
+
+                # the extract is never committed next to a stale mark
+                refresh.remove_mark(output_path)
+                self.commit_file(temp_path, output_path)
 
-            collation = self._collation_map[collation]
-            table_definition = self._define_table(tds_reader, collation)
+                if mark_temp_path is not None:
+                    refresh.commit_mark(mark_temp_path, output_path)
+            finally:
+                self.discard_file(temp_path)
 
-            new_extract.addTable('Extract', tableDefinition=table_definition)
+                if mark_temp_path is not None:
+                    self.discard_file(mark_temp_path)
 
-            new_extract.close()
-            table_definition.close()
-        except ReaderException as err:
+            return columns
+        except (ReaderException,
+                RowSourceException,
+                UnexpectedNoneValue) as err:
             raise_with_traceback(WriterException(err))
-        except TableauException:
-            raise_with_traceback(WriterException(GetLastErrorMessage()))
+        except sdk_exceptions.TableauException:
+            raise_with_traceback(
+                WriterException(sdk_exceptions.GetLastErrorMessage())
+            )
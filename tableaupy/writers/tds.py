@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""This module defines datasource writer
+
+Datasource files are serialized with `lxml.etree.xmlfile`, element by
+element as column records are iterated, so that the memory used to write
+a datasource does not depend on how many columns it has.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from future.utils import raise_with_traceback
+from future.utils import string_types
+import lxml.etree as etree
+
+from tableaupy.contenthandlers import TDSContentHandler
+from tableaupy.writers.base import Writer
+from tableaupy.writers.exceptions import FileOutputException
+
+#: str : class of the connection holding named connections
+_OUTER_CONNECTION_CLASS = 'federated'
+
+_INDENT = '  '
+
+
+def _text(value):
+    """`value` as text"""
+
+    return value if isinstance(value, string_types) else str(value)
+
+
+def _attributes(attributes):
+    """Attributes of dict `attributes` with a value, as text"""
+
+    return {
+        key: _text(value)
+        for key, value in attributes.items() if value is not None
+    }
+
+
+def _element(tag, content):
+    """Element `tag` of xmltodict style `content`
+
+    `content` is the text of the element, None for an empty element, or a
+    dict of attributes, keys prefixed with '@', text, key '#text', and
+    child elements, a list of contents for repeated elements.
+
+    Examples
+    --------
+    >>> element = _element('collation', {'@flag': '0', '@name': 'binary'})
+    >>> etree.tostring(element) == b'<collation flag="0" name="binary"/>'
+    True
+    >>> element = _element('attributes', {'attribute': [u'a', u'b']})
+    >>> etree.tostring(element) == (
+    ...     b'<attributes><attribute>a</attribute>'
+    ...     b'<attribute>b</attribute></attributes>'
+    ... )
+    True
+    """
+
+    element = etree.Element(tag)
+
+    if content is None:
+        return element
+
+    if not isinstance(content, dict):
+        element.text = _text(content)
+        return element
+
+    for key, value in content.items():
+        if value is None and key.startswith(('@', '#')):
+            continue
+
+        if key.startswith('@'):
+            element.set(key[1:], _text(value))
+        elif key == '#text':
+            element.text = _text(value)
+        else:
+            for child in value if isinstance(value, list) else [value]:
+                element.append(_element(key, child))
+
+    return element
+
+
+def _newline(xml_file, depth):
+    """Writes a newline indented to `depth` to incremental `xml_file`"""
+
+    xml_file.write('\n' + _INDENT * depth)
+
+
+def _indent(element, depth):
+    """Indents children of `element`, an element at `depth`"""
+
+    children = list(element)
+
+    # mixed content is left as is
+    if not children or (element.text or '').strip():
+        return element
+
+    element.text = '\n' + _INDENT * (depth + 1)
+
+    for child in children:
+        _indent(child, depth + 1)
+        child.tail = '\n' + _INDENT * (depth + 1)
+
+    children[-1].tail = '\n' + _INDENT * depth
+    return element
+
+
+def _relation(relation_tree):
+    """relation element of `relation_tree` with its joined relations
+
+    Examples
+    --------
+    >>> tree = {'attributes': {'type': 'join'}, 'relations': [],
+    ...         'clauses': [('[a].[id]', '[b].[id]'), ('[a].[x]', '[b].[x]')]}
+    >>> element = _relation(tree)
+    >>> [expression.get('op') for expression in element.iter('expression')]
+    ['AND', '=', '[a].[id]', '[b].[id]', '=', '[a].[x]', '[b].[x]']
+    """
+
+    element = etree.Element(
+        'relation',
+        _attributes(relation_tree['attributes'])
+    )
+    clauses = relation_tree['clauses']
+
+    if clauses:
+        parent = etree.SubElement(element, 'clause', type='join')
+
+        # several equalities of a join are joined by AND
+        if len(clauses) > 1:
+            parent = etree.SubElement(parent, 'expression', op='AND')
+
+        for left, right in clauses:
+            equality = etree.SubElement(parent, 'expression', op='=')
+            etree.SubElement(equality, 'expression', op=left)
+            etree.SubElement(equality, 'expression', op=right)
+
+    for child in relation_tree['relations']:
+        element.append(_relation(child))
+
+    return element
+
+
+def _record(column):
+    """metadata-record element of column `column`
+
+    `column` holds the fields of the record, in TDSReader column details
+    or column records format, fields which are None are left out of
+    details without an `@class` key.
+    """
+
+    if '@class' in column:
+        return _element('metadata-record', column)
+
+    record = {'@class': 'column'}
+    record.update(
+        (key, value) for key, value in column.items() if value is not None
+    )
+    return _element('metadata-record', record)
+
+
+class TDSWriter(Writer):
+    """Writer class for Tableau datasource files (\\*.tds)
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> from tableaupy.readers import TDSReader
+    >>> reader = TDSReader()
+    >>> reader.read('sample/sample.tds')
+    >>> writer = TDSWriter({'output_dir': tempfile.mkdtemp()})
+    >>> path = writer.write_from_reader('sample.tds', reader)
+    >>> copy = TDSReader()
+    >>> copy.read(path)
+    >>> copy.get_datasource_metadata() == reader.get_datasource_metadata()
+    True
+    >>> copy.get_datasource_column_records() == \\
+    ...     reader.get_datasource_column_records()
+    True
+    """
+
+    def __init__(self, options=None):
+        super(TDSWriter, self).__init__('.tds', options)
+
+    def write(self,
+              file_name,
+              metadata,
+              columns,
+              relation=None,
+              refresh=None,
+              output_path=None,
+              connections=None):
+        """Writes a tableau datasource file
+
+        The datasource is written to a temporary file in the output
+        directory and renamed into place when complete.
+
+        Parameters
+        ----------
+        file_name : str
+            file name / path the output file is named after, see
+            get_output_path
+        metadata : dict
+            datasource and connection attributes, in
+            TDSReader.get_datasource_metadata format
+        columns : iterable
+            fields of every column, in TDSReader column details or column
+            records format, iterated once as records are written
+        relation : dict
+            attributes of the relation element, or relation tree of a
+            relation joining relations, see
+            TDSReader.get_datasource_relation_tree, no relation when None
+        refresh : dict
+            attributes of the refresh element, no refresh when None
+        output_path : str
+            absolute path to output file, computed from `file_name` when
+            None (default: None)
+        connections : dict
+            attributes of every connection by name of its
+            named-connection, see TDSReader.get_datasource_connections,
+            the metadata connection alone when None
+
+        Returns
+        -------
+        str
+            path to written file
+
+        Raises
+        ------
+        FileAlreadyExists
+            when the file exists and overwrite is false
+        FileOutputException
+            when the file could not be written
+        """
+
+        if output_path is None:
+            output_path = self.get_output_path(file_name)
+
+        self.check_file_writable(output_path)
+        temp_path = self.get_temp_path(output_path)
+
+        try:
+            try:
+                with etree.xmlfile(temp_path, encoding='utf-8') as xml_file:
+                    xml_file.write_declaration()
+                    self._write_datasource(
+                        xml_file,
+                        metadata,
+                        columns,
+                        relation,
+                        refresh,
+                        connections
+                    )
+            except (IOError, OSError, etree.LxmlError):
+                raise_with_traceback(FileOutputException(output_path))
+
+            self.commit_file(temp_path, output_path)
+        finally:
+            self.discard_file(temp_path)
+
+        return output_path
+
+    @staticmethod
+    def _write_datasource(xml_file,
+                          metadata,
+                          columns,
+                          relation,
+                          refresh,
+                          connections):
+        """Writes the datasource element to incremental `xml_file`"""
+
+        tree = relation is not None and \
+            set(relation) == set(['attributes', 'relations', 'clauses'])
+
+        if connections is None:
+            connection = metadata[TDSContentHandler.K_METADATA_CONNECTION]
+            attributes = relation['attributes'] if tree else relation or {}
+            name = attributes.get('connection') or '{}.{}'.format(
+                connection.get('class'),
+                connection.get('dbname')
+            )
+            connections = {name: connection}
+
+        datasource = _attributes(
+            metadata[TDSContentHandler.K_METADATA_DATASOURCE]
+        )
+
+        with xml_file.element('datasource', datasource):
+            _newline(xml_file, 1)
+
+            with xml_file.element('connection',
+                                  {'class': _OUTER_CONNECTION_CLASS}):
+                _newline(xml_file, 2)
+
+                with xml_file.element('named-connections'):
+                    for name, connection in connections.items():
+                        _newline(xml_file, 3)
+
+                        with xml_file.element('named-connection',
+                                              {'name': name}):
+                            _newline(xml_file, 4)
+                            xml_file.write(etree.Element(
+                                'connection',
+                                _attributes(connection)
+                            ))
+                            _newline(xml_file, 3)
+
+                    _newline(xml_file, 2)
+
+                if relation is not None:
+                    _newline(xml_file, 2)
+                    xml_file.write(_indent(
+                        _relation(relation) if tree
+                        else etree.Element('relation', _attributes(relation)),
+                        2
+                    ))
+
+                if refresh is not None:
+                    _newline(xml_file, 2)
+                    xml_file.write(etree.Element(
+                        'refresh',
+                        _attributes(refresh)
+                    ))
+
+                _newline(xml_file, 2)
+
+                # a record at a time, written records are not held
+                with xml_file.element('metadata-records'):
+                    for column in columns:
+                        _newline(xml_file, 3)
+                        xml_file.write(_indent(_record(column), 3))
+
+                    _newline(xml_file, 2)
+
+                _newline(xml_file, 1)
+
+            _newline(xml_file, 0)
+
+    def write_from_reader(self, file_name, tds_reader, output_path=None):
+        """Writes the datasource read by `tds_reader`, see write
+
+        Every field of column records, every connection under its name,
+        the relation with its joined relations and clauses, and the
+        refresh settings read are written, so that the file written reads
+        back as the file read.
+        """
+
+        return self.write(
+            file_name,
+            tds_reader.get_datasource_metadata(),
+            tds_reader.get_datasource_column_records(),
+            relation=tds_reader.get_datasource_relation_tree() or None,
+            refresh=tds_reader.get_datasource_refresh() or None,
+            output_path=output_path,
+            connections=tds_reader.get_datasource_connections()
+        )
@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+"""This module defines transfer of row batches through shared memory
+
+Converted rows are packed column by column into shared memory segments,
+with a fixed layout derived from the extract type of every column, so
+that a batch crosses process boundaries without being pickled: only a
+small descriptor of the batch, its segment and row count, is queued.
+
+For a batch of `n` rows every column holds, in column order:
+
+* `n` null flags
+* for fixed width types, `n` values, see _codecs
+* for strings, `n` end offsets of their utf-8 text in the column heap
+
+followed by the heaps of every string column, in column order. Regions
+are aligned on 8 bytes.
+
+Segments are `multiprocessing.shared_memory` blocks where available
+(python 3.8+), memory mapped files otherwise.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import codecs
+import datetime
+import mmap
+import os
+import struct
+import tempfile
+
+from future.moves.queue import Empty
+
+from tableaupy.writers.exceptions import FetchProcessDied
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    # python < 3.8, segments are memory mapped files
+    shared_memory = None
+
+#: seconds a blocked end of a channel waits before checking whether to stop
+_POLL_INTERVAL = 0.1
+
+_ALIGNMENT = 8
+
+_EPOCH = datetime.datetime(1, 1, 1)
+
+#: descriptor kinds
+_BATCH = 'batch'
+_DONE = 'done'
+_ERROR = 'error'
+
+
+def _microseconds(delta):
+    """Microseconds of timedelta `delta`"""
+
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _from_datetime(value):
+    """Microseconds since 0001-01-01 of datetime `value`"""
+
+    return _microseconds(value - _EPOCH)
+
+
+def _to_datetime(slot):
+    """datetime of microseconds since 0001-01-01"""
+
+    return _EPOCH + datetime.timedelta(microseconds=slot)
+
+
+def _to_duration(slot):
+    """timedelta of microseconds"""
+
+    return datetime.timedelta(microseconds=slot)
+
+
+#: dict : sdk type name to (struct code, to slot value, from slot value),
+#: struct code is None for strings, stored in heaps
+_codecs = {
+    'BOOLEAN': ('?', None, None),
+    'INTEGER': ('q', None, None),
+    'DOUBLE': ('d', None, None),
+    'DATE': ('i', datetime.date.toordinal, datetime.date.fromordinal),
+    'DATETIME': ('q', _from_datetime, _to_datetime),
+    'DURATION': ('q', _microseconds, _to_duration),
+    'CHAR_STRING': (None, None, None),
+    'UNICODE_STRING': (None, None, None),
+}
+
+
+def _align(offset):
+    """`offset` rounded up to the alignment of regions"""
+
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _utf8(value):
+    """utf-8 bytes of text `value`"""
+
+    if isinstance(value, bytes):
+        return value
+
+    return value.encode('utf-8')
+
+
+class BatchLayout(object):
+    """Column oriented layout of row batches in shared memory
+
+    Parameters
+    ----------
+    type_names : list
+        sdk type name of every column, e.g. INTEGER or UNICODE_STRING, as
+        the extract table defines them
+
+    Raises
+    ------
+    KeyError
+        when a type name is not an sdk type name
+
+    Examples
+    --------
+    >>> import datetime
+    >>> layout = BatchLayout(['INTEGER', 'UNICODE_STRING', 'DATE'])
+    >>> rows = [(1, u'a', datetime.date(2017, 1, 2)), (None, None, None)]
+    >>> size, writes = layout.pack(rows)
+    >>> buf = bytearray(size)
+    >>> layout.write(buf, writes)
+    >>> layout.unpack(buf, 2) == rows
+    True
+    """
+
+    def __init__(self, type_names):
+        super(BatchLayout, self).__init__()
+        self._columns = [_codecs[type_name] for type_name in type_names]
+
+    def pack(self, rows):
+        """Plans writing `rows` to a buffer
+
+        Parameters
+        ----------
+        rows : list
+            converted rows, a value per column
+
+        Returns
+        -------
+        tuple
+            (bytes used by the batch, writes), see write
+        """
+
+        count = len(rows)
+        writes = list()
+        heaps = list()
+        offset = 0
+
+        for position, (code, to_slot, _) in enumerate(self._columns):
+            column = [row[position] for row in rows]
+            writes.append((
+                offset,
+                '<{}?'.format(count),
+                [value is None for value in column]
+            ))
+            offset = _align(offset + count)
+
+            if code is None:
+                texts = [b'' if value is None else _utf8(value)
+                         for value in column]
+                ends = list()
+                end = 0
+
+                for text in texts:
+                    end += len(text)
+                    ends.append(end)
+
+                writes.append((offset, '<{}q'.format(count), ends))
+                heaps.append(b''.join(texts))
+                offset += 8 * count
+                continue
+
+            if to_slot is not None:
+                column = [value if value is None else to_slot(value)
+                          for value in column]
+
+            value_format = '<{}{}'.format(count, code)
+            writes.append((
+                offset,
+                value_format,
+                [0 if value is None else value for value in column]
+            ))
+            offset = _align(offset + struct.calcsize(value_format))
+
+        for heap in heaps:
+            writes.append((offset, '<{}s'.format(len(heap)), [heap]))
+            offset += len(heap)
+
+        return offset, writes
+
+    @staticmethod
+    def write(buf, writes):
+        """Writes a batch planned with pack to writable buffer `buf`"""
+
+        for offset, value_format, column in writes:
+            struct.pack_into(value_format, buf, offset, *column)
+
+    def unpack(self, buf, count):
+        """Rows of a batch of `count` rows written to buffer `buf`
+
+        Values are read from `buf` in place, without copying the batch.
+        """
+
+        offset = 0
+        columns = list()
+        strings = list()
+
+        for code, _, from_slot in self._columns:
+            nulls = struct.unpack_from('<{}?'.format(count), buf, offset)
+            offset = _align(offset + count)
+
+            if code is None:
+                ends = struct.unpack_from('<{}q'.format(count), buf, offset)
+                offset += 8 * count
+                strings.append((len(columns), nulls, ends))
+                columns.append(None)
+                continue
+
+            value_format = '<{}{}'.format(count, code)
+            slots = struct.unpack_from(value_format, buf, offset)
+            offset = _align(offset + struct.calcsize(value_format))
+
+            if from_slot is None:
+                column = [None if null else slot
+                          for null, slot in zip(nulls, slots)]
+            else:
+                column = [None if null else from_slot(slot)
+                          for null, slot in zip(nulls, slots)]
+
+            columns.append(column)
+
+        for position, nulls, ends in strings:
+            column = list()
+            start = 0
+
+            for null, end in zip(nulls, ends):
+                column.append(None if null else codecs.utf_8_decode(
+                    buf[offset + start:offset + end]
+                )[0])
+                start = end
+
+            columns[position] = column
+            offset += start
+
+        return list(zip(*columns))
+
+
+class _MappedSegment(object):
+    """Memory mapped file, with the interface of SharedMemory"""
+
+    def __init__(self, name=None, create=False, size=0):
+        super(_MappedSegment, self).__init__()
+
+        if create:
+            directory = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            descriptor, name = tempfile.mkstemp(
+                prefix='tableaupy-', dir=directory
+            )
+            os.ftruncate(descriptor, size)
+        else:
+            descriptor = os.open(name, os.O_RDWR)
+            size = os.fstat(descriptor).st_size
+
+        try:
+            self.buf = mmap.mmap(descriptor, size)
+        finally:
+            os.close(descriptor)
+
+        self.name = name
+        self.size = size
+
+    def close(self):
+        """Unmaps the segment"""
+
+        self.buf.close()
+
+    def unlink(self):
+        """Removes the segment"""
+
+        os.remove(self.name)
+
+
+def _segment(name=None, size=0):
+    """Creates a segment of `size` bytes, or attaches segment `name`"""
+
+    if shared_memory is None:
+        return _MappedSegment(name, name is None, size)
+
+    return shared_memory.SharedMemory(name, name is None, size)
+
+
+class BatchChannel(object):
+    """Moves row batches of a forked process to the process owning them
+
+    The owning process creates the channel, with `slots` segments of
+    `slot_size` bytes, then forks the producing process, which inherits
+    the segments. The producer packs every batch into a free slot and
+    queues its descriptor, the owner unpacks the batch and frees the slot,
+    so that at most `slots` batches are in flight. A batch larger than a
+    slot is packed into a segment of its own, removed once read.
+
+    Parameters
+    ----------
+    layout : BatchLayout
+        layout of batches
+    context : module
+        multiprocessing context of the producing process
+    slots : int
+        batches in flight (default: 4)
+    slot_size : int
+        bytes of a slot (default: 4 MB)
+    """
+
+    def __init__(self, layout, context, slots=4, slot_size=4 << 20):
+        super(BatchChannel, self).__init__()
+        self._layout = layout
+        self._slots = [_segment(size=slot_size) for _ in range(slots)]
+        self._free = context.Queue()
+        self._ready = context.Queue()
+        self._stop = context.Event()
+
+        for index in range(slots):
+            self._free.put(index)
+
+        #: dict : metrics sent by the producer once done, see finish
+        self.producer_metrics = None
+
+    def send(self, rows):
+        """Packs `rows` into a free slot, False if the owner stopped first
+
+        Called by the producer.
+        """
+
+        size, writes = self._layout.pack(rows)
+        index = None
+
+        while index is None:
+            if self._stop.is_set():
+                return False
+
+            try:
+                index = self._free.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                continue
+
+        name = None
+        segment = self._slots[index]
+
+        if size > segment.size:
+            segment = _segment(size=size)
+            name = segment.name
+
+        try:
+            self._layout.write(segment.buf, writes)
+        finally:
+            if name is not None:
+                segment.close()
+
+        self._ready.put((_BATCH, (index, name, len(rows))))
+        return True
+
+    def finish(self, metrics=None):
+        """Tells the owner every batch was sent, with producer `metrics`"""
+
+        self._ready.put((_DONE, metrics))
+
+    def fail(self, error):
+        """Tells the owner the producer failed with exception `error`"""
+
+        self._ready.put((_ERROR, error))
+
+    def receive(self, producer):
+        """Yields rows of every batch sent, in order, as they are read
+
+        Called by the owner.
+
+        Parameters
+        ----------
+        producer : Process
+            producing process, batches end when it exits
+
+        Raises
+        ------
+        Exception
+            the exception the producer failed with
+        FetchProcessDied
+            when the producer exited without finishing
+        """
+
+        while True:
+            try:
+                kind, content = self._ready.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                if not producer.is_alive() and self._ready.empty():
+                    raise FetchProcessDied(producer.exitcode)
+
+                continue
+
+            if kind == _DONE:
+                self.producer_metrics = content
+                return
+
+            if kind == _ERROR:
+                raise content
+
+            index, name, count = content
+            segment = self._slots[index] if name is None else _segment(name)
+
+            try:
+                rows = self._layout.unpack(segment.buf, count)
+            finally:
+                if name is not None:
+                    segment.close()
+                    segment.unlink()
+
+                self._free.put(index)
+
+            yield rows
+
+    def stop(self):
+        """Stops a producer waiting for a free slot"""
+
+        self._stop.set()
+
+    def close(self):
+        """Removes slots, called by the owner once the producer exited"""
+
+        for segment in self._slots:
+            segment.close()
+            segment.unlink()
+
+        self._slots = list()
+
+        for queue in (self._free, self._ready):
+            queue.close()
+            queue.join_thread()
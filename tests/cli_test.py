@@ -5,9 +5,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import contextlib
+import json
 import os
 import re
 import shutil
+import sqlite3
+import subprocess
+import sys
 import unittest
 
 from click.testing import CliRunner
@@ -19,9 +24,142 @@ from tableausdk.Types import Type
 import config
 from tableaupy.cli import main
 from tableaupy.exceptions import AutoExtractException
+from tableaupy.writers import tde
+from tableaupy.writers.pipeline import InsertPipeline
 
 RUNNER = CliRunner()
 
+JOIN_DATASOURCE = '''<?xml version='1.0' encoding='utf-8' ?>
+<datasource formatted-name='sales' inline='true'>
+  <connection class='federated'>
+    <named-connections>
+      <named-connection name='sqlite.sales'>
+        <connection class='sqlite' dbname='{dbname}' />
+      </named-connection>
+    </named-connections>
+    <relation join='left' type='join'>
+      <clause type='join'>
+        <expression op='='>
+          <expression op='[orders].[customer]' />
+          <expression op='[customers].[id]' />
+        </expression>
+      </clause>
+      <relation connection='sqlite.sales' name='orders' table='[orders]'
+                type='table' />
+      <relation connection='sqlite.sales' name='customers'
+                table='[customers]' type='table' />
+    </relation>
+    <metadata-records>
+      <metadata-record class='column'>
+        <remote-name>id</remote-name>
+        <local-name>[id]</local-name>
+        <parent-name>[orders]</parent-name>
+        <local-type>integer</local-type>
+      </metadata-record>
+      <metadata-record class='column'>
+        <remote-name>customer</remote-name>
+        <local-name>[customer]</local-name>
+        <parent-name>[orders]</parent-name>
+        <local-type>integer</local-type>
+      </metadata-record>
+      <metadata-record class='column'>
+        <remote-name>id</remote-name>
+        <local-name>[id (customers)]</local-name>
+        <parent-name>[customers]</parent-name>
+        <local-type>integer</local-type>
+      </metadata-record>
+      <metadata-record class='column'>
+        <remote-name>name</remote-name>
+        <local-name>[name]</local-name>
+        <parent-name>[customers]</parent-name>
+        <local-type>string</local-type>
+      </metadata-record>
+    </metadata-records>
+  </connection>
+</datasource>
+'''
+
+ORDERS_DATASOURCE = '''<?xml version='1.0' encoding='utf-8' ?>
+<datasource formatted-name='orders' inline='true'>
+  <connection class='federated'>
+    <named-connections>
+      <named-connection name='sqlite.orders'>
+        <connection class='sqlite' dbname='{dbname}' />
+      </named-connection>
+    </named-connections>
+    <relation connection='sqlite.orders' name='orders' table='[orders]'
+              type='table' />
+    <refresh increment-key='[id]' incremental-updates='{incremental}' />
+    <metadata-records>
+      <metadata-record class='column'>
+        <remote-name>id</remote-name>
+        <local-name>[id]</local-name>
+        <parent-name>[orders]</parent-name>
+        <local-type>integer</local-type>
+      </metadata-record>
+      <metadata-record class='column'>
+        <remote-name>customer</remote-name>
+        <local-name>[customer]</local-name>
+        <parent-name>[orders]</parent-name>
+        <local-type>string</local-type>
+      </metadata-record>
+      <metadata-record class='column'>
+        <remote-name>amount</remote-name>
+        <local-name>[amount]</local-name>
+        <parent-name>[orders]</parent-name>
+        <local-type>integer</local-type>
+        <aggregation>Sum</aggregation>
+      </metadata-record>
+    </metadata-records>
+  </connection>
+</datasource>
+'''
+
+
+def write_orders(rows, incremental=False):
+    """Writes orders.db holding `rows` and its datasource orders.tds"""
+
+    database = sqlite3.connect('orders.db')
+    database.execute(
+        'CREATE TABLE IF NOT EXISTS orders '
+        '(id INTEGER, customer TEXT, amount INTEGER)'
+    )
+    database.executemany('INSERT INTO orders VALUES (?, ?, ?)', rows)
+    database.commit()
+    database.close()
+
+    with open('orders.tds', 'w') as stream:
+        stream.write(ORDERS_DATASOURCE.format(
+            dbname=os.path.abspath('orders.db'),
+            incremental='true' if incremental else 'false'
+        ))
+
+
+@contextlib.contextmanager
+def inserted_rows():
+    """Records converted rows inserted into extracts, in insertion order"""
+
+    rows = list()
+
+    class _RecordingPipeline(InsertPipeline):
+        """Insert pipeline recording inserted rows"""
+
+        def __init__(self, row_source, converter, insert, **kwargs):
+            def _insert(converted):
+                rows.append(tuple(converted))
+                insert(converted)
+
+            super(_RecordingPipeline, self).__init__(
+                row_source, converter, _insert, **kwargs
+            )
+
+    tde.InsertPipeline = _RecordingPipeline
+
+    try:
+        yield rows
+    finally:
+        tde.InsertPipeline = InsertPipeline
+
 
 def isolated_filesystem(func):
     """Isolated Filesystem decorator
@@ -89,6 +227,33 @@ class TestAutoExtractCommand(unittest.TestCase):
         self.assertEqual(result.exit_code, 0)
         self._assert_text_not_displayed(self.PROGRESS_TEXT_PATTERN, result)
 
+    def test_help_does_not_import_heavy_modules(self):
+        """Tests that importing command and its help is lightweight
+
+        Asserts
+        -------
+        * tableau sdk, lxml and xmltodict are not imported with command
+        * tableau sdk, lxml and xmltodict are not imported for --help
+        """
+
+        snippet = '\n'.join([
+            'import sys',
+            'from tableaupy.cli import main',
+            'try:',
+            '    main([{}])',
+            'except SystemExit:',
+            '    pass',
+            'heavy = ("tableausdk", "lxml", "xmltodict")',
+            'loaded = [m for m in sys.modules if m.split(".")[0] in heavy]',
+            'print(sorted(loaded))',
+        ])
+
+        for args in ['', '"--help"']:
+            output = subprocess.check_output(
+                [sys.executable, '-c', snippet.format(args)]
+            )
+            self.assertEqual(output.strip().splitlines()[-1], b'[]')
+
     @isolated_filesystem
     def test_without_argument(self):
         """Tests without argument
@@ -249,7 +414,7 @@ class TestAutoExtractCommand(unittest.TestCase):
         Asserts
         -------
         * if tde already exists with same table name give error
-        * progress text is displayed
+        * progress text is not displayed, conflict is found while planning
         * error Message and Failed object
         * failed is printed
         * success is not printed
@@ -263,7 +428,7 @@ class TestAutoExtractCommand(unittest.TestCase):
         result = RUNNER.invoke(main, ['sample.tds'])
         self.assertEqual(result.exit_code, -1)
         self.assertIsInstance(result.exception, AutoExtractException)
-        self._assert_text_displayed(self.PROGRESS_TEXT_PATTERN, result, 1)
+        self._assert_text_not_displayed(self.PROGRESS_TEXT_PATTERN, result)
         self._assert_text_not_displayed(self.SUCCESS_PATTERN, result)
         self._assert_text_displayed(self.FAILED_PATTERN, result, 1)
         result_values = result.exc_info[1].args[0].values()
@@ -312,7 +477,7 @@ class TestAutoExtractCommand(unittest.TestCase):
         Asserts
         -------
         * gives error with any other extension file
-        * progress text is displayed
+        * progress text is not displayed, error is found while planning
         * throws errors and the error message
         * success is not printed
         * failed is printed once
@@ -322,7 +487,7 @@ class TestAutoExtractCommand(unittest.TestCase):
         result = RUNNER.invoke(main, ['sample.tde'])
         self.assertEqual(result.exit_code, -1)
         self.assertIsInstance(result.exception, AutoExtractException)
-        self._assert_text_displayed(self.PROGRESS_TEXT_PATTERN, result, 1)
+        self._assert_text_not_displayed(self.PROGRESS_TEXT_PATTERN, result)
         self._assert_text_displayed(self.FAILED_PATTERN, result, 1)
         self._assert_text_not_displayed(self.SUCCESS_PATTERN, result)
         self.assertEqual(result.exc_info[1].args[0].values(), [
@@ -439,3 +604,390 @@ class TestAutoExtractCommand(unittest.TestCase):
         self._assert_text_displayed(self.PROGRESS_TEXT_PATTERN, result, 1)
         self._assert_text_displayed(self.SUCCESS_PATTERN, result, 1)
         self._assert_text_not_displayed(self.FAILED_PATTERN, result)
+
+    @isolated_filesystem
+    def test_with_journal_resume(self):
+        """Tests resuming a run with checkpoint journal
+
+        Asserts
+        -------
+        * journal is written
+        * resumed run skips journaled file instead of failing on it
+        * resumed run processes file missing in journal
+        * resume without journal is a usage error
+        """
+
+        shutil.copy('sample.tds', 'sample1.tds')
+        result = RUNNER.invoke(main, [
+            '--journal', 'run.journal', 'sample.tds'
+        ])
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(os.path.exists('run.journal'))
+
+        result = RUNNER.invoke(main, [
+            '--journal', 'run.journal', '--resume', 'sample.tds', 'sample1.tds'
+        ])
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(os.path.exists('sample1.tde'))
+        self._assert_text_displayed(self.SUCCESS_PATTERN, result, 1)
+        self._assert_text_not_displayed(self.FAILED_PATTERN, result)
+
+        result = RUNNER.invoke(main, ['--resume', 'sample.tds'])
+        self.assertEqual(result.exit_code, 2)
+
+    @isolated_filesystem
+    def test_with_journal_resume_after_lost_record(self):
+        """Tests resuming a run whose last journal record was lost
+
+        Asserts
+        -------
+        * file whose output exists but whose record was lost is processed
+          again, replacing its output, instead of failing the batch
+        * journaled file is skipped
+        """
+
+        shutil.copy('sample.tds', 'sample1.tds')
+        result = RUNNER.invoke(main, [
+            '--journal', 'run.journal', 'sample.tds', 'sample1.tds'
+        ])
+        self.assertEqual(result.exit_code, 0)
+
+        with open('run.journal') as stream:
+            lines = stream.readlines()
+
+        with open('run.journal', 'w') as stream:
+            stream.writelines(lines[:-1])
+
+        lost = json.loads(lines[-1])['path']
+        os.utime(os.path.splitext(lost)[0] + '.tde', (0, 0))
+
+        result = RUNNER.invoke(main, [
+            '--journal', 'run.journal', '--resume', 'sample.tds', 'sample1.tds'
+        ])
+        self.assertEqual(result.exit_code, 0)
+        self._assert_text_displayed(self.SUCCESS_PATTERN, result, 1)
+        self._assert_text_not_displayed(self.FAILED_PATTERN, result)
+        self.assertGreater(
+            os.path.getmtime(os.path.splitext(lost)[0] + '.tde'), 0
+        )
+
+    @isolated_filesystem
+    def test_with_output_path_collision(self):
+        """Tests files having the same output path
+
+        Asserts
+        -------
+        * batch fails without processing any file
+        * progress text is not displayed
+        * both colliding files are reported failed
+        """
+
+        os.mkdir('a')
+        os.mkdir('temp')
+        shutil.copy('sample.tds', os.path.join('a', 'sample.tds'))
+        result = RUNNER.invoke(main, [
+            '--output-dir',
+            'temp',
+            'sample.tds',
+            os.path.join('a', 'sample.tds'),
+        ])
+        self.assertEqual(result.exit_code, -1)
+        self.assertIsInstance(result.exception, AutoExtractException)
+        self._assert_text_not_displayed(self.PROGRESS_TEXT_PATTERN, result)
+        self._assert_text_displayed(self.FAILED_PATTERN, result, 2)
+        self.assertFalse(os.path.exists(os.path.join('temp', 'sample.tde')))
+
+    @isolated_filesystem
+    def test_with_jobs(self):
+        """Tests with multiple worker processes
+
+        Asserts
+        -------
+        * completes successfully
+        * every file is generated
+        * success is printed for every file
+        """
+
+        shutil.copy('sample.tds', 'sample1.tds')
+        shutil.copy('sample.tds', 'sample2.tds')
+        result = RUNNER.invoke(main, [
+            '--jobs', '2', 'sample.tds', 'sample1.tds', 'sample2.tds'
+        ])
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(os.path.exists('sample.tde'))
+        self.assertTrue(os.path.exists('sample1.tde'))
+        self.assertTrue(os.path.exists('sample2.tde'))
+        self._assert_text_displayed(self.SUCCESS_PATTERN, result, 3)
+
+    @isolated_filesystem
+    def test_with_shard(self):
+        """Tests splitting files across shards
+
+        Asserts
+        -------
+        * each shard completes successfully
+        * every file is generated by exactly one shard
+        * invalid shard is rejected
+        """
+
+        files = ['sample.tds']
+
+        for index in range(1, 6):
+            files.append('sample{}.tds'.format(index))
+            shutil.copy('sample.tds', files[-1])
+
+        processed = 0
+
+        for shard in ['0/2', '1/2']:
+            result = RUNNER.invoke(main, ['--shard', shard] + files)
+            self.assertEqual(result.exit_code, 0)
+            processed += len(self.SUCCESS_PATTERN.findall(result.output))
+
+        self.assertEqual(processed, len(files))
+
+        for file_name in files:
+            self.assertTrue(os.path.exists(file_name.replace('.tds', '.tde')))
+
+        result = RUNNER.invoke(main, ['--shard', '2/2', 'sample.tds'])
+        self.assertEqual(result.exit_code, 2)
+
+    @isolated_filesystem
+    def test_with_join_relation(self):
+        """Tests datasources joining tables
+
+        Asserts
+        -------
+        * an extract is generated per table, none for the datasource
+        * rows of tables are not aggregated
+        * a single extract of joined rows meeting predicates is generated
+          with --denormalize
+        * predicate on a table whose columns are all excluded fails
+        """
+
+        database = sqlite3.connect('sales.db')
+        database.executescript(
+            'CREATE TABLE orders (id INTEGER, customer INTEGER);'
+            'CREATE TABLE customers (id INTEGER, name TEXT);'
+            'INSERT INTO orders VALUES (1, 7), (2, 8), (3, 7);'
+            "INSERT INTO customers VALUES (7, 'a');"
+        )
+        database.close()
+
+        with open('sales.tds', 'w') as stream:
+            stream.write(JOIN_DATASOURCE.format(
+                dbname=os.path.abspath('sales.db')
+            ))
+
+        result = RUNNER.invoke(main, ['--fetch-rows', 'sales.tds'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue(os.path.exists('sales.orders.tde'))
+        self.assertTrue(os.path.exists('sales.customers.tde'))
+        self.assertFalse(os.path.exists('sales.tde'))
+
+        result = RUNNER.invoke(main, [
+            '--fetch-rows', '--aggregate', '--overwrite', 'sales.tds'
+        ])
+        self.assertIsInstance(result.exception, AutoExtractException)
+        self.assertIn("'aggregate': requires a single table", result.output)
+
+        with inserted_rows() as rows:
+            result = RUNNER.invoke(main, [
+                '--fetch-rows', '--denormalize', '--where', 'name=a',
+                'sales.tds'
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue(os.path.exists('sales.tde'))
+        self.assertEqual(sorted(rows), [(1, 7, 7, 'a'), (3, 7, 7, 'a')])
+
+        result = RUNNER.invoke(main, [
+            '--fetch-rows', '--overwrite', '--exclude-column', 'name',
+            '--exclude-column', 'id (customers)', '--where', 'name=a',
+            'sales.tds'
+        ])
+        self.assertIsInstance(result.exception, AutoExtractException)
+        self.assertIn("'where': requires a single table", result.output)
+
+    @isolated_filesystem
+    def test_with_join_table_plan(self):
+        """Tests planning the extract of every joined table
+
+        Asserts
+        -------
+        * extract of a table colliding with the output of another file
+          fails both files
+        * existing extract of a table fails without --overwrite
+        * no extract is generated when planning fails
+        """
+
+        with open('sales.tds', 'w') as stream:
+            stream.write(JOIN_DATASOURCE.format(
+                dbname=os.path.abspath('sales.db')
+            ))
+
+        shutil.copy('sample.tds', 'sales.orders.v2.tds')
+        result = RUNNER.invoke(main, ['sales.tds', 'sales.orders.v2.tds'])
+        self.assertIsInstance(result.exception, AutoExtractException)
+        self.assertIn('is output path of multiple files', result.output)
+        self._assert_text_displayed(self.FAILED_PATTERN, result, 2)
+        self.assertFalse(os.path.exists('sales.orders.tde'))
+
+        open('sales.orders.tde', 'w').close()
+        result = RUNNER.invoke(main, ['sales.tds'])
+        self.assertIsInstance(result.exception, AutoExtractException)
+        self.assertIn('sales.orders.tde', result.output)
+        self.assertFalse(os.path.exists('sales.customers.tde'))
+        self.assertEqual(os.path.getsize('sales.orders.tde'), 0)
+
+    @isolated_filesystem
+    def test_with_join_table_path_collision(self):
+        """Tests joined tables whose extracts would have the same path
+
+        Asserts
+        -------
+        * datasource fails with output path collision
+        * no extract is generated
+        """
+
+        content = JOIN_DATASOURCE.format(dbname=os.path.abspath('sales.db'))
+
+        for old, new in (("name='orders'", "name='a b'"),
+                         ("name='customers'", "name='a_b'"),
+                         ('[orders].[customer]', '[a b].[customer]'),
+                         ('[customers].[id]', '[a_b].[id]'),
+                         ('>[orders]<', '>[a b]<'),
+                         ('>[customers]<', '>[a_b]<')):
+            content = content.replace(old, new)
+
+        with open('sales.tds', 'w') as stream:
+            stream.write(content)
+
+        result = RUNNER.invoke(main, ['sales.tds'])
+        self.assertIsInstance(result.exception, AutoExtractException)
+        self.assertIn('is output path of multiple files: a b, a_b',
+                      result.output)
+        self.assertEqual(
+            [name for name in os.listdir('.') if name.startswith('sales.')],
+            ['sales.tds']
+        )
+
+    @isolated_filesystem
+    def test_with_incremental_refresh(self):
+        """Tests refreshing extract of datasource refreshed incrementally
+
+        Asserts
+        -------
+        * rerun appends only the rows inserted since the previous run
+        * extract is rebuilt when its predicates change
+        * extract is rebuilt without mark when increment key is excluded
+        """
+
+        write_orders([(1, 'a', 10), (2, 'b', 20)], incremental=True)
+
+        with inserted_rows() as rows:
+            result = RUNNER.invoke(main, ['--fetch-rows', 'orders.tds'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(rows, [(1, 'a', 10), (2, 'b', 20)])
+        self.assertTrue(os.path.exists('orders.tde.hwm'))
+
+        write_orders([(3, 'a', 30)], incremental=True)
+
+        with inserted_rows() as rows:
+            result = RUNNER.invoke(main, [
+                '--fetch-rows', '--overwrite', 'orders.tds'
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(rows, [(3, 'a', 30)])
+
+        with inserted_rows() as rows:
+            result = RUNNER.invoke(main, [
+                '--fetch-rows', '--overwrite', '--where', 'customer=a',
+                'orders.tds'
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(rows, [(1, 'a', 10), (3, 'a', 30)])
+
+        with inserted_rows() as rows:
+            result = RUNNER.invoke(main, [
+                '--fetch-rows', '--overwrite', '--exclude-column', 'id',
+                'orders.tds'
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(rows, [('a', 10), ('b', 20), ('a', 30)])
+        self.assertFalse(os.path.exists('orders.tde.hwm'))
+
+    @isolated_filesystem
+    def test_with_aggregate(self):
+        """Tests aggregating rows fetched
+
+        Asserts
+        -------
+        * rows are grouped on dimensions and measures summed
+        """
+
+        write_orders([(1, 'a', 10), (2, 'b', 20), (3, 'a', 30)])
+
+        with inserted_rows() as rows:
+            result = RUNNER.invoke(main, [
+                '--fetch-rows', '--aggregate', '--exclude-column', 'id',
+                'orders.tds'
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(sorted(rows), [('a', 40), ('b', 20)])
+
+    @isolated_filesystem
+    def test_with_sort_by(self):
+        """Tests sorting rows fetched
+
+        Asserts
+        -------
+        * rows are inserted in descending order of the sort column
+        """
+
+        write_orders([(1, 'a', 20), (2, 'b', 30), (3, 'a', 10)])
+
+        with inserted_rows() as rows:
+            result = RUNNER.invoke(main, [
+                '--fetch-rows', '--sort-by', 'amount:desc', 'orders.tds'
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(rows, [(2, 'b', 30), (1, 'a', 20), (3, 'a', 10)])
+
+    @isolated_filesystem
+    def test_with_sampling(self):
+        """Tests sampling rows fetched
+
+        Asserts
+        -------
+        * --sample-rows keeps as many rows, the same ones for a seed
+        * --sample-percent keeps no row at 0 and every row at 100
+        * --top keeps the first rows in order of --top-by
+        """
+
+        orders = [(number, 'a', number * 10) for number in range(1, 11)]
+        write_orders(orders)
+
+        def _sample(*options):
+            with inserted_rows() as rows:
+                result = RUNNER.invoke(
+                    main,
+                    ['--fetch-rows', '--overwrite'] + list(options) +
+                    ['orders.tds']
+                )
+            self.assertEqual(result.exit_code, 0, result.output)
+            return sorted(rows)
+
+        sample = _sample('--sample-rows', '3', '--sample-seed', '1')
+        self.assertEqual(len(sample), 3)
+        self.assertTrue(set(sample) <= set(orders))
+        self.assertEqual(
+            _sample('--sample-rows', '3', '--sample-seed', '1'),
+            sample
+        )
+
+        self.assertEqual(_sample('--sample-percent', '0'), [])
+        self.assertEqual(_sample('--sample-percent', '100'), orders)
+
+        self.assertEqual(
+            _sample('--top', '2', '--top-by', 'amount:desc'),
+            [(9, 'a', 90), (10, 'a', 100)]
+        )
@@ -169,9 +169,9 @@ class TestTDSContentHandler(unittest.TestCase):
         Asserts
         -------
         * when named-connection has multiple connection
-        * when named-connections has multiple named-connection with connection
-        * when connection has more than one named-connections
         * when datasource has more than one connection
+        * when named-connections has named-connections sharing a name
+        * when named-connections has multiple named-connection with connection
         * when datasource has only one connection
         """
 
@@ -188,6 +188,7 @@ class TestTDSContentHandler(unittest.TestCase):
         connection.append(named_connections)
 
         named_connection = etree.Element('named-connection')
+        named_connection.attrib['name'] = 'sqlserver.a'
         named_connections.append(named_connection)
 
         connection_inside = etree.Element('connection')
@@ -198,15 +199,93 @@ class TestTDSContentHandler(unittest.TestCase):
         })
 
         self._fail_on_multiple_connections(tds_xml, connection_inside)
-        self._fail_on_multiple_connections(tds_xml, named_connection)
-        self._fail_on_multiple_connections(tds_xml, named_connections)
         self._fail_on_multiple_connections(tds_xml, connection)
 
+        named_connection_copy = deepcopy(named_connection)
+        named_connections.append(named_connection_copy)
+        message = "expected count of named-connection 'sqlserver.a' to be 1"
+        self._check_error(tds_xml, message)
+
+        named_connection_copy.attrib['name'] = 'sqlserver.b'
+        named_connection_copy[0].attrib['server'] = '0.0.0.1'
+        self.content_handler.parse(tds_xml)
+        self.assertEqual(
+            list(self.content_handler.connections.items()),
+            [
+                ('sqlserver.a', {'server': '0.0.0.0'}),
+                ('sqlserver.b', {'server': '0.0.0.1'}),
+            ]
+        )
+        self.assertEqual(
+            self.content_handler.metadata['connection'],
+            {'server': '0.0.0.0'}
+        )
+
+        named_connections.remove(named_connection_copy)
+
         try:
             self.content_handler.parse(tds_xml)
         except ContentHandlerException:
             self.fail('parse() raised ContentHandlerException unexpectedly')
 
+    def test_relation_tree(self):
+        """Tests relation_tree property
+
+        Asserts
+        -------
+        * joined relations are nested, in order
+        * equalities of join clauses are parsed, other expressions are not
+        * tables have no relations nor clauses
+        """
+
+        tds_xml = etree.fromstring('''
+            <datasource formatted-name='sales' inline='true'>
+              <connection class='federated'>
+                <named-connections>
+                  <named-connection name='a'>
+                    <connection class='sqlite' dbname='a.db' />
+                  </named-connection>
+                </named-connections>
+                <relation join='left' type='join'>
+                  <clause type='join'>
+                    <expression op='AND'>
+                      <expression op='='>
+                        <expression op='[o].[c]' />
+                        <expression op='[c].[id]' />
+                      </expression>
+                      <expression op='='>
+                        <expression op='[o].[r]' />
+                        <expression op='[c].[r]' />
+                      </expression>
+                      <expression op='&lt;'>
+                        <expression op='[o].[d]' />
+                        <expression op='[c].[d]' />
+                      </expression>
+                    </expression>
+                  </clause>
+                  <relation connection='a' name='o' table='[o]'
+                            type='table' />
+                  <relation connection='a' name='c' table='[c]'
+                            type='table' />
+                </relation>
+              </connection>
+            </datasource>
+        ''')
+        self.content_handler.parse(tds_xml)
+        tree = self.content_handler.relation_tree
+
+        self.assertEqual(tree['attributes'], {'join': 'left', 'type': 'join'})
+        self.assertEqual(
+            tree['clauses'],
+            [('[o].[c]', '[c].[id]'), ('[o].[r]', '[c].[r]')]
+        )
+        self.assertEqual(
+            [relation['attributes']['name'] for relation in tree['relations']],
+            ['o', 'c']
+        )
+        self.assertEqual(tree['relations'][0]['relations'], [])
+        self.assertEqual(tree['relations'][0]['clauses'], [])
+
     def test_parse_stale_value(self):
         """Tests stale values
 
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for checkpoint journal"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from tableaupy.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Unit Test Cases for Journal"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'run.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_missing(self):
+        """Tests loading journal which does not exist
+
+        Asserts
+        -------
+        * no record is loaded
+        * journal file is not created
+        """
+
+        self.assertEqual(Journal(self.path).load(), {})
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_successes(self):
+        """Tests successes across runs
+
+        Asserts
+        -------
+        * records are appended across runs
+        * last record of a file wins
+        * only files with last record as success are returned
+        """
+
+        with Journal(self.path) as journal:
+            journal.record('/a.tds', True)
+            journal.record('/b.tds', False, 'failed')
+            journal.record('/c.tds', True)
+
+        with Journal(self.path) as journal:
+            journal.record('/b.tds', True)
+            journal.record('/c.tds', False, 'failed')
+
+        self.assertEqual(
+            Journal(self.path).successes(),
+            set(['/a.tds', '/b.tds'])
+        )
+
+    def test_torn_record(self):
+        """Tests journal with a partially written last record
+
+        Asserts
+        -------
+        * complete records are loaded
+        * partial record is ignored
+        """
+
+        with Journal(self.path) as journal:
+            journal.record('/a.tds', True)
+
+        with open(self.path, 'ab') as stream:
+            stream.write(b'{"path": "/b.tds", "sta')
+
+        self.assertEqual(Journal(self.path).load(), {'/a.tds': 'success'})
+
+    def test_append_after_torn_record(self):
+        """Tests appending to a journal with a partially written last record
+
+        Asserts
+        -------
+        * partial record is ended by a new line
+        * appended record is loaded
+        """
+
+        with open(self.path, 'wb') as stream:
+            stream.write(b'{"path": "/a.tds", "status": "success"}\n')
+            stream.write(b'{"path": "/b.tds", "sta')
+
+        with Journal(self.path) as journal:
+            journal.record('/c.tds', True)
+
+        self.assertEqual(
+            Journal(self.path).load(),
+            {'/a.tds': 'success', '/c.tds': 'success'}
+        )
+
+    def test_batched_sync(self):
+        """Tests batching of syncs
+
+        Asserts
+        -------
+        * records are not synced before batch is full
+        * records are synced when batch is full
+        """
+
+        journal = Journal(self.path, sync_every=3, sync_interval=3600)
+        journal.record('/a.tds', True)
+        journal.record('/b.tds', True)
+        self.assertEqual(Journal(self.path).load(), {})
+
+        journal.record('/c.tds', True)
+        self.assertEqual(len(Journal(self.path).load()), 3)
+        journal.close()
+
+    def test_timed_sync(self):
+        """Tests syncing after sync_interval without further records
+
+        Asserts
+        -------
+        * record is not synced at once
+        * record is synced once sync_interval elapsed
+        """
+
+        journal = Journal(self.path, sync_every=100, sync_interval=0.2)
+        journal.record('/a.tds', True)
+        self.assertEqual(Journal(self.path).load(), {})
+
+        deadline = time.time() + 5
+
+        while not Journal(self.path).load() and time.time() < deadline:
+            time.sleep(0.05)
+
+        self.assertEqual(Journal(self.path).load(), {'/a.tds': 'success'})
+        journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for memory profiling"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+import config
+from tableaupy import memprofile
+from tableaupy.memprofile import MemoryProfiler
+from tableaupy.readers import TDSReader
+
+
+class TestMemoryProfiler(unittest.TestCase):
+    """Unit Test Cases for MemoryProfiler"""
+
+    def test_reader_phases(self):
+        """Tests phases recorded while reading a datasource
+
+        Asserts
+        -------
+        * reader phases are recorded in order for the file
+        * nothing is recorded once profiler is stopped
+        """
+
+        with MemoryProfiler() as profiler:
+            with memprofile.track_file(config.SAMPLE_DS_PATH):
+                tds_reader = TDSReader()
+                tds_reader.read(config.SAMPLE_DS_PATH)
+                tds_reader.get_datasource_column_defs()
+
+        tds_reader.read(config.SAMPLE_DS_PATH)
+        report = profiler.report()
+
+        self.assertEqual(len(report['files']), 1)
+        self.assertEqual(report['files'][0]['path'], config.SAMPLE_DS_PATH)
+        self.assertEqual(list(report['files'][0]['phases']), [
+            'parse tree',
+            'xmltodict records',
+            'column definitions',
+        ])
+
+    def test_nested_peak(self):
+        """Tests peak of nested phases
+
+        Asserts
+        -------
+        * file peak covers peak of its phases
+        * outer phase peak covers peak of inner phase
+        * top allocator is the line allocating most
+        """
+
+        with MemoryProfiler() as profiler:
+            with memprofile.track_file('a'):
+                with memprofile.phase('outer'):
+                    with memprofile.phase('inner'):
+                        data = bytearray(1 << 20)
+                    del data
+
+        report = profiler.report(limit=1)
+
+        if not report['tracemalloc']:
+            self.skipTest('tracemalloc is not available')
+
+        entry = report['files'][0]
+        self.assertGreaterEqual(entry['phases']['inner']['peak'], 1 << 20)
+        self.assertGreaterEqual(
+            entry['phases']['outer']['peak'],
+            entry['phases']['inner']['peak']
+        )
+        self.assertGreaterEqual(
+            entry['peak'],
+            entry['phases']['outer']['peak']
+        )
+        self.assertIn('memprofile_test.py', report['allocators'][0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for batch throughput tracking"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+from tableaupy.progress import Throughput
+
+
+class TestThroughput(unittest.TestCase):
+    """Unit Test Cases for Throughput"""
+
+    def test_moving_window(self):
+        """Tests rates averaged over the moving window
+
+        Asserts
+        -------
+        * totals count every file
+        * rates only count files completed within the window
+        * eta follows the recent rate
+        """
+
+        throughput = Throughput(4, 400, window=10.0, started_at=0.0)
+        throughput.update(100, columns=3, now=1.0)
+        throughput.update(100, columns=3, now=2.0)
+        self.assertEqual(throughput.bytes_per_second(now=2.0), 100.0)
+
+        throughput.update(100, columns=3, now=20.0)
+        self.assertEqual(throughput.files, 3)
+        self.assertEqual(throughput.columns, 9)
+        self.assertEqual(throughput.bytes_per_second(now=20.0), 10.0)
+        self.assertEqual(throughput.eta(now=20.0), 10.0)
+
+    def test_eta_without_rate(self):
+        """Tests eta when no rate is known
+
+        Asserts
+        -------
+        * eta is unknown before any file is processed
+        * eta falls back to files for a batch of empty files
+        * eta is 0 once every file is processed
+        """
+
+        throughput = Throughput(2, 0, started_at=0.0)
+        self.assertIsNone(throughput.eta(now=1.0))
+        self.assertIn('eta --:--:--', throughput.format(now=1.0))
+
+        throughput.update(0, now=1.0)
+        self.assertEqual(throughput.eta(now=1.0), 1.0)
+
+        throughput.update(0, now=2.0)
+        self.assertEqual(throughput.eta(now=2.0), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
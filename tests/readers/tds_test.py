@@ -108,6 +108,60 @@ class TestTDSReader(ReaderBaseTest):
                 expected_result
             )
 
+    def test_get_datasource_relation(self):
+        """Tests get_datasource_relation method
+
+        Asserts
+        -------
+        * value before calling read
+        * value after calling read
+        """
+
+        self.assertEqual(self.reader.get_datasource_relation(), {})
+
+        self.reader.read(config.SAMPLE_DS_PATH)
+        relation = self.reader.get_datasource_relation()
+        self.assertEqual(relation['type'], 'table')
+        self.assertEqual(relation['table'], '[dbo].[TABLE_NAME]')
+
+    def test_get_datasource_column_details(self):
+        """Tests get_datasource_column_details method
+
+        Asserts
+        -------
+        * details include column definitions
+        * details include remote names
+        """
+
+        self.reader.read(config.SAMPLE_DS_PATH)
+        details = self.reader.get_datasource_column_details()
+        column_definitions = self.reader.get_datasource_column_defs()
+
+        self.assertEqual(len(details), len(column_definitions))
+
+        for detail, column_definition in zip(details, column_definitions):
+            for key, value in column_definition.items():
+                self.assertEqual(detail[key], value)
+
+        self.assertEqual(details[0]['remote-name'], 'REMOTE_COLUMN_NAME1')
+
+    def test_get_datasource_refresh(self):
+        """Tests get_datasource_refresh method
+
+        Asserts
+        -------
+        * value before calling read
+        * value after calling read
+        """
+
+        self.assertEqual(self.reader.get_datasource_refresh(), {})
+
+        self.reader.read(config.SAMPLE_DS_PATH)
+        self.assertEqual(self.reader.get_datasource_refresh(), {
+            'increment-key': '',
+            'incremental-updates': 'false',
+        })
+
 
 if __name__ == '__main__':
     unittest.main()
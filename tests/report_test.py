@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for extract_report command"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+from click.testing import CliRunner
+
+from tableaupy.exceptions import AutoExtractException
+from tableaupy.journal import Journal
+from tableaupy.report import main
+
+RUNNER = CliRunner()
+
+
+class TestExtractReportCommand(unittest.TestCase):
+    """Unit Test Cases for extract_report command"""
+
+    def test_merge_shards(self):
+        """Tests report of journals of several shards
+
+        Asserts
+        -------
+        * files of every journal are reported
+        * later record of a file overrides earlier one
+        * command fails when a file failed
+        * only failures are printed with --failed-only
+        """
+
+        with RUNNER.isolated_filesystem():
+            with Journal('0.journal') as journal:
+                journal.record('/data/a.tds', False, 'file already exists')
+                journal.record('/data/b.tds', True)
+
+            with Journal('1.journal') as journal:
+                journal.record('/data/c.tds', False, 'bad datasource')
+
+            result = RUNNER.invoke(main, ['0.journal', '1.journal'])
+            self.assertIsInstance(result.exception, AutoExtractException)
+            self.assertIn('file already exists', result.output)
+            self.assertIn('/data/b.tds', result.output)
+            self.assertIn('3 files, 1 succeeded, 2 failed', result.output)
+
+            with Journal('2.journal') as journal:
+                journal.record('/data/a.tds', True)
+                journal.record('/data/c.tds', True)
+
+            result = RUNNER.invoke(
+                main, ['0.journal', '1.journal', '2.journal']
+            )
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('3 files, 3 succeeded, 0 failed', result.output)
+
+            result = RUNNER.invoke(
+                main, ['--failed-only', '0.journal', '1.journal']
+            )
+            self.assertNotIn('/data/b.tds', result.output)
+            self.assertIn('/data/c.tds', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for rewrite_tds command"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import unittest
+
+from click.testing import CliRunner
+
+import config
+from tableaupy.exceptions import AutoExtractException
+from tableaupy.rewrite import main
+
+RUNNER = CliRunner()
+
+SAMPLE_PATH = os.path.abspath(config.SAMPLE_DS_PATH)
+
+
+class TestRewriteTDSCommand(unittest.TestCase):
+    """Unit Test Cases for rewrite_tds command"""
+
+    def test_rewrite_directory(self):
+        """Tests rewriting datasources of a directory
+
+        Asserts
+        -------
+        * dry run prints changes and summary without writing files
+        * datasources of subdirectories are rewritten with --jobs
+        * command fails when a file failed, other files are rewritten
+        """
+
+        with RUNNER.isolated_filesystem():
+            os.makedirs('corpus/sub')
+
+            for path in ('corpus/a.tds', 'corpus/sub/b.tds'):
+                shutil.copyfile(SAMPLE_PATH, path)
+
+            with open(SAMPLE_PATH, 'rb') as stream:
+                content = stream.read()
+
+            result = RUNNER.invoke(main, [
+                '--dry-run', '--set', 'server=db2', '--match',
+                'server=0.0.0.0', 'corpus',
+            ])
+            self.assertIsNone(result.exception, result.output)
+            self.assertIn(
+                "server: '0.0.0.0' -> 'db2' in 2 connections",
+                result.output
+            )
+            self.assertIn('2 files, 2 would change', result.output)
+
+            with open('corpus/a.tds', 'rb') as stream:
+                self.assertEqual(stream.read(), content)
+
+            with open('corpus/sub/bad.tds', 'w') as stream:
+                stream.write('<datasource')
+
+            result = RUNNER.invoke(main, [
+                '-j', '2', '--set', 'server=db2', 'corpus',
+            ])
+            self.assertIsInstance(result.exception, AutoExtractException)
+            self.assertIn('malformed datasource', result.output)
+            self.assertIn('3 files, 2 changed, 0 unchanged, 1 failed',
+                          result.output)
+
+            with open('corpus/sub/b.tds', 'rb') as stream:
+                self.assertIn(b"server='db2'", stream.read())
+
+    def test_bad_assignment(self):
+        """Tests --set value which is not NAME=VALUE"""
+
+        with RUNNER.isolated_filesystem():
+            shutil.copyfile(SAMPLE_PATH, 'a.tds')
+            result = RUNNER.invoke(main, ['--set', 'server', 'a.tds'])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn('expected NAME=VALUE', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for streaming aggregation"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+from tableaupy.rowsources import AggregateSource
+from tableaupy.rowsources import IterableSource
+from tableaupy.rowsources.exceptions import UnknownSourceColumn
+
+
+class TestAggregateSource(unittest.TestCase):
+    """Unit Test Cases for AggregateSource"""
+
+    functions = [None, None, 'sum', 'count', 'avg', 'min', 'max']
+
+    def _rows(self):
+        for number in range(3000):
+            value = None if number % 11 == 0 else number % 13
+            yield (
+                number % 50,
+                None if number % 7 == 0 else 'g{}'.format(number % 3),
+                value, value, value, value, value,
+            )
+
+    def _expected(self):
+        groups = dict()
+
+        for row in self._rows():
+            groups.setdefault(row[:2], list()).append(row[2])
+
+        expected = set()
+
+        for key, measures in groups.items():
+            measures = [value for value in measures if value is not None]
+            expected.add(key + (
+                sum(measures) if measures else None,
+                len(measures),
+                sum(measures) / len(measures) if measures else None,
+                min(measures) if measures else None,
+                max(measures) if measures else None,
+            ))
+
+        return expected
+
+    def _source(self, **kwargs):
+        return AggregateSource(
+            IterableSource(['a', 'b', 'c', 'd', 'e', 'f', 'g'], self._rows()),
+            tuple,
+            self.functions,
+            **kwargs
+        )
+
+    def test_in_memory(self):
+        source = self._source()
+        rows = list(source.rows())
+
+        self.assertEqual(set(rows), self._expected())
+        self.assertEqual(len(rows), len(self._expected()))
+        self.assertEqual(source.metrics['runs'], 0)
+        self.assertEqual(source.metrics['rows'], 3000)
+
+    def test_spilled(self):
+        source = self._source(memory_budget=1, batch_size=7)
+        rows = list(source.rows())
+
+        self.assertGreater(source.metrics['runs'], 1)
+        self.assertEqual(len(rows), len(self._expected()))
+        self.assertEqual(set(rows), self._expected())
+
+    def test_filters(self):
+        source = self._source()
+
+        self.assertEqual(source.push_filters([('a', '<', 2)]), [])
+        self.assertEqual(
+            set(row[0] for row in source.rows()),
+            set([0, 1])
+        )
+
+        with self.assertRaises(UnknownSourceColumn):
+            source.push_filters([('missing', '=', 1)])
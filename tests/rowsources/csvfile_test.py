@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for csv file row source"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import codecs
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from tableaupy.rowsources import CSVSource
+from tableaupy.rowsources.exceptions import UnknownSourceColumn
+from tableaupy.rowsources.exceptions import ValueConversionError
+
+
+class TestCSVSource(unittest.TestCase):
+    """Unit Test Cases for CSVSource"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'orders.csv')
+        self.expected = list()
+        lines = [u'day,amount,note']
+
+        for number in range(3000):
+            day = datetime.date(2017, 1, 1) + datetime.timedelta(number % 90)
+            note = u'"n°{}, ""quoted""\nline"'.format(number) \
+                if number % 3 else u''
+            lines.append(u'{},{},{}'.format(day, number, note))
+            self.expected.append((
+                number,
+                day,
+                u'n°{}, "quoted"\nline'.format(number) if number % 3 else u'',
+            ))
+
+        self._write(u'\n'.join(lines) + u'\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, text, bom=False):
+        with io.open(self.path, 'wb') as csv_file:
+            if bom:
+                csv_file.write(codecs.BOM_UTF8)
+
+            csv_file.write(text.encode('utf-8'))
+
+    def _source(self, **kwargs):
+        kwargs.setdefault('processes', 1)
+        return CSVSource(
+            self.path,
+            ['amount', 'day', 'note'],
+            ['integer', 'date', 'unicode_string'],
+            **kwargs
+        )
+
+    def test_rows_in_order(self):
+        for processes in (1, 3):
+            source = self._source(
+                processes=processes,
+                chunk_size=1024,
+                batch_size=100
+            )
+
+            self.assertEqual(list(source.rows()), self.expected)
+            self.assertGreater(source.metrics['chunks'], 10)
+            self.assertEqual(source.metrics['rows'], 3000)
+
+    def test_without_header(self):
+        self._write(u'1,x\n2,y\n')
+        source = CSVSource(
+            self.path,
+            ['name', 'id'],
+            ['string', 'integer'],
+            positions=[1, 0],
+            header=False,
+            processes=1
+        )
+
+        self.assertEqual(list(source.rows()), [(u'x', 1), (u'y', 2)])
+
+    def test_bom_and_separator(self):
+        self._write(u'amount;day;note\n1;2017-01-01;a;extra\n2\n', bom=True)
+
+        self.assertEqual(
+            list(self._source(separator=';').rows()),
+            [(1, datetime.date(2017, 1, 1), u'a'), (2, None, None)]
+        )
+
+    def test_empty_file(self):
+        self._write(u'')
+
+        self.assertEqual(list(self._source().rows()), [])
+
+    def test_filters(self):
+        source = self._source(processes=2, chunk_size=4096)
+
+        self.assertEqual(source.push_filters([('amount', '<', 5)]), [])
+        self.assertEqual(list(source.rows()), self.expected[:5])
+
+        with self.assertRaises(UnknownSourceColumn):
+            source.push_filters([('missing', '=', 1)])
+
+    def test_errors(self):
+        with self.assertRaises(UnknownSourceColumn):
+            list(CSVSource(self.path, ['missing'], ['string']).rows())
+
+        self._write(u'amount,day,note\n1,2017-01-01,a\nx,2017-01-01,b\n')
+
+        with self.assertRaises(ValueConversionError):
+            list(self._source(processes=2).rows())
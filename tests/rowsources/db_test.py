@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for database row source"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from tableaupy.readers import TDSReader
+from tableaupy.rowsources import ConnectionPool
+from tableaupy.rowsources import DBRowSource
+from tableaupy.rowsources import RowSourceException
+from tableaupy.rowsources.exceptions import UnsupportedConnection
+
+DATASOURCE = '''<?xml version='1.0' encoding='utf-8' ?>
+<datasource formatted-name='data' inline='true'>
+  <connection class='federated'>
+    <named-connections>
+      <named-connection name='sqlite.other'>
+        <connection class='sqlite' dbname='{other}' />
+      </named-connection>
+      <named-connection name='sqlite.data'>
+        <connection class='sqlite' dbname='{dbname}' />
+      </named-connection>
+    </named-connections>
+    <relation connection='sqlite.data' name='T' table='[T]' type='table' />
+    <metadata-records>
+      <metadata-record class='column'>
+        <remote-name>id</remote-name>
+        <local-name>[id]</local-name>
+        <parent-name>[T]</parent-name>
+        <local-type>integer</local-type>
+      </metadata-record>
+    </metadata-records>
+  </connection>
+</datasource>
+'''
+
+
+class TestDBRowSource(unittest.TestCase):
+    """Unit Test Cases for DBRowSource"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        dbname = os.path.join(self.directory, 'data.db')
+        database = sqlite3.connect(dbname)
+        database.execute('CREATE TABLE "T" (id INTEGER, "my name" TEXT)')
+        database.executemany(
+            'INSERT INTO "T" VALUES (?, ?)',
+            [(number, 'name {}'.format(number)) for number in range(25)]
+        )
+        database.commit()
+        database.close()
+        self.connection = {'class': 'sqlite', 'dbname': dbname}
+        self.pool = ConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.directory)
+
+    def _source(self, table='T', batch_size=10):
+        return DBRowSource(
+            self.connection,
+            table,
+            ['id', 'my name'],
+            pool=self.pool,
+            batch_size=batch_size
+        )
+
+    def test_batches(self):
+        batches = list(self._source().batches())
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual(batches[0][1], (1, 'name 1'))
+        self.assertEqual(len(list(self._source().rows())), 25)
+
+    def test_shared_connections(self):
+        for _ in range(5):
+            list(self._source().batches())
+
+        metrics = self.pool.metrics
+        self.assertEqual(metrics['opened'], 1)
+        self.assertEqual(metrics['reused'], 4)
+        self.assertEqual(metrics['idle'], 1)
+
+        first = self._source().batches()
+        second = self._source().batches()
+        next(first)
+        next(second)
+        list(first)
+        list(second)
+        self.assertEqual(self.pool.metrics['opened'], 2)
+        self.assertEqual(self.pool.metrics['idle'], 2)
+
+        with self.assertRaises(RowSourceException):
+            list(self._source(table='MISSING').batches())
+
+        self.assertEqual(self.pool.metrics['idle'], 1)
+
+        self.pool.close()
+        self.assertEqual(self.pool.metrics['idle'], 0)
+
+    def test_push_filters(self):
+        source = self._source()
+        filters = [('id', '>=', 20), ('my name', '<>', 'name 22')]
+        self.assertEqual(source.push_filters(filters), [])
+        self.assertEqual(
+            [row[0] for row in source.rows()],
+            [20, 21, 23, 24]
+        )
+
+        with self.assertRaises(ValueError):
+            source.push_filters([('id', 'LIKE', 1)])
+
+    def test_unsupported_connection(self):
+        source = DBRowSource({'class': 'unknown'}, 'T', ['id'])
+
+        with self.assertRaises(UnsupportedConnection):
+            list(source.batches())
+
+    def test_connection_failed(self):
+        dbname = os.path.join(self.directory, 'missing', 'data.db')
+        source = DBRowSource({'class': 'sqlite', 'dbname': dbname}, 'T',
+                             ['id'], pool=self.pool)
+
+        with self.assertRaises(RowSourceException):
+            list(source.batches())
+
+        self.assertEqual(self.pool.metrics['opened'], 0)
+
+        dbname = os.path.join(self.directory, 'missing.db')
+        source = DBRowSource({'class': 'sqlite', 'dbname': dbname}, 'T',
+                             ['id'], pool=self.pool)
+
+        with self.assertRaises(RowSourceException):
+            list(source.batches())
+
+        self.assertFalse(os.path.exists(dbname))
+
+    def test_pool_key(self):
+        list(self._source().batches())
+        self.connection = dict(self.connection, caption='Data')
+        list(self._source().batches())
+        self.assertEqual(self.pool.metrics['opened'], 1)
+
+        self.connection = dict(self.connection, port='5432')
+        list(self._source().batches())
+        self.assertEqual(self.pool.metrics['opened'], 2)
+
+    def test_from_reader(self):
+        tds_path = os.path.join(self.directory, 'data.tds')
+
+        with open(tds_path, 'w') as stream:
+            stream.write(DATASOURCE.format(
+                other=os.path.join(self.directory, 'other.db'),
+                dbname=self.connection['dbname']
+            ))
+
+        reader = TDSReader()
+        reader.read(tds_path)
+        source = DBRowSource.from_reader(reader, self.pool)
+        self.assertEqual(len(list(source.rows())), 25)
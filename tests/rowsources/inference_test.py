@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for inference of csv file columns"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from tableaupy.infer import main
+from tableaupy.readers import TDSReader
+from tableaupy.rowsources import CSVSource
+from tableaupy.rowsources.inference import infer_columns
+from tableaupy.rowsources.inference import sample_records
+
+
+class TestInference(unittest.TestCase):
+    """Unit Test Cases for inference of csv file columns"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'orders.csv')
+        lines = [u'day,amount,price,paid,at,note,']
+
+        for number in range(5000):
+            day = datetime.date(2017, 1, 1) + datetime.timedelta(number % 90)
+            lines.append(u'{},{},{},{},{} 10:{:02d}:00,"n°{}\nline",'.format(
+                day,
+                number if number % 7 else u'',
+                number / 4,
+                u'true' if number % 2 else u'FALSE',
+                day,
+                number % 60,
+                number
+            ))
+
+        with io.open(self.path, 'w', encoding='utf-8', newline='') as csv:
+            csv.write(u'\n'.join(lines) + u'\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sample_records(self):
+        """Tests sampling records of a file larger than the sample
+
+        Asserts
+        -------
+        * empty column names are named by position
+        * records are taken from the whole file
+        * records cut in quoted fields are left out
+        """
+
+        names, records = sample_records(self.path, sample_size=16 << 10)
+        self.assertEqual(
+            names,
+            [u'day', u'amount', u'price', u'paid', u'at', u'note', u'F7']
+        )
+        self.assertLess(len(records), 5000)
+        self.assertTrue(all(len(record) == 7 for record in records))
+        self.assertTrue(any(record[5].startswith(u'n°49')
+                            for record in records))
+        self.assertTrue(all(record[5].endswith(u'\nline')
+                            for record in records))
+
+    def test_infer_columns(self):
+        """Tests inferring column types and nullability
+
+        Asserts
+        -------
+        * every candidate type is inferred
+        * columns with empty values are nullable
+        * non ascii text columns are unicode strings
+        * inferred columns read the file without conversion errors
+        """
+
+        columns = infer_columns(self.path, 'orders.csv', sample_size=16 << 10)
+        self.assertEqual(
+            [(column['local-type'], column['contains-null'])
+             for column in columns],
+            [
+                ('date', 'false'),
+                ('integer', 'true'),
+                ('double', 'false'),
+                ('boolean', 'false'),
+                ('datetime', 'false'),
+                ('unicode_string', 'false'),
+                ('string', 'true'),
+            ]
+        )
+        self.assertEqual(columns[0]['parent-name'], u'[orders.csv]')
+        self.assertEqual(columns[1]['aggregation'], 'Sum')
+
+        source = CSVSource(
+            self.path,
+            [column['remote-name'] for column in columns[:6]],
+            [column['local-type'] for column in columns[:6]],
+            processes=1
+        )
+        rows = list(source.rows())
+        self.assertEqual(len(rows), 5000)
+        self.assertEqual(rows[3][3], True)
+
+    def test_infer_tds_command(self):
+        """Tests writing the datasource of a csv file
+
+        Asserts
+        -------
+        * datasource is read back with the inferred columns
+        * datasource connects to the csv file
+        * existing datasource is only replaced with --overwrite
+        """
+
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            '--no-extract', '-o', self.directory, self.path,
+        ])
+        self.assertIsNone(result.exception, result.output)
+
+        tds_path = os.path.join(self.directory, 'orders.tds')
+        reader = TDSReader()
+        reader.read(tds_path)
+        metadata = reader.get_datasource_metadata()
+        self.assertEqual(metadata['connection']['class'], 'textscan')
+        self.assertEqual(metadata['connection']['filename'], 'orders.csv')
+        self.assertEqual(
+            [column['local-type']
+             for column in reader.get_datasource_column_details()],
+            [column['local-type'] for column in infer_columns(
+                self.path, 'orders.csv'
+            )]
+        )
+
+        result = runner.invoke(main, ['--no-extract', self.path])
+        self.assertIsNotNone(result.exception)
+        self.assertIn('file already exists', result.output)
+
+        result = runner.invoke(main, [
+            '--no-extract', '--overwrite', self.path,
+        ])
+        self.assertIsNone(result.exception, result.output)
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for joining row sources"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+from tableaupy.rowsources import HashJoinSource
+from tableaupy.rowsources import IterableSource
+
+
+class _FilteredSource(IterableSource):
+    """IterableSource recording conditions handed over to it"""
+
+    def __init__(self, columns, rows, batch_size=1000):
+        super(_FilteredSource, self).__init__(columns, rows, batch_size)
+        self.filters = list()
+
+    def push_filters(self, filters):
+        self.filters.extend(filters)
+        return list()
+
+
+class TestHashJoinSource(unittest.TestCase):
+    """Unit Test Cases for HashJoinSource"""
+
+    orders = [(1, 7), (2, 8), (3, 7), (4, None)]
+    customers = [(7, 'a'), (9, 'c'), (None, 'n')]
+
+    def _join(self, how, **kwargs):
+        return HashJoinSource(
+            IterableSource(['id', 'customer'], self.orders, batch_size=2),
+            IterableSource(['id', 'name'], self.customers, batch_size=2),
+            [(1, 0)],
+            how=how,
+            **kwargs
+        )
+
+    def test_join_types(self):
+        """Tests rows joined by every join type
+
+        Asserts
+        -------
+        * left rows are matched in order, against every equal right row
+        * rows without match are kept with null columns by outer joins
+        * null keys match no row
+        """
+
+        self.assertEqual(
+            list(self._join('inner').rows()),
+            [(1, 7, 7, 'a'), (3, 7, 7, 'a')]
+        )
+        self.assertEqual(
+            list(self._join('left').rows()),
+            [(1, 7, 7, 'a'), (2, 8, None, None), (3, 7, 7, 'a'),
+             (4, None, None, None)]
+        )
+        self.assertEqual(
+            list(self._join('right').rows()),
+            [(1, 7, 7, 'a'), (3, 7, 7, 'a'), (None, None, 9, 'c'),
+             (None, None, None, 'n')]
+        )
+        self.assertEqual(len(list(self._join('full').rows())), 6)
+
+        with self.assertRaises(ValueError):
+            self._join('cross')
+
+    def test_nested_joins(self):
+        """Tests joining a join, with columns named and kept
+
+        Asserts
+        -------
+        * rows of every joined source are joined, columns projected
+        * batches hold at most batch_size rows
+        * metrics count rows read and joined
+        """
+
+        items = IterableSource(
+            ['order', 'product'],
+            [(1, 'x'), (1, 'y'), (3, 'z')]
+        )
+        orders = self._join(
+            'inner',
+            columns=['[o].[id]', '[o].[customer]', '[c].[id]', '[c].[name]']
+        )
+        joined = HashJoinSource(
+            items,
+            orders,
+            [(0, 0)],
+            columns=['[i].[order]', '[i].[product]'] + orders.columns,
+            output=[5, 1],
+            batch_size=2
+        )
+
+        self.assertEqual(joined.columns, ['[c].[name]', '[i].[product]'])
+        batches = list(joined.batches())
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual(
+            [row for batch in batches for row in batch],
+            [('a', 'x'), ('a', 'y'), ('a', 'z')]
+        )
+        self.assertEqual(
+            joined.metrics,
+            {'build_rows': 2, 'probe_rows': 3, 'rows': 3}
+        )
+
+    def test_push_filters(self):
+        """Tests conditions handed over to joined sources
+
+        Asserts
+        -------
+        * conditions on the preserved side are handed over to it
+        * conditions on the side of outer rows are matched after joining
+        * conditions on other columns are returned
+        """
+
+        orders = _FilteredSource(['id', 'customer'], self.orders)
+        customers = _FilteredSource(['id', 'name'], self.customers)
+        joined = HashJoinSource(
+            orders,
+            customers,
+            [(1, 0)],
+            how='left',
+            columns=['o.id', 'o.customer', 'c.id', 'c.name']
+        )
+
+        remaining = joined.push_filters([
+            ('o.id', '>', 1),
+            ('c.name', '=', 'a'),
+            ('x', '=', 1),
+        ])
+
+        self.assertEqual(remaining, [('x', '=', 1)])
+        self.assertEqual(orders.filters, [('id', '>', 1)])
+        self.assertEqual(customers.filters, [])
+        self.assertEqual(
+            list(joined.rows()),
+            [(1, 7, 7, 'a'), (3, 7, 7, 'a')]
+        )
+
+    def test_errors(self):
+        """Tests errors reading the hash table are raised"""
+
+        def _failing_rows():
+            yield (7, 'a')
+            raise IOError('fetch failed')
+
+        joined = HashJoinSource(
+            IterableSource(['id', 'customer'], self.orders),
+            IterableSource(['id', 'name'], _failing_rows()),
+            [(1, 0)]
+        )
+
+        with self.assertRaises(IOError):
+            list(joined.rows())
+
+
+if __name__ == '__main__':
+    unittest.main()
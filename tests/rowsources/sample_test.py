@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for sampling row sources"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+from tableaupy.rowsources import HashSampleSource
+from tableaupy.rowsources import IterableSource
+from tableaupy.rowsources import ReservoirSource
+from tableaupy.rowsources import TopSource
+
+
+class TestReservoirSource(unittest.TestCase):
+    """Unit Test Cases for ReservoirSource"""
+
+    def _sample(self, size, seed=None, count=5000):
+        source = IterableSource(['n'], [(n,) for n in range(count)])
+        return list(ReservoirSource(source, size, seed=seed).rows())
+
+    def test_size_and_order(self):
+        rows = self._sample(100, seed=7)
+
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(len(set(rows)), 100)
+        self.assertEqual(rows, sorted(rows))
+        self.assertEqual(rows, self._sample(100, seed=7))
+
+    def test_fewer_rows(self):
+        self.assertEqual(self._sample(10, count=4), [(0,), (1,), (2,), (3,)])
+        self.assertEqual(self._sample(0), [])
+
+    def test_uniform(self):
+        # every row is sampled with probability 1/10
+        hits = [0] * 50
+
+        for seed in range(2000):
+            for (number,) in self._sample(5, seed=seed, count=50):
+                hits[number] += 1
+
+        self.assertTrue(all(100 < count < 300 for count in hits))
+
+    def test_filters(self):
+        source = ReservoirSource(
+            IterableSource(['n'], [(n,) for n in range(5000)]),
+            20,
+            seed=3
+        )
+
+        self.assertEqual(source.push_filters([('n', '<', 10)]), [])
+        self.assertEqual(list(source.rows()), [(n,) for n in range(10)])
+
+
+class TestHashSampleSource(unittest.TestCase):
+    """Unit Test Cases for HashSampleSource"""
+
+    rows = [(n % 100, n) for n in range(10000)]
+
+    def _sample(self, percent, positions=None):
+        source = IterableSource(['key', 'n'], self.rows)
+        return list(HashSampleSource(source, percent, positions).rows())
+
+    def test_percentage(self):
+        self.assertTrue(800 < len(self._sample(10)) < 1200)
+        self.assertEqual(self._sample(0), [])
+        self.assertEqual(self._sample(100), self.rows)
+
+    def test_nested(self):
+        small = set(self._sample(5))
+
+        self.assertTrue(small.issubset(set(self._sample(20))))
+
+    def test_key_positions(self):
+        keys = set(key for key, _ in self._sample(30, positions=[0]))
+        rows = self._sample(30, positions=[0])
+
+        self.assertEqual(len(rows), len(keys) * 100)
+
+    def test_filters(self):
+        source = HashSampleSource(
+            IterableSource(['key', 'n'], self.rows),
+            100
+        )
+
+        self.assertEqual(source.push_filters([('key', '=', 3)]), [])
+        self.assertEqual(len(list(source.rows())), 100)
+
+
+class TestTopSource(unittest.TestCase):
+    """Unit Test Cases for TopSource"""
+
+    rows = [('abc'[n % 3], n % 17, n) for n in range(1000)]
+
+    def test_first_rows(self):
+        source = TopSource(
+            IterableSource(['a', 'b', 'c'], self.rows),
+            tuple,
+            [(1, True), (0, False)],
+            5
+        )
+        expected = sorted(self.rows, key=lambda row: row[0])
+        expected = sorted(expected, key=lambda row: row[1], reverse=True)
+
+        self.assertEqual(list(source.rows()), expected[:5])
+
+    def test_filters(self):
+        source = TopSource(
+            IterableSource(['a', 'b', 'c'], self.rows),
+            tuple,
+            [(2, True)],
+            2
+        )
+
+        self.assertEqual(source.push_filters([('a', '=', 'a')]), [])
+        self.assertEqual([row[2] for row in source.rows()], [999, 996])
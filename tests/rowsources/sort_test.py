@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for external merge sort"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import random
+import unittest
+
+from tableaupy.rowsources import IterableSource
+from tableaupy.rowsources import SortSource
+
+
+class TestSortSource(unittest.TestCase):
+    """Unit Test Cases for SortSource"""
+
+    def setUp(self):
+        generator = random.Random(42)
+        self.rows = [
+            (
+                generator.choice([None, 'a', 'b', 'c']),
+                generator.randint(0, 100),
+                number,
+            )
+            for number in range(5000)
+        ]
+
+    def _expected(self, descending):
+        # nulls last, then stable on source order
+        rows = sorted(self.rows, key=lambda row: row[1], reverse=descending)
+        return sorted(rows, key=lambda row: (row[0] is None, row[0] or ''))
+
+    def _sort(self, keys, **kwargs):
+        source = SortSource(
+            IterableSource(['a', 'b', 'c'], self.rows),
+            tuple,
+            keys,
+            **kwargs
+        )
+        return source, list(source.rows())
+
+    def test_in_memory(self):
+        source, rows = self._sort([(0, False), (1, False)])
+
+        self.assertEqual(rows, self._expected(descending=False))
+        self.assertEqual(source.metrics, {'rows': 5000, 'runs': 0})
+
+    def test_spilled(self):
+        source, rows = self._sort(
+            [(0, False), (1, True)],
+            memory_budget=1,
+            batch_size=64
+        )
+
+        self.assertEqual(rows, self._expected(descending=True))
+        self.assertGreater(source.metrics['runs'], 1)
+
+    def test_filters(self):
+        source = SortSource(
+            IterableSource(['a', 'b', 'c'], self.rows),
+            tuple,
+            [(2, True)]
+        )
+
+        self.assertEqual(source.push_filters([('c', '<', 3)]), [])
+        self.assertEqual([row[2] for row in source.rows()], [2, 1, 0])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for buffering row sources ahead of their consumer"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import unittest
+
+from tableaupy.rowsources import IterableSource
+from tableaupy.rowsources import SpillSource
+
+
+class TestSpillSource(unittest.TestCase):
+    """Unit Test Cases for SpillSource"""
+
+    rows = [(number, 'row {}'.format(number)) for number in range(5000)]
+
+    def _source(self, rows=None, **kwargs):
+        return SpillSource(
+            IterableSource(['a', 'b'], rows or self.rows, batch_size=10),
+            **kwargs
+        )
+
+    def test_in_memory(self):
+        source = self._source()
+
+        self.assertEqual(list(source.rows()), self.rows)
+        self.assertEqual(source.metrics['spilled'], 0)
+        self.assertEqual(source.metrics['batches'], 500)
+
+    def test_spilled_in_order(self):
+        source = self._source(memory_budget=4096)
+
+        self.assertEqual(list(source.rows()), self.rows)
+        self.assertGreater(source.metrics['spilled'], 0)
+        self.assertLess(source.metrics['spilled'], 500)
+        self.assertLessEqual(source.metrics['peak_memory'], 4096)
+
+    def test_source_read_ahead(self):
+        """Tests the source is read to its end ahead of a slow consumer
+
+        Asserts
+        -------
+        * every row is read while the consumer holds the first batch
+        """
+
+        exhausted = threading.Event()
+
+        def _rows():
+            for row in self.rows:
+                yield row
+
+            exhausted.set()
+
+        batches = self._source(_rows(), memory_budget=1024).batches()
+        next(batches)
+
+        self.assertTrue(exhausted.wait(10))
+        self.assertEqual(len(list(batches)), 499)
+
+    def test_errors(self):
+        def _failing_rows():
+            yield (1, 'a')
+            raise IOError('fetch failed')
+
+        with self.assertRaises(IOError):
+            list(self._source(_failing_rows()).rows())
+
+    def test_early_close(self):
+        source = self._source(memory_budget=1)
+        batches = source.batches()
+        next(batches)
+        batches.close()
+
+        self.assertIsNone(source._spill_file)  # pylint: disable=W0212
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for extract_server command"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from click.testing import CliRunner
+from future.moves.http.client import HTTPConnection
+from future.moves.queue import Full
+
+import config
+from tableaupy.server import _TCPJobServer
+from tableaupy.server import _UnixJobServer
+from tableaupy.server import main
+from tableaupy.writers import WriterPool
+from tableaupy.writers.pool import Job
+
+
+class _Pool(object):
+    """Pool finishing jobs at once, or refusing them when `full`"""
+
+    def __init__(self, full=False):
+        self.full = full
+        self.submitted = list()
+        self.metrics = {'submitted': 0, 'rejected': 1}
+
+    def submit(self, path, options=None, collation='en_us_ci', block=True):
+        if self.full:
+            raise Full('1 jobs pending')
+
+        self.submitted.append((path, options, collation, block))
+        job = Job(len(self.submitted), path, options, collation)
+        job.finish(None, 0.5)
+        return job
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    """HTTP connection over a Unix socket"""
+
+    def __init__(self, path):
+        HTTPConnection.__init__(self, 'localhost')
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class TestExtractServer(unittest.TestCase):
+    """Unit Test Cases for extract_server"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.servers = list()
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+        shutil.rmtree(self.directory)
+
+    def _serve(self, server):
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.servers.append(server)
+        return server
+
+    def _tcp(self, pool):
+        server = self._serve(_TCPJobServer(('127.0.0.1', 0), pool))
+        return HTTPConnection('127.0.0.1', server.server_address[1])
+
+    @staticmethod
+    def _request(connection, method, path, body=None):
+        connection.request(
+            method,
+            path,
+            body=None if body is None else json.dumps(body)
+        )
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+
+    def test_job_over_http(self):
+        """Tests generating an extract of a job posted over HTTP
+
+        Asserts
+        -------
+        * job succeeds and its extract is generated
+        * metrics count the job completed
+        """
+
+        path = os.path.join(self.directory, 'sample.tds')
+        shutil.copyfile(config.SAMPLE_DS_PATH, path)
+
+        with WriterPool(processes=1) as pool:
+            connection = self._tcp(pool)
+            status, body = self._request(
+                connection,
+                'POST',
+                '/jobs',
+                {'path': path, 'output_dir': self.directory}
+            )
+
+            self.assertEqual(status, 200)
+            self.assertEqual(body['status'], 'Success', body['msg'])
+            self.assertTrue(
+                os.path.exists(os.path.join(self.directory, 'sample.tde'))
+            )
+
+            status, metrics = self._request(connection, 'GET', '/metrics')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(metrics['completed'], 1)
+        self.assertEqual(metrics['processes'], 1)
+
+        for key in ('queued', 'running', 'submitted', 'failed', 'rejected',
+                    'timeouts', 'replaced', 'max-pending'):
+            self.assertIn(key, metrics)
+
+    def test_job_over_unix_socket(self):
+        """Tests a job posted over a Unix socket
+
+        Asserts
+        -------
+        * job options and collation are handed to the pool
+        * response reports status, message and duration
+        """
+
+        pool = _Pool()
+        path = os.path.join(self.directory, 'server.sock')
+        self._serve(_UnixJobServer(path, pool))
+
+        status, body = self._request(
+            _UnixHTTPConnection(path),
+            'POST',
+            '/jobs',
+            {'path': 'a.tds', 'overwrite': True, 'collation': 'binary',
+             'unknown': 1}
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {
+            'path': 'a.tds',
+            'status': 'Success',
+            'msg': '',
+            'duration': 0.5,
+        })
+        self.assertEqual(
+            pool.submitted,
+            [('a.tds', {'overwrite': True}, 'binary', False)]
+        )
+
+    def test_rejected_and_invalid_jobs(self):
+        """Tests jobs the server does not run
+
+        Asserts
+        -------
+        * 503 is returned when the job queue is full
+        * 400 is returned for a job without path
+        * 404 is returned for unknown endpoints
+        * metrics payload is the pool metrics
+        """
+
+        connection = self._tcp(_Pool(full=True))
+
+        self.assertEqual(
+            self._request(connection, 'POST', '/jobs', {'path': 'a.tds'}),
+            (503, {'msg': 'job queue is full'})
+        )
+        self.assertEqual(
+            self._request(connection, 'POST', '/jobs', {})[0],
+            400
+        )
+        self.assertEqual(self._request(connection, 'GET', '/jobs')[0], 404)
+        self.assertEqual(
+            self._request(connection, 'GET', '/metrics'),
+            (200, {'submitted': 0, 'rejected': 1})
+        )
+
+    def test_socket_path_not_a_socket(self):
+        """Tests --socket naming a file which is not a socket
+
+        Asserts
+        -------
+        * command fails with usage error
+        * file is kept
+        """
+
+        path = os.path.join(self.directory, 'data.tds')
+        shutil.copyfile(config.SAMPLE_DS_PATH, path)
+
+        result = CliRunner().invoke(main, ['--socket', path])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn('is not a socket', result.output)
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for directory watcher"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from tableaupy.watcher import Watcher
+from tableaupy.writers.exceptions import FileAlreadyExists
+
+
+class RecordingWriter(object):
+    """Writer recording generated files instead of writing extracts"""
+
+    def __init__(self, fail=False):
+        self.generated = list()
+        self.options = list()
+        self.fail = fail
+
+    @staticmethod
+    def get_output_path(file_path):
+        """Returns path of extract next to the datasource file"""
+        return os.path.splitext(file_path)[0] + '.tde'
+
+    def generate_from_tds(self, tds_file_name, **options):
+        """Records `tds_file_name` and `options`, fails if asked to"""
+        self.generated.append(os.path.basename(tds_file_name))
+        self.options.append(options)
+
+        if self.fail:
+            raise FileAlreadyExists(tds_file_name)
+
+
+class TestWatcher(unittest.TestCase):
+    """Unit Test Cases for Watcher"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.writer = RecordingWriter()
+        self.watcher = Watcher(self.directory, self.writer, debounce=1.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _touch(self, name, content='', mtime=None):
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w') as stream:
+            stream.write(content)
+
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+        return path
+
+    def test_poll_initial_scan(self):
+        """Tests first poll
+
+        Asserts
+        -------
+        * datasource without extract is generated after debounce period
+        * datasource with newer extract is not generated
+        * files other than .tds are ignored
+        """
+
+        self._touch('a.tds', mtime=100)
+        self._touch('b.tds', mtime=100)
+        self._touch('b.tde', mtime=200)
+        self._touch('c.txt', mtime=100)
+
+        self.assertEqual(self.watcher.poll(now=1000), [])
+        results = self.watcher.poll(now=1001)
+        self.assertEqual(self.writer.generated, ['a.tds'])
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0][1])
+
+    def test_poll_debounce(self):
+        """Tests debouncing of changes
+
+        Asserts
+        -------
+        * change is not generated before debounce period
+        * repeated writes restart the debounce period
+        * change is generated once after it settles
+        * unchanged file is not generated again
+        """
+
+        self.watcher.poll(now=0)
+        self._touch('a.tds', 'x', mtime=100)
+
+        self.assertEqual(self.watcher.poll(now=10), [])
+        self.assertEqual(self.watcher.pending, [
+            os.path.join(self.directory, 'a.tds')
+        ])
+
+        self._touch('a.tds', 'xy', mtime=101)
+        self.assertEqual(self.watcher.poll(now=10.5), [])
+        self.assertEqual(self.watcher.poll(now=11), [])
+
+        self.watcher.poll(now=11.5)
+        self.assertEqual(self.writer.generated, ['a.tds'])
+        self.assertEqual(self.watcher.pending, [])
+
+        self.assertEqual(self.watcher.poll(now=20), [])
+        self.assertEqual(self.writer.generated, ['a.tds'])
+
+    def test_poll_generate_options(self):
+        """Tests options of generated extracts
+
+        Asserts
+        -------
+        * generate options are passed to the writer
+        """
+
+        self.watcher = Watcher(
+            self.directory,
+            self.writer,
+            debounce=1.0,
+            generate_options={'fetch_rows': True}
+        )
+        self._touch('a.tds', mtime=100)
+
+        self.watcher.poll(now=1000)
+        self.watcher.poll(now=1001)
+        self.assertEqual(self.writer.options, [{'fetch_rows': True}])
+
+    def test_poll_failure(self):
+        """Tests failure while generating
+
+        Asserts
+        -------
+        * writer exception is returned and not raised
+        """
+
+        self.writer.fail = True
+        self._touch('a.tds', mtime=100)
+
+        self.watcher.poll(now=1000)
+        results = self.watcher.poll(now=1001)
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0][1], FileAlreadyExists)
+
+    def test_poll_removed(self):
+        """Tests file removed before its change settles
+
+        Asserts
+        -------
+        * removed file is not generated
+        """
+
+        self.watcher.poll(now=0)
+        path = self._touch('a.tds', mtime=100)
+        self.watcher.poll(now=10)
+        os.remove(path)
+
+        self.assertEqual(self.watcher.poll(now=20), [])
+        self.assertEqual(self.writer.generated, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
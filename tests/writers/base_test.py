@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for Writer base class"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+
+from tableaupy.writers import Writer
+from tableaupy.writers import exceptions
+
+
+class TestWriter(unittest.TestCase):
+    """Unit Test Cases for Writer file handling"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.directory, 'sample.tde')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, path, content):
+        with open(path, 'w') as stream:
+            stream.write(content)
+
+    def _read(self, path):
+        with open(path) as stream:
+            return stream.read()
+
+    def test_check_file_writable(self):
+        """Tests check_file_writable method
+
+        Asserts
+        -------
+        * raises FileAlreadyExists without overwrite
+        * existing file is not removed with overwrite
+        """
+
+        self._write(self.output_path, 'old')
+
+        with self.assertRaises(exceptions.FileAlreadyExists):
+            Writer('.tde').check_file_writable(self.output_path)
+
+        writer = Writer('.tde', {'overwrite': True})
+        writer.check_file_writable(self.output_path)
+        self.assertEqual(self._read(self.output_path), 'old')
+
+    def test_commit_file_overwrite(self):
+        """Tests commit_file with overwrite
+
+        Asserts
+        -------
+        * temporary file is in output directory
+        * temporary file replaces existing file
+        * temporary file does not exist after commit
+        """
+
+        writer = Writer('.tde', {'overwrite': True})
+        temp_path = writer.get_temp_path(self.output_path)
+        self.assertEqual(os.path.dirname(temp_path), self.directory)
+
+        self._write(self.output_path, 'old')
+        self._write(temp_path, 'new')
+        writer.commit_file(temp_path, self.output_path)
+
+        self.assertEqual(self._read(self.output_path), 'new')
+        self.assertFalse(os.path.exists(temp_path))
+
+    def test_commit_file_without_overwrite(self):
+        """Tests commit_file without overwrite
+
+        Asserts
+        -------
+        * temporary file is moved to output path
+        * raises FileAlreadyExists when output path was created meanwhile
+        * existing file is not modified
+        """
+
+        writer = Writer('.tde')
+        temp_path = writer.get_temp_path(self.output_path)
+        self._write(temp_path, 'first')
+        writer.commit_file(temp_path, self.output_path)
+        self.assertEqual(self._read(self.output_path), 'first')
+
+        temp_path = writer.get_temp_path(self.output_path)
+        self._write(temp_path, 'second')
+
+        with self.assertRaises(exceptions.FileAlreadyExists):
+            writer.commit_file(temp_path, self.output_path)
+
+        self.assertEqual(self._read(self.output_path), 'first')
+        writer.discard_file(temp_path)
+        writer.discard_file(temp_path)
+        self.assertFalse(os.path.exists(temp_path))
+
+    def test_commit_file_without_hard_links(self):
+        """Tests commit_file without overwrite where links are unsupported
+
+        Asserts
+        -------
+        * temporary file is moved to output path
+        * raises FileAlreadyExists when output path exists
+        * existing file is not modified
+        """
+
+        def _link(source, link_name):
+            raise OSError(errno.EPERM, 'Operation not permitted')
+
+        writer = Writer('.tde')
+        link = getattr(os, 'link', None)
+        os.link = _link
+
+        try:
+            temp_path = writer.get_temp_path(self.output_path)
+            self._write(temp_path, 'first')
+            writer.commit_file(temp_path, self.output_path)
+            self.assertEqual(self._read(self.output_path), 'first')
+            self.assertFalse(os.path.exists(temp_path))
+
+            self._write(temp_path, 'second')
+
+            with self.assertRaises(exceptions.FileAlreadyExists):
+                writer.commit_file(temp_path, self.output_path)
+        finally:
+            if link is None:
+                del os.link
+            else:
+                os.link = link
+
+        self.assertEqual(self._read(self.output_path), 'first')
+        writer.discard_file(temp_path)
+
+    def test_cleanup_temp_files(self):
+        """Tests cleanup_temp_files method
+
+        Asserts
+        -------
+        * temporary file of running process is kept
+        * temporary file of dead process is removed
+        * old temporary file of another host is removed
+        * other files are kept
+        """
+
+        writer = Writer('.tde')
+        own_path = writer.get_temp_path(self.output_path)
+        dead_path = own_path.replace(
+            '-{}-'.format(os.getpid()), '-{}-'.format(2 ** 22 + 1)
+        )
+        other_host_path = os.path.join(
+            self.directory, '.old.00000000-1-abcd.tmp.tde'
+        )
+
+        for path in [own_path, dead_path, other_host_path, self.output_path]:
+            self._write(path, '')
+
+        os.utime(other_host_path, (0, 0))
+
+        removed = writer.cleanup_temp_files(self.directory)
+        self.assertEqual(sorted(removed), sorted([dead_path, other_host_path]))
+        self.assertTrue(os.path.exists(own_path))
+        self.assertTrue(os.path.exists(self.output_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
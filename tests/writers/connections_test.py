@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for rewriting datasource connection attributes"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import config
+from tableaupy.readers import TDSReader
+from tableaupy.writers import exceptions
+from tableaupy.writers.connections import ConnectionRewriter
+from tableaupy.writers.connections import markup
+from tableaupy.writers.connections import rewrite_stream
+
+_DATASOURCE = u'''<?xml version='1.0' encoding='utf-8' ?>
+<!-- <connection server='comment'/> -->
+<datasource formatted-name='ds' inline='true'>
+  <connection class='federated'>
+    <named-connections>
+      <named-connection caption='a' name='sqlserver.a'>
+        <connection class='sqlserver' dbname="sales"
+                    server='db1'   username='me' one-time-sql='a&#10;b'/>
+      </named-connection>
+      <named-connection caption='b' name='sqlserver.b'>
+        <connection class='sqlserver' dbname='hr' server='db9'/>
+      </named-connection>
+    </named-connections>
+    <relation connection='sqlserver.a' name='T' type='text'><![CDATA[
+      SELECT '<connection server="db1"/>'
+    ]]></relation>
+    <connection server='db1'/>
+  </connection>
+</datasource>
+'''.encode('utf-8')
+
+
+class TestRewriteStream(unittest.TestCase):
+    """Unit Test Cases for rewrite_stream"""
+
+    def _rewrite(self, changes, conditions=None):
+        target = io.BytesIO()
+        diff = rewrite_stream(
+            io.BytesIO(_DATASOURCE),
+            target,
+            changes,
+            conditions
+        )
+        return target.getvalue(), diff
+
+    def test_markup(self):
+        """Tests splitting markup across chunk boundaries
+
+        Asserts
+        -------
+        * pieces joined are the stream for every chunk size
+        """
+
+        for chunk_size in (1, 2, 7, 64):
+            pieces = list(markup(io.BytesIO(_DATASOURCE), chunk_size))
+            self.assertEqual(b''.join(pieces), _DATASOURCE)
+
+    def test_rewrite_matched(self):
+        """Tests rewriting connections matching conditions
+
+        Asserts
+        -------
+        * only values of matched connections change
+        * other bytes are kept, comments and CDATA are not rewritten
+        * escaped values are compared unescaped
+        """
+
+        output, diff = self._rewrite(
+            {'server': u'db2', 'dbname': u'sales'},
+            {'server': u'db1', 'one-time-sql': u'a\nb'}
+        )
+        self.assertEqual(diff, [('server', u'db1', u'db2')])
+        self.assertEqual(
+            output,
+            _DATASOURCE.replace(
+                b"server='db1'   username",
+                b"server='db2'   username"
+            )
+        )
+
+    def test_rewrite_every_connection(self):
+        """Tests rewriting every connection
+
+        Asserts
+        -------
+        * values are escaped for their quotes
+        * missing attributes are added
+        * file is still read
+        """
+
+        output, diff = self._rewrite({'username': u'o\'neil & "co"'})
+        self.assertEqual(
+            [(name, old) for name, old, _ in diff],
+            [('username', u'me'), ('username', None)]
+        )
+        self.assertIn(b"username='o&apos;neil &amp; \"co\"'", output)
+        self.assertIn(
+            b"server='db9' username=\"o'neil &amp; &quot;co&quot;\"/>",
+            output
+        )
+
+    def test_rewrite_malformed(self):
+        """Tests rewriting datasources which are not well formed
+
+        Asserts
+        -------
+        * raises ValueError for unbalanced and unfinished elements
+        """
+
+        for source in (b'<a><b></a>', b'<a><b/>', b'<a x="1'):
+            with self.assertRaises(ValueError):
+                rewrite_stream(io.BytesIO(source), None, {'server': 'x'})
+
+
+class TestConnectionRewriter(unittest.TestCase):
+    """Unit Test Cases for ConnectionRewriter"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'sample.tds')
+        shutil.copyfile(config.SAMPLE_DS_PATH, self.path)
+
+        with open(self.path, 'rb') as stream:
+            self.content = stream.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _read(self):
+        with open(self.path, 'rb') as stream:
+            return stream.read()
+
+    def test_rewrite(self):
+        """Tests rewriting a datasource file in place
+
+        Asserts
+        -------
+        * dry run reports changes without writing the file
+        * file is replaced with values changed
+        * file is not written when no value changes
+        * no temporary file is left
+        """
+
+        rewriter = ConnectionRewriter({'server': '10.0.0.9'}, dry_run=True)
+        self.assertEqual(
+            rewriter.rewrite(self.path),
+            [('server', '0.0.0.0', '10.0.0.9')]
+        )
+        self.assertEqual(self._read(), self.content)
+
+        rewriter = ConnectionRewriter({'server': '10.0.0.9'})
+        rewriter.rewrite(self.path)
+        self.assertEqual(
+            self._read(),
+            self.content.replace(b"server='0.0.0.0'", b"server='10.0.0.9'")
+        )
+
+        reader = TDSReader()
+        reader.read(self.path)
+        self.assertEqual(
+            reader.get_datasource_metadata()['connection']['server'],
+            '10.0.0.9'
+        )
+
+        os.utime(self.path, (0, 0))
+        self.assertEqual(rewriter.rewrite(self.path), [])
+        self.assertEqual(os.path.getmtime(self.path), 0)
+        self.assertEqual(os.listdir(self.directory), ['sample.tds'])
+
+    def test_rewrite_malformed(self):
+        """Tests rewriting a malformed datasource file
+
+        Asserts
+        -------
+        * raises MalformedDatasource
+        * file is kept and no temporary file is left
+        """
+
+        with open(self.path, 'wb') as stream:
+            stream.write(self.content[:-20])
+
+        with self.assertRaises(exceptions.MalformedDatasource):
+            ConnectionRewriter({'server': 'x'}).rewrite(self.path)
+
+        self.assertEqual(self._read(), self.content[:-20])
+        self.assertEqual(os.listdir(self.directory), ['sample.tds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
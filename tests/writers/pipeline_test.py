@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for insert pipeline"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+import unittest
+
+from tableaupy.rowsources import IterableSource
+from tableaupy.writers.pipeline import InsertPipeline
+from tableaupy.writers.pipeline import ProcessInsertPipeline
+from tableaupy.writers.transport import BatchLayout
+
+
+class TestInsertPipeline(unittest.TestCase):
+    """Unit Test Cases for InsertPipeline"""
+
+    def test_order_and_metrics(self):
+        """Tests rows are inserted in source order
+
+        Asserts
+        -------
+        * every row is converted and inserted once, in order
+        * every stage counts every batch and row
+        """
+
+        inserted = list()
+        source = IterableSource(
+            ['a'],
+            ((number,) for number in range(1000)),
+            batch_size=7
+        )
+        pipeline = InsertPipeline(
+            source,
+            lambda row: (row[0] + 1,),
+            inserted.append,
+            queue_size=2
+        )
+
+        self.assertEqual(pipeline.run(), 1000)
+        self.assertEqual(inserted, [(number,) for number in range(1, 1001)])
+
+        metrics = pipeline.metrics
+
+        for stage in ('fetch', 'convert', 'insert'):
+            self.assertEqual(metrics[stage]['batches'], 143)
+            self.assertEqual(metrics[stage]['rows'], 1000)
+            self.assertLessEqual(metrics[stage]['utilization'], 1.0)
+
+    def test_keep(self):
+        """Tests rows not kept are not inserted
+
+        Asserts
+        -------
+        * only kept rows are inserted and counted
+        """
+
+        inserted = list()
+        pipeline = InsertPipeline(
+            IterableSource(['a'], [(number,) for number in range(10)]),
+            tuple,
+            inserted.append,
+            keep=lambda row: row[0] % 3 == 0
+        )
+
+        self.assertEqual(pipeline.run(), 4)
+        self.assertEqual(inserted, [(0,), (3,), (6,), (9,)])
+
+    def test_backpressure(self):
+        """Tests fetching runs ahead of insertion by at most the queues
+
+        Asserts
+        -------
+        * rows fetched ahead of insertion are bounded by the queue sizes
+        """
+
+        lock = threading.Lock()
+        counts = {'fetched': 0, 'inserted': 0, 'ahead': 0}
+
+        def _rows():
+            for number in range(200):
+                with lock:
+                    counts['fetched'] += 1
+                    counts['ahead'] = max(
+                        counts['ahead'],
+                        counts['fetched'] - counts['inserted']
+                    )
+
+                yield (number,)
+
+        def _insert(row):
+            time.sleep(0.001)
+
+            with lock:
+                counts['inserted'] += 1
+
+        pipeline = InsertPipeline(
+            IterableSource(['a'], _rows(), batch_size=5),
+            tuple,
+            _insert,
+            queue_size=1
+        )
+        pipeline.run()
+
+        # a batch in each queue, one per stage and one being built
+        self.assertLessEqual(counts['ahead'], 6 * 5)
+        self.assertGreater(pipeline.metrics['fetch']['waiting'], 0)
+
+    def test_errors(self):
+        """Tests errors of any stage are raised by run
+
+        Asserts
+        -------
+        * error fetching, converting or inserting is raised
+        * row source is closed
+        """
+
+        class _Source(IterableSource):
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        def _failing_rows():
+            yield (1,)
+            raise IOError('fetch failed')
+
+        def _fail(row):
+            raise ValueError(row)
+
+        cases = [
+            (_failing_rows(), tuple, list().append, IOError),
+            ([(1,), (2,)], _fail, list().append, ValueError),
+            ([(1,), (2,)], tuple, _fail, ValueError),
+        ]
+
+        for rows, convert, insert, exception in cases:
+            source = _Source(['a'], rows, batch_size=1)
+
+            with self.assertRaises(exception):
+                InsertPipeline(source, convert, insert).run()
+
+            self.assertTrue(source.closed)
+
+
+@unittest.skipUnless(
+    ProcessInsertPipeline.supported(),
+    'processes can not be forked'
+)
+class TestProcessInsertPipeline(unittest.TestCase):
+    """Unit Test Cases for ProcessInsertPipeline"""
+
+    def _pipeline(self, rows, convert, insert, **kwargs):
+        return ProcessInsertPipeline(
+            IterableSource(['a', 'b'], rows, batch_size=7),
+            convert,
+            insert,
+            BatchLayout(['INTEGER', 'UNICODE_STRING']),
+            **kwargs
+        )
+
+    def test_order_and_metrics(self):
+        """Tests rows converted in the fetch process are inserted in order
+
+        Asserts
+        -------
+        * every kept row is inserted once, in order
+        * batches larger than a slot are inserted too
+        * fetch and convert metrics of the fetch process are reported
+        """
+
+        rows = [(number, u'é' * (number % 50)) for number in range(1000)]
+        inserted = list()
+        pipeline = self._pipeline(
+            rows,
+            lambda row: (row[0] * 2, row[1] or None),
+            inserted.append,
+            keep=lambda row: row[0] % 3 != 0,
+            batch_size=100,
+            slot_size=512
+        )
+
+        expected = [
+            (number * 2, text or None)
+            for number, text in rows
+            if number * 2 % 3 != 0
+        ]
+
+        self.assertEqual(pipeline.run(), len(expected))
+        self.assertEqual(inserted, expected)
+        self.assertEqual(pipeline.metrics['fetch']['rows'], 1000)
+        self.assertEqual(pipeline.metrics['convert']['rows'], len(expected))
+        self.assertEqual(pipeline.metrics['insert']['batches'], 7)
+
+    def test_errors(self):
+        """Tests errors of either process are raised by run
+
+        Asserts
+        -------
+        * error converting in the fetch process is raised
+        * error inserting is raised
+        """
+
+        def _fail(row):
+            raise ValueError(row)
+
+        rows = [(number, u'a') for number in range(100)]
+
+        with self.assertRaises(ValueError):
+            self._pipeline(rows, _fail, list().append).run()
+
+        with self.assertRaises(ValueError):
+            self._pipeline(rows, tuple, _fail, queue_size=1).run()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for output path planner"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from tableaupy.writers import Writer
+from tableaupy.writers import exceptions
+from tableaupy.writers.planner import plan_batch
+
+
+class TestPlanBatch(unittest.TestCase):
+    """Unit Test Cases for plan_batch"""
+
+    def setUp(self):
+        self.directory = os.path.realpath(tempfile.mkdtemp())
+        self.output_dir = os.path.join(self.directory, 'out')
+        os.mkdir(self.output_dir)
+
+        for sub_directory in ['a', 'b']:
+            os.mkdir(os.path.join(self.directory, sub_directory))
+            self._touch(sub_directory, 'x.tds')
+
+        self._touch('a', 'y.tds')
+        self._touch('a', 'z.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _path(self, *names):
+        return os.path.join(self.directory, *names)
+
+    def _touch(self, *names):
+        open(self._path(*names), 'w').close()
+
+    def _writer(self, **options):
+        return Writer('.tde', options)
+
+    def test_entries(self):
+        """Tests planned entries
+
+        Asserts
+        -------
+        * output is placed next to input without output_dir
+        * prefix and suffix are used
+        * duplicate inputs are planned once
+        * skipped inputs are not planned
+        """
+
+        writer = self._writer(prefix='p_', suffix='_s')
+        files = [self._path('a', 'x.tds'), self._path('a', 'x.tds')]
+        plan = plan_batch(writer, files, '.tds')
+
+        self.assertTrue(plan.ok)
+        self.assertEqual(len(plan.entries), 1)
+        self.assertEqual(
+            plan.entries[0].output_path,
+            self._path('a', 'p_x_s.tde')
+        )
+
+        plan = plan_batch(writer, files, '.tds', skip=set([files[0]]))
+        self.assertTrue(plan.ok)
+        self.assertEqual(plan.entries, [])
+
+    def test_collision(self):
+        """Tests inputs with same output path
+
+        Asserts
+        -------
+        * every colliding input is a failure
+        * failure is OutputPathCollision
+        * other inputs are still planned
+        """
+
+        writer = self._writer(output_dir=self.output_dir)
+        files = [
+            self._path('a', 'x.tds'),
+            self._path('b', 'x.tds'),
+            self._path('a', 'y.tds'),
+        ]
+        plan = plan_batch(writer, files, '.tds')
+
+        self.assertFalse(plan.ok)
+        self.assertEqual(sorted(plan.failures), sorted(files[:2]))
+
+        for _, error in plan.failures.values():
+            self.assertIsInstance(error, exceptions.OutputPathCollision)
+
+        self.assertEqual([entry.absolute_path for entry in plan.entries], [
+            files[2]
+        ])
+
+    def test_several_outputs(self):
+        """Tests inputs written to several outputs
+
+        Asserts
+        -------
+        * other output of an input colliding with the output of another
+          input is OutputPathCollision for both
+        * existing other output is FileAlreadyExists without overwrite
+        """
+
+        writer = self._writer(output_dir=self.output_dir)
+        files = [self._path('a', 'x.tds'), self._path('a', 'y.tds')]
+
+        def _output_paths(file_name, output_path):
+            if file_name != files[0]:
+                return [output_path]
+
+            return [
+                os.path.join(self.output_dir, name)
+                for name in ['y.tde', 'z.tde']
+            ]
+
+        plan = plan_batch(writer, files, '.tds', output_paths=_output_paths)
+        self.assertEqual(sorted(plan.failures), sorted(files))
+
+        for _, error in plan.failures.values():
+            self.assertIsInstance(error, exceptions.OutputPathCollision)
+
+        open(os.path.join(self.output_dir, 'z.tde'), 'w').close()
+        plan = plan_batch(
+            writer, files[:1], '.tds', output_paths=_output_paths
+        )
+        self.assertIsInstance(
+            plan.failures[files[0]][1],
+            exceptions.FileAlreadyExists
+        )
+
+    def test_existing_output(self):
+        """Tests inputs whose output already exists
+
+        Asserts
+        -------
+        * failure is FileAlreadyExists without overwrite
+        * input is planned with overwrite
+        """
+
+        open(os.path.join(self.output_dir, 'y.tde'), 'w').close()
+        files = [self._path('a', 'y.tds')]
+
+        plan = plan_batch(
+            self._writer(output_dir=self.output_dir), files, '.tds'
+        )
+        self.assertIsInstance(
+            plan.failures[files[0]][1],
+            exceptions.FileAlreadyExists
+        )
+
+        plan = plan_batch(
+            self._writer(output_dir=self.output_dir, overwrite=True),
+            files,
+            '.tds'
+        )
+        self.assertTrue(plan.ok)
+
+    def test_extension(self):
+        """Tests inputs with wrong extension
+
+        Asserts
+        -------
+        * failure message names the expected extension
+        """
+
+        files = [self._path('a', 'z.txt')]
+        plan = plan_batch(self._writer(), files, '.tds')
+
+        self.assertFalse(plan.ok)
+        self.assertRegexpMatches(
+            str(plan.failures[files[0]][1]),
+            'does not have extension `.tds`'
+        )
+
+    def test_shard(self):
+        """Tests sharding of a plan
+
+        Asserts
+        -------
+        * every entry and failure is in exactly one shard
+        * shards do not depend on input order
+        """
+
+        files = [self._path('{}.tds'.format(index)) for index in range(20)]
+        files.append(self._path('other.txt'))
+        plan = plan_batch(self._writer(), files, '.tds')
+        reversed_plan = plan_batch(self._writer(), files[::-1], '.tds')
+        shards = [plan.shard(index, 3) for index in range(3)]
+
+        self.assertEqual(
+            sorted(entry for shard in shards for entry in shard.entries),
+            sorted(plan.entries)
+        )
+        self.assertEqual(
+            sum(len(shard.failures) for shard in shards),
+            len(plan.failures)
+        )
+
+        for index, shard in enumerate(shards):
+            self.assertEqual(
+                sorted(shard.entries),
+                sorted(reversed_plan.shard(index, 3).entries)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for pool of worker processes"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import signal
+import tempfile
+import time
+import unittest
+
+import config
+from tableaupy.writers import WriterPool
+
+
+class _Path(object):
+    """Datasource path whose use in a worker misbehaves
+
+    `behavior` is one of hang or exhaust.
+    """
+
+    def __init__(self, path, behavior):
+        self.path = path
+        self.behavior = behavior
+
+    def __fspath__(self):
+        if self.behavior == 'hang':
+            time.sleep(3600)
+        elif self.behavior == 'exhaust':
+            raise MemoryError()
+
+        return self.path
+
+    def __str__(self):
+        return self.path
+
+
+class _Unpicklable(object):
+    """Option killing the worker receiving it, before it starts its job"""
+
+    def __reduce__(self):
+        return os._exit, (9, )  # pylint: disable=protected-access
+
+
+class TestWriterPool(unittest.TestCase):
+    """Unit Test Cases for WriterPool"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'sample.tds')
+        shutil.copyfile(config.SAMPLE_DS_PATH, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _submit(self, pool, path=None, **kwargs):
+        return pool.submit(
+            self.path if path is None else path,
+            {'output_dir': self.directory, 'overwrite': True},
+            **kwargs
+        )
+
+    def _assert_succeeds(self, pool):
+        job = self._submit(pool)
+        self.assertTrue(job.wait(30))
+        self.assertTrue(job.succeeded, job.error)
+
+    def test_jobs(self):
+        """Tests jobs run by warm workers
+
+        Asserts
+        -------
+        * every job succeeds
+        * metrics count completed jobs and no replaced worker
+        """
+
+        with WriterPool(processes=1) as pool:
+            jobs = [self._submit(pool) for _ in range(3)]
+
+            for job in jobs:
+                self.assertTrue(job.wait(30))
+                self.assertTrue(job.succeeded, job.error)
+
+            metrics = pool.metrics
+
+        self.assertEqual(metrics['completed'], 3)
+        self.assertEqual(metrics['replaced'], 0)
+
+    def test_timeout(self):
+        """Tests job running longer than timeout
+
+        Asserts
+        -------
+        * job fails with timeout
+        * worker is replaced and runs next job
+        """
+
+        with WriterPool(processes=1, timeout=1) as pool:
+            job = self._submit(pool, _Path(self.path, 'hang'))
+            self.assertTrue(job.wait(30))
+            self.assertIn('worker killed', job.error)
+            self._assert_succeeds(pool)
+            metrics = pool.metrics
+
+        self.assertEqual(metrics['timeouts'], 1)
+        self.assertEqual(metrics['replaced'], 1)
+
+    def test_memory_budget(self):
+        """Tests job exceeding memory budget of its worker
+
+        Asserts
+        -------
+        * job fails with memory budget exceeded
+        * job queued meanwhile is not given to exiting worker and succeeds
+        * exited worker is replaced
+        """
+
+        with WriterPool(processes=1, memory_limit=8 << 30) as pool:
+            exhausted = self._submit(pool, _Path(self.path, 'exhaust'))
+            queued = self._submit(pool)
+
+            self.assertTrue(exhausted.wait(30))
+            self.assertIn('memory budget', exhausted.error)
+            self.assertTrue(queued.wait(30))
+            self.assertTrue(queued.succeeded, queued.error)
+
+            deadline = time.time() + 30
+
+            while pool.metrics['replaced'] < 1 and time.time() < deadline:
+                time.sleep(0.05)
+
+            self.assertEqual(pool.metrics['replaced'], 1)
+
+    def test_worker_died(self):
+        """Tests worker dying while running a job
+
+        Asserts
+        -------
+        * job of a worker killed while running it fails
+        * job is not queued again
+        * worker is replaced and runs next job
+        """
+
+        with WriterPool(processes=1) as pool:
+            job = self._submit(pool, _Path(self.path, 'hang'))
+            deadline = time.time() + 30
+
+            while job.started_at is None and time.time() < deadline:
+                time.sleep(0.05)
+
+            os.kill(job.worker, signal.SIGKILL)
+            self.assertTrue(job.wait(30))
+            self.assertIsNotNone(job.error)
+            self.assertIn('exit code -9', job.error)
+            self.assertFalse(job.requeued)
+
+            self._assert_succeeds(pool)
+            metrics = pool.metrics
+
+        self.assertEqual(metrics['replaced'], 1)
+        self.assertEqual(metrics['failed'], 1)
+
+    def test_worker_died_before_job(self):
+        """Tests worker dying before starting a job
+
+        Asserts
+        -------
+        * job is queued again once, then fails
+        * every dead worker is replaced and the pool keeps running jobs
+        """
+
+        with WriterPool(processes=1) as pool:
+            job = self._submit(
+                pool,
+                generate_options={'fetch_rows': _Unpicklable()}
+            )
+            self.assertTrue(job.wait(30))
+            self.assertTrue(job.requeued)
+            self.assertIsNotNone(job.error)
+
+            self._assert_succeeds(pool)
+            metrics = pool.metrics
+
+        self.assertEqual(metrics['replaced'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
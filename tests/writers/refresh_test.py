@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for incremental refresh high-water marks"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import config
+from tableaupy.readers import TDSReader
+from tableaupy.writers import refresh
+from tableaupy.writers.exceptions import UnknownIncrementKey
+from tableaupy.writers.exceptions import WriterException
+
+
+class TestRefresh(unittest.TestCase):
+    """Unit Test Cases for refresh"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.directory, 'sample.tde')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _save(self, increment_key, local_type, mark, scope=None):
+        refresh.commit_mark(
+            refresh.write_mark(
+                self.output_path, increment_key, local_type, mark, scope
+            ),
+            self.output_path
+        )
+
+    def _reader(self, increment_key, incremental_updates='true'):
+        with open(config.SAMPLE_DS_PATH) as stream:
+            content = stream.read().replace(
+                'increment-key="" incremental-updates="false"',
+                'increment-key="{}" incremental-updates="{}"'.format(
+                    increment_key, incremental_updates
+                )
+            )
+
+        tds_path = os.path.join(self.directory, 'sample.tds')
+
+        with open(tds_path, 'w') as stream:
+            stream.write(content)
+
+        reader = TDSReader()
+        reader.read(tds_path)
+        return reader
+
+    def test_increment_column(self):
+        """Tests increment key column lookup
+
+        Asserts
+        -------
+        * no column unless incremental updates are enabled
+        * key is found by local-name and by remote-name
+        * key is found among selected columns, no column when excluded
+        * unknown key raises UnknownIncrementKey
+        """
+
+        reader = TDSReader()
+        reader.read(config.SAMPLE_DS_PATH)
+        self.assertIsNone(refresh.increment_column(reader))
+
+        reader = self._reader('[LOCAL_COLUMN_NAME1]', 'false')
+        self.assertIsNone(refresh.increment_column(reader))
+
+        for increment_key in ['[LOCAL_COLUMN_NAME2]', 'REMOTE_COLUMN_NAME2']:
+            index, column = refresh.increment_column(
+                self._reader(increment_key)
+            )
+            self.assertEqual(index, 1)
+            self.assertEqual(column['remote-name'], 'REMOTE_COLUMN_NAME2')
+
+        reader = self._reader('[LOCAL_COLUMN_NAME2]')
+        self.assertEqual(refresh.increment_column(reader, [1, 2])[0], 0)
+        self.assertIsNone(refresh.increment_column(reader, [0, 2]))
+
+        with self.assertRaises(UnknownIncrementKey):
+            refresh.increment_column(self._reader('[MISSING]'))
+
+    def test_marks(self):
+        """Tests saving, loading and removing marks
+
+        Asserts
+        -------
+        * no mark before one is saved
+        * mark is loaded back with its type
+        * mark of another key is not loaded
+        * mark of another scope is not loaded
+        * removed mark is not loaded
+        """
+
+        self.assertIsNone(refresh.load_mark(self.output_path, 'Id', 'integer'))
+
+        mark = datetime.datetime(2017, 3, 1, 10, 30, 15, 250000)
+        self._save('At', 'datetime', mark)
+        self.assertEqual(
+            refresh.load_mark(self.output_path, 'At', 'datetime'),
+            mark
+        )
+        self.assertIsNone(refresh.load_mark(self.output_path, 'Id', 'integer'))
+
+        self._save('Id', 'integer', 42)
+        self.assertEqual(
+            refresh.load_mark(self.output_path, 'Id', 'integer'),
+            42
+        )
+
+        scope = refresh.mark_scope(['[Id]'], [('Id', '>', 1)])
+        self._save('Id', 'integer', 42, scope)
+        self.assertEqual(
+            refresh.load_mark(self.output_path, 'Id', 'integer', scope),
+            42
+        )
+        self.assertIsNone(refresh.load_mark(self.output_path, 'Id', 'integer'))
+        self.assertIsNone(refresh.load_mark(
+            self.output_path,
+            'Id',
+            'integer',
+            refresh.mark_scope(['[Id]'], [('Id', '>', 2)])
+        ))
+
+        refresh.remove_mark(self.output_path)
+        refresh.remove_mark(self.output_path)
+        self.assertIsNone(refresh.load_mark(self.output_path, 'Id', 'integer'))
+
+    def test_mark_commit(self):
+        """Tests marks written ahead of extract commit
+
+        Asserts
+        -------
+        * written mark is not loaded before it is committed
+        * committed mark replaces previous one
+        * failures to write or remove a mark raise WriterException
+        """
+
+        self._save('Id', 'integer', 1)
+        temp_path = refresh.write_mark(self.output_path, 'Id', 'integer', 2)
+        self.assertEqual(
+            refresh.load_mark(self.output_path, 'Id', 'integer'),
+            1
+        )
+
+        refresh.commit_mark(temp_path, self.output_path)
+        self.assertEqual(
+            refresh.load_mark(self.output_path, 'Id', 'integer'),
+            2
+        )
+        self.assertFalse(os.path.exists(temp_path))
+
+        missing = os.path.join(self.directory, 'missing', 'sample.tde')
+
+        with self.assertRaises(WriterException):
+            refresh.write_mark(missing, 'Id', 'integer', 1)
+
+        os.remove(refresh.mark_path(self.output_path))
+        os.mkdir(refresh.mark_path(self.output_path))
+
+        with self.assertRaises(WriterException):
+            refresh.remove_mark(self.output_path)
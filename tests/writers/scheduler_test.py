@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for largest-first scheduling"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from tableaupy.writers.planner import PlanEntry
+from tableaupy.writers.scheduler import CostHistory
+from tableaupy.writers.scheduler import schedule
+
+
+class TestSchedule(unittest.TestCase):
+    """Unit Test Cases for schedule and CostHistory"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.history_path = os.path.join(self.directory, 'history.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _entry(self, name, size):
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'wb') as stream:
+            stream.write(b'x' * size)
+
+        return PlanEntry(name, path, path + '.tde')
+
+    def _names(self, entries, history):
+        return [entry.file_name for entry in schedule(entries, history)]
+
+    def test_largest_first(self):
+        """Tests ordering without history
+
+        Asserts
+        -------
+        * entries are ordered largest file first
+        * missing files are ordered last
+        """
+
+        entries = [
+            self._entry('small.tds', 10),
+            self._entry('big.tds', 1000),
+            PlanEntry('missing.tds', '/missing.tds', '/missing.tde'),
+            self._entry('medium.tds', 100),
+        ]
+
+        self.assertEqual(
+            self._names(entries, CostHistory()),
+            ['big.tds', 'medium.tds', 'small.tds', 'missing.tds']
+        )
+
+    def test_history(self):
+        """Tests ordering by durations recorded across runs
+
+        Asserts
+        -------
+        * history is saved and loaded
+        * last duration is used for a file of unchanged size
+        * observed rate scales size of a changed or unknown file
+        """
+
+        slow = self._entry('slow.tds', 10)
+        big = self._entry('big.tds', 1000)
+        new = self._entry('new.tds', 500)
+
+        history = CostHistory(self.history_path)
+        history.record(slow.absolute_path, 10, 60.0)
+        history.record(big.absolute_path, 1000, 10.0)
+        history.save()
+
+        history = CostHistory(self.history_path)
+        self.assertEqual(history.seconds_per_byte(), 6.0)
+        self.assertEqual(history.estimate(slow.absolute_path, 10), 60.0)
+        self.assertEqual(history.estimate(big.absolute_path, 2000, 0.5),
+                         1000.0)
+        self.assertEqual(
+            self._names([big, new, slow], history),
+            ['new.tds', 'slow.tds', 'big.tds']
+        )
+
+    def test_corrupt_history(self):
+        """Tests history files which can not be used
+
+        Asserts
+        -------
+        * invalid JSON, JSON of another shape and invalid entries are
+          ignored
+        * entries are ordered by size
+        * history is saved over a corrupt file
+        """
+
+        entries = [self._entry('small.tds', 10), self._entry('big.tds', 1000)]
+        contents = [
+            b'{"/a.tds": {"size": 1',
+            b'\xff\xfe',
+            b'[1, 2]',
+            b'{"/a.tds": 1, "/b.tds": {"size": "1", "duration": 2.0},'
+            b' "/c.tds": {"size": 0}}',
+        ]
+
+        for content in contents:
+            with open(self.history_path, 'wb') as stream:
+                stream.write(content)
+
+            history = CostHistory(self.history_path)
+
+            self.assertIsNone(history.seconds_per_byte(), content)
+            self.assertEqual(
+                self._names(entries, history),
+                ['big.tds', 'small.tds']
+            )
+
+        history.record(entries[0].absolute_path, 10, 1.0)
+        history.save()
+
+        self.assertEqual(
+            CostHistory(self.history_path).estimate(
+                entries[0].absolute_path, 10
+            ),
+            1.0
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for TDSWriter"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import config
+from tableaupy.readers import TDSReader
+from tableaupy.writers import TDSWriter
+from tableaupy.writers import exceptions
+
+JOIN_DATASOURCE = '''<?xml version='1.0' encoding='utf-8' ?>
+<datasource formatted-name='sales' inline='true'>
+  <connection class='federated'>
+    <named-connections>
+      <named-connection name='sqlite.sales'>
+        <connection class='sqlite' dbname='/data/sales.db' />
+      </named-connection>
+      <named-connection name='sqlite.crm'>
+        <connection class='sqlite' dbname='/data/crm.db' />
+      </named-connection>
+    </named-connections>
+    <relation join='inner' type='join'>
+      <clause type='join'>
+        <expression op='='>
+          <expression op='[items].[order]' />
+          <expression op='[orders].[id]' />
+        </expression>
+      </clause>
+      <relation connection='sqlite.sales' name='items' table='[items]'
+                type='table' />
+      <relation join='left' type='join'>
+        <clause type='join'>
+          <expression op='AND'>
+            <expression op='='>
+              <expression op='[orders].[customer]' />
+              <expression op='[customers].[id]' />
+            </expression>
+            <expression op='='>
+              <expression op='[orders].[region]' />
+              <expression op='[customers].[region]' />
+            </expression>
+          </expression>
+        </clause>
+        <relation connection='sqlite.sales' name='orders' table='[orders]'
+                  type='table' />
+        <relation connection='sqlite.crm' name='customers'
+                  table='[customers]' type='table' />
+      </relation>
+    </relation>
+    <metadata-records>
+      <metadata-record class='column'>
+        <remote-name>id</remote-name>
+        <local-name>[id]</local-name>
+        <parent-name>[orders]</parent-name>
+        <local-type>integer</local-type>
+      </metadata-record>
+    </metadata-records>
+  </connection>
+</datasource>
+'''
+
+
+class TestTDSWriter(unittest.TestCase):
+    """Unit Test Cases for TDSWriter"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.reader = TDSReader()
+        self.reader.read(config.SAMPLE_DS_PATH)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _read(self, path):
+        reader = TDSReader()
+        reader.read(path)
+        return reader
+
+    def test_write_from_reader(self):
+        """Tests writing a datasource read
+
+        Asserts
+        -------
+        * metadata, columns, relation and refresh read back as read
+        * output file is named after the input file
+        * existing file is only replaced with overwrite
+        """
+
+        writer = TDSWriter({'output_dir': self.directory, 'prefix': 'p_'})
+        path = writer.write_from_reader(config.SAMPLE_DS_PATH, self.reader)
+        self.assertEqual(path, os.path.join(self.directory, 'p_sample.tds'))
+
+        copy = self._read(path)
+
+        for getter in ('get_datasource_metadata',
+                       'get_datasource_column_records',
+                       'get_datasource_column_details',
+                       'get_datasource_relation',
+                       'get_datasource_refresh'):
+            self.assertEqual(
+                getattr(copy, getter)(),
+                getattr(self.reader, getter)(),
+                getter
+            )
+
+        with self.assertRaises(exceptions.FileAlreadyExists):
+            writer.write_from_reader(config.SAMPLE_DS_PATH, self.reader)
+
+        writer.overwrite = True
+        writer.write_from_reader(config.SAMPLE_DS_PATH, self.reader)
+        self.assertEqual(os.listdir(self.directory), ['p_sample.tds'])
+
+    def test_write_join_from_reader(self):
+        """Tests writing a datasource joining tables of several connections
+
+        Asserts
+        -------
+        * relation tree reads back with joined relations and clauses
+        * every connection reads back under its name
+        """
+
+        tds_path = os.path.join(self.directory, 'sales.tds')
+
+        with open(tds_path, 'w') as stream:
+            stream.write(JOIN_DATASOURCE)
+
+        reader = self._read(tds_path)
+        path = TDSWriter({'suffix': '_copy'}).write_from_reader(
+            tds_path,
+            reader
+        )
+        copy = self._read(path)
+
+        for getter in ('get_datasource_metadata',
+                       'get_datasource_connections',
+                       'get_datasource_relation',
+                       'get_datasource_relation_tree',
+                       'get_datasource_column_records'):
+            self.assertEqual(
+                getattr(copy, getter)(),
+                getattr(reader, getter)(),
+                getter
+            )
+
+        self.assertEqual(
+            list(copy.get_datasource_connections()),
+            ['sqlite.sales', 'sqlite.crm']
+        )
+        self.assertEqual(
+            copy.get_datasource_relation_tree()['relations'][1]['clauses'],
+            [('[orders].[customer]', '[customers].[id]'),
+             ('[orders].[region]', '[customers].[region]')]
+        )
+
+    def test_write_streamed_columns(self):
+        """Tests writing columns of a generator
+
+        Asserts
+        -------
+        * column details are written with their fields
+        * missing fields read back as None
+        * special characters are escaped
+        * file has no relation or refresh when not given
+        """
+
+        def columns():
+            for number in range(5000):
+                yield {
+                    'remote-name': u'c<{}> & "ü"'.format(number),
+                    'local-name': u'[c{}]'.format(number),
+                    'parent-name': u'[t]',
+                    'local-type': 'integer',
+                    'aggregation': None,
+                }
+
+        metadata = {
+            'datasource': {'formatted-name': u'wide', 'inline': 'true'},
+            'connection': {'class': 'sqlite', 'dbname': u'/data/wide.db'},
+        }
+        path = TDSWriter().write(
+            os.path.join(self.directory, 'wide.tds'),
+            metadata,
+            columns()
+        )
+        copy = self._read(path)
+
+        self.assertEqual(copy.get_datasource_metadata(), metadata)
+        self.assertEqual(
+            copy.get_datasource_column_details(),
+            list(columns())
+        )
+        self.assertEqual(copy.get_datasource_relation(), {})
+        self.assertEqual(copy.get_datasource_refresh(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
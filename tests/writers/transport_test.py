@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Unit Test Cases for shared memory transfer of row batches"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import datetime
+import unittest
+
+from tableaupy.writers import transport
+
+
+class TestBatchLayout(unittest.TestCase):
+    """Unit Test Cases for BatchLayout"""
+
+    type_names = [
+        'BOOLEAN', 'INTEGER', 'DOUBLE', 'DATE', 'DATETIME', 'DURATION',
+        'CHAR_STRING', 'UNICODE_STRING',
+    ]
+
+    def _round_trip(self, rows):
+        layout = transport.BatchLayout(self.type_names)
+        size, writes = layout.pack(rows)
+        buf = bytearray(size)
+        layout.write(buf, writes)
+        return layout.unpack(memoryview(buf), len(rows))
+
+    def test_every_type(self):
+        rows = [
+            (
+                number % 2 == 0,
+                -number * 1000003,
+                number / 7,
+                datetime.date(2017, 1, 1) + datetime.timedelta(days=number),
+                datetime.datetime(1999, 12, 31, 23, 59, 59, number),
+                datetime.timedelta(days=-number, microseconds=number),
+                u'text {}'.format(number),
+                u'ünïcödé' * number,
+            )
+            for number in range(20)
+        ]
+        rows.append((None,) * len(self.type_names))
+
+        self.assertEqual(self._round_trip(rows), rows)
+
+    def test_empty(self):
+        self.assertEqual(self._round_trip([]), [])
+
+    def test_alignment(self):
+        layout = transport.BatchLayout(['BOOLEAN', 'DOUBLE'])
+        _, writes = layout.pack([(True, 1.0)] * 3)
+
+        self.assertEqual([offset for offset, _, _ in writes], [0, 8, 16, 24])
+
+    def test_unknown_type(self):
+        with self.assertRaises(KeyError):
+            transport.BatchLayout(['SPATIAL'])